@@ -4,6 +4,7 @@ __all__ = [
     "knowledge_router",
     "profiling_router",
     "etp_router",
+    "ingestion_router",
 ]
 
 from .auth_router import router as auth_router
@@ -11,5 +12,4 @@ from .knowledge_router import router as knowledge_router
 from .profiling_router import router as profiling_router
 from .two_factor_router import router as two_factor_router
 from .etp_router import router as etp_router
-# TODO: Reativar na integração do Crawler
-# from . import ingestion_router
+from .ingestion_router import router as ingestion_router
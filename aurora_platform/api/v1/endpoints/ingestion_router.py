@@ -1,48 +1,92 @@
 # src/aurora_platform/api/v1/endpoints/ingestion_router.py
 
-from typing import Any, Dict, Optional
+import os
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 
+from aurora_platform.core.security import get_current_user
+from aurora_platform.modules.crawler.batch import check_source, is_url
 from aurora_platform.modules.rag.orchestrator import AuroraIngestionOrchestrator
 
 router = APIRouter(prefix="/ingest", tags=["ingestion"])
 
+# caminhos locais só sob esta raiz (vazio = API não lê arquivos do servidor)
+LOCAL_ROOT = os.getenv("INGEST_LOCAL_ROOT", "")
+# hosts aceitos em URLs, separados por vírgula (vazio = qualquer host público)
+ALLOWED_HOSTS = [h.strip().lower() for h in os.getenv("INGEST_ALLOWED_HOSTS", "").split(",") if h.strip()]
+
 
 class IngestRequest(BaseModel):
-    """Schema for document ingestion requests."""
+    """Schema for document ingestion requests.
+
+    `content` ingere um documento em texto; `sources` aceita URLs e, com
+    `INGEST_LOCAL_ROOT`, caminhos relativos a essa raiz.
+    """
 
-    content: str
+    content: Optional[str] = None
     document_type: Optional[str] = "text"
     metadata: Optional[Dict[str, Any]] = None
+    sources: Optional[List[str]] = None
 
 
 @router.post("/", status_code=status.HTTP_202_ACCEPTED)
-async def ingest_document(request: IngestRequest):
+async def ingest_document(
+    request: IngestRequest, current_user: dict = Depends(get_current_user)
+):
     """
-    Ingest a document into the RAG system.
+    Ingest documents into the RAG system.
 
     Args:
-        request: Document ingestion request containing content and metadata
+        request: Document ingestion request containing content and/or sources
 
     Returns:
-        Dictionary with ingestion result
+        Dictionary with the job id; progress at GET /ingest/jobs/{job_id}
     """
-    try:
-        orchestrator = AuroraIngestionOrchestrator()
-
-        document_data = {
+    if not request.content and not request.sources:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Informe 'content' ou 'sources'",
+        )
+    rejected = [
+        {"source": src, "error": err}
+        for src in request.sources or []
+        if (err := check_source(src, LOCAL_ROOT, ALLOWED_HOSTS)) is not None
+    ]
+    if rejected:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=rejected)
+    # URLs seguem como {"url": ...}: o worker baixa com `guarded_client`,
+    # que refaz a checagem de host em cada redirect
+    specs: List[Any] = [
+        {"url": src, "allowed_hosts": ALLOWED_HOSTS}
+        if is_url(src)
+        else os.path.realpath(os.path.join(LOCAL_ROOT, src))
+        for src in request.sources or []
+    ]
+    if request.content:
+        meta = request.metadata or {}
+        spec: Dict[str, Any] = {
             "content": request.content,
-            "document_type": request.document_type,
-            "metadata": request.metadata or {},
+            "media_type": request.document_type or "text",
+            "metadata": meta,
         }
-
-        result = await orchestrator.ingest_document(document_data)
-        return result
-
+        if meta.get("source"):
+            spec["source"] = meta["source"]
+        specs.append(spec)
+    try:
+        return await AuroraIngestionOrchestrator().ingest_sources(specs)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error ingesting document: {str(e)}",
         )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Progresso, tempos por etapa e falhas de um job de ingestão."""
+    job = AuroraIngestionOrchestrator().job_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job não encontrado")
+    return job
@@ -5,6 +5,13 @@ from typing import Any, Dict, List, Optional
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
+from aurora_platform.modules.rag.indexer.profiles import (
+    CollectionProfile,
+    ensure_collection,
+    get_profile,
+    search_params,
+)
+
 
 class QdrantAdapter:
     def __init__(
@@ -14,11 +21,15 @@ class QdrantAdapter:
         host: str = "qdrant",
         port: int = 6333,
         collection_name: str = "aurora_knowledge",
+        vector_size: int = 1536,  # Tamanho compatível com embeddings OpenAI
+        profile: Optional[CollectionProfile] = None,
     ):
         # Permite inicialização por URL/API_KEY (Qdrant Cloud) ou host/port (local)
         url = url or os.getenv("QDRANT_URL")
         api_key = api_key or os.getenv("QDRANT_API_KEY")
         self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.profile = profile or get_profile()
         if url:
             self.client = QdrantClient(url=url, api_key=api_key)
         else:
@@ -34,19 +45,11 @@ class QdrantAdapter:
             return False
 
     def _ensure_collection(self):
-        """Cria a coleção se não existir com configurações otimizadas"""
+        """Cria a coleção se não existir, conforme o perfil (QDRANT_PROFILE)"""
         try:
-            if not self.client.collection_exists(collection_name=self.collection_name):
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(
-                        size=1536,  # Tamanho compatível com embeddings OpenAI
-                        distance=models.Distance.COSINE,
-                    ),
-                    optimizers_config=models.OptimizersConfigDiff(
-                        indexing_threshold=0, memmap_threshold=2000
-                    ),
-                )
+            ensure_collection(
+                self.client, self.collection_name, self.vector_size, self.profile
+            )
         except Exception as e:
             logging.error(f"Erro ao criar coleção Qdrant: {e}")
             raise
@@ -83,6 +86,7 @@ class QdrantAdapter:
                 query_vector=query_embedding,
                 query_filter=models.Filter(**filters) if filters else None,
                 limit=k,
+                search_params=search_params(self.profile),
             )
 
             return [
@@ -4,13 +4,18 @@ from typing import Any, Dict, List, Optional
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import (
     PointStruct,
-    VectorParams,
-    Distance,
     Filter,
     FieldCondition,
     MatchValue,
 )
 
+from aurora_platform.modules.rag.indexer.profiles import (
+    CollectionProfile,
+    ensure_collection,
+    get_profile,
+    search_params,
+)
+
 
 class VectorStore:
     def __init__(
@@ -19,6 +24,7 @@ class VectorStore:
         port: int = 6333,
         collection_name: str = "aurora_collection",
         vector_size: int = 384,
+        profile: Optional[CollectionProfile] = None,
     ):
         """
         Inicializa o cliente Qdrant e garante a existência da coleção.
@@ -26,20 +32,16 @@ class VectorStore:
         self.client = QdrantClient(host=host, port=port)
         self.collection_name = collection_name
         self.vector_size = vector_size
+        self.profile = profile or get_profile()
         self._ensure_collection()
 
     def _ensure_collection(self):
         """
         Garante que a coleção existe no Qdrant.
         """
-        collections = self.client.get_collections().collections
-        if not any(c.name == self.collection_name for c in collections):
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size, distance=Distance.COSINE
-                ),
-            )
+        if ensure_collection(
+            self.client, self.collection_name, self.vector_size, self.profile
+        ):
             print(f"Collection '{self.collection_name}' created.")
         else:
             print(f"Collection '{self.collection_name}' exists.")
@@ -93,5 +95,6 @@ class VectorStore:
             query_vector=embedding,
             limit=n_results,
             query_filter=qdrant_filter,
+            search_params=search_params(self.profile),
         )
         return results
@@ -12,6 +12,7 @@ from firebase_admin import credentials
 from aurora_platform.core.config import settings
 from aurora_platform.services.knowledge_service import KnowledgeBaseService
 from aurora_platform.api.v1.endpoints import auth_router, knowledge_router, debug_router
+from aurora_platform.api.v1.endpoints import ingestion_router
 from aurora_platform.api.v1.routers import system_router
 
 logging.basicConfig(level=logging.INFO)
@@ -61,4 +62,5 @@ app.include_router(
 )
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(debug_router.router, prefix="/api/v1/debug", tags=["Debug"])
+app.include_router(ingestion_router, prefix="/api/v1")
 app.include_router(system_router.router, prefix="/v1/system", tags=["System"])
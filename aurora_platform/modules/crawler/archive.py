@@ -0,0 +1,408 @@
+"""Arquivo bruto das respostas HTTP (estilo WARC) e reprocessamento offline.
+
+Cada resposta vira um registro WARC/1.0 `response` (cabeçalhos HTTP + corpo)
+comprimido como um membro gzip próprio e anexado ao segmento corrente
+(`fetch-00000.warc.gz`, ...) — o mesmo layout `.warc.gz` que ferramentas de
+WARC leem. Um índice sqlite mapeia (url, fetched_at) -> (segmento, offset,
+tamanho), então dá para ler a última versão de uma URL sem varrer nada.
+
+`reprocess` refaz extração -> normalização -> chunking (e, opcionalmente,
+indexação) a partir do arquivo, em paralelo, sem tocar nos sites de origem:
+mudanças em `policies.for_source`, no splitter ou nas heurísticas HTML viram
+um rebuild local.
+
+O corpo gravado é o decodificado pelo httpx (sem Content-Encoding); por isso
+`Content-Encoding`/`Transfer-Encoding` não são gravados.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, List, Mapping, Optional, Set, TextIO, Tuple, Union
+
+SEGMENT_BYTES = int(os.getenv("ARCHIVE_SEGMENT_BYTES", str(1024 * 1024 * 1024)))
+GZIP_LEVEL = int(os.getenv("ARCHIVE_GZIP_LEVEL", "6"))
+DROP_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (segment INTEGER PRIMARY KEY, bytes INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT NOT NULL, fetched_at REAL NOT NULL, status INTEGER NOT NULL,
+    content_type TEXT, sha256 TEXT NOT NULL, size INTEGER NOT NULL,
+    segment INTEGER NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL,
+    PRIMARY KEY (url, fetched_at)
+);
+"""
+
+
+def segment_name(segment: int) -> str:
+    return f"fetch-{segment:05d}.warc.gz"
+
+
+@dataclass
+class ArchivedResponse:
+    url: str
+    fetched_at: float
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "")
+
+    def text(self) -> str:
+        charset = "utf-8"
+        for part in self.content_type.split(";")[1:]:
+            k, _, v = part.strip().partition("=")
+            if k.lower() == "charset" and v:
+                charset = v.strip('"')
+        return self.body.decode(charset, errors="replace")
+
+
+def _warc_date(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_record(raw: bytes) -> ArchivedResponse:
+    """Registro WARC descomprimido -> ArchivedResponse."""
+    head, _, rest = raw.partition(b"\r\n\r\n")
+    warc = {}
+    for line in head.decode("utf-8").split("\r\n")[1:]:
+        k, _, v = line.partition(":")
+        warc[k.strip().lower()] = v.strip()
+    block = rest[: int(warc["content-length"])]
+    http_head, _, body = block.partition(b"\r\n\r\n")
+    lines = http_head.decode("iso-8859-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        k, _, v = line.partition(":")
+        headers[k.strip().lower()] = v.strip()
+    ts = datetime.strptime(warc["warc-date"], "%Y-%m-%dT%H:%M:%S.%fZ")
+    fetched_at = ts.replace(tzinfo=timezone.utc).timestamp()
+    return ArchivedResponse(warc["warc-target-uri"], fetched_at, status, headers, body)
+
+
+class FetchArchive:
+    def __init__(self, root: str = "artifacts/archive", segment_bytes: Optional[int] = None) -> None:
+        self.root = root
+        self.segment_bytes = segment_bytes or SEGMENT_BYTES
+        os.makedirs(root, exist_ok=True)
+        self.conn = sqlite3.connect(
+            os.path.join(root, "index.sqlite"),
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        row = self.conn.execute(
+            "SELECT segment, bytes FROM segments ORDER BY segment DESC LIMIT 1"
+        ).fetchone()
+        self._segment, self._size = row if row else (0, 0)
+        path = self.path(self._segment)
+        if os.path.exists(path) and os.path.getsize(path) > self._size:
+            # registro de uma escrita interrompida: fora do índice, descarta
+            with open(path, "r+b") as f:
+                f.truncate(self._size)
+
+    def path(self, segment: int) -> str:
+        return os.path.join(self.root, segment_name(segment))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "FetchArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -------- escrita --------
+    def put(
+        self,
+        url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: Union[bytes, IO[bytes]],
+        fetched_at: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> float:
+        """Anexa a resposta; `body` pode ser bytes ou arquivo (lido em blocos,
+        com `size` bytes). Retorna o `fetched_at` gravado."""
+        fetched_at = fetched_at or time.time()
+        if isinstance(body, (bytes, bytearray)):
+            size = len(body)
+            body = io.BytesIO(body)
+        elif size is None:
+            raise ValueError("size é obrigatório quando body é um arquivo")
+        http_head = [f"HTTP/1.1 {status}"]
+        http_head += [
+            f"{k}: {v}" for k, v in headers.items() if k.lower() not in DROP_HEADERS
+        ]
+        http_head.append(f"Content-Length: {size}")
+        http_bytes = ("\r\n".join(http_head) + "\r\n\r\n").encode("iso-8859-1", errors="replace")
+        warc_head = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {_warc_date(fetched_at)}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(http_bytes) + size}\r\n\r\n"
+        ).encode("utf-8")
+        digest = hashlib.sha256()
+        ctype = next((v for k, v in headers.items() if k.lower() == "content-type"), None)
+        with self._lock:
+            if self._size and self._size >= self.segment_bytes:
+                self._segment, self._size = self._segment + 1, 0
+            offset = self._size
+            with open(self.path(self._segment), "ab") as f:
+                with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=GZIP_LEVEL) as gz:
+                    gz.write(warc_head)
+                    gz.write(http_bytes)
+                    for block in iter(lambda: body.read(1 << 20), b""):
+                        digest.update(block)
+                        gz.write(block)
+                    gz.write(b"\r\n\r\n")
+                f.flush()
+                end = f.tell()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, fetched_at, status, content_type, "
+                    "sha256, size, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, fetched_at, status, ctype, digest.hexdigest(), size,
+                     self._segment, offset, end - offset),
+                )
+                self.conn.execute(
+                    "INSERT INTO segments (segment, bytes) VALUES (?, ?) "
+                    "ON CONFLICT (segment) DO UPDATE SET bytes = excluded.bytes",
+                    (self._segment, end),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self._size = end
+        return fetched_at
+
+    # -------- leitura --------
+    def locate(self, url: str, fetched_at: Optional[float] = None) -> Optional[Tuple[str, int, int]]:
+        """(segmento, offset, tamanho) da versão pedida (padrão: a mais nova)."""
+        with self._lock:
+            if fetched_at is None:
+                row = self.conn.execute(
+                    "SELECT segment, offset, length FROM responses WHERE url = ? "
+                    "ORDER BY fetched_at DESC LIMIT 1",
+                    (url,),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT segment, offset, length FROM responses "
+                    "WHERE url = ? AND fetched_at = ?",
+                    (url, fetched_at),
+                ).fetchone()
+        return (self.path(row[0]), row[1], row[2]) if row else None
+
+    def get(self, url: str, fetched_at: Optional[float] = None) -> Optional[ArchivedResponse]:
+        loc = self.locate(url, fetched_at)
+        return read_at(*loc) if loc else None
+
+    def versions(self, url: str) -> List[float]:
+        with self._lock:
+            return [
+                r[0]
+                for r in self.conn.execute(
+                    "SELECT fetched_at FROM responses WHERE url = ? ORDER BY fetched_at", (url,)
+                )
+            ]
+
+    def latest(self) -> List[Tuple[str, str, int, int]]:
+        """(url, segmento, offset, tamanho) da versão mais nova de cada URL,
+        em ordem de disco (leitura sequencial)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, segment, offset, length FROM responses r "
+                "WHERE fetched_at = (SELECT MAX(fetched_at) FROM responses WHERE url = r.url) "
+                "ORDER BY segment, offset"
+            ).fetchall()
+        return [(u, self.path(s), o, n) for u, s, o, n in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def read_at(path: str, offset: int, length: int) -> ArchivedResponse:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return parse_record(gzip.decompress(f.read(length)))
+
+
+# -------- reprocessamento --------
+def extract(resp: ArchivedResponse) -> Tuple[str, str, Optional[str]]:
+    """(texto, media_type, título) de uma resposta arquivada, pelos mesmos
+    loaders do crawl."""
+    from .loaders.url_loader import SUFFIX, sniff
+
+    kind = sniff(resp.body[:8], resp.content_type, resp.url)
+    if kind == "html":
+        from .ingestion.html_loader import HTMLLoader
+
+        loaded = HTMLLoader().load_from_string(resp.text(), resp.url)
+        return loaded.text, "html", loaded.meta.get("title")
+    fd, tmp = tempfile.mkstemp(suffix=SUFFIX[kind])
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(resp.body)
+        if kind == "pdf":
+            from .loaders.pdf_loader import PDFLoader
+
+            return PDFLoader().load(source=tmp)["text"], "pdf", None
+        from .loaders.docx_loader import DocxLoader
+
+        return DocxLoader().load(source=tmp)["text"], "docx", None
+    finally:
+        os.unlink(tmp)
+
+
+def reprocess_one(url: str, path: str, offset: int, length: int) -> Dict[str, Any]:
+    """Roda no worker: lê o registro do disco e refaz a ingestão.
+
+    PDF/DOCX vão por `run_file_ingestion` (streaming, página nos chunks)."""
+    from .loaders.url_loader import SUFFIX, sniff
+    from .pipeline import run_file_ingestion, run_ingestion
+
+    t0 = time.perf_counter()
+    try:
+        resp = read_at(path, offset, length)
+        kind = sniff(resp.body[:8], resp.content_type, resp.url)
+        title = None
+        if kind == "html":
+            text, media, title = extract(resp)
+            tags = {"title": title} if title else None
+            record = run_ingestion(content=text, media_type=media, source=url, tags=tags)
+        else:
+            fd, tmp = tempfile.mkstemp(suffix=SUFFIX[kind])
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(resp.body)
+                record = run_file_ingestion(tmp, kind, source=url, workers=1)
+            finally:
+                os.unlink(tmp)
+        return {"source": url, "record": record, "title": title, "seconds": time.perf_counter() - t0}
+    except Exception as e:
+        return {"source": url, "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - t0}
+
+
+def reprocess(
+    archive: FetchArchive,
+    out_dir: Optional[str] = "artifacts/ingested",
+    workers: Optional[int] = None,
+    indexer: Any = None,
+    batch_size: int = 256,
+    progress: Optional[TextIO] = sys.stderr,
+    progress_every: float = 2.0,
+):
+    """Reingere a versão mais nova de cada URL do arquivo em paralelo.
+
+    Registros vão para o `ArtifactStore` de `out_dir`; com `indexer`
+    (ex.: `QdrantIndexer.from_env()`), os chunks são indexados em lotes de
+    `batch_size` no processo principal e, depois de cada lote, os pontos
+    antigos de cada URL (`indexer.prune_url`) saem da coleção — o id canônico
+    é o hash do conteúdo, então a versão anterior não seria sobrescrita.
+    """
+    from .batch import BatchReport
+    from .ingestion.artifact_store import ArtifactStore
+    from .pipeline import to_index_record
+
+    todo = archive.latest()
+    report = BatchReport(total=len(todo))
+    store = ArtifactStore(out_dir) if out_dir else None
+    pending_recs: List[Dict[str, Any]] = []
+    pending_urls: Dict[str, List[Dict[str, Any]]] = {}
+    started = time.perf_counter()
+    last = 0.0
+
+    def flush_index() -> None:
+        if indexer is not None and pending_recs:
+            indexer.upsert_records(list(pending_recs))
+        if indexer is not None:
+            for url, recs in pending_urls.items():
+                indexer.prune_url(url, recs)
+        pending_recs.clear()
+        pending_urls.clear()
+
+    def handle(result: Dict[str, Any]) -> None:
+        nonlocal last
+        rec = result.get("record")
+        if rec is None:
+            report.failed += 1
+            if progress is not None:
+                print(f"[erro] {result['source']}: {result['error']}", file=progress)
+        else:
+            report.done += 1
+            report.chunks += len(rec["chunks"])
+            if store is not None:
+                store.put(rec)
+            if indexer is not None:
+                recs = [
+                    to_index_record(ch, url=rec["source"], title=result.get("title"))
+                    for ch in rec["chunks"]
+                ]
+                pending_recs.extend(recs)
+                pending_urls[rec["source"]] = recs
+                if len(pending_recs) >= batch_size:
+                    flush_index()
+        now = time.perf_counter()
+        if progress is not None and now - last >= progress_every:
+            last = now
+            report.seconds = now - started
+            print(
+                f"[{report.done + report.failed}/{report.total}] "
+                f"{report.items_per_s} itens/s, erros={report.failed}",
+                file=progress,
+            )
+
+    workers = workers or os.cpu_count() or 1
+    try:
+        if workers <= 1:
+            for item in todo:
+                handle(reprocess_one(*item))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                it = iter(todo)
+                running: Set[Future] = set()
+                while True:
+                    while len(running) < workers * 4:
+                        item = next(it, None)
+                        if item is None:
+                            break
+                        running.add(ex.submit(reprocess_one, *item))
+                    if not running:
+                        break
+                    finished, running = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        handle(fut.result())
+        flush_index()
+    finally:
+        if store is not None:
+            store.close()
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
+
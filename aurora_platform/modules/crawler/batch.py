@@ -0,0 +1,417 @@
+"""Ingestão em lote para o `aurora-crawler` (backfills de dezenas de milhares
+de documentos).
+
+Entradas: diretórios (recursivo), globs, arquivos e listas de URLs. Cada
+item passa por `ingest_item` num pool de processos; o estado de cada item
+fica num manifesto sqlite, então uma nova execução pula o que já terminou e
+refaz só os pendentes/falhos. Os registros vão para o `ArtifactStore`
+(shards zstd) de `out_dir`.
+"""
+
+from __future__ import annotations
+
+import glob
+import ipaddress
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+from urllib.parse import urlparse
+
+from .ingestion.artifact_store import ArtifactStore
+from .pipeline import run_file_ingestion, run_ingestion, run_pages_ingestion
+
+SUPPORTED_EXT = {".html": "html", ".htm": "html", ".pdf": "pdf", ".docx": "docx", ".txt": "text", ".md": "text"}
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    source TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    record_id TEXT,
+    chunks INTEGER,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    seconds REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status);
+"""
+
+
+def is_url(s: str) -> bool:
+    return s.startswith(("http://", "https://"))
+
+
+class SourceRejected(ValueError):
+    """Fonte externa recusada pela política (inclusive num redirect)."""
+
+
+def resolve_host(host: str) -> List[str]:
+    """Endereços de `host` (vazio se não resolve). Passa pelo resolvedor do
+    sistema, então formas como `2130706433` e `127.1` viram o IP real."""
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError):
+        return []
+    return [info[4][0].split("%", 1)[0] for info in infos]
+
+
+def _public_host(host: str, allowed: Sequence[str]) -> bool:
+    if host == "localhost" or host.endswith(".localhost"):
+        return False
+    if allowed and not any(host == h or host.endswith("." + h) for h in allowed):
+        return False
+    # nomes internos (qdrant, redis...) resolvem para a rede privada e não
+    # resolver também é recusa
+    addrs = resolve_host(host)
+    return bool(addrs) and all(ipaddress.ip_address(a).is_global for a in addrs)
+
+
+def check_url(url: str, allowed_hosts: Sequence[str] = ()) -> Optional[str]:
+    """Esquema e host de uma URL (também usado a cada redirect)."""
+    p = urlparse(url)
+    if not is_url(url) or not p.hostname:
+        return "URL deve ser http(s)"
+    if not _public_host(p.hostname.lower(), [h.lower() for h in allowed_hosts]):
+        return "host não permitido"
+    return None
+
+
+def check_source(
+    source: str, local_root: Optional[str] = None, allowed_hosts: Sequence[str] = ()
+) -> Optional[str]:
+    """Motivo para recusar uma fonte vinda de fora (API), ou None se aceita.
+
+    URLs seguem a política do crawler (http/https, sem estáticos) e todos os
+    endereços do host precisam ser públicos; com `allowed_hosts`, só esses
+    hosts (e subdomínios). Caminhos locais só valem dentro de `local_root`.
+    A busca em si deve usar `guarded_client`, que refaz a checagem em cada
+    redirect.
+    """
+    if "://" in source:
+        from .engine import SKIP_EXT
+
+        if urlparse(source).path.lower().endswith(SKIP_EXT):
+            return "tipo de URL não ingerível"
+        return check_url(source, allowed_hosts)
+    if not local_root:
+        return "caminhos locais não são aceitos"
+    root = os.path.realpath(local_root)
+    path = os.path.realpath(os.path.join(root, source))
+    if os.path.commonpath([root, path]) != root:
+        return "caminho fora da raiz permitida"
+    return None
+
+
+_guarded: Dict[Tuple[str, ...], Any] = {}
+_guarded_lock = threading.Lock()
+
+
+def guarded_client(allowed_hosts: Sequence[str] = ()):
+    """Cliente httpx para URLs vindas de fora: cada requisição, inclusive os
+    saltos de redirect, passa por `check_url` antes de sair
+    (`SourceRejected` se o destino não for permitido)."""
+    import httpx
+
+    from .loaders.url_loader import _LIMITS
+
+    key = tuple(sorted(h.lower() for h in allowed_hosts))
+
+    def check(request: "httpx.Request") -> None:
+        err = check_url(str(request.url), key)
+        if err is not None:
+            raise SourceRejected(f"{err}: {request.url}")
+
+    with _guarded_lock:
+        client = _guarded.get(key)
+        if client is None or client.is_closed:
+            client = _guarded[key] = httpx.Client(
+                limits=_LIMITS, follow_redirects=True, event_hooks={"request": [check]}
+            )
+        return client
+
+
+def read_url_list(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def expand_inputs(inputs: Iterable[str], url_files: Iterable[str] = ()) -> Iterator[str]:
+    """Diretórios, globs, arquivos e URLs -> fontes individuais (sem repetição)."""
+    seen: Set[str] = set()
+
+    def emit(src: str) -> Iterator[str]:
+        if src not in seen:
+            seen.add(src)
+            yield src
+
+    for item in inputs:
+        if is_url(item):
+            yield from emit(item)
+        elif os.path.isdir(item):
+            for p in sorted(Path(item).rglob("*")):
+                if p.is_file() and p.suffix.lower() in SUPPORTED_EXT:
+                    yield from emit(str(p))
+        elif any(c in item for c in "*?["):
+            for p in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(p):
+                    yield from emit(p)
+        else:
+            yield from emit(item)
+    for path in url_files:
+        for url in read_url_list(path):
+            yield from emit(url)
+
+
+def _load_url(
+    source: str, media: str = "auto", client: Any = None
+) -> Tuple[str, str, Dict[str, Any]]:
+    from .loaders.url_loader import URLLoader
+
+    doc = URLLoader(client=client).load(source=source)
+    ct = doc["metadata"].get("content_type", "")
+    if media == "auto":
+        media = "pdf" if "pdf" in ct else "docx" if "wordprocessing" in ct else "html"
+    text = doc["text"]
+    return (_html_text(text, source) if media == "html" else text), media, doc["metadata"]
+
+
+def local_kind(source: str, media: str = "auto") -> str:
+    return media if media != "auto" else SUPPORTED_EXT.get(Path(source).suffix.lower(), "text")
+
+
+def load_item(source: str, media: str = "auto") -> Tuple[str, str]:
+    """(texto, media_type) de um arquivo local ou URL."""
+    if is_url(source):
+        text, media, _ = _load_url(source, media)
+        return text, media
+    kind = local_kind(source, media)
+    if kind == "pdf":
+        from .loaders.pdf_loader import PDFLoader
+
+        return PDFLoader().load(source=source, workers=1)["text"], kind
+    if kind == "docx":
+        from .loaders.docx_loader import DocxLoader
+
+        return DocxLoader().load(source=source)["text"], kind
+    text = Path(source).read_text(encoding="utf-8", errors="replace")
+    return (_html_text(text, source) if kind == "html" else text), kind
+
+
+def _html_text(html: str, source: str) -> str:
+    from .ingestion.html_loader import HTMLLoader
+
+    return HTMLLoader().load_from_string(html, source if is_url(source) else None).text
+
+
+def ingest_item(
+    source: str,
+    media: str = "auto",
+    *,
+    tags: Optional[Dict[str, Any]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    workers: Optional[int] = None,
+    client: Any = None,
+) -> Dict[str, Any]:
+    """Registro de ingestão de um arquivo local ou URL.
+
+    PDF/DOCX locais vão pelos iteradores em streaming (páginas do PDF em
+    paralelo com `workers`, DOCX por iterparse) e os chunks de PDF levam a
+    página; PDFs baixados usam os `page_spans` do loader. O resto passa por
+    `load_item` + `run_ingestion`. URLs são baixadas com `client` (ex.:
+    `guarded_client`), se dado.
+    """
+    t0 = time.perf_counter()
+    if is_url(source):
+        text, kind, meta = _load_url(source, media, client)
+        if timings is not None:
+            timings["load"] = timings.get("load", 0.0) + time.perf_counter() - t0
+        if kind == "pdf" and meta.get("page_spans"):
+            return run_pages_ingestion(text, meta["page_spans"], source, tags, timings)
+        return run_ingestion(content=text, media_type=kind, source=source, tags=tags, timings=timings)
+    kind = local_kind(source, media)
+    if kind in ("pdf", "docx"):
+        return run_file_ingestion(source, kind, source, tags, timings, workers=workers)
+    text, kind = load_item(source, kind)
+    if timings is not None:
+        timings["load"] = timings.get("load", 0.0) + time.perf_counter() - t0
+    return run_ingestion(content=text, media_type=kind, source=source, tags=tags, timings=timings)
+
+
+def process_item(source: str, media: str = "auto") -> Dict[str, Any]:
+    """Roda no worker: carrega, ingere e devolve o registro (ou o erro)."""
+    t0 = time.perf_counter()
+    try:
+        # já estamos num worker do lote: sem pool de páginas aninhado
+        record = ingest_item(source, media, workers=1)
+        return {"source": source, "record": record, "seconds": time.perf_counter() - t0}
+    except Exception as e:
+        return {
+            "source": source,
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": time.perf_counter() - t0,
+        }
+
+
+class Manifest:
+    def __init__(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def register(self, sources: Iterable[str]) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO items (source, status, updated_at) VALUES (?, ?, ?)",
+                ((s, PENDING, now) for s in sources),
+            )
+
+    def todo(self, retry_failed: bool = True) -> List[str]:
+        states = (PENDING, FAILED) if retry_failed else (PENDING,)
+        marks = ",".join("?" * len(states))
+        return [
+            r[0]
+            for r in self.conn.execute(
+                f"SELECT source FROM items WHERE status IN ({marks}) ORDER BY rowid", states
+            )
+        ]
+
+    def mark(self, result: Dict[str, Any]) -> None:
+        rec = result.get("record")
+        with self.conn:
+            self.conn.execute(
+                "UPDATE items SET status = ?, record_id = ?, chunks = ?, error = ?, "
+                "attempts = attempts + 1, seconds = ?, updated_at = ? WHERE source = ?",
+                (
+                    DONE if rec is not None else FAILED,
+                    rec["id"] if rec else None,
+                    len(rec["chunks"]) if rec else None,
+                    result.get("error"),
+                    result.get("seconds"),
+                    time.time(),
+                    result["source"],
+                ),
+            )
+
+    def counts(self) -> Dict[str, int]:
+        out = {PENDING: 0, DONE: 0, FAILED: 0}
+        out.update(dict(self.conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status")))
+        return out
+
+
+@dataclass
+class BatchReport:
+    total: int = 0
+    skipped: int = 0  # já concluídos em execuções anteriores
+    done: int = 0
+    failed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def items_per_s(self) -> float:
+        return round((self.done + self.failed) / self.seconds, 2) if self.seconds else 0.0
+
+
+def run_batch(
+    sources: Iterable[str],
+    *,
+    manifest_path: str = "artifacts/ingested/manifest.sqlite",
+    out_dir: Optional[str] = "artifacts/ingested",
+    workers: Optional[int] = None,
+    media: str = "auto",
+    retry_failed: bool = True,
+    progress: Optional[TextIO] = sys.stderr,
+    progress_every: float = 2.0,
+) -> BatchReport:
+    manifest = Manifest(manifest_path)
+    store = ArtifactStore(out_dir) if out_dir else None
+    # concluídos cujo registro ainda está no buffer do armazém: só vão para o
+    # manifesto depois do flush, senão um crash perderia o registro
+    unflushed: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    try:
+        manifest.register(sources)
+        todo = manifest.todo(retry_failed=retry_failed)
+        counts = manifest.counts()
+        report = BatchReport(total=sum(counts.values()), skipped=counts[DONE])
+        workers = workers or os.cpu_count() or 1
+        last = 0.0
+
+        def handle(result: Dict[str, Any]) -> None:
+            nonlocal last
+            rec = result.get("record")
+            if rec is None:
+                manifest.mark(result)
+                report.failed += 1
+                if progress is not None:
+                    print(f"[erro] {result['source']}: {result['error']}", file=progress)
+            else:
+                report.done += 1
+                report.chunks += len(rec["chunks"])
+                if store is None:
+                    manifest.mark(result)
+                else:
+                    store.put(rec)
+                    unflushed.append(result)
+                    if not store.buffered:
+                        _mark_all(manifest, unflushed)
+            now = time.perf_counter()
+            if progress is not None and now - last >= progress_every:
+                last = now
+                report.seconds = now - started
+                print(
+                    f"[{report.skipped + report.done + report.failed}/{report.total}] "
+                    f"{report.items_per_s} itens/s, erros={report.failed}",
+                    file=progress,
+                )
+
+        if workers <= 1:
+            for src in todo:
+                handle(process_item(src, media))
+        else:
+            # janela limitada de tarefas em voo: memória constante em backfills grandes
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                it = iter(todo)
+                pending: Set[Future] = set()
+                while True:
+                    while len(pending) < workers * 4:
+                        src = next(it, None)
+                        if src is None:
+                            break
+                        pending.add(ex.submit(process_item, src, media))
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        handle(fut.result())
+        report.seconds = round(time.perf_counter() - started, 3)
+        return report
+    finally:
+        if store is not None:
+            store.close()
+            _mark_all(manifest, unflushed)
+        manifest.close()
+
+
+def _mark_all(manifest: Manifest, results: List[Dict[str, Any]]) -> None:
+    for result in results:
+        manifest.mark(result)
+    results.clear()
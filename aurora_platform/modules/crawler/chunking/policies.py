@@ -1,14 +1,25 @@
+import os
+
 PDF_CHUNK = {"size": 800, "overlap": 100}
 HTML_CHUNK = {"size": 1000, "overlap": 120}
 YOUTUBE_CHUNK = {"size": 700, "overlap": 70}
 
+# mesmos limites em tokens do tokenizer (~4 caracteres por token em pt/en)
+PDF_CHUNK_TOKENS = {"size": 200, "overlap": 25, "unit": "tokens"}
+HTML_CHUNK_TOKENS = {"size": 250, "overlap": 30, "unit": "tokens"}
+YOUTUBE_CHUNK_TOKENS = {"size": 175, "overlap": 18, "unit": "tokens"}
+
 
-def for_source(source: str) -> dict:
+def for_source(source: str, unit: str | None = None) -> dict:
+    """Política de chunk; `unit` (ou `CHUNK_UNIT`) escolhe "chars" ou "tokens"."""
     s = source.lower()
+    tokens = (unit or os.getenv("CHUNK_UNIT", "chars")) == "tokens"
     if s == "pdf":
-        return PDF_CHUNK
+        return PDF_CHUNK_TOKENS if tokens else PDF_CHUNK
     if s == "html":
-        return HTML_CHUNK
+        return HTML_CHUNK_TOKENS if tokens else HTML_CHUNK
     if s == "youtube":
-        return YOUTUBE_CHUNK
+        return YOUTUBE_CHUNK_TOKENS if tokens else YOUTUBE_CHUNK
+    if tokens:
+        return {"size": 200, "overlap": 25, "unit": "tokens"}
     return {"size": 800, "overlap": 100}
@@ -1,27 +1,228 @@
+"""Splitter de Markdown nativo, em uma passada.
+
+O texto vira uma sequência de unidades (títulos, parágrafos; frases ou
+palavras quando o bloco não cabe num chunk) com offsets no original; as
+unidades são empacotadas gulosamente até `chunk_size`, medido em caracteres
+ou em tokens do tokenizer configurado. Títulos sempre abrem chunk novo, e a
+sobreposição reaproveita unidades inteiras do fim do chunk anterior (nunca
+corta palavra). Cada chunk leva `start`/`end` (offsets de caractere no
+Markdown de entrada) e o título da seção.
+"""
+
 from __future__ import annotations
-from typing import List, Dict, Any
+
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    import tiktoken  # type: ignore
+
+    _HAS_TIKTOKEN = True
+except Exception:
+    _HAS_TIKTOKEN = False
+
+HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+\S")
+FENCE_RE = re.compile(r"^\s{0,3}(```|~~~)")
+SENTENCE_RE = re.compile(r"[^.!?;\n]+(?:[.!?;]+|\n|$)")
+WORD_RE = re.compile(r"\S+")
+# aproximação de tokenizer BPE quando tiktoken não está instalado
+TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]", re.UNICODE)
+
+
+class _RegexTokenizer:
+    name = "regex"
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in TOKEN_RE.finditer(text))
+
+
+class _TiktokenTokenizer:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._enc = tiktoken.get_encoding(name)
+
+    def count(self, text: str) -> int:
+        return len(self._enc.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=8)
+def get_tokenizer(name: Optional[str] = None):
+    """Tokenizer em cache por processo (`CHUNK_TOKENIZER`, padrão cl100k_base)."""
+    name = name or os.getenv("CHUNK_TOKENIZER", "cl100k_base")
+    if _HAS_TIKTOKEN and name != "regex":
+        try:
+            return _TiktokenTokenizer(name)
+        except Exception:
+            pass
+    return _RegexTokenizer()
+
+
+class _Unit(NamedTuple):
+    start: int
+    end: int
+    size: int
+    heading: bool
+
+
+def _blocks(md: str) -> Iterator[tuple[int, int, bool]]:
+    """(início, fim, é_título) de títulos, parágrafos e blocos de código."""
+    pos, start, fence = 0, None, False
+    for line in md.splitlines(keepends=True):
+        line_end = pos + len(line)
+        stripped = line.strip()
+        if FENCE_RE.match(line):
+            if start is None:
+                start = pos
+            fence = not fence
+        elif fence:
+            pass
+        elif not stripped:
+            if start is not None:
+                yield start, pos, False
+                start = None
+        elif HEADING_RE.match(line):
+            if start is not None:
+                yield start, pos, False
+                start = None
+            yield pos, line_end, True
+        elif start is None:
+            start = pos
+        pos = line_end
+    if start is not None:
+        yield start, pos, False
+
+
+def _trim(md: str, start: int, end: int) -> tuple[int, int]:
+    while start < end and md[start].isspace():
+        start += 1
+    while end > start and md[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _units(md: str, limit: int, measure: Callable[[str], int]) -> Iterator[_Unit]:
+    for b_start, b_end, heading in _blocks(md):
+        b_start, b_end = _trim(md, b_start, b_end)
+        if b_start == b_end:
+            continue
+        size = measure(md[b_start:b_end])
+        if size <= limit or heading:
+            yield _Unit(b_start, b_end, size, heading)
+            continue
+        for m in SENTENCE_RE.finditer(md, b_start, b_end):
+            s_start, s_end = _trim(md, m.start(), m.end())
+            if s_start == s_end:
+                continue
+            size = measure(md[s_start:s_end])
+            if size <= limit:
+                yield _Unit(s_start, s_end, size, False)
+                continue
+            for w in WORD_RE.finditer(md, s_start, s_end):
+                size = measure(w.group())
+                if size <= limit:
+                    yield _Unit(w.start(), w.end(), size, False)
+                    continue
+                # palavra maior que o chunk: janelas fixas (1 token >= 1 caractere)
+                for i in range(w.start(), w.end(), limit):
+                    piece = md[i : min(i + limit, w.end())]
+                    yield _Unit(i, i + len(piece), measure(piece), False)
+
+
+def _tail(
+    md: str, u: _Unit, budget: int, measure: Callable[[str], int]
+) -> Optional[_Unit]:
+    """Sufixo de `u` que começa em início de palavra e cabe em `budget`."""
+    if budget <= 0:
+        return None
+    # palpite em caracteres (1 token >= 1 caractere), depois ajusta por palavra
+    for w in WORD_RE.finditer(md, max(u.start, u.end - budget * 4), u.end):
+        if w.start() == u.start or md[w.start() - 1].isspace():
+            size = measure(md[w.start() : u.end])
+            if size <= budget:
+                return _Unit(w.start(), u.end, size, False)
+    return None
+
+
+def iter_markdown_chunks(
+    md: str,
+    chunk_size: int = 800,
+    overlap: int = 100,
+    unit: str = "chars",
+    tokenizer: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Gera chunks `{"text", "start", "end", "heading"[, "tokens"]}` em O(n)."""
+    if unit == "tokens":
+        measure = get_tokenizer(tokenizer).count
+    elif unit == "chars":
+        measure = len
+    else:
+        raise ValueError(f"unidade de chunk desconhecida: {unit}")
+    chunk_size = max(1, chunk_size)
+    overlap = max(0, min(overlap, chunk_size - 1))
+    buf: Deque[_Unit] = deque()
+    size = 0
+    heading: Optional[str] = None
+    buf_heading: Optional[str] = None
+
+    def emit() -> Dict[str, Any]:
+        start, end = buf[0].start, buf[-1].end
+        ch: Dict[str, Any] = {"text": md[start:end], "start": start, "end": end}
+        ch["heading"] = buf_heading
+        if unit == "tokens":
+            ch["tokens"] = size
+        return ch
+
+    def gap(a: _Unit, b: _Unit) -> int:
+        # separador entre unidades vizinhas também entra no chunk
+        return measure(md[a.end : b.start]) if b.start > a.end else 0
+
+    has_body = False  # buffer tem algo além de títulos
+    for u in _units(md, chunk_size, measure):
+        add = u.size + (gap(buf[-1], u) if buf else 0)
+        if buf and ((u.heading and has_body) or size + add > chunk_size):
+            yield emit()
+            if u.heading:
+                buf.clear()
+                size = 0
+                has_body = False
+            else:
+                # sobreposição: unidades inteiras do fim, sem reabrir títulos
+                budget = min(overlap, chunk_size - add)
+                keep: List[_Unit] = []
+                kept = 0
+                for x in reversed(buf):
+                    if x.heading:
+                        break
+                    sep = gap(x, keep[-1]) if keep else 0
+                    if kept + sep + x.size > budget:
+                        # unidade maior que o que sobra: leva só as últimas palavras
+                        tail = _tail(md, x, budget - kept - sep, measure)
+                        if tail is not None:
+                            keep.append(tail)
+                            kept += sep + tail.size
+                        break
+                    keep.append(x)
+                    kept += sep + x.size
+                buf = deque(reversed(keep))
+                size = kept
+                has_body = bool(keep)
+            if not buf:
+                add = u.size
+        if u.heading:
+            heading = md[u.start : u.end].lstrip().lstrip("#").strip()
+        if not buf:
+            buf_heading = heading
+        buf.append(u)
+        size += add
+        has_body = has_body or not u.heading
+    if buf:
+        yield emit()
 
 
 def split_markdown(
-    md: str, chunk_size: int = 800, overlap: int = 100
+    md: str, chunk_size: int = 800, overlap: int = 100, unit: str = "chars"
 ) -> List[Dict[str, Any]]:
-    # Use langchain splitter if available, else fallback to naive splitter
-    try:
-        from langchain.text_splitter import RecursiveCharacterTextSplitter  # type: ignore
-
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size, chunk_overlap=overlap
-        )
-        return [{"text": c} for c in splitter.split_text(md)]
-    except Exception:
-        chunks = []
-        start = 0
-        n = len(md)
-        while start < n:
-            end = min(n, start + chunk_size)
-            chunk = md[start:end]
-            chunks.append({"text": chunk})
-            start = end - overlap if end < n else end
-            if start < 0:
-                start = 0
-        return chunks
+    return list(iter_markdown_chunks(md, chunk_size=chunk_size, overlap=overlap, unit=unit))
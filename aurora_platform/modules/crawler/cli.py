@@ -1,18 +1,44 @@
-"""Minimal CLI for the crawler module (Fase 9 skeleton)."""
+"""Minimal CLI for the crawler module (Fase 9 skeleton).
+
+Um documento:  aurora-crawler --path arquivo.html [--out dir]
+Em lote:       aurora-crawler --batch docs/ "editais/**/*.pdf" --urls urls.txt \
+                   --workers 8 --manifest artifacts/ingested/manifest.sqlite
+Reprocessar:   aurora-crawler --reprocess artifacts/archive [--index] [--workers 8]
+"""
 from pathlib import Path
 import argparse
+import sys
 from .pipeline import run_ingestion
 
 
-def main():
+def main(argv=None):
     p = argparse.ArgumentParser(prog="aurora-crawler")
-    p.add_argument("--path", dest="source", required=True,
+    p.add_argument("--path", dest="source",
                    help="File path or URL to ingest")
     p.add_argument(
         "--media", dest="media", choices=["auto", "html", "pdf", "docx"], default="auto"
     )
     p.add_argument("--out", dest="out", required=False)
-    args = p.parse_args()
+    p.add_argument("--batch", nargs="+", default=[], metavar="INPUT",
+                   help="diretórios, globs, arquivos ou URLs (modo lote)")
+    p.add_argument("--urls", action="append", default=[], metavar="FILE",
+                   help="arquivo com uma URL por linha (modo lote)")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--manifest", default="artifacts/ingested/manifest.sqlite",
+                   help="manifesto retomável do lote")
+    p.add_argument("--no-retry-failed", action="store_true",
+                   help="não reprocessa itens que falharam antes")
+    p.add_argument("--reprocess", metavar="ARCHIVE_DIR",
+                   help="reingere a partir do arquivo bruto (FetchArchive), sem recrawl")
+    p.add_argument("--index", action="store_true",
+                   help="com --reprocess, indexa os chunks no Qdrant (QdrantIndexer.from_env)")
+    args = p.parse_args(argv)
+    if args.reprocess:
+        return _reprocess(args)
+    if args.batch or args.urls:
+        return _batch(args)
+    if not args.source:
+        p.error("--path ou --batch/--urls é obrigatório")
     source = args.source
     media = args.media
     out = args.out
@@ -33,5 +59,46 @@ def main():
     print(record)
 
 
+def _batch(args):
+    from .batch import expand_inputs, run_batch
+
+    report = run_batch(
+        expand_inputs(args.batch, args.urls),
+        manifest_path=args.manifest,
+        out_dir=args.out or "artifacts/ingested",
+        workers=args.workers,
+        media=args.media,
+        retry_failed=not args.no_retry_failed,
+    )
+    print(
+        f"total={report.total} concluídos={report.done} pulados={report.skipped} "
+        f"falhas={report.failed} chunks={report.chunks} "
+        f"{report.items_per_s} itens/s em {report.seconds}s"
+    )
+    return 1 if report.failed else 0
+
+
+def _reprocess(args):
+    from .archive import FetchArchive, reprocess
+
+    indexer = None
+    if args.index:
+        from aurora_platform.modules.rag.indexer.qdrant_indexer import QdrantIndexer
+
+        indexer = QdrantIndexer.from_env()
+    with FetchArchive(args.reprocess) as archive:
+        report = reprocess(
+            archive,
+            out_dir=args.out or "artifacts/ingested",
+            workers=args.workers,
+            indexer=indexer,
+        )
+    print(
+        f"total={report.total} concluídos={report.done} falhas={report.failed} "
+        f"chunks={report.chunks} {report.items_per_s} itens/s em {report.seconds}s"
+    )
+    return 1 if report.failed else 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,584 @@
+"""Motor de crawl assíncrono (substitui o `MassScraper` de mass_scraper.py).
+
+- conexões httpx reaproveitadas (HTTP/2 quando `h2` está instalado);
+- limite de concorrência e intervalo mínimo *por host*, em vez de um
+  `sleep` global entre páginas; por padrão adaptativos (AIMD por latência,
+  429/503 e Retry-After, ver ratecontrol.py) e persistíveis entre execuções;
+- fronteira com prioridade (em memória ou sqlite retomável, ver
+  frontier.py) e cache de robots.txt por host;
+- com `discover=True`, sitemaps (robots.txt, índices, .gz) e feeds RSS/Atom
+  alimentam a fronteira, priorizados por `lastmod` (ver discovery.py);
+- extração de links com selectolax (fallback regex);
+- re-crawl condicional com `ValidatorStore` (ETag/Last-Modified + sha256 do
+  texto): páginas sem mudança não são reprocessadas;
+- quase-duplicatas (MinHash LSH, `NearDuplicateIndex`) viram vínculo em vez
+  de chunks novos; blocos repetidos no domínio (menus, cookies, rodapés)
+  saem com o `BoilerplateModel`;
+- cada página HTML vira um registro de `pipeline.run_ingestion`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import importlib.util
+import logging
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from .archive import FetchArchive
+from .discovery import FeedParser, freshness
+from .frontier import FrontierItem, MemoryFrontier, SQLiteFrontier
+from .ingestion.html_loader import HTMLLoader
+from .ingestion.boilerplate import BoilerplateModel
+from .ingestion.near_dedupe import NearDuplicateIndex
+from .ingestion.validators import ValidatorStore, text_fingerprint
+from .pipeline import register_dedupe, run_ingestion
+from .ratecontrol import THROTTLE_STATUS, AdaptiveHostLimiter, RateStore, parse_retry_after
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+
+    HAS_SELECTOLAX = True
+except Exception:
+    try:
+        from selectolax.parser import HTMLParser
+
+        HAS_SELECTOLAX = True
+    except Exception:
+        HAS_SELECTOLAX = False
+
+HAS_H2 = importlib.util.find_spec("h2") is not None
+
+logger = logging.getLogger(__name__)
+
+HREF_RE = re.compile(r"""<a\s[^>]*?href\s*=\s*["']([^"'#]+)""", re.I)
+SKIP_EXT = (".jpg", ".jpeg", ".png", ".gif", ".svg", ".css", ".js", ".ico", ".zip")
+
+
+@dataclass
+class CrawlConfig:
+    max_pages: int = 100
+    max_depth: int = 3
+    concurrency: int = 16  # requisições simultâneas no total
+    per_host_concurrency: int = 2  # inicial, se adaptive
+    per_host_delay: float = 0.5  # intervalo mínimo entre requisições ao mesmo host (s)
+    adaptive: bool = True  # AIMD por host; False = limites fixos acima
+    max_per_host_concurrency: int = 16
+    min_per_host_delay: float = 0.0
+    max_retries: int = 2  # novas tentativas após 429/503
+    discover: bool = False  # sitemaps (robots.txt ou /sitemap.xml) + feeds
+    feeds: List[str] = field(default_factory=list)  # sitemaps/feeds extras
+    max_sitemaps: int = 50
+    max_links_per_page: Optional[int] = None  # None = todos
+    same_domain_only: bool = True
+    respect_robots: bool = True
+    timeout: float = 10.0
+    http2: bool = True
+    user_agent: str = "AuroraCrawler/1.0 (+https://aurora.ai)"
+    ingest: bool = True  # gera registros via run_ingestion
+    # guarda os registros em CrawlReport.records; None = só quando não há
+    # on_record (crawls longos entregam cada registro e não acumulam memória)
+    keep_records: Optional[bool] = None
+    tags: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class CrawlReport:
+    fetched: int = 0
+    failed: int = 0
+    skipped_robots: int = 0
+    skipped_non_html: int = 0
+    sitemaps: int = 0  # sitemaps/feeds lidos
+    discovered: int = 0  # URLs novas vindas de sitemaps/feeds
+    skipped_lastmod: int = 0  # lastmod <= última verificação: nem buscadas
+    throttled: int = 0  # respostas 429/503
+    retried: int = 0
+    not_modified: int = 0  # 304 via ETag/Last-Modified
+    unchanged: int = 0  # 200, mas texto com o mesmo sha256
+    near_duplicates: int = 0  # documentos ligados a um original (sem chunks)
+    duplicate_chunks: int = 0
+    boilerplate_blocks: int = 0  # blocos removidos pelo modelo do domínio
+    bytes: int = 0
+    elapsed_s: float = 0.0
+    records: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def skipped_unchanged(self) -> int:
+        return self.not_modified + self.unchanged
+
+    @property
+    def pages_per_s(self) -> float:
+        return round(self.fetched / self.elapsed_s, 2) if self.elapsed_s else 0.0
+
+
+def extract_links(html: str, base_url: str) -> List[str]:
+    if HAS_SELECTOLAX:
+        hrefs = [
+            n.attributes.get("href") or ""
+            for n in HTMLParser(html).css("a[href]")
+        ]
+    else:
+        hrefs = HREF_RE.findall(html)
+    out: List[str] = []
+    for href in hrefs:
+        href = href.strip()
+        if not href or href.startswith(("mailto:", "javascript:", "tel:", "#")):
+            continue
+        url = urljoin(base_url, href).split("#", 1)[0]
+        if url.startswith(("http://", "https://")):
+            out.append(url)
+    return out
+
+
+class HostLimiter:
+    """Concorrência máxima + intervalo mínimo entre requisições, por host."""
+
+    def __init__(self, per_host: int, delay: float) -> None:
+        self.per_host = per_host
+        self.delay = delay
+        self._sems: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_at: Dict[str, float] = {}
+
+    def _sem(self, host: str) -> asyncio.Semaphore:
+        if host not in self._sems:
+            self._sems[host] = asyncio.Semaphore(self.per_host)
+            self._locks[host] = asyncio.Lock()
+        return self._sems[host]
+
+    async def acquire(self, host: str) -> None:
+        await self._sem(host).acquire()
+        async with self._locks[host]:
+            wait = self._next_at.get(host, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_at[host] = time.monotonic() + self.delay
+
+    def release(self, host: str) -> None:
+        self._sems[host].release()
+
+    def record(self, host: str, latency: float, *args: Any, **kwargs: Any) -> None:
+        """Limites fixos: nada a ajustar."""
+
+    def save(self) -> None:
+        pass
+
+
+class RobotsCache:
+    def __init__(self, client: httpx.AsyncClient, user_agent: str, ttl: float = 3600.0):
+        self.client = client
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self._cache: Dict[str, tuple[float, Optional[RobotFileParser]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def allowed(self, url: str) -> bool:
+        p = urlparse(url)
+        origin = f"{p.scheme}://{p.netloc}"
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            cached = self._cache.get(origin)
+            if cached is None or time.monotonic() - cached[0] > self.ttl:
+                cached = (time.monotonic(), await self._fetch(origin))
+                self._cache[origin] = cached
+        rp = cached[1]
+        return True if rp is None else rp.can_fetch(self.user_agent, url)
+
+    async def sitemaps(self, origin: str) -> List[str]:
+        """Linhas `Sitemap:` do robots.txt da origem."""
+        await self.allowed(origin + "/")
+        rp = self._cache[origin][1]
+        return list((rp.site_maps() if rp is not None else None) or [])
+
+    async def _fetch(self, origin: str) -> Optional[RobotFileParser]:
+        try:
+            r = await self.client.get(f"{origin}/robots.txt")
+        except httpx.HTTPError:
+            return None
+        if r.status_code >= 400:
+            return None  # sem robots.txt: tudo liberado
+        rp = RobotFileParser()
+        rp.parse(r.text.splitlines())
+        return rp
+
+
+class AsyncCrawler:
+    def __init__(
+        self,
+        config: Optional[CrawlConfig] = None,
+        frontier=None,
+        on_record: Optional[Callable[[Dict[str, Any]], Awaitable[None] | None]] = None,
+        priority: Optional[Callable[[str, int], float]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        validators: Optional[ValidatorStore] = None,
+        dedupe: Optional[NearDuplicateIndex] = None,
+        boilerplate: Optional[BoilerplateModel] = None,
+        archive: Optional[FetchArchive] = None,
+        rates: Optional[RateStore] = None,
+    ) -> None:
+        self.config = config or CrawlConfig()
+        self.frontier = frontier if frontier is not None else MemoryFrontier()
+        self.on_record = on_record
+        self.priority = priority or self.default_priority
+        self.transport = transport
+        self.validators = validators
+        self.dedupe = dedupe
+        self.boilerplate = boilerplate
+        self.archive = archive
+        self.rates = rates
+        self.html_loader = HTMLLoader()
+        self.report = CrawlReport()
+        keep = self.config.keep_records
+        self._keep_records = on_record is None if keep is None else keep
+        self._hosts: set[str] = set()
+
+    @staticmethod
+    def default_priority(url: str, depth: int) -> float:
+        # BFS por profundidade; páginas com query string (listagens, filtros)
+        # e caminhos longos ficam um pouco atrás
+        p = urlparse(url)
+        return depth + (0.5 if p.query else 0.0) + 0.01 * p.path.count("/")
+
+    def _client(self) -> httpx.AsyncClient:
+        c = self.config
+        limits = httpx.Limits(
+            max_connections=c.concurrency, max_keepalive_connections=c.concurrency
+        )
+        return httpx.AsyncClient(
+            http2=c.http2 and HAS_H2,
+            limits=limits,
+            timeout=c.timeout,
+            follow_redirects=True,
+            headers={
+                "User-Agent": c.user_agent,
+                "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+            },
+            transport=self.transport,
+        )
+
+    def _accept(self, url: str) -> bool:
+        p = urlparse(url)
+        if p.path.lower().endswith(SKIP_EXT):
+            return False
+        return not self.config.same_domain_only or p.netloc in self._hosts
+
+    async def crawl(self, seeds: Sequence[str]) -> CrawlReport:
+        started = time.perf_counter()
+        for s in seeds:
+            self._hosts.add(urlparse(s).netloc)
+            self.frontier.push(s, depth=0, priority=self.priority(s, 0))
+        limiter = self._limiter()
+        in_flight: set[asyncio.Task] = set()
+        try:
+            async with self._client() as client:
+                robots = RobotsCache(client, self.config.user_agent)
+                if self.config.discover or self.config.feeds:
+                    await self._discover(client, robots, limiter, seeds)
+                claimed = 0
+                while True:
+                    while (
+                        len(in_flight) < self.config.concurrency
+                        and claimed < self.config.max_pages
+                    ):
+                        item = self.frontier.pop()
+                        if item is None:
+                            break
+                        claimed += 1
+                        in_flight.add(
+                            asyncio.create_task(self._visit(client, robots, limiter, item))
+                        )
+                    if not in_flight:
+                        break
+                    finished, in_flight = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for t in finished:
+                        if not t.result():
+                            claimed -= 1  # não conta no limite (robots, não-HTML)
+        finally:
+            if in_flight:
+                # interrompido: devolve as reservas para outro processo/retomada
+                for t in in_flight:
+                    t.cancel()
+                release = getattr(self.frontier, "release", None)
+                if release is not None:
+                    release()
+            limiter.save()
+        self.report.elapsed_s = round(time.perf_counter() - started, 3)
+        return self.report
+
+    def _limiter(self):
+        c = self.config
+        if not c.adaptive:
+            return HostLimiter(c.per_host_concurrency, c.per_host_delay)
+        return AdaptiveHostLimiter(
+            c.per_host_concurrency,
+            c.per_host_delay,
+            max_limit=max(c.max_per_host_concurrency, c.per_host_concurrency),
+            min_delay=c.min_per_host_delay,
+            store=self.rates,
+        )
+
+    async def _fetch(self, client, limiter, url: str, headers: Dict[str, str]) -> httpx.Response:
+        """GET com realimentação do limitador; 429/503 voltam para a fila do
+        host (respeitando Retry-After) até `max_retries` vezes."""
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            await limiter.acquire(host)
+            t0 = time.monotonic()
+            try:
+                r = await client.get(url, headers=headers)
+            except httpx.TimeoutException:
+                limiter.record(host, time.monotonic() - t0, timeout=True)
+                raise
+            finally:
+                limiter.release(host)
+            throttled = r.status_code in THROTTLE_STATUS
+            retry_after = parse_retry_after(r.headers.get("retry-after")) if throttled else None
+            limiter.record(host, time.monotonic() - t0, r.status_code, retry_after)
+            if not throttled:
+                return r
+            self.report.throttled += 1
+            if attempt >= self.config.max_retries:
+                return r
+            attempt += 1
+            self.report.retried += 1
+
+    async def _discover(self, client, robots, limiter, seeds: Sequence[str]) -> None:
+        """Lê sitemaps/feeds e empurra as URLs na fronteira (profundidade 1)."""
+        queue: List[str] = []
+        if self.config.discover:
+            for origin in dict.fromkeys(
+                f"{p.scheme}://{p.netloc}" for p in map(urlparse, seeds)
+            ):
+                queue += await robots.sitemaps(origin) or [f"{origin}/sitemap.xml"]
+        queue += self.config.feeds
+        seen: set[str] = set()
+        while queue and self.report.sitemaps < self.config.max_sitemaps:
+            url = queue.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            batch: List[tuple] = []
+            async for d in self._iter_feed(client, limiter, url):
+                if d.sitemap:
+                    if not self._fresh(d.url, d.lastmod):
+                        continue
+                    queue.append(d.url)
+                elif not self._accept(d.url):
+                    continue
+                elif not self._fresh(d.url, d.lastmod):
+                    self.report.skipped_lastmod += 1
+                else:
+                    batch.append((d.url, 1, self.priority(d.url, 1) - freshness(d.lastmod)))
+                    if len(batch) >= 1000:
+                        self.report.discovered += self.frontier.push_many(batch)
+                        batch = []
+            self.report.discovered += self.frontier.push_many(batch)
+            if self.validators is not None:
+                self.validators.update(url)
+
+    def _fresh(self, url: str, lastmod: Optional[float]) -> bool:
+        if lastmod is None or self.validators is None:
+            return True
+        v = self.validators.get(url)
+        return v is None or lastmod > v.checked_at
+
+    async def _iter_feed(self, client, limiter, url: str):
+        """Entradas de um sitemap/feed, lidas em streaming."""
+        host = urlparse(url).netloc
+        await limiter.acquire(host)
+        t0 = time.monotonic()
+        try:
+            async with client.stream("GET", url) as r:
+                limiter.record(host, time.monotonic() - t0, r.status_code)
+                if r.status_code != 200:
+                    logger.info("sitemap/feed %s: HTTP %s", url, r.status_code)
+                    return
+                self.report.sitemaps += 1
+                parser = FeedParser()
+                async for chunk in r.aiter_bytes():
+                    for d in parser.feed(chunk):
+                        yield d
+                for d in parser.close():
+                    yield d
+        except (httpx.HTTPError, ET.ParseError) as e:
+            logger.warning("falha ao ler sitemap/feed %s: %s", url, e)
+        finally:
+            limiter.release(host)
+
+    async def _visit(self, client, robots, limiter, item: FrontierItem) -> bool:
+        """Processa um item; erro inesperado (parser, indexador, on_record)
+        conta em `report.failed` sem derrubar o crawl."""
+        try:
+            return await self._visit_page(client, robots, limiter, item)
+        except Exception:
+            logger.exception("falha ao processar %s", item.url)
+            self.report.failed += 1
+            self.frontier.done(item, ok=False)
+            return True
+
+    async def _visit_page(self, client, robots, limiter, item: FrontierItem) -> bool:
+        if self.config.respect_robots and not await robots.allowed(item.url):
+            self.report.skipped_robots += 1
+            self.frontier.done(item, ok=True)
+            return False
+        headers = self.validators.conditional_headers(item.url) if self.validators else {}
+        try:
+            r = await self._fetch(client, limiter, item.url, headers)
+            if r.status_code != 304:
+                r.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("falha ao buscar %s: %s", item.url, e)
+            self.report.failed += 1
+            self.frontier.done(item, ok=False)
+            return True
+        if r.status_code == 304:
+            # nada mudou: segue os links da última versão, sem reprocessar
+            self.report.not_modified += 1
+            self.validators.touch(item.url)
+            self._push_links(item, self.validators.get(item.url).links)
+            self.frontier.done(item, ok=True)
+            return True
+        ctype = r.headers.get("content-type", "text/html").split(";")[0].lower()
+        if "html" not in ctype:
+            self.report.skipped_non_html += 1
+            self.frontier.done(item, ok=True)
+            return False
+        if self.archive is not None:
+            await asyncio.to_thread(
+                self.archive.put, item.url, r.status_code, r.headers, r.content
+            )
+        html = r.text
+        self.report.fetched += 1
+        self.report.bytes += len(r.content)
+        links = [u for u in extract_links(html, str(r.url)) if self._accept(u)]
+        links = links[: self.config.max_links_per_page]
+        self._push_links(item, links)
+        if self.config.ingest or self.validators is not None:
+            await self._ingest(item.url, str(r.url), html, r.headers, links)
+        self.frontier.done(item, ok=True)
+        return True
+
+    def _push_links(self, item: FrontierItem, links: List[str]) -> None:
+        if item.depth >= self.config.max_depth:
+            return
+        depth = item.depth + 1
+        self.frontier.push_many((u, depth, self.priority(u, depth)) for u in links)
+
+    async def _ingest(
+        self, key: str, url: str, html: str, headers: httpx.Headers, links: List[str]
+    ) -> None:
+        loaded = await asyncio.to_thread(self.html_loader.load_from_string, html, url)
+        digest = None
+        if self.validators is not None:
+            digest = text_fingerprint(loaded.text, url)
+            if self.validators.unchanged(key, digest):
+                self._save_validators(key, headers, digest, links)
+                self.report.unchanged += 1
+                return
+        if not self.config.ingest:
+            self._save_validators(key, headers, digest, links)
+            return
+        tags = dict(self.config.tags)
+        if loaded.meta.get("title"):
+            tags.setdefault("title", loaded.meta["title"])
+        # normalização/chunking são CPU-bound: fora do event loop
+        record = await asyncio.to_thread(
+            run_ingestion,
+            content=loaded.text,
+            media_type="html",
+            source=url,
+            tags=tags,
+            dedupe=self.dedupe,
+            boilerplate=self.boilerplate,
+        )
+        self.report.boilerplate_blocks += record["meta"]["raw"].get("boilerplate_removed", 0)
+        if "duplicate_of" in record:
+            self.report.near_duplicates += 1
+        self.report.duplicate_chunks += len(record.get("chunk_duplicates", {}))
+        if self._keep_records:
+            self.report.records.append(record)
+        if self.on_record is not None:
+            res = self.on_record(record)
+            if asyncio.iscoroutine(res):
+                await res
+        # só agora o texto vira "original" e a página, vista: se algo acima
+        # falhar, o próximo crawl baixa e ingere de novo
+        await asyncio.to_thread(register_dedupe, self.dedupe, record)
+        self._save_validators(key, headers, digest, links)
+
+    def _save_validators(
+        self, key: str, headers: httpx.Headers, digest: Optional[str], links: List[str]
+    ) -> None:
+        if self.validators is not None:
+            self.validators.update(
+                key,
+                etag=headers.get("etag"),
+                last_modified=headers.get("last-modified"),
+                content_sha256=digest,
+                links=links,
+            )
+
+
+def crawl(
+    seeds: Sequence[str],
+    frontier_path: Optional[str] = None,
+    validators_path: Optional[str] = None,
+    dedupe_path: Optional[str] = None,
+    boilerplate_path: Optional[str] = None,
+    archive_path: Optional[str] = None,
+    rates_path: Optional[str] = None,
+    **config: Any,
+) -> CrawlReport:
+    """Atalho síncrono: `crawl(["https://..."], max_pages=50)`.
+
+    Com `frontier_path`, a fronteira fica em sqlite e uma nova chamada com o
+    mesmo arquivo retoma o crawl (as sementes já vistas são ignoradas). Com
+    `validators_path`, páginas que não mudaram desde o último crawl são
+    puladas (ver `CrawlReport.skipped_unchanged`). Com `dedupe_path`,
+    quase-duplicatas de documentos/chunks já vistos não geram chunks. Com
+    `boilerplate_path`, blocos repetidos no domínio saem antes do chunking.
+    Com `archive_path`, as respostas HTML ficam gravadas cruas (WARC) para
+    `archive.reprocess`. Com `rates_path`, os limites aprendidos por host
+    (AIMD) valem para a próxima execução.
+    """
+    with contextlib.ExitStack() as stack:
+        frontier = (
+            stack.enter_context(SQLiteFrontier(frontier_path)) if frontier_path else None
+        )
+        validators = (
+            stack.enter_context(ValidatorStore(validators_path))
+            if validators_path
+            else None
+        )
+        dedupe = (
+            stack.enter_context(NearDuplicateIndex(dedupe_path)) if dedupe_path else None
+        )
+        boilerplate = (
+            stack.enter_context(BoilerplateModel(boilerplate_path))
+            if boilerplate_path
+            else None
+        )
+        archive = stack.enter_context(FetchArchive(archive_path)) if archive_path else None
+        rates = stack.enter_context(RateStore(rates_path)) if rates_path else None
+        crawler = AsyncCrawler(
+            CrawlConfig(**config),
+            frontier=frontier,
+            validators=validators,
+            dedupe=dedupe,
+            boilerplate=boilerplate,
+            archive=archive,
+            rates=rates,
+        )
+        return asyncio.run(crawler.crawl(seeds))
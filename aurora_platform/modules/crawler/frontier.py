@@ -0,0 +1,286 @@
+"""Fronteira de crawl com prioridade (menor valor = visitado antes).
+
+`MemoryFrontier` serve para crawls curtos. `SQLiteFrontier` persiste fila e
+visitados em disco: um crawl interrompido retoma de onde parou e vários
+processos podem compartilhar o mesmo arquivo (itens são *reservados* com
+lease; reservas vencidas voltam para a fila). Um Bloom filter escalável fica
+na frente da tabela para responder "nunca visto" sem ir ao disco.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import math
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urldefrag
+
+PENDING, CLAIMED, DONE, FAILED = 0, 1, 2, 3
+
+
+@dataclass(frozen=True)
+class FrontierItem:
+    url: str
+    depth: int = 0
+    priority: float = 0.0
+
+
+def normalize_url(url: str) -> str:
+    return urldefrag(url)[0]
+
+
+class MemoryFrontier:
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, FrontierItem]] = []
+        self._seq = itertools.count()
+        self._seen: Set[str] = set()
+
+    def push(self, url: str, depth: int = 0, priority: float = 0.0) -> bool:
+        url = normalize_url(url)
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        item = FrontierItem(url=url, depth=depth, priority=priority)
+        heapq.heappush(self._heap, (priority, next(self._seq), item))
+        return True
+
+    def push_many(self, items: Iterable[Tuple[str, int, float]]) -> int:
+        return sum(self.push(u, d, p) for u, d, p in items)
+
+    def pop(self) -> Optional[FrontierItem]:
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
+
+    def done(self, item: FrontierItem, ok: bool = True) -> None:
+        """Marca o item como processado (no-op em memória)."""
+
+    def seen(self, url: str) -> bool:
+        return normalize_url(url) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+# -------- Bloom filter --------
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.m = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.k = max(1, int(round(self.m / capacity * math.log(2))))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class ScalableBloomFilter:
+    """Cadeia de Bloom filters: quando o atual enche, abre outro maior e com
+    taxa de erro mais apertada, mantendo o erro total perto de `error_rate`."""
+
+    def __init__(
+        self,
+        initial_capacity: int = 100_000,
+        error_rate: float = 0.001,
+        growth: int = 2,
+        tightening: float = 0.5,
+    ) -> None:
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: List[BloomFilter] = []
+
+    def add(self, key: str) -> None:
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            n = len(self.filters)
+            self.filters.append(
+                BloomFilter(
+                    self.initial_capacity * self.growth**n,
+                    self.error_rate * (1 - self.tightening) * self.tightening**n,
+                )
+            )
+        self.filters[-1].add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in f for f in reversed(self.filters))
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(f.bits) for f in self.filters)
+
+
+# -------- fronteira persistente --------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    priority REAL NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    claimed_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (state, priority);
+"""
+
+
+class SQLiteFrontier:
+    """Fronteira em sqlite (WAL) compartilhável entre processos.
+
+    - `pop` reserva o próximo item (`claimed_by`/`claimed_at`) dentro de uma
+      transação `BEGIN IMMEDIATE`, então dois processos nunca pegam o mesmo;
+    - itens reservados há mais de `lease_s` (processo que caiu) voltam a ser
+      elegíveis;
+    - `done` grava o estado final, que é o checkpoint do crawl.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        lease_s: float = 300.0,
+        worker_id: Optional[str] = None,
+        bloom_capacity: int = 100_000,
+        error_rate: float = 0.001,
+    ) -> None:
+        self.path = path
+        self.lease_s = lease_s
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.bloom = ScalableBloomFilter(bloom_capacity, error_rate)
+        for (url,) in self.conn.execute("SELECT url FROM frontier"):
+            self.bloom.add(url)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SQLiteFrontier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _exists(self, url: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM frontier WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def push(self, url: str, depth: int = 0, priority: float = 0.0) -> bool:
+        return self.push_many([(url, depth, priority)]) == 1
+
+    def push_many(self, items: Iterable[Tuple[str, int, float]]) -> int:
+        now = time.time()
+        rows = []
+        batch: Set[str] = set()
+        for url, depth, priority in items:
+            url = normalize_url(url)
+            if url in batch:
+                continue
+            # Bloom diz "talvez": confirma na tabela (falso positivo não perde URL)
+            if url in self.bloom and self._exists(url):
+                continue
+            batch.add(url)
+            rows.append((url, depth, priority, now))
+        if not rows:
+            return 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, depth, priority, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        for url, *_ in rows:
+            self.bloom.add(url)
+        return added
+
+    def pop(self) -> Optional[FrontierItem]:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT url, depth, priority FROM frontier "
+                "WHERE state = ? OR (state = ? AND claimed_at < ?) "
+                "ORDER BY state, priority LIMIT 1",
+                (PENDING, CLAIMED, now - self.lease_s),
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE frontier SET state = ?, claimed_by = ?, claimed_at = ?, "
+                    "updated_at = ? WHERE url = ?",
+                    (CLAIMED, self.worker_id, now, now, row[0]),
+                )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return FrontierItem(url=row[0], depth=row[1], priority=row[2])
+
+    def done(self, item: FrontierItem, ok: bool = True) -> None:
+        self.conn.execute(
+            "UPDATE frontier SET state = ?, updated_at = ? WHERE url = ?",
+            (DONE if ok else FAILED, time.time(), item.url),
+        )
+
+    def release(self, worker_id: Optional[str] = None) -> int:
+        """Devolve à fila os itens reservados por `worker_id` (padrão: este)."""
+        cur = self.conn.execute(
+            "UPDATE frontier SET state = ?, claimed_by = NULL, claimed_at = NULL "
+            "WHERE state = ? AND claimed_by = ?",
+            (PENDING, CLAIMED, worker_id or self.worker_id),
+        )
+        return cur.rowcount
+
+    def seen(self, url: str) -> bool:
+        url = normalize_url(url)
+        return url in self.bloom and self._exists(url)
+
+    def stats(self) -> Dict[str, int]:
+        names = {PENDING: "pending", CLAIMED: "claimed", DONE: "done", FAILED: "failed"}
+        out = {v: 0 for v in names.values()}
+        for state, n in self.conn.execute(
+            "SELECT state, COUNT(*) FROM frontier GROUP BY state"
+        ):
+            out[names[state]] = n
+        return out
+
+    def __len__(self) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM frontier WHERE state = ?", (PENDING,)
+        ).fetchone()
+        return row[0]
@@ -0,0 +1,236 @@
+"""Armazém de registros ingeridos em shards zstd com índice lateral.
+
+Em vez de um `{id}.jsonl` por documento, os registros são acumulados em
+blocos de JSONL; cada bloco vira um frame zstd anexado ao shard corrente
+(`shard-00000.jsonl.zst`, ...), que é selado ao atingir `shard_bytes`.
+O índice (sqlite) mapeia canonical_id -> (shard, offset do frame, tamanho,
+linha), então uma leitura pontual descomprime só um bloco, e a iteração
+lê os shards em sequência, na velocidade do disco.
+
+Um único escritor por diretório. O índice guarda quantos bytes de cada shard
+estão confirmados; sobras de uma escrita interrompida são truncadas na
+abertura e shards que o índice não conhece são apagados.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard as zstd
+
+    _HAS_ZSTD = True
+except Exception:
+    zstd = None
+    _HAS_ZSTD = False
+
+SHARD_BYTES = int(os.getenv("ARTIFACT_SHARD_BYTES", str(256 * 1024 * 1024)))
+BLOCK_BYTES = int(os.getenv("ARTIFACT_BLOCK_BYTES", str(256 * 1024)))
+ZSTD_LEVEL = int(os.getenv("ARTIFACT_ZSTD_LEVEL", "3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (shard INTEGER PRIMARY KEY, bytes INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS records (
+    id TEXT PRIMARY KEY, shard INTEGER NOT NULL, offset INTEGER NOT NULL,
+    length INTEGER NOT NULL, line INTEGER NOT NULL
+);
+"""
+
+
+SHARD_RE = re.compile(r"^shard-(\d+)\.jsonl\.zst$")
+
+
+def shard_name(shard: int) -> str:
+    return f"shard-{shard:05d}.jsonl.zst"
+
+
+class ArtifactStore:
+    def __init__(
+        self,
+        root: str = "artifacts/ingested",
+        shard_bytes: Optional[int] = None,
+        block_bytes: Optional[int] = None,
+        level: Optional[int] = None,
+    ) -> None:
+        if not _HAS_ZSTD:
+            raise RuntimeError("zstandard não instalado: pip install zstandard")
+        self.root = root
+        self.shard_bytes = shard_bytes or SHARD_BYTES
+        self.block_bytes = block_bytes or BLOCK_BYTES
+        self._cctx = zstd.ZstdCompressor(level=level or ZSTD_LEVEL)
+        self._dctx = zstd.ZstdDecompressor()
+        os.makedirs(root, exist_ok=True)
+        self.conn = sqlite3.connect(
+            os.path.join(root, "index.sqlite"),
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._buf: List[Tuple[str, bytes]] = []
+        self._buf_ids: Dict[str, int] = {}
+        self._buf_bytes = 0
+        row = self.conn.execute(
+            "SELECT shard, bytes FROM shards ORDER BY shard DESC LIMIT 1"
+        ).fetchone()
+        self._shard, self._shard_size = row if row else (0, 0)
+        self._truncate_uncommitted()
+
+    def _path(self, shard: int) -> str:
+        return os.path.join(self.root, shard_name(shard))
+
+    def _truncate_uncommitted(self) -> None:
+        # uma escrita interrompida pode ter deixado frames em qualquer shard
+        # (inclusive num recém-aberto que o índice nunca registrou)
+        committed = dict(self.conn.execute("SELECT shard, bytes FROM shards"))
+        for name in os.listdir(self.root):
+            m = SHARD_RE.match(name)
+            if not m:
+                continue
+            shard, path = int(m.group(1)), os.path.join(self.root, name)
+            size = committed.get(shard)
+            if size is None:
+                os.remove(path)
+            elif os.path.getsize(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    # -------- escrita --------
+    def put(self, record: Dict[str, Any]) -> bool:
+        """Enfileira o registro; False se o id já está no armazém."""
+        rid = record["id"]
+        with self._lock:
+            if rid in self._buf_ids or self._indexed(rid):
+                return False
+            line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+            self._buf_ids[rid] = len(self._buf)
+            self._buf.append((rid, line))
+            self._buf_bytes += len(line)
+            if self._buf_bytes >= self.block_bytes:
+                self._flush()
+        return True
+
+    @property
+    def buffered(self) -> int:
+        """Registros aceitos por `put` e ainda não gravados em disco."""
+        return len(self._buf)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        frame = self._cctx.compress(b"".join(line for _, line in self._buf))
+        if self._shard_size and self._shard_size + len(frame) > self.shard_bytes:
+            self._shard, self._shard_size = self._shard + 1, 0
+        with open(self._path(self._shard), "ab") as f:
+            # posição real do fim do arquivo, não a que o índice supõe
+            offset = f.tell()
+            f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT INTO records (id, shard, offset, length, line) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (rid, self._shard, offset, len(frame), i)
+                    for i, (rid, _) in enumerate(self._buf)
+                ],
+            )
+            self.conn.execute(
+                "INSERT INTO shards (shard, bytes) VALUES (?, ?) "
+                "ON CONFLICT (shard) DO UPDATE SET bytes = excluded.bytes",
+                (self._shard, offset + len(frame)),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self._shard_size = offset + len(frame)
+        self._buf, self._buf_ids, self._buf_bytes = [], {}, 0
+
+    # -------- leitura --------
+    def _indexed(self, rid: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM records WHERE id = ?", (rid,)).fetchone() is not None
+
+    def __contains__(self, rid: str) -> bool:
+        with self._lock:
+            return rid in self._buf_ids or self._indexed(rid)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0] + len(self._buf)
+
+    def get(self, rid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if rid in self._buf_ids:
+                return json.loads(self._buf[self._buf_ids[rid]][1])
+            row = self.conn.execute(
+                "SELECT shard, offset, length, line FROM records WHERE id = ?", (rid,)
+            ).fetchone()
+        if row is None:
+            return None
+        shard, offset, length, line = row
+        with open(self._path(shard), "rb") as f:
+            f.seek(offset)
+            block = self._dctx.decompress(f.read(length))
+        return json.loads(block.split(b"\n")[line])
+
+    def shards(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            rows = self.conn.execute("SELECT shard, bytes FROM shards ORDER BY shard").fetchall()
+        return [(self._path(s), b) for s, b in rows]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_records()
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Todos os registros gravados, em ordem de escrita, lendo os shards
+        em streaming (só a parte confirmada no índice)."""
+        for path, size in self.shards():
+            with open(path, "rb") as raw:
+                reader = self._dctx.stream_reader(_Limited(raw, size), read_across_frames=True)
+                for line in io.BufferedReader(reader, buffer_size=1 << 20):
+                    if line.strip():
+                        yield json.loads(line)
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self) -> "ArtifactStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _Limited(io.RawIOBase):
+    """Lê no máximo `size` bytes de `fh` (ignora frames não confirmados)."""
+
+    def __init__(self, fh: io.BufferedReader, size: int) -> None:
+        self.fh = fh
+        self.left = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self.left)
+        if n <= 0:
+            return 0
+        data = self.fh.read(n)
+        b[: len(data)] = data
+        self.left -= len(data)
+        return len(data)
@@ -0,0 +1,148 @@
+"""Modelo de boilerplate por domínio.
+
+Conta, para cada domínio, em quantas páginas cada bloco (linha ou frase,
+normalizado) aparece. Blocos presentes em pelo menos `threshold` das páginas
+do domínio — menus, banners de cookies, rodapés legais — são removidos em
+`to_markdown`, antes do chunking. O modelo fica em sqlite e é atualizado a
+cada página nova, então melhora conforme o crawl avança.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+SEGMENT_SPLIT_RE = re.compile(r"(\n+|(?<=[.!?])\s+)")
+SPACES_RE = re.compile(r"\s+")
+HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    domain TEXT NOT NULL, page TEXT NOT NULL, PRIMARY KEY (domain, page)
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    domain TEXT NOT NULL, hash TEXT NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (domain, hash)
+);
+"""
+
+
+def block_hash(segment: str) -> str:
+    # números ficam: em editais eles são o conteúdo ("lote 3", "pregão 45/2024")
+    norm = SPACES_RE.sub(" ", segment.lower()).strip()
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class BoilerplateModel:
+    def __init__(
+        self,
+        path: str = "artifacts/boilerplate/model.sqlite",
+        threshold: Optional[float] = None,
+        min_pages: int = 5,
+        min_chars: int = 20,
+    ) -> None:
+        self.threshold = threshold or float(os.getenv("BOILERPLATE_THRESHOLD", "0.5"))
+        self.min_pages = min_pages
+        self.min_chars = min_chars
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pages: Dict[str, int] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "BoilerplateModel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _segments(self, text: str) -> List[str]:
+        return SEGMENT_SPLIT_RE.split(text)
+
+    def _candidate(self, segment: str) -> bool:
+        # títulos são estrutura do documento, não boilerplate
+        s = segment.strip()
+        return len(s) >= self.min_chars and not HEADING_RE.match(s)
+
+    def _load(self, domain: str) -> Dict[str, int]:
+        if domain not in self._counts:
+            self._pages[domain] = self.conn.execute(
+                "SELECT COUNT(*) FROM pages WHERE domain = ?", (domain,)
+            ).fetchone()[0]
+            self._counts[domain] = dict(
+                self.conn.execute(
+                    "SELECT hash, count FROM blocks WHERE domain = ?", (domain,)
+                )
+            )
+        return self._counts[domain]
+
+    def observe(self, domain: str, page: str, text: str) -> bool:
+        """Conta os blocos da página (uma vez por página). False se já vista."""
+        hashes = {block_hash(s) for s in self._segments(text)[::2] if self._candidate(s)}
+        with self._lock:
+            counts = self._load(domain)
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO pages (domain, page) VALUES (?, ?)",
+                    (domain, page),
+                )
+                if cur.rowcount == 0:
+                    self.conn.execute("COMMIT")
+                    return False
+                self.conn.executemany(
+                    "INSERT INTO blocks (domain, hash, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT (domain, hash) DO UPDATE SET count = count + 1",
+                    [(domain, h) for h in hashes],
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self._pages[domain] += 1
+            for h in hashes:
+                counts[h] = counts.get(h, 0) + 1
+        return True
+
+    def is_boilerplate(self, domain: str, segment: str) -> bool:
+        with self._lock:
+            counts = self._load(domain)
+            pages = self._pages[domain]
+        if pages < self.min_pages or not self._candidate(segment):
+            return False
+        return counts.get(block_hash(segment), 0) / pages >= self.threshold
+
+    def strip(self, domain: str, text: str) -> Tuple[str, int]:
+        """Remove os blocos frequentes; retorna (texto, blocos removidos)."""
+        parts = self._segments(text)
+        out: List[str] = []
+        removed = 0
+        for i in range(0, len(parts), 2):
+            seg = parts[i]
+            sep = parts[i + 1] if i + 1 < len(parts) else ""
+            if self.is_boilerplate(domain, seg):
+                removed += 1
+                continue
+            out.append(seg + sep)
+        return "".join(out).strip(), removed
+
+    def stats(self, domain: str) -> Dict[str, int]:
+        with self._lock:
+            counts = self._load(domain)
+            pages = self._pages[domain]
+        frequent = sum(
+            1 for c in counts.values() if pages and c / pages >= self.threshold
+        )
+        return {"pages": pages, "blocks": len(counts), "boilerplate_blocks": frequent}
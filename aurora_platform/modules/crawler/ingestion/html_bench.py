@@ -0,0 +1,115 @@
+"""Microbenchmark dos motores de extração HTML sobre arquivos locais.
+
+    python -m aurora_platform.modules.crawler.ingestion.html_bench \
+        tests/crawler/fixtures/*.html --repeat 5
+
+Mede ms/documento, cobertura (texto extraído / maior extração do mesmo
+documento) e a qualidade usada pelo `EngineSelector` (`extraction_quality`)
+de cada motor disponível, além do `load_many` em pool.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import statistics
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from aurora_platform.modules.crawler.ingestion.html_loader import (
+    HTMLLoader,
+    available_engines,
+    extraction_quality,
+)
+
+
+@dataclass
+class EngineBenchResult:
+    engine: str
+    docs: int
+    ms_per_doc: float
+    chars_per_doc: float
+    coverage: float
+    quality: float
+
+
+def benchmark_engines(
+    docs: Sequence[Tuple[str, Optional[str]]],
+    repeat: int = 3,
+    engines: Optional[Sequence[str]] = None,
+) -> List[EngineBenchResult]:
+    loader = HTMLLoader()
+    engines = list(engines or available_engines())
+    texts = [{e: "" for e in engines} for _ in docs]
+    times = {e: [] for e in engines}
+    for _ in range(repeat):
+        for i, (html, url) in enumerate(docs):
+            for e in engines:
+                t0 = time.perf_counter()
+                res = loader.extract(html, url, e)
+                times[e].append((time.perf_counter() - t0) * 1000)
+                texts[i][e] = res.text if res else ""
+    lengths = {e: [len(texts[i][e]) for i in range(len(docs))] for e in engines}
+    quality = [extraction_quality(t) for t in texts]
+    longest = [max((lengths[e][i] for e in engines), default=0) for i in range(len(docs))]
+    out = []
+    for e in engines:
+        cov = [lengths[e][i] / longest[i] for i in range(len(docs)) if longest[i]]
+        out.append(
+            EngineBenchResult(
+                engine=e,
+                docs=len(docs),
+                ms_per_doc=round(statistics.median(times[e]), 3) if times[e] else 0.0,
+                chars_per_doc=round(statistics.mean(lengths[e]), 1) if docs else 0.0,
+                coverage=round(statistics.mean(cov), 3) if cov else 0.0,
+                quality=round(statistics.mean(q[e] for q in quality), 3) if docs else 0.0,
+            )
+        )
+    return out
+
+
+def benchmark_load_many(
+    docs: Sequence[Tuple[str, Optional[str]]], workers: Optional[int] = None
+) -> Tuple[float, float]:
+    """(ms/doc sequencial, ms/doc com `load_many` em pool)."""
+    loader = HTMLLoader()
+    t0 = time.perf_counter()
+    for html, url in docs:
+        loader.load_from_string(html, url)
+    seq = (time.perf_counter() - t0) * 1000 / max(1, len(docs))
+    t0 = time.perf_counter()
+    loader.load_many(docs, workers=workers, chunksize=1)
+    pool = (time.perf_counter() - t0) * 1000 / max(1, len(docs))
+    return round(seq, 3), round(pool, 3)
+
+
+def format_table(results: List[EngineBenchResult]) -> str:
+    head = f"{'motor':<14}{'docs':>6}{'ms/doc':>10}{'chars/doc':>12}{'cobertura':>11}{'qualidade':>11}"
+    rows = [head, "-" * len(head)]
+    for r in results:
+        rows.append(
+            f"{r.engine:<14}{r.docs:>6}{r.ms_per_doc:>10.3f}"
+            f"{r.chars_per_doc:>12.1f}{r.coverage:>11.3f}{r.quality:>11.3f}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    p = argparse.ArgumentParser(prog="aurora-html-bench")
+    p.add_argument("paths", nargs="*", default=["tests/crawler/fixtures/*.html"])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--replicate", type=int, default=1,
+                   help="repete a lista de documentos (lotes maiores para o pool)")
+    args = p.parse_args(argv)
+    files = sorted({f for pat in args.paths for f in glob.glob(pat)})
+    docs = [(open(f, encoding="utf-8", errors="replace").read(), None) for f in files]
+    docs = docs * args.replicate
+    print(format_table(benchmark_engines(docs, repeat=args.repeat)))
+    seq, pool = benchmark_load_many(docs, workers=args.workers)
+    print(f"\nload_many: {seq:.3f} ms/doc sequencial, {pool:.3f} ms/doc em pool")
+
+
+if __name__ == "__main__":
+    main()
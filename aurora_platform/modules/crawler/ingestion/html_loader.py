@@ -1,16 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
+from urllib.parse import urlparse
+import json
 import logging
+import os
 import re
+import time
 
 try:
-    from selectolax.parser import HTMLParser
+    # lexbor: backend mantido do selectolax (o "modest" foi removido no 1.0)
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
 
     HAS_SELECTOLAX = True
 except Exception:
-    HAS_SELECTOLAX = False
+    try:
+        from selectolax.parser import HTMLParser
+
+        HAS_SELECTOLAX = True
+    except Exception:
+        HAS_SELECTOLAX = False
 
 try:
     import trafilatura
@@ -28,6 +40,20 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+ENGINES = ("trafilatura", "selectolax", "bs4")
+SKIP_TAGS = frozenset({"script", "style", "nav", "footer", "form", "aside"})
+CANDIDATE_TAGS = frozenset({"article", "main"})
+CANDIDATE_CLASSES = frozenset({"article", "post", "content", "entry-content"})
+HTML_WORKERS = int(os.getenv("HTML_WORKERS", "0")) or (os.cpu_count() or 1)
+
+
+WORD_RE = re.compile(r"\w+")
+
+
+def available_engines() -> List[str]:
+    flags = {"trafilatura": HAS_TRAFILATURA, "selectolax": HAS_SELECTOLAX, "bs4": HAS_BS4}
+    return [e for e in ENGINES if flags[e]]
+
 
 @dataclass
 class HTMLLoadResult:
@@ -42,22 +68,23 @@ class HTMLLoader:
     2) senão parseia com selectolax (rápido) ou fallback bs4.
     """
 
-    def __init__(self, prefer_readable: bool = True) -> None:
+    def __init__(
+        self,
+        prefer_readable: bool = True,
+        selector: Optional["EngineSelector"] = None,
+    ) -> None:
         self.prefer_readable = prefer_readable
+        self.selector = selector
 
     def load_from_string(
         self, html: str, base_url: Optional[str] = None
     ) -> HTMLLoadResult:
+        if self.selector is not None and base_url:
+            return self._load_adaptive(html, base_url)
         if self.prefer_readable and HAS_TRAFILATURA:
-            try:
-                extracted = trafilatura.extract(
-                    html, include_comments=False, include_tables=False, url=base_url
-                )
-                if extracted and extracted.strip():
-                    meta = self._extract_meta_trafilatura(html, base_url)
-                    return HTMLLoadResult(text=extracted.strip(), html=html, meta=meta)
-            except Exception as e:
-                logger.warning("Trafilatura falhou: %s", e)
+            result = self._parse_with_trafilatura(html, base_url)
+            if result is not None:
+                return result
         if HAS_SELECTOLAX:
             return self._parse_with_selectolax(html, base_url)
         if HAS_BS4:
@@ -66,6 +93,103 @@ class HTMLLoader:
             text=self._fallback_text(html), html=html, meta={"source_type": "html"}
         )
 
+    def extract(
+        self, html: str, base_url: Optional[str], engine: str
+    ) -> Optional[HTMLLoadResult]:
+        """Extrai com um motor específico (None se ele não produziu texto)."""
+        if engine == "trafilatura":
+            return self._parse_with_trafilatura(html, base_url)
+        if engine == "selectolax":
+            return self._parse_with_selectolax(html, base_url)
+        if engine == "bs4":
+            return self._parse_with_bs4(html, base_url)
+        raise ValueError(f"motor HTML desconhecido: {engine}")
+
+    def measure(
+        self, html: str, base_url: Optional[str]
+    ) -> Dict[str, Tuple[Optional[HTMLLoadResult], float]]:
+        """Roda todos os motores disponíveis: motor -> (resultado, ms)."""
+        out = {}
+        for engine in available_engines():
+            t0 = time.perf_counter()
+            try:
+                res = self.extract(html, base_url, engine)
+            except Exception as e:
+                logger.warning("%s falhou: %s", engine, e)
+                res = None
+            out[engine] = (res, (time.perf_counter() - t0) * 1000)
+        return out
+
+    def _load_adaptive(self, html: str, base_url: str) -> HTMLLoadResult:
+        domain = urlparse(base_url).netloc
+        engine = self.selector.choose(domain)
+        if engine is not None:
+            t0 = time.perf_counter()
+            res = self.extract(html, base_url, engine)
+            self.selector.record_cost(domain, engine, (time.perf_counter() - t0) * 1000)
+            if res is not None and res.text:
+                return res
+        # exploração (ou motor escolhido falhou): mede todos e fica com o melhor
+        runs = self.measure(html, base_url)
+        best, trial = _score_runs(runs)
+        self.selector.record_trial(domain, trial)
+        return best or HTMLLoadResult(
+            text=self._fallback_text(html), html=html, meta={"source_type": "html"}
+        )
+
+    def load_many(
+        self,
+        docs: Iterable[Union[str, Tuple[str, Optional[str]]]],
+        workers: Optional[int] = None,
+        chunksize: int = 8,
+    ) -> List[HTMLLoadResult]:
+        """Extrai vários documentos (`html` ou `(html, url)`) num pool de
+        processos, preservando a ordem. Lotes pequenos rodam no processo."""
+        items = [(d, None) if isinstance(d, str) else tuple(d) for d in docs]
+        workers = min(workers or HTML_WORKERS, max(1, len(items) // chunksize))
+        if workers <= 1:
+            return [self.load_from_string(h, u) for h, u in items]
+        jobs = []
+        explore_left: Dict[str, int] = {}
+        for html, url in items:
+            engine = None
+            if self.selector is not None and url:
+                domain = urlparse(url).netloc
+                engine = self.selector.choose(domain)
+                if engine is None:
+                    left = explore_left.setdefault(domain, self.selector.pending(domain))
+                    engine = "explore" if left > 0 else None
+                    explore_left[domain] = left - 1
+            jobs.append((html, url, engine, self.prefer_readable))
+        out: List[HTMLLoadResult] = []
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for (html, url, engine, _), (res, runs) in zip(
+                jobs, ex.map(_load_worker, jobs, chunksize=chunksize)
+            ):
+                if self.selector is not None and url and runs:
+                    domain = urlparse(url).netloc
+                    if engine == "explore":
+                        self.selector.record_trial(domain, runs)
+                    elif engine is not None:
+                        self.selector.record_cost(domain, engine, runs[engine][1])
+                out.append(res)
+        return out
+
+    # -------- trafilatura --------
+    def _parse_with_trafilatura(
+        self, html: str, base_url: Optional[str]
+    ) -> Optional[HTMLLoadResult]:
+        try:
+            extracted = trafilatura.extract(
+                html, include_comments=False, include_tables=False, url=base_url
+            )
+            if extracted and extracted.strip():
+                meta = self._extract_meta_trafilatura(html, base_url)
+                return HTMLLoadResult(text=extracted.strip(), html=html, meta=meta)
+        except Exception as e:
+            logger.warning("Trafilatura falhou: %s", e)
+        return None
+
     # -------- selectolax --------
     def _parse_with_selectolax(
         self, html: str, base_url: Optional[str]
@@ -91,30 +215,52 @@ class HTMLLoader:
         return None
 
     def _heuristic_main_text_selectolax(self, tree) -> str:
-        for sel in ["script", "style", "nav", "footer", "form", "aside"]:
-            for n in tree.css(sel) or []:
-                n.decompose()
-        candidates = []
-        for sel in [
-            "article",
-            "main",
-            "[role=main]",
-            ".article",
-            ".post",
-            ".content",
-            ".entry-content",
-        ]:
-            for n in tree.css(sel) or []:
-                t = n.text(separator=" ").strip()
-                if t:
-                    candidates.append((len(t), t))
-        if candidates:
-            return max(candidates, key=lambda x: x[0])[1]
+        """Uma passada pelo DOM: cada nó de texto soma seu tamanho aos
+        contêineres candidatos acima dele (fora de script/nav/...). Só o texto
+        do vencedor é materializado."""
+        info: Dict[int, Tuple[bool, Tuple[Any, ...]]] = {}
+        scores: Dict[int, int] = {}
+        nodes: Dict[int, Any] = {}
+        root = tree.root
+        if root is None:
+            return ""
+        for n in root.traverse(include_text=True):
+            parent = n.parent
+            skipped, cands = info.get(parent.mem_id, (False, ())) if parent else (False, ())
+            if n.tag == "-text":
+                if skipped or not cands:
+                    continue
+                size = len((n.text_content or "").strip())
+                for c in cands:
+                    scores[c] = scores.get(c, 0) + size
+                continue
+            if n.tag in SKIP_TAGS:
+                skipped = True
+            elif not skipped and self._is_candidate(n):
+                nodes[n.mem_id] = n
+                cands = cands + (n.mem_id,)
+            info[n.mem_id] = (skipped, cands)
+        best = max(scores.items(), key=lambda kv: kv[1], default=None)
+        if best is not None and best[1] > 0:
+            node = nodes[best[0]]
+            for sel in SKIP_TAGS:
+                for x in node.css(sel) or []:
+                    x.decompose()
+            return node.text(separator=" ").strip()
         paragraphs = [n.text().strip() for n in tree.css("p") or [] if n.text().strip()]
         if paragraphs:
             return "\n\n".join(paragraphs)
         return self._fallback_text(tree.html)
 
+    @staticmethod
+    def _is_candidate(n) -> bool:
+        if n.tag in CANDIDATE_TAGS:
+            return True
+        attrs = n.attributes
+        if attrs.get("role") == "main":
+            return True
+        return bool(CANDIDATE_CLASSES.intersection((attrs.get("class") or "").split()))
+
     def _guess_authors_selectolax(self, tree):
         authors = set()
         for sel in ["meta[name=author]", "[itemprop=author]", ".author", ".byline"]:
@@ -211,3 +357,128 @@ class HTMLLoader:
 
     def _fallback_text(self, s: str) -> str:
         return re.sub(r"\s+", " ", s or "").strip()
+
+
+# -------- escolha de motor por domínio --------
+def _tokens(text: str) -> Counter:
+    return Counter(WORD_RE.findall(text.lower()))
+
+
+def _f1(a: Counter, b: Counter) -> float:
+    overlap = sum((a & b).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(a.values()), overlap / sum(b.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def extraction_quality(texts: Dict[str, str]) -> Dict[str, float]:
+    """Qualidade de cada extração do mesmo documento (motor -> texto).
+
+    F1 de tokens contra a saída do trafilatura, que separa conteúdo de
+    boilerplate; sem ela, F1 médio contra os outros motores (consenso). Texto
+    maior não ganha nada por si: menu e rodapé extras derrubam a precisão.
+    """
+    bags = {e: _tokens(t) for e, t in texts.items() if t}
+    ref = bags.get("trafilatura")
+    out: Dict[str, float] = {}
+    for engine in texts:
+        bag = bags.get(engine)
+        if bag is None:
+            out[engine] = 0.0
+        elif ref is not None:
+            out[engine] = _f1(bag, ref)
+        else:
+            others = [b for e, b in bags.items() if e != engine]
+            out[engine] = sum(_f1(bag, b) for b in others) / len(others) if others else 1.0
+    return out
+
+
+def _score_runs(
+    runs: Dict[str, Tuple[Optional[HTMLLoadResult], float]]
+) -> Tuple[Optional[HTMLLoadResult], Dict[str, Tuple[float, float]]]:
+    """Melhor resultado de `HTMLLoader.measure` e motor -> (qualidade, ms)."""
+    quality = extraction_quality({e: r.text if r else "" for e, (r, _) in runs.items()})
+    scored = [(quality[e], r) for e, (r, _) in runs.items() if r is not None]
+    best = max(scored, key=lambda x: x[0])[1] if scored else None
+    return best, {e: (quality[e], ms) for e, (_, ms) in runs.items()}
+
+
+@dataclass
+class EngineStats:
+    trials: int = 0
+    quality: float = 0.0  # média de `extraction_quality` nos documentos medidos
+    calls: int = 0
+    ms: float = 0.0  # média de custo por documento
+
+    def add_cost(self, ms: float) -> None:
+        self.calls += 1
+        self.ms += (ms - self.ms) / self.calls
+
+
+@dataclass
+class EngineSelector:
+    """Escolhe o motor de extração por domínio a partir de custo e qualidade
+    medidos: os primeiros `explore_docs` documentos de cada domínio passam por
+    todos os motores; depois vence o mais barato cuja qualidade média fique a
+    até `tolerance` da melhor. Qualidade vem de `extraction_quality`."""
+
+    explore_docs: int = 3
+    tolerance: float = 0.9
+    stats: Dict[str, Dict[str, EngineStats]] = field(default_factory=dict)
+
+    def pending(self, domain: str) -> int:
+        engines = self.stats.get(domain, {})
+        trials = max((s.trials for s in engines.values()), default=0)
+        return max(0, self.explore_docs - trials)
+
+    def choose(self, domain: str) -> Optional[str]:
+        if self.pending(domain) > 0:
+            return None
+        engines = self.stats[domain]
+        best_q = max(s.quality for s in engines.values())
+        ok = [e for e, s in engines.items() if best_q > 0 and s.quality >= self.tolerance * best_q]
+        return min(ok, key=lambda e: engines[e].ms) if ok else None
+
+    def record_trial(self, domain: str, runs: Dict[str, Tuple[float, float]]) -> None:
+        """`runs`: motor -> (qualidade 0..1, ms)."""
+        engines = self.stats.setdefault(domain, {})
+        for engine, (q, ms) in runs.items():
+            s = engines.setdefault(engine, EngineStats())
+            s.trials += 1
+            s.quality += (q - s.quality) / s.trials
+            s.add_cost(ms)
+
+    def record_cost(self, domain: str, engine: str, ms: float) -> None:
+        self.stats.setdefault(domain, {}).setdefault(engine, EngineStats()).add_cost(ms)
+
+    def save(self, path: str) -> None:
+        raw = {d: {e: s.__dict__ for e, s in es.items()} for d, es in self.stats.items()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(raw, f)
+
+    @classmethod
+    def load(cls, path: str, **kwargs: Any) -> "EngineSelector":
+        sel = cls(**kwargs)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            sel.stats = {
+                d: {e: EngineStats(**s) for e, s in es.items()} for d, es in raw.items()
+            }
+        return sel
+
+
+def _load_worker(job):
+    html, url, engine, prefer_readable = job
+    loader = HTMLLoader(prefer_readable=prefer_readable)
+    if engine == "explore":
+        best, trial = _score_runs(loader.measure(html, url))
+        return best or loader.load_from_string(html, url), trial
+    if engine is not None:
+        t0 = time.perf_counter()
+        res = loader.extract(html, url, engine)
+        ms = (time.perf_counter() - t0) * 1000
+        if res is not None and res.text:
+            return res, {engine: (len(res.text), ms)}
+    return loader.load_from_string(html, url), {}
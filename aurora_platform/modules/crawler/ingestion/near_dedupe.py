@@ -0,0 +1,287 @@
+"""Detecção de quase-duplicatas (documento e chunk) com MinHash + LSH.
+
+`compute_id` só pega cópias byte a byte; aqui a assinatura MinHash dos
+shingles de palavras estima a similaridade de Jaccard, e o LSH por bandas
+(persistido em sqlite) acha candidatos sem comparar com o índice inteiro.
+O mesmo edital republicado com rodapé ou data diferente cai acima do limiar
+e não é re-chunkado/re-embeddado.
+
+`check` só consulta; o texto entra no índice com `register`, que o chamador
+faz depois de indexar/gravar o registro (uma falha no meio não transforma a
+nova tentativa em "duplicata"). A própria URL nunca conta como original:
+uma versão nova da mesma página substitui a antiga em vez de ser descartada.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+MERSENNE = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS signatures (
+    id TEXT NOT NULL, kind TEXT NOT NULL, source TEXT, sig BLOB NOT NULL,
+    url TEXT,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS bands (
+    kind TEXT NOT NULL, band INTEGER NOT NULL, hash INTEGER NOT NULL, id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_lookup ON bands (kind, band, hash);
+CREATE INDEX IF NOT EXISTS bands_id ON bands (kind, id);
+CREATE TABLE IF NOT EXISTS stats (
+    source TEXT NOT NULL, kind TEXT NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 0, dup INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, kind)
+);
+"""
+
+
+def source_key(source: str, media_type: str = "") -> str:
+    """Agrupa as estatísticas por domínio (URLs) ou tipo de mídia (arquivos)."""
+    return urlparse(source).netloc or media_type or "local"
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bandas, linhas) com b*r <= num_perm cujo ponto de inflexão
+    (1/b)^(1/r) fica mais perto do limiar."""
+    best = (1, num_perm)
+    best_err = float("inf")
+    for r in range(1, num_perm + 1):
+        b = num_perm // r
+        err = abs((1 / b) ** (1 / r) - threshold)
+        if err < best_err:
+            best, best_err = (b, r), err
+    return best
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle: int = 5, seed: int = 1) -> None:
+        self.num_perm = num_perm
+        self.shingle = shingle
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        words = WORD_RE.findall(text.lower())
+        k = self.shingle
+        grams = (
+            [" ".join(words[i : i + k]) for i in range(len(words) - k + 1)]
+            if len(words) >= k
+            else [" ".join(words)]
+        )
+        return np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in set(grams)), dtype=np.uint64
+        )
+
+    def signature(self, text: str, block: int = 4096) -> np.ndarray:
+        hv = self.shingles(text)
+        sig = np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        for i in range(0, len(hv), block):
+            part = hv[i : i + block]
+            ph = (self.a[:, None] * part[None, :] + self.b[:, None]) % MERSENNE
+            sig = np.minimum(sig, (ph & MAX_HASH).min(axis=1))
+        return sig
+
+    @staticmethod
+    def similarity(s1: np.ndarray, s2: np.ndarray) -> float:
+        return float(np.count_nonzero(s1 == s2)) / len(s1)
+
+
+# assinaturas calculadas em `check` e ainda não registradas (por processo)
+PENDING_MAX = 4096
+
+
+class NearDuplicateIndex:
+    """Índice LSH persistente. `check` diz se o texto é quase-duplicata de
+    algo acima de `threshold`; `register` grava o texto como original."""
+
+    def __init__(
+        self,
+        path: str = "artifacts/dedupe/minhash.sqlite",
+        threshold: Optional[float] = None,
+        num_perm: int = 128,
+        shingle: int = 5,
+        seed: int = 1,
+    ) -> None:
+        self.threshold = threshold or float(os.getenv("NEAR_DUP_THRESHOLD", "0.85"))
+        self.hasher = MinHasher(num_perm, shingle, seed)
+        self.bands, self.rows = lsh_params(self.threshold, num_perm)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # usado também de threads do crawler (asyncio.to_thread)
+        self.conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(signatures)")}
+        if "url" not in cols:  # índice criado antes da coluna
+            self.conn.execute("ALTER TABLE signatures ADD COLUMN url TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS signatures_url ON signatures (url)")
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._check_params(num_perm=num_perm, shingle=shingle, seed=seed)
+
+    def _check_params(self, **params: int) -> None:
+        stored = dict(self.conn.execute("SELECT key, value FROM params"))
+        if not stored:
+            self.conn.executemany(
+                "INSERT INTO params (key, value) VALUES (?, ?)",
+                [(k, str(v)) for k, v in params.items()],
+            )
+            return
+        for k, v in params.items():
+            if stored.get(k) != str(v):
+                raise ValueError(
+                    f"índice criado com {k}={stored.get(k)}, pedido {k}={v}"
+                )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "NearDuplicateIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _band_hashes(self, sig: np.ndarray) -> List[int]:
+        out = []
+        for i in range(self.bands):
+            chunk = sig[i * self.rows : (i + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            out.append(int.from_bytes(digest, "little", signed=True))
+        return out
+
+    def _query(
+        self, sig: np.ndarray, kind: str, id_: Optional[str] = None, url: str = ""
+    ) -> Optional[Tuple[str, float]]:
+        candidates = set()
+        for band, h in enumerate(self._band_hashes(sig)):
+            candidates.update(
+                r[0]
+                for r in self.conn.execute(
+                    "SELECT id FROM bands WHERE kind = ? AND band = ? AND hash = ?",
+                    (kind, band, h),
+                )
+            )
+        candidates.discard(id_)  # o próprio documento (reingestão) não é original
+        best: Optional[Tuple[str, float]] = None
+        for cid in candidates:
+            row = self.conn.execute(
+                "SELECT sig, url FROM signatures WHERE kind = ? AND id = ?", (kind, cid)
+            ).fetchone()
+            if row is None or (url and row[1] == url):
+                continue  # versão anterior da mesma página
+            sim = MinHasher.similarity(sig, np.frombuffer(row[0], dtype=np.uint64))
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (cid, sim)
+        return best
+
+    def query(
+        self, text: str, kind: str = "doc", id_: Optional[str] = None, url: str = ""
+    ) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            return self._query(self.hasher.signature(text), kind, id_, url)
+
+    def _add(self, id_: str, sig: np.ndarray, kind: str, source: str, url: str) -> None:
+        self.conn.execute("DELETE FROM bands WHERE kind = ? AND id = ?", (kind, id_))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO signatures (id, kind, source, sig, url) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (id_, kind, source, sig.tobytes(), url or None),
+        )
+        self.conn.executemany(
+            "INSERT INTO bands (kind, band, hash, id) VALUES (?, ?, ?, ?)",
+            [(kind, band, h, id_) for band, h in enumerate(self._band_hashes(sig))],
+        )
+
+    def check(
+        self, id_: str, text: str, kind: str = "doc", source: str = "", url: str = ""
+    ) -> Optional[Tuple[str, float]]:
+        """(id original, similaridade) se `text` é quase-duplicata de outro
+        documento (nem `id_` nem uma versão anterior de `url`); senão None.
+        Não registra nada: ver `register`. Textos com menos palavras que o
+        shingle não são avaliados."""
+        if len(WORD_RE.findall(text)) < self.hasher.shingle:
+            return None
+        sig = self.hasher.signature(text)
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                match = self._query(sig, kind, id_, url)
+                if match is None:
+                    self._pending[(kind, id_)] = sig
+                    if len(self._pending) > PENDING_MAX:
+                        self._pending.popitem(last=False)
+                self.conn.execute(
+                    "INSERT INTO stats (source, kind, seen, dup) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (source, kind) DO UPDATE SET "
+                    "seen = seen + 1, dup = dup + excluded.dup",
+                    (source, kind, int(match is not None)),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return match
+
+    def register(
+        self, items: List[Tuple[str, str, str]], source: str = "", url: str = ""
+    ) -> int:
+        """Grava `(id, texto, kind)` como originais, depois que o registro foi
+        indexado/gravado. Com `url`, o que estava registrado para ela (versão
+        anterior da página) sai antes, numa só transação."""
+        sigs = []
+        for id_, text, kind in items:
+            if len(WORD_RE.findall(text)) < self.hasher.shingle:
+                continue
+            with self._lock:
+                sig = self._pending.pop((kind, id_), None)
+            sigs.append((id_, kind, sig if sig is not None else self.hasher.signature(text)))
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if url:
+                    self._forget(url)
+                for id_, kind, sig in sigs:
+                    self._add(id_, sig, kind, source, url)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(sigs)
+
+    def _forget(self, url: str) -> None:
+        rows = self.conn.execute(
+            "SELECT kind, id FROM signatures WHERE url = ?", (url,)
+        ).fetchall()
+        self.conn.executemany("DELETE FROM bands WHERE kind = ? AND id = ?", rows)
+        self.conn.execute("DELETE FROM signatures WHERE url = ?", (url,))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Por fonte: vistos, duplicados e taxa de dedupe (doc e chunk)."""
+        out: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            rows = self.conn.execute("SELECT source, kind, seen, dup FROM stats").fetchall()
+        for source, kind, seen, dup in rows:
+            s = out.setdefault(source, {})
+            s[f"{kind}s"] = seen
+            s[f"{kind}_dups"] = dup
+            s[f"{kind}_dup_rate"] = round(dup / seen, 4) if seen else 0.0
+        return out
@@ -1,7 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlparse
 from aurora_platform.modules.crawler.ingestion.metadata import CanonicalMetadata
 
+if TYPE_CHECKING:
+    from aurora_platform.modules.crawler.ingestion.boilerplate import BoilerplateModel
+
 
 @dataclass
 class NormalizedDoc:
@@ -9,9 +14,19 @@ class NormalizedDoc:
     meta: CanonicalMetadata
 
 
-def to_markdown(bundle_content: str, meta: CanonicalMetadata) -> NormalizedDoc:
+def to_markdown(
+    bundle_content: str,
+    meta: CanonicalMetadata,
+    boilerplate: Optional["BoilerplateModel"] = None,
+) -> NormalizedDoc:
     # Minimal normalization to Markdown; placeholders for title/headers
     md = bundle_content.strip()
+    domain = urlparse(meta.source).netloc
+    if boilerplate is not None and domain and md:
+        # aprende com a página antes de limpar: o modelo cresce a cada crawl
+        boilerplate.observe(domain, meta.source, md)
+        md, removed = boilerplate.strip(domain, md)
+        meta.raw["boilerplate_removed"] = removed
     if not md:
         md = "(empty)"
     return NormalizedDoc(markdown=md, meta=meta)
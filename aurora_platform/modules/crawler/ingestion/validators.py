@@ -0,0 +1,141 @@
+"""Validadores por URL para re-crawl condicional.
+
+Guarda ETag, Last-Modified e o sha256 do texto extraído (o mesmo
+`compute_id` do pipeline). Na próxima visita a requisição vai com
+`If-None-Match`/`If-Modified-Since`; um 304, ou um 200 cujo texto tem o
+mesmo hash, dispensa normalização, chunking e embedding.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from aurora_platform.modules.crawler.ingestion.dedupe import compute_id
+from aurora_platform.modules.crawler.ingestion.metadata import CanonicalMetadata
+from aurora_platform.modules.crawler.ingestion.normalizer import to_markdown
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_sha256 TEXT,
+    links TEXT,
+    checked_at REAL NOT NULL,
+    changed_at REAL
+);
+"""
+
+
+@dataclass
+class Validators:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_sha256: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    checked_at: float = 0.0
+    changed_at: Optional[float] = None
+
+
+def text_fingerprint(text: str, source: str) -> str:
+    """sha256 do texto como o pipeline calcula o id canônico do registro."""
+    return compute_id(to_markdown(text, CanonicalMetadata(source=source)))
+
+
+class ValidatorStore:
+    def __init__(self, path: str = "artifacts/crawl/validators.sqlite") -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ValidatorStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, url: str) -> Optional[Validators]:
+        row = self.conn.execute(
+            "SELECT url, etag, last_modified, content_sha256, links, checked_at, "
+            "changed_at FROM validators WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        return Validators(
+            url=row[0],
+            etag=row[1],
+            last_modified=row[2],
+            content_sha256=row[3],
+            links=json.loads(row[4]) if row[4] else [],
+            checked_at=row[5],
+            changed_at=row[6],
+        )
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        v = self.get(url)
+        headers: Dict[str, str] = {}
+        if v is None:
+            return headers
+        if v.etag:
+            headers["If-None-Match"] = v.etag
+        if v.last_modified:
+            headers["If-Modified-Since"] = v.last_modified
+        return headers
+
+    def unchanged(self, url: str, content_sha256: str) -> bool:
+        v = self.get(url)
+        return v is not None and v.content_sha256 == content_sha256
+
+    def update(
+        self,
+        url: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_sha256: Optional[str] = None,
+        links: Optional[List[str]] = None,
+    ) -> bool:
+        """Grava os validadores da resposta. Retorna True se o conteúdo mudou."""
+        prev = self.get(url)
+        now = time.time()
+        changed = prev is None or (
+            content_sha256 is not None and prev.content_sha256 != content_sha256
+        )
+        if prev is not None:
+            content_sha256 = content_sha256 or prev.content_sha256
+            if links is None:
+                links = prev.links
+        self.conn.execute(
+            "INSERT OR REPLACE INTO validators "
+            "(url, etag, last_modified, content_sha256, links, checked_at, changed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                etag,
+                last_modified,
+                content_sha256,
+                json.dumps(links or []),
+                now,
+                now if changed else prev.changed_at,
+            ),
+        )
+        return changed
+
+    def touch(self, url: str) -> None:
+        """Resposta 304: só atualiza o horário da verificação."""
+        self.conn.execute(
+            "UPDATE validators SET checked_at = ? WHERE url = ?", (time.time(), url)
+        )
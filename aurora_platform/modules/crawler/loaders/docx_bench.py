@@ -0,0 +1,157 @@
+"""Benchmark dos motores DOCX (stream/iterparse vs python-docx vs mammoth).
+
+    python -m aurora_platform.modules.crawler.loaders.docx_bench anexo.docx
+    python -m aurora_platform.modules.crawler.loaders.docx_bench --synthetic 20000
+
+Mede segundos e pico de memória Python (tracemalloc) por motor disponível,
+além do caminho `iter_docx_chunks` (stream direto para o chunker). Sem
+arquivos, `--synthetic N` gera um DOCX com N parágrafos e tabelas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from aurora_platform.modules.crawler.loaders.docx_loader import (
+    DocxLoader,
+    available_engines,
+)
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-'
+    'officedocument.wordprocessingml.document.main+xml"/></Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships/officeDocument" Target="word/document.xml"/></Relationships>'
+)
+_DOC_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+)
+_DOC_TAIL = "</w:body></w:document>"
+
+
+def _p(text: str, style: Optional[str] = None) -> str:
+    ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{ppr}<w:r><w:t xml:space=\"preserve\">{escape(text)}</w:t></w:r></w:p>"
+
+
+def _table(rows: Sequence[Sequence[str]]) -> str:
+    trs = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_p(c)}</w:tc>" for c in row) + "</w:tr>" for row in rows
+    )
+    return f"<w:tbl>{trs}</w:tbl>"
+
+
+def write_docx(path: str, body_xml_parts: Sequence[str]) -> str:
+    """DOCX mínimo (só `word/document.xml`) a partir de fragmentos de `w:body`."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _RELS)
+        with zf.open("word/document.xml", "w") as fh:
+            fh.write(_DOC_HEAD.encode("utf-8"))
+            for part in body_xml_parts:
+                fh.write(part.encode("utf-8"))
+            fh.write(_DOC_TAIL.encode("utf-8"))
+    return path
+
+
+def make_large_docx(path: str, paragraphs: int = 20000, every: int = 50) -> str:
+    """Anexo sintético: seções com título, parágrafos e uma tabela por seção."""
+
+    def parts():
+        for i in range(paragraphs):
+            if i % every == 0:
+                sec = i // every + 1
+                yield _p(f"Seção {sec}", "Heading1")
+                yield _table(
+                    [["Item", "Descrição", "Qtd"]]
+                    + [[str(j), f"Material {sec}.{j}", str(j * 3)] for j in range(1, 6)]
+                )
+            yield _p(
+                f"Cláusula {i}: o contratado fornecerá os itens do lote {i % 17} "
+                "conforme especificações do termo de referência e prazos do edital."
+            )
+
+    return write_docx(path, parts())
+
+
+@dataclass
+class DocxBenchResult:
+    engine: str
+    seconds: float
+    peak_mb: float
+    chars: int
+
+
+def _measure(fn) -> tuple:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        out = fn()
+    finally:
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return out, elapsed, peak / 1e6
+
+
+def benchmark_docx(path: str, engines: Optional[Sequence[str]] = None) -> List[DocxBenchResult]:
+    from aurora_platform.modules.crawler.pipeline import iter_docx_chunks
+
+    out = []
+    for e in engines or available_engines():
+        doc, secs, peak = _measure(lambda: DocxLoader(e).load(source=path))
+        out.append(DocxBenchResult(e, round(secs, 3), round(peak, 2), len(doc["text"])))
+    n, secs, peak = _measure(lambda: sum(len(c["text"]) for c in iter_docx_chunks(path)))
+    out.append(DocxBenchResult("stream->chunks", round(secs, 3), round(peak, 2), n))
+    return out
+
+
+def format_table(results: List[DocxBenchResult]) -> str:
+    head = f"{'motor':<16}{'s':>9}{'pico MB':>10}{'chars':>12}"
+    rows = [head, "-" * len(head)]
+    for r in results:
+        rows.append(f"{r.engine:<16}{r.seconds:>9.3f}{r.peak_mb:>10.2f}{r.chars:>12}")
+    return "\n".join(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    p = argparse.ArgumentParser(prog="aurora-docx-bench")
+    p.add_argument("paths", nargs="*")
+    p.add_argument("--synthetic", type=int, default=0,
+                   help="gera um DOCX com N parágrafos (além dos arquivos dados)")
+    args = p.parse_args(argv)
+    paths = list(args.paths)
+    tmp = None
+    if args.synthetic or not paths:
+        fd, tmp = tempfile.mkstemp(suffix=".docx")
+        os.close(fd)
+        paths.append(make_large_docx(tmp, args.synthetic or 20000))
+    try:
+        for path in paths:
+            size = os.path.getsize(path) / 1e6
+            print(f"{path} ({size:.1f} MB)")
+            print(format_table(benchmark_docx(path)) + "\n")
+    finally:
+        if tmp:
+            os.unlink(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 from __future__ import annotations
-from ..types import LoadedDocument
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional
+from ..types import DocxBlock, LoadedDocument
 
 try:
     import docx  # type: ignore
@@ -13,17 +18,171 @@ try:
 except Exception:
     _HAS_MAMMOTH = False
 
+DOCX_CT = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+# "stream" (iterparse, só stdlib) | "python-docx" | "mammoth"
+DOCX_ENGINE = os.getenv("DOCX_ENGINE", "stream")
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+P, T, TAB, BR, CR = W + "p", W + "t", W + "tab", W + "br", W + "cr"
+TBL, TR, TC, BODY = W + "tbl", W + "tr", W + "tc", W + "body"
+PSTYLE, OUTLINE, VAL = W + "pStyle", W + "outlineLvl", W + "val"
+# ids de estilo de título: Heading1 (en), Ttulo1/Titulo1 (pt), Title/Ttulo
+HEADING_STYLE_RE = re.compile(r"^(?:heading|t[ií]?tulo)\s*(\d)$", re.IGNORECASE)
+TITLE_STYLES = {"title", "ttulo", "titulo", "título"}
+
+
+def available_engines() -> List[str]:
+    flags = {"stream": True, "python-docx": _HAS_DOCPY, "mammoth": _HAS_MAMMOTH}
+    return [e for e, ok in flags.items() if ok]
+
+
+def _heading_level(style: Optional[str], outline: Optional[str]) -> int:
+    if style:
+        m = HEADING_STYLE_RE.match(style)
+        if m:
+            return max(1, min(6, int(m.group(1))))
+        if style.lower() in TITLE_STYLES:
+            return 1
+    if outline is not None and outline.isdigit() and int(outline) < 6:
+        return int(outline) + 1
+    return 0
+
+
+def iter_blocks(source: str) -> Iterator[DocxBlock]:
+    """Parágrafos, títulos e linhas de tabela de `word/document.xml`, em ordem,
+    lidos com iterparse direto do zip.
+
+    Cada elemento é descartado depois de emitido, então a memória fica
+    limitada ao maior parágrafo/linha, não ao documento. Tabelas aninhadas
+    entram como texto da célula externa.
+    """
+    with zipfile.ZipFile(source) as zf, zf.open("word/document.xml") as fh:
+        body: Optional[ET.Element] = None
+        # por tabela aberta: células da linha corrente e parágrafos da célula
+        tables: List[Dict[str, List[str]]] = []
+        parts: List[str] = []
+        style: Optional[str] = None
+        outline: Optional[str] = None
+        for event, el in ET.iterparse(fh, events=("start", "end")):
+            tag = el.tag
+            if event == "start":
+                if tag == BODY:
+                    body = el
+                elif tag == TBL:
+                    tables.append({"cells": [], "paras": []})
+                elif tag == P:
+                    parts, style, outline = [], None, None
+                continue
+            if tag == T:
+                parts.append(el.text or "")
+            elif tag == TAB:
+                parts.append("\t")
+            elif tag in (BR, CR):
+                parts.append("\n")
+            elif tag == PSTYLE:
+                style = el.get(VAL)
+            elif tag == OUTLINE:
+                outline = el.get(VAL)
+            elif tag == P:
+                text = "".join(parts).strip()
+                if tables:
+                    if text:
+                        tables[-1]["paras"].append(text)
+                elif text:
+                    level = _heading_level(style, outline)
+                    yield {"kind": "heading" if level else "paragraph", "text": text, "level": level}
+                el.clear()
+            elif tag == TC and tables:
+                t = tables[-1]
+                t["cells"].append(" ".join(t["paras"]).replace("|", "\\|"))
+                t["paras"] = []
+                el.clear()
+            elif tag == TR and tables:
+                t = tables[-1]
+                cells, t["cells"] = t["cells"], []
+                if len(tables) == 1:
+                    if any(cells):
+                        yield {"kind": "row", "text": " | ".join(cells), "level": 0, "cells": cells}
+                else:
+                    tables[-2]["paras"].append(" ; ".join(c for c in cells if c))
+                el.clear()
+            elif tag == TBL and tables:
+                tables.pop()
+                el.clear()
+                if not tables:
+                    yield {"kind": "table_end", "text": "", "level": 0}
+            if body is not None and tag in (P, TBL) and not tables:
+                # filhos já emitidos continuam pendurados no body: solta
+                del body[:]
+
+
+def iter_markdown(source: str) -> Iterator[str]:
+    """Blocos de `iter_blocks` como linhas de Markdown (tabelas em pipe)."""
+    header_done = False
+    for b in iter_blocks(source):
+        kind = b["kind"]
+        if kind == "heading":
+            yield "#" * b["level"] + " " + b["text"]
+        elif kind == "paragraph":
+            yield b["text"]
+        elif kind == "row":
+            yield "| " + " | ".join(b["cells"]) + " |"
+            if not header_done:
+                yield "|" + " --- |" * len(b["cells"])
+                header_done = True
+        elif kind == "table_end":
+            header_done = False
+            yield ""
+
 
 class DocxLoader:
-    def load(self, *, source: str, content_type: str | None = None) -> LoadedDocument:
-        if _HAS_DOCPY:
+    def __init__(self, engine: Optional[str] = None) -> None:
+        self.engine = engine or DOCX_ENGINE
+
+    def iter_markdown(self, source: str) -> Iterator[str]:
+        return iter_markdown(source)
+
+    def load(self, *, source: str, content_type: str | None = None, engine: Optional[str] = None) -> LoadedDocument:
+        engine = engine or self.engine
+        if engine == "stream":
+            try:
+                lines = list(iter_markdown(source))
+            except (OSError, zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+                return self._fallback(source, f"stream: {type(e).__name__}: {e}")
+            return self._doc(source, _join_markdown(lines), "stream")
+        return self._fallback(source, None, engine)
+
+    def _fallback(self, source: str, warning: Optional[str], engine: Optional[str] = None) -> LoadedDocument:
+        if _HAS_DOCPY and engine in (None, "python-docx"):
             document = docx.Document(source)
             text = "\n".join(p.text for p in document.paragraphs)
-            return {"text": text, "metadata": {"source": source, "content_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "engine": "python-docx"}}
+            return self._doc(source, text, "python-docx", warning)
 
-        if _HAS_MAMMOTH:
+        if _HAS_MAMMOTH and engine in (None, "mammoth"):
             with open(source, "rb") as f:
                 result = mammoth.convert_to_markdown(f)
-            return {"text": result.value, "metadata": {"source": source, "content_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "engine": "mammoth"}}
+            return self._doc(source, result.value, "mammoth", warning)
+
+        return {"text": "", "metadata": {"source": source, "content_type": DOCX_CT, "engine": "noop", "warning": warning or "no docx backends installed"}}
+
+    @staticmethod
+    def _doc(source: str, text: str, engine: str, warning: Optional[str] = None) -> LoadedDocument:
+        meta: Dict[str, Any] = {"source": source, "content_type": DOCX_CT, "engine": engine}
+        if warning:
+            meta["warning"] = warning
+        return {"text": text, "metadata": meta}
+
 
-        return {"text": "", "metadata": {"source": source, "content_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "engine": "noop", "warning": "no docx backends installed"}}
+def _join_markdown(lines: List[str]) -> str:
+    # parágrafos separados por linha em branco; linhas de tabela juntas
+    out: List[str] = []
+    brk = False
+    for line in lines:
+        if not line:  # fim de tabela
+            brk = True
+            continue
+        if out and (brk or not (line.startswith("|") and out[-1].startswith("|"))):
+            out.append("")
+        out.append(line)
+        brk = False
+    return "\n".join(out)
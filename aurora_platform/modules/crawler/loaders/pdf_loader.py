@@ -1,6 +1,12 @@
 from __future__ import annotations
-from typing import List
-from ..types import LoadedDocument
+import atexit
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Iterator, List, Optional, Tuple
+from ..types import LoadedDocument, LoadedPage
 
 # Optional backends
 try:
@@ -21,9 +27,135 @@ try:
 except Exception:
     _HAS_PYPDF = False
 
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0")) or (os.cpu_count() or 1)
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    """Pool de extração do processo (`PDF_WORKERS` processos), criado na
+    primeira carga e reaproveitado entre PDFs."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def _drop_broken_pool(ex: ProcessPoolExecutor) -> None:
+    # um worker morto quebra o pool inteiro: a próxima carga cria outro
+    global _pool
+    with _pool_lock:
+        if _pool is ex:
+            _pool = None
+    ex.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_pool)
+
+
+def page_count(source: str) -> int:
+    if _HAS_PYPDF:
+        return len(PdfReader(source).pages)
+    if _HAS_PDFPLUMBER:
+        with pdfplumber.open(source) as pdf:
+            return len(pdf.pages)
+    return 0
+
+
+def extract_page_range(source: str, start: int, stop: int) -> List[LoadedPage]:
+    """Texto das páginas [start, stop) (0-based); roda dentro do pool, então
+    cada worker abre o próprio arquivo."""
+    if _HAS_PDFPLUMBER:
+        with pdfplumber.open(source, pages=list(range(start + 1, stop + 1))) as pdf:
+            return [
+                {"page": p.page_number, "text": p.extract_text() or ""} for p in pdf.pages
+            ]
+    if _HAS_PYPDF:
+        reader = PdfReader(source)
+        return [
+            {"page": i + 1, "text": reader.pages[i].extract_text() or ""}
+            for i in range(start, stop)
+        ]
+    return []
+
 
 class PDFLoader:
-    def load(self, *, source: str, content_type: str | None = None) -> LoadedDocument:
+    def iter_pages(
+        self,
+        source: str,
+        *,
+        workers: Optional[int] = None,
+        pages_per_task: int = PAGES_PER_TASK,
+        first_page: int = 1,
+        last_page: Optional[int] = None,
+    ) -> Iterator[LoadedPage]:
+        """Gera as páginas em ordem, à medida que ficam prontas.
+
+        Faixas de `pages_per_task` páginas são distribuídas no pool de
+        processos compartilhado (`shared_pool`); no máximo `2 * workers`
+        faixas deste arquivo ficam em voo, então a memória não cresce com o
+        tamanho do arquivo. Com um worker (ou arquivo curto) extrai no
+        próprio processo.
+        """
+        if not (_HAS_PDFPLUMBER or _HAS_PYPDF):
+            if _HAS_UNSTRUCTURED:
+                yield from self._iter_unstructured(source)
+            return
+        n = page_count(source)
+        stop = min(n, last_page or n)
+        ranges = [
+            (s, min(s + pages_per_task, stop))
+            for s in range(max(first_page, 1) - 1, stop, pages_per_task)
+        ]
+        workers = min(workers or PDF_WORKERS, len(ranges))
+        if workers <= 1:
+            for start, end in ranges:
+                yield from extract_page_range(source, start, end)
+            return
+        todo = iter(ranges)
+        pending: Deque[Future] = deque()
+        ex = shared_pool()
+        try:
+            for start, end in _take(todo, 2 * workers):
+                pending.append(ex.submit(extract_page_range, source, start, end))
+            while pending:
+                pages = pending.popleft().result()
+                for start, end in _take(todo, 1):
+                    pending.append(ex.submit(extract_page_range, source, start, end))
+                yield from pages
+        except BrokenProcessPool:
+            _drop_broken_pool(ex)
+            raise
+        finally:
+            # consumidor pode parar no meio: faixas ainda não iniciadas são
+            # canceladas (as que já estão num worker terminam e são descartadas)
+            for fut in pending:
+                fut.cancel()
+
+    def _iter_unstructured(self, source: str) -> Iterator[LoadedPage]:
+        page, buf = None, []
+        for el in partition_pdf(filename=source):
+            num = getattr(getattr(el, "metadata", None), "page_number", None) or 1
+            if page is not None and num != page:
+                yield {"page": page, "text": "\n".join(buf)}
+                buf = []
+            page = num
+            buf.append(str(el))
+        if page is not None:
+            yield {"page": page, "text": "\n".join(buf)}
+
+    def load(self, *, source: str, content_type: str | None = None, workers: Optional[int] = None) -> LoadedDocument:
         # 1) unstructured
         if _HAS_UNSTRUCTURED:
             parts = partition_pdf(filename=source)
@@ -31,19 +163,25 @@ class PDFLoader:
                 [getattr(p, "get", lambda k, d="": "")("text", "") for p in parts])
             return {"text": text, "metadata": {"source": source, "content_type": "application/pdf", "engine": "unstructured"}}
 
-        # 2) pdfplumber
-        if _HAS_PDFPLUMBER:
-            pages: List[str] = []
-            with pdfplumber.open(source) as pdf:
-                for p in pdf.pages:
-                    pages.append(p.extract_text() or "")
-            return {"text": "\n".join(pages), "metadata": {"source": source, "content_type": "application/pdf", "engine": "pdfplumber"}}
-
-        # 3) pypdf
-        if _HAS_PYPDF:
-            reader = PdfReader(source)
-            pages = [p.extract_text() or "" for p in reader.pages]
-            return {"text": "\n".join(pages), "metadata": {"source": source, "content_type": "application/pdf", "engine": "pypdf"}}
+        # 2) pdfplumber / 3) pypdf, em faixas de páginas paralelas
+        if _HAS_PDFPLUMBER or _HAS_PYPDF:
+            texts: List[str] = []
+            spans: List[Tuple[int, int, int]] = []  # (página, início, fim) no texto final
+            pos = 0
+            for p in self.iter_pages(source, workers=workers):
+                texts.append(p["text"])
+                spans.append((p["page"], pos, pos + len(p["text"])))
+                pos += len(p["text"]) + 1
+            engine = "pdfplumber" if _HAS_PDFPLUMBER else "pypdf"
+            return {"text": "\n".join(texts), "metadata": {"source": source, "content_type": "application/pdf", "engine": engine, "pages": len(texts), "page_spans": spans}}
 
         # fallback
         return {"text": "", "metadata": {"source": source, "content_type": "application/pdf", "engine": "noop", "warning": "no pdf backends installed"}}
+
+
+def _take(it, n: int):
+    for _ in range(n):
+        item = next(it, None)
+        if item is None:
+            return
+        yield item
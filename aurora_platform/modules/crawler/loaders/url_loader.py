@@ -1,30 +1,313 @@
 from __future__ import annotations
+import asyncio
+import os
+import tempfile
+import threading
+from typing import IO, TYPE_CHECKING, Dict, Iterable, List, Optional
+
 import httpx
-from tempfile import NamedTemporaryFile
-from pathlib import Path
+
 from ..types import LoadedDocument
+from ..ingestion.validators import ValidatorStore, text_fingerprint
+
+if TYPE_CHECKING:
+    from ..archive import FetchArchive
+
+MAX_BYTES = int(os.getenv("URL_LOADER_MAX_BYTES", str(50 * 1024 * 1024)))
+SPOOL_BYTES = int(os.getenv("URL_LOADER_SPOOL_BYTES", str(2 * 1024 * 1024)))
+TMP_DIR = os.getenv("URL_LOADER_TMPDIR") or None
+
+DOCX_CT = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+SUFFIX = {"pdf": ".pdf", "docx": ".docx"}
+
+_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+class DocumentTooLarge(ValueError):
+    pass
+
+
+def shared_client() -> httpx.Client:
+    """Cliente httpx do processo (pool de conexões reaproveitado entre cargas)."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(limits=_LIMITS, follow_redirects=True)
+        return _client
+
+
+def close_shared_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def sniff(head: bytes, content_type: str, source: str) -> str:
+    """Tipo do corpo pelos primeiros bytes; cabeçalho/extensão só desempatam."""
+    ct = content_type.split(";")[0].lower()
+    url = source.lower().split("?", 1)[0]
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        if b"word/" in head or "officedocument" in ct or "word" in ct or url.endswith(".docx"):
+            return "docx"
+        raise ValueError(f"arquivo zip não suportado: {source}")
+    if head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<"):
+        return "html"
+    if "pdf" in ct or url.endswith(".pdf"):
+        return "pdf"
+    if "officedocument" in ct or "word" in ct or url.endswith(".docx"):
+        return "docx"
+    return "html"
+
+
+class _Sink:
+    """Destino do corpo: HTML/texto em SpooledTemporaryFile (RAM até
+    `SPOOL_BYTES`), PDF/DOCX num arquivo nomeado (os loaders pedem caminho).
+    `close()` sempre remove o arquivo."""
+
+    def __init__(self, kind: str, max_bytes: int) -> None:
+        self.kind = kind
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.path: Optional[str] = None
+        self.fh: IO[bytes]
+        if kind in SUFFIX:
+            fd, self.path = tempfile.mkstemp(suffix=SUFFIX[kind], dir=TMP_DIR)
+            self.fh = os.fdopen(fd, "w+b")
+        else:
+            self.fh = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES, dir=TMP_DIR)
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise DocumentTooLarge(f"corpo maior que {self.max_bytes} bytes")
+        self.fh.write(chunk)
+
+    def text(self, encoding: Optional[str]) -> str:
+        self.fh.seek(0)
+        return self.fh.read().decode(encoding or "utf-8", errors="replace")
+
+    def close(self) -> None:
+        try:
+            self.fh.close()
+        finally:
+            if self.path is not None:
+                try:
+                    os.unlink(self.path)
+                except FileNotFoundError:
+                    pass
 
 
 class URLLoader:
+    """Carrega uma URL (HTML, PDF ou DOCX) em streaming, com memória limitada.
+
+    - conexões vêm de um pool compartilhado (`shared_client`);
+    - o corpo é lido em blocos direto para arquivo temporário, com limite
+      rígido de `max_bytes` (também checado contra Content-Length);
+    - o tipo é detectado pelos primeiros bytes;
+    - temporários são removidos mesmo em erro;
+    - `aload`/`aload_many` fazem o mesmo com `httpx.AsyncClient`.
+
+    Com `validators`, a requisição é condicional (ETag/Last-Modified) e o
+    documento volta com `metadata["unchanged"] = True` quando o servidor
+    responde 304 (texto vazio) ou o texto extraído tem o mesmo sha256 da
+    última carga; nesse caso o chamador não precisa reprocessar. Documento
+    que mudou só tem os validadores gravados com `commit(doc)`, que o
+    chamador faz depois de ingerir: se a ingestão falhar, a próxima carga
+    baixa e processa de novo.
+
+    Com `archive` (`FetchArchive`), cada resposta 200 é gravada crua
+    (cabeçalhos + corpo) antes da extração, para reprocessar sem recrawl.
+    """
+
+    def __init__(
+        self,
+        validators: ValidatorStore | None = None,
+        *,
+        client: httpx.Client | None = None,
+        async_client: httpx.AsyncClient | None = None,
+        max_bytes: int = MAX_BYTES,
+        archive: Optional["FetchArchive"] = None,
+    ) -> None:
+        self.validators = validators
+        self.archive = archive
+        self.client = client
+        self.async_client = async_client
+        self.max_bytes = max_bytes
+        self._owns_async = async_client is None
+        self._html_loader = None
+
+    # -------- síncrono --------
     def load(self, *, source: str, content_type: str | None = None, timeout: float = 10.0) -> LoadedDocument:
-        with httpx.Client(timeout=timeout) as client:
-            r = client.get(source, follow_redirects=True)
+        client = self.client or shared_client()
+        with client.stream("GET", source, headers=self._headers(source), timeout=timeout) as r:
+            if self._not_modified(r, source):
+                return self._unchanged_doc(source)
+            r.raise_for_status()
+            self._check_length(r)
+            sink: Optional[_Sink] = None
+            try:
+                for chunk in r.iter_bytes():
+                    if sink is None:
+                        sink = self._open_sink(chunk, r, source, content_type)
+                    sink.write(chunk)
+                if sink is None:
+                    sink = self._open_sink(b"", r, source, content_type)
+                self._archive(sink, r, source)
+                doc = self._parse(sink, r, source, content_type)
+            finally:
+                if sink is not None:
+                    sink.close()
+        return self._validate(doc, r, source)
+
+    # -------- assíncrono --------
+    async def aload(self, *, source: str, content_type: str | None = None, timeout: float = 10.0) -> LoadedDocument:
+        if self.async_client is None:
+            self.async_client = httpx.AsyncClient(limits=_LIMITS, follow_redirects=True)
+        async with self.async_client.stream(
+            "GET", source, headers=self._headers(source), timeout=timeout
+        ) as r:
+            if self._not_modified(r, source):
+                return self._unchanged_doc(source)
             r.raise_for_status()
+            self._check_length(r)
+            sink: Optional[_Sink] = None
+            try:
+                async for chunk in r.aiter_bytes():
+                    if sink is None:
+                        sink = self._open_sink(chunk, r, source, content_type)
+                    sink.write(chunk)
+                if sink is None:
+                    sink = self._open_sink(b"", r, source, content_type)
+                await asyncio.to_thread(self._archive, sink, r, source)
+                # extração de PDF/DOCX é CPU-bound: fora do event loop
+                doc = await asyncio.to_thread(self._parse, sink, r, source, content_type)
+            finally:
+                if sink is not None:
+                    sink.close()
+        digest = None
+        if self.validators is not None:
+            digest = await asyncio.to_thread(self._fingerprint, doc, source)
+        return self._validate(doc, r, source, digest)
+
+    async def aload_many(
+        self, sources: Iterable[str], *, concurrency: int = 8, timeout: float = 10.0
+    ) -> List[LoadedDocument | BaseException]:
+        """Carrega várias URLs em paralelo; falhas voltam como exceção na lista."""
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(src: str):
+            async with sem:
+                return await self.aload(source=src, timeout=timeout)
+
+        return await asyncio.gather(*(one(s) for s in sources), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        if self.async_client is not None and self._owns_async:
+            await self.async_client.aclose()
+            self.async_client = None
+
+    async def __aenter__(self) -> "URLLoader":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    # -------- auxiliares --------
+    def _headers(self, source: str) -> Dict[str, str]:
+        return self.validators.conditional_headers(source) if self.validators else {}
+
+    def _not_modified(self, r: httpx.Response, source: str) -> bool:
+        if r.status_code == 304 and self.validators is not None:
+            self.validators.touch(source)
+            return True
+        return False
+
+    @staticmethod
+    def _unchanged_doc(source: str) -> LoadedDocument:
+        return {"text": "", "metadata": {"source": source, "unchanged": True, "not_modified": True}}
+
+    def _check_length(self, r: httpx.Response) -> None:
+        length = r.headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            raise DocumentTooLarge(f"Content-Length {length} maior que {self.max_bytes} bytes")
+
+    def _open_sink(self, head: bytes, r: httpx.Response, source: str, content_type: str | None) -> _Sink:
+        ct = content_type or r.headers.get("content-type", "")
+        return _Sink(sniff(head, ct, source), self.max_bytes)
+
+    def _archive(self, sink: _Sink, r: httpx.Response, source: str) -> None:
+        if self.archive is None:
+            return
+        sink.fh.flush()
+        sink.fh.seek(0)
+        self.archive.put(source, r.status_code, r.headers, sink.fh, size=sink.size)
+        sink.fh.seek(0, os.SEEK_END)
+
+    def _parse(self, sink: _Sink, r: httpx.Response, source: str, content_type: str | None) -> LoadedDocument:
+        sink.fh.flush()
+        if sink.kind == "pdf":
+            from .pdf_loader import PDFLoader
+
+            doc = PDFLoader().load(source=sink.path)
+        elif sink.kind == "docx":
+            from .docx_loader import DocxLoader
+
+            doc = DocxLoader().load(source=sink.path)
+        else:
             ct = content_type or r.headers.get("content-type", "")
-            ct_low = ct.split(";")[0].lower()
-            if "pdf" in ct_low or source.lower().endswith(".pdf"):
-                with NamedTemporaryFile(suffix=".pdf", delete=False) as tf:
-                    tf.write(r.content)
-                    tmp_path = tf.name
-                from .pdf_loader import PDFLoader
-
-                return PDFLoader().load(source=tmp_path)
-            if "officedocument" in ct_low or "word" in ct_low or source.lower().endswith(".docx"):
-                with NamedTemporaryFile(suffix=".docx", delete=False) as tf:
-                    tf.write(r.content)
-                    tmp_path = tf.name
-                from .docx_loader import DocxLoader
-
-                return DocxLoader().load(source=tmp_path)
-            # default: treat as HTML/text
-            return {"text": r.text, "metadata": {"source": source, "content_type": ct or "text/html", "engine": "httpx"}}
+            return {
+                "text": sink.text(r.charset_encoding),
+                "metadata": {
+                    "source": source,
+                    "content_type": ct or "text/html",
+                    "engine": "httpx",
+                    "bytes": sink.size,
+                },
+            }
+        # o caminho temporário some no close(): a origem é a URL
+        doc["metadata"].update(source=source, bytes=sink.size)
+        return doc
+
+    def _fingerprint(self, doc: LoadedDocument, source: str) -> str:
+        """Impressão do texto principal, como o engine calcula: no HTML,
+        tokens CSRF, datas e anúncios não contam como mudança."""
+        text = doc["text"]
+        if doc["metadata"].get("engine") == "httpx":
+            if self._html_loader is None:
+                from ..ingestion.html_loader import HTMLLoader
+
+                self._html_loader = HTMLLoader()
+            text = self._html_loader.load_from_string(text, source).text
+        return text_fingerprint(text, source)
+
+    def _validate(
+        self, doc: LoadedDocument, r: httpx.Response, source: str, digest: Optional[str] = None
+    ) -> LoadedDocument:
+        if self.validators is not None:
+            digest = digest or self._fingerprint(doc, source)
+            meta = doc["metadata"]
+            meta["content_sha256"] = digest
+            meta["etag"] = r.headers.get("etag")
+            meta["last_modified"] = r.headers.get("last-modified")
+            meta["unchanged"] = self.validators.unchanged(source, digest)
+            if meta["unchanged"]:
+                self.commit(doc)  # nada a ingerir: só renova os validadores
+        return doc
+
+    def commit(self, doc: LoadedDocument) -> None:
+        """Grava ETag/Last-Modified/sha256 de `doc` depois de ingerido."""
+        meta = doc["metadata"]
+        if self.validators is None or meta.get("not_modified") or "content_sha256" not in meta:
+            return
+        self.validators.update(
+            meta["source"],
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            content_sha256=meta["content_sha256"],
+        )
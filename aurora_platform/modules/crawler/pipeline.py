@@ -1,42 +1,310 @@
 from __future__ import annotations
-import json
-import os
-from typing import Dict, Any
+import hashlib
+import time
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence
 from aurora_platform.modules.crawler.ingestion.metadata import CanonicalMetadata
 from aurora_platform.modules.crawler.ingestion.normalizer import to_markdown
+from aurora_platform.modules.crawler.ingestion.artifact_store import ArtifactStore
+from aurora_platform.modules.crawler.ingestion.boilerplate import BoilerplateModel
 from aurora_platform.modules.crawler.ingestion.dedupe import compute_id
+from aurora_platform.modules.crawler.ingestion.near_dedupe import (
+    NearDuplicateIndex,
+    source_key,
+)
 from aurora_platform.modules.crawler.chunking.splitter import split_markdown
 from aurora_platform.modules.crawler.chunking import policies as chunk_policies
 
 
 def run_ingestion(
-    content: str, media_type: str, source: str, tags: Dict[str, Any] | None = None
+    content: str,
+    media_type: str,
+    source: str,
+    tags: Dict[str, Any] | None = None,
+    dedupe: Optional[NearDuplicateIndex] = None,
+    boilerplate: Optional[BoilerplateModel] = None,
+    timings: Optional[Dict[str, float]] = None,
 ) -> Dict[str, Any]:
+    """`timings`, se dado, acumula os segundos das etapas normalize/chunk.
+
+    Com `dedupe`, o registro só é comparado com o índice; depois de indexá-lo
+    ou gravá-lo, o chamador confirma com `register_dedupe`.
+    """
+    t0 = time.perf_counter()
     meta = CanonicalMetadata(
         source=source, tags=tags or {}, raw={"media_type": media_type}
     )
-    normalized = to_markdown(content, meta)
+    normalized = to_markdown(content, meta, boilerplate)
     canonical_id = compute_id(normalized)
+    t1 = time.perf_counter()
+    if timings is not None:
+        timings["normalize"] = timings.get("normalize", 0.0) + t1 - t0
+    key = source_key(source, media_type)
+    record = {
+        "id": canonical_id,
+        "source": source,
+        "meta": normalized.meta.__dict__,
+        "content_markdown": normalized.markdown,
+        "chunks": [],
+    }
+    if dedupe is not None:
+        # quase-duplicata do documento: só o vínculo, nada para embeddar
+        match = dedupe.check(canonical_id, normalized.markdown, "doc", key, url=source)
+        if match is not None:
+            record["duplicate_of"], record["similarity"] = match
+            return record
     policy = chunk_policies.for_source(media_type)
     chunks = split_markdown(
-        normalized.markdown, chunk_size=policy["size"], overlap=policy["overlap"]
+        normalized.markdown, chunk_size=policy["size"], overlap=policy["overlap"],
+        unit=policy.get("unit", "chars"),
     )
     for idx, ch in enumerate(chunks):
         ch["id"] = f"{canonical_id}::{idx}"
         ch["source"] = media_type
-    record = {
+    if dedupe is not None:
+        linked: Dict[str, str] = {}
+        kept = []
+        for ch in chunks:
+            match = dedupe.check(ch["id"], ch["text"], "chunk", key, url=source)
+            if match is None:
+                kept.append(ch)
+            else:
+                linked[ch["id"]] = match[0]
+        chunks = kept
+        if linked:
+            record["chunk_duplicates"] = linked
+    record["chunks"] = chunks
+    if timings is not None:
+        timings["chunk"] = timings.get("chunk", 0.0) + time.perf_counter() - t1
+    return record
+
+
+def register_dedupe(dedupe: Optional[NearDuplicateIndex], record: Dict[str, Any]) -> None:
+    """Grava documento e chunks de `record` como originais no índice de
+    quase-duplicatas (substituindo a versão anterior da mesma fonte)."""
+    if dedupe is None or "duplicate_of" in record:
+        return
+    items = [(ch["id"], ch["text"], "chunk") for ch in record["chunks"]]
+    if record.get("content_markdown"):
+        items.insert(0, (record["id"], record["content_markdown"], "doc"))
+    media_type = record["meta"].get("raw", {}).get("media_type", "")
+    dedupe.register(items, source_key(record["source"], media_type), url=record["source"])
+
+
+def file_sha256(path: str, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for buf in iter(lambda: f.read(block), b""):
+            h.update(buf)
+    return h.hexdigest()
+
+
+def iter_pdf_chunks(
+    path: str,
+    source: Optional[str] = None,
+    tags: Dict[str, Any] | None = None,
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Chunks de um PDF conforme as páginas saem do pool de extração.
+
+    Cada página é normalizada e dividida sozinha, então todo chunk tem a
+    página de origem (`page`). Como o texto completo só existe no fim, o id
+    canônico é o sha256 do arquivo (não o `compute_id` do texto).
+    """
+    from aurora_platform.modules.crawler.loaders.pdf_loader import PDFLoader
+
+    yield from iter_page_chunks(
+        PDFLoader().iter_pages(path, workers=workers), file_sha256(path), source or path, tags
+    )
+
+
+def iter_page_chunks(
+    pages: Iterable[Dict[str, Any]],
+    canonical_id: str,
+    source: str,
+    tags: Dict[str, Any] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Normaliza e divide página a página; cada chunk leva `page`."""
+    policy = chunk_policies.for_source("pdf")
+    idx = 0
+    for page in pages:
+        if not page["text"].strip():
+            continue
+        meta = CanonicalMetadata(
+            source=source, tags=tags or {}, raw={"media_type": "pdf", "page": page["page"]}
+        )
+        normalized = to_markdown(page["text"], meta)
+        for ch in split_markdown(
+            normalized.markdown, chunk_size=policy["size"], overlap=policy["overlap"],
+            unit=policy.get("unit", "chars"),
+        ):
+            ch["id"] = f"{canonical_id}::{idx}"
+            ch["source"] = "pdf"
+            ch["page"] = page["page"]
+            idx += 1
+            yield ch
+
+
+def pages_from_spans(text: str, spans: Iterable[Sequence[int]]) -> Iterator[Dict[str, Any]]:
+    """Páginas de volta a partir do texto e de `page_spans` do `PDFLoader.load`."""
+    for page, start, end in spans:
+        yield {"page": page, "text": text[start:end]}
+
+
+def _chunks_record(
+    canonical_id: str,
+    source: str,
+    media_type: str,
+    chunks: List[Dict[str, Any]],
+    tags: Dict[str, Any] | None,
+) -> Dict[str, Any]:
+    raw: Dict[str, Any] = {"media_type": media_type, "streamed": True}
+    pages = {ch["page"] for ch in chunks if "page" in ch}
+    if pages:
+        raw["pages"] = len(pages)
+    meta = CanonicalMetadata(source=source, tags=tags or {}, raw=raw)
+    return {
         "id": canonical_id,
         "source": source,
-        "meta": normalized.meta.__dict__,
-        "content_markdown": normalized.markdown,
+        "meta": meta.__dict__,
+        # montado por página/seção: não há um markdown único do documento
+        "content_markdown": None,
         "chunks": chunks,
     }
-    return record
 
 
-def save_record(record: Dict[str, Any], out_dir: str = "artifacts/ingested") -> str:
-    os.makedirs(out_dir, exist_ok=True)
-    path = os.path.join(out_dir, f"{record['id']}.jsonl")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
-    return path
+def run_file_ingestion(
+    path: str,
+    media_type: str,
+    source: Optional[str] = None,
+    tags: Dict[str, Any] | None = None,
+    timings: Optional[Dict[str, float]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """`run_ingestion` para PDF/DOCX em disco, pelos iteradores em streaming.
+
+    Mesmo formato de registro, com id = sha256 do arquivo e `page` nos
+    chunks de PDF. Extração e chunking são intercalados, então o tempo todo
+    entra em `timings["load"]`.
+    """
+    t0 = time.perf_counter()
+    source = source or path
+    if media_type == "pdf":
+        chunks = list(iter_pdf_chunks(path, source, tags, workers=workers))
+    elif media_type == "docx":
+        chunks = list(iter_docx_chunks(path, source, tags))
+    else:
+        raise ValueError(f"sem leitura em streaming para {media_type}")
+    canonical_id = chunks[0]["id"].rsplit("::", 1)[0] if chunks else file_sha256(path)
+    if timings is not None:
+        timings["load"] = timings.get("load", 0.0) + time.perf_counter() - t0
+    return _chunks_record(canonical_id, source, media_type, chunks, tags)
+
+
+def run_pages_ingestion(
+    text: str,
+    spans: Iterable[Sequence[int]],
+    source: str,
+    tags: Dict[str, Any] | None = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """PDF já extraído (ex.: baixado pelo `URLLoader`): chunks por página a
+    partir de `page_spans`, com o mesmo id canônico de `run_ingestion`."""
+    t0 = time.perf_counter()
+    canonical_id = compute_id(to_markdown(text, CanonicalMetadata(source=source)))
+    chunks = list(iter_page_chunks(pages_from_spans(text, spans), canonical_id, source, tags))
+    if timings is not None:
+        timings["chunk"] = timings.get("chunk", 0.0) + time.perf_counter() - t0
+    return _chunks_record(canonical_id, source, "pdf", chunks, tags)
+
+
+def iter_docx_chunks(
+    path: str,
+    source: Optional[str] = None,
+    tags: Dict[str, Any] | None = None,
+    section_chars: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Chunks de um DOCX lidos em streaming (`docx_loader.iter_markdown`).
+
+    Os blocos são acumulados em seções — fechadas em cada título ou ao passar
+    de `section_chars` (padrão 4x o tamanho do chunk) — e cada seção vai
+    direto para o splitter, então a memória não cresce com o documento. Como
+    em `iter_pdf_chunks`, o id canônico é o sha256 do arquivo.
+    """
+    from aurora_platform.modules.crawler.loaders.docx_loader import iter_markdown
+
+    source = source or path
+    canonical_id = file_sha256(path)
+    policy = chunk_policies.for_source("docx")
+    # ~4 caracteres por token quando a política é em tokens
+    chars_per_unit = 4 if policy.get("unit") == "tokens" else 1
+    limit = section_chars or policy["size"] * 4 * chars_per_unit
+    idx = 0
+    heading: Optional[str] = None
+
+    def flush(lines: list) -> Iterator[Dict[str, Any]]:
+        nonlocal idx
+        md = "\n\n".join(lines).strip()
+        if not md:
+            return
+        meta = CanonicalMetadata(source=source, tags=tags or {}, raw={"media_type": "docx"})
+        normalized = to_markdown(md, meta)
+        for ch in split_markdown(
+            normalized.markdown, chunk_size=policy["size"], overlap=policy["overlap"],
+            unit=policy.get("unit", "chars"),
+        ):
+            ch["id"] = f"{canonical_id}::{idx}"
+            ch["source"] = "docx"
+            if heading and not ch.get("heading"):
+                ch["heading"] = heading
+            idx += 1
+            yield ch
+
+    buf: list = []
+    size = 0
+    for line in iter_markdown(path):
+        if line.startswith("#") or size >= limit:
+            yield from flush(buf)
+            buf, size = [], 0
+            if line.startswith("#"):
+                heading = line.lstrip("#").strip()
+        if line:
+            # linhas de tabela ficam juntas (uma tabela markdown)
+            if buf and line.startswith("|") and buf[-1].startswith("|"):
+                buf[-1] += "\n" + line
+            else:
+                buf.append(line)
+            size += len(line)
+    yield from flush(buf)
+
+
+def to_index_record(chunk: Dict[str, Any], url: str, title: Optional[str] = None) -> Dict[str, Any]:
+    """Chunk do pipeline -> payload aceito por `QdrantIndexer.upsert_records`."""
+    canonical_id, idx = chunk["id"].rsplit("::", 1)
+    rec = {
+        "chunk_text": chunk["text"],
+        "canonical_id": canonical_id,
+        "chunk_index": int(idx),
+        "url": url,
+        "title": title,
+        "source_type": chunk.get("source"),
+    }
+    if "page" in chunk:
+        rec["page"] = chunk["page"]
+    return rec
+
+
+def save_record(
+    record: Dict[str, Any],
+    out_dir: str = "artifacts/ingested",
+    store: Optional[ArtifactStore] = None,
+) -> str:
+    """Grava o registro no armazém sharded de `out_dir` e retorna o shard.
+    Para muitos registros passe um `ArtifactStore` aberto (evita reabrir o
+    índice e agrupa os registros no mesmo frame)."""
+    if store is not None:
+        store.put(record)
+        return store.root
+    with ArtifactStore(out_dir) as st:
+        st.put(record)
+        st.flush()
+        return st.shards()[-1][0]
@@ -0,0 +1,279 @@
+"""Controle de taxa adaptativo por host (AIMD) para o crawler.
+
+Cada host tem um limite de concorrência (fracionário; vale o piso, mínimo
+1) e um intervalo mínimo entre inícios de requisição:
+
+- resposta saudável: aumento aditivo, `limit += step / limit` (~ +step por
+  janela completa) e o intervalo encolhe 10%;
+- 429/503, timeout ou latência (EWMA) bem acima da linha de base do host:
+  corte multiplicativo do limite (`decrease`) e o intervalo dobra — no
+  máximo um corte por janela de latência, para uma rajada de 429 não zerar
+  o host;
+- `Retry-After` bloqueia o host até o instante pedido.
+
+Com `RateStore`, os limites aprendidos ficam em sqlite e a próxima execução
+começa de onde a anterior parou (inclusive um `Retry-After` ainda em vigor).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+THROTTLE_STATUS = {429, 503}
+# folga absoluta sobre a linha de base: jitter de milissegundos não é congestão
+LATENCY_SLACK_S = float(os.getenv("CRAWL_LATENCY_SLACK_S", "0.25"))
+MAX_RETRY_AFTER_S = float(os.getenv("CRAWL_MAX_RETRY_AFTER_S", "3600"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS host_rates (
+    host TEXT PRIMARY KEY,
+    rate_limit REAL NOT NULL,
+    delay REAL NOT NULL,
+    latency REAL NOT NULL,
+    base_latency REAL NOT NULL,
+    blocked_until REAL NOT NULL,
+    throttled INTEGER NOT NULL,
+    ok INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class HostRate:
+    host: str
+    limit: float
+    delay: float
+    latency: float = 0.0  # EWMA (s)
+    base_latency: float = 0.0  # referência "saudável" (mínimo que sobe devagar)
+    blocked_until: float = 0.0  # time.time(); Retry-After
+    throttled: int = 0
+    ok: int = 0
+    updated_at: float = 0.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """`Retry-After` em segundos (aceita número ou data HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        secs = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        secs = when.timestamp() - (now if now is not None else time.time())
+    return min(max(secs, 0.0), MAX_RETRY_AFTER_S)
+
+
+class RateStore:
+    def __init__(self, path: str = "artifacts/crawl/rates.sqlite") -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "RateStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, host: str) -> Optional[HostRate]:
+        row = self.conn.execute(
+            "SELECT host, rate_limit, delay, latency, base_latency, blocked_until, "
+            "throttled, ok, updated_at FROM host_rates WHERE host = ?",
+            (host,),
+        ).fetchone()
+        return HostRate(*row) if row else None
+
+    def save(self, rates: Iterable[HostRate]) -> None:
+        rows = [
+            (r.host, r.limit, r.delay, r.latency, r.base_latency, r.blocked_until,
+             r.throttled, r.ok, r.updated_at)
+            for r in rates
+        ]
+        if not rows:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO host_rates (host, rate_limit, delay, latency, "
+                "base_latency, blocked_until, throttled, ok, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def all(self) -> List[HostRate]:
+        return [
+            HostRate(*row)
+            for row in self.conn.execute(
+                "SELECT host, rate_limit, delay, latency, base_latency, blocked_until, "
+                "throttled, ok, updated_at FROM host_rates ORDER BY host"
+            )
+        ]
+
+
+@dataclass
+class _Slot:
+    rate: HostRate
+    active: int = 0
+    next_at: float = 0.0  # time.monotonic()
+    last_cut: float = 0.0
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    pacing: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def cap(self) -> int:
+        return max(1, int(self.rate.limit))
+
+
+class AdaptiveHostLimiter:
+    """Mesma interface do `HostLimiter` (`acquire`/`release`) + `record`,
+    que alimenta o AIMD com o resultado de cada requisição."""
+
+    def __init__(
+        self,
+        initial_limit: int = 2,
+        initial_delay: float = 0.5,
+        *,
+        max_limit: int = 16,
+        min_delay: float = 0.0,
+        max_delay: float = 30.0,
+        step: float = 1.0,
+        decrease: float = 0.5,
+        latency_factor: float = 2.0,
+        alpha: float = 0.3,
+        store: Optional[RateStore] = None,
+    ) -> None:
+        self.initial_limit = initial_limit
+        self.initial_delay = initial_delay
+        self.max_limit = max_limit
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.alpha = alpha
+        self.store = store
+        self._slots: Dict[str, _Slot] = {}
+
+    def _slot(self, host: str) -> _Slot:
+        slot = self._slots.get(host)
+        if slot is None:
+            rate = self.store.get(host) if self.store is not None else None
+            if rate is None:
+                rate = HostRate(host, float(self.initial_limit), self.initial_delay)
+            rate.limit = min(max(rate.limit, 1.0), float(self.max_limit))
+            rate.delay = min(max(rate.delay, self.min_delay), self.max_delay)
+            slot = self._slots[host] = _Slot(rate)
+        return slot
+
+    def rate(self, host: str) -> HostRate:
+        return self._slot(host).rate
+
+    def rates(self) -> List[HostRate]:
+        return [s.rate for s in self._slots.values()]
+
+    async def acquire(self, host: str) -> None:
+        slot = self._slot(host)
+        while slot.active >= slot.cap:
+            fut = asyncio.get_running_loop().create_future()
+            slot.waiters.append(fut)
+            try:
+                await fut
+            finally:
+                if fut in slot.waiters:
+                    slot.waiters.remove(fut)
+        slot.active += 1
+        try:
+            async with slot.pacing:
+                # espaçamento entre inícios + Retry-After (relógio de parede)
+                wait = max(
+                    slot.next_at - time.monotonic(),
+                    slot.rate.blocked_until - time.time(),
+                )
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                slot.next_at = time.monotonic() + slot.rate.delay
+        except BaseException:
+            self.release(host)
+            raise
+
+    def release(self, host: str) -> None:
+        slot = self._slots[host]
+        slot.active -= 1
+        self._wake(slot)
+
+    def _wake(self, slot: _Slot) -> None:
+        free = slot.cap - slot.active
+        for fut in [f for f in slot.waiters if not f.done()][: max(free, 0)]:
+            fut.set_result(None)
+
+    def record(
+        self,
+        host: str,
+        latency: float,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        timeout: bool = False,
+    ) -> None:
+        """Resultado de uma requisição ao host. `status` None + `timeout`
+        indica que o servidor não respondeu a tempo."""
+        slot = self._slot(host)
+        rate = slot.rate
+        now = time.monotonic()
+        rate.updated_at = time.time()
+        if retry_after is not None:
+            rate.blocked_until = max(rate.blocked_until, time.time() + retry_after)
+        if timeout or status in THROTTLE_STATUS:
+            rate.throttled += 1
+            self._cut(slot, now)
+            return
+        rate.ok += 1
+        rate.latency = latency if not rate.latency else (
+            self.alpha * latency + (1 - self.alpha) * rate.latency
+        )
+        if not rate.base_latency or latency < rate.base_latency:
+            rate.base_latency = latency
+        else:
+            rate.base_latency += (latency - rate.base_latency) * 0.01
+        ceiling = max(rate.base_latency * self.latency_factor, rate.base_latency + LATENCY_SLACK_S)
+        if rate.latency > ceiling:
+            self._cut(slot, now)
+            return
+        rate.limit = min(float(self.max_limit), rate.limit + self.step / rate.limit)
+        rate.delay = max(self.min_delay, rate.delay * 0.9)
+        self._wake(slot)
+
+    def _cut(self, slot: _Slot, now: float) -> None:
+        rate = slot.rate
+        # um corte por janela: respostas já em voo refletem o limite antigo
+        if now - slot.last_cut < max(rate.latency, rate.delay, 0.05):
+            return
+        slot.last_cut = now
+        rate.limit = max(1.0, rate.limit * self.decrease)
+        rate.delay = min(self.max_delay, max(rate.delay * 2, self.min_delay, 0.1))
+
+    def save(self) -> None:
+        if self.store is not None:
+            self.store.save(self.rates())
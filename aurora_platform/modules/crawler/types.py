@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import TypedDict, Dict, Any, Protocol
+from typing import TypedDict, Dict, Any, List, Protocol
 
 
 class LoadedDocument(TypedDict):
@@ -10,3 +10,15 @@ class LoadedDocument(TypedDict):
 class LoaderProtocol(Protocol):
     def load(self, *, source: str, content_type: str |
              None = None) -> LoadedDocument: ...
+
+
+class LoadedPage(TypedDict):
+    page: int  # 1-based
+    text: str
+
+
+class DocxBlock(TypedDict, total=False):
+    kind: str  # heading | paragraph | row | table_end
+    text: str
+    level: int  # 1-6 em títulos, 0 no resto
+    cells: List[str]  # só em linhas de tabela
@@ -0,0 +1,151 @@
+"""CLI de manutenção do RAG (rebuild de coleções)."""
+import argparse
+import json
+import logging
+
+
+def _rebuild(args) -> None:
+    from .indexer.profiles import get_profile
+    from .indexer.rebuild import CollectionRebuilder
+
+    rb = CollectionRebuilder.from_env(
+        alias=args.alias, model=args.model, rescore_model=args.rescore_model
+    )
+    rb.batch_size = args.batch_size
+    if args.profile:
+        rb.profile = get_profile(args.profile)
+    rb.lexical = args.lexical_backend
+    report = rb.run(target=args.target, switch=not args.no_switch)
+    print(json.dumps(report.__dict__, ensure_ascii=False))
+
+
+def _bench_profiles(args) -> None:
+    import os
+    from fastembed import TextEmbedding
+    from qdrant_client import QdrantClient
+    from .indexer.profile_bench import benchmark_profiles, format_table
+    from .indexer.profiles import get_profile
+    from .indexer.qdrant_indexer import serving_collection
+
+    with open(args.queries, "r", encoding="utf-8") as f:
+        queries = [ln.strip() for ln in f if ln.strip()][: args.max_queries]
+    embedder = TextEmbedding(
+        model_name=os.getenv("EMBEDDINGS_MODEL", "BAAI/bge-small-en-v1.5")
+    )
+    client = QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    results = benchmark_profiles(
+        client,
+        args.collection or serving_collection(),
+        list(embedder.embed(queries)),
+        [get_profile(n) for n in args.profiles.split(",")],
+        sample=args.sample,
+        top_k=args.top_k,
+        using=args.vector,
+    )
+    print(format_table(results, args.top_k))
+
+
+def _bench_lexical(args) -> None:
+    import os
+    from qdrant_client import QdrantClient
+    from .indexer.qdrant_indexer import serving_collection
+    from .search.hybrid import VectorSearch
+    from .search.lexical_bench import benchmark_lexical, format_table
+
+    with open(args.queries, "r", encoding="utf-8") as f:
+        queries = [ln.strip() for ln in f if ln.strip()][: args.max_queries]
+    url = os.getenv("QDRANT_URL", "http://localhost:6333")
+    coll = args.collection or serving_collection()
+    vs = None
+    if args.hybrid:
+        vs = VectorSearch(
+            coll,
+            url,
+            os.getenv("EMBEDDINGS_MODEL", "BAAI/bge-small-en-v1.5"),
+            rescore_model=os.getenv("EMBEDDINGS_MODEL_RESCORE"),
+        )
+    results = benchmark_lexical(
+        QdrantClient(url=url), coll, queries, top_k=args.top_k, vector_search=vs
+    )
+    print(format_table(results, args.top_k))
+
+
+def _ingest_worker(args) -> None:
+    from .jobs import IngestionWorker
+    from .workqueue import open_queue
+
+    queue = open_queue(args.queue)
+    worker = IngestionWorker(queue, lease_s=args.lease_s, prefetch=args.prefetch)
+    done = worker.run(max_items=args.max_items, stop_when_idle=args.exit_when_idle)
+    print(json.dumps({"worker": worker.worker_id, "processed": done, "failed": worker.failed}))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    p = argparse.ArgumentParser(prog="aurora-rag")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    rb = sub.add_parser("rebuild", help="Rebuild blue/green de uma coleção")
+    rb.add_argument("--alias", help="Alias servido (default: alias de QDRANT_COLLECTION)")
+    rb.add_argument("--target", help="Coleção nova (default: próxima <alias>@vN)")
+    rb.add_argument("--model", help="Modelo de embeddings da nova versão")
+    rb.add_argument(
+        "--rescore-model",
+        help="Modelo grande para o vetor de rescoring (default: EMBEDDINGS_MODEL_RESCORE)",
+    )
+    rb.add_argument("--profile", help="Perfil da nova coleção (default: QDRANT_PROFILE)")
+    rb.add_argument(
+        "--lexical-backend",
+        choices=["bm25", "sparse", "both"],
+        help="Backend lexical da nova versão (default: LEXICAL_BACKEND)",
+    )
+    rb.add_argument("--batch-size", type=int, default=64)
+    rb.add_argument(
+        "--no-switch", action="store_true", help="Não troca o alias ao terminar"
+    )
+    rb.set_defaults(func=_rebuild)
+
+    bp = sub.add_parser(
+        "bench-profiles", help="Compara perfis (latência, recall, memória)"
+    )
+    bp.add_argument("--queries", required=True, help="Arquivo com 1 consulta por linha")
+    bp.add_argument("--collection", help="Coleção amostrada (default: alias de QDRANT_COLLECTION)")
+    bp.add_argument("--profiles", default="default,balanced,low_memory,binary")
+    bp.add_argument("--sample", type=int, default=5000)
+    bp.add_argument("--max-queries", type=int, default=200)
+    bp.add_argument("--top-k", type=int, default=10)
+    bp.add_argument("--vector", help="Vetor nomeado a avaliar (ex.: fast)")
+    bp.set_defaults(func=_bench_profiles)
+
+    bl = sub.add_parser(
+        "bench-lexical", help="BM25 em processo vs. vetor esparso no Qdrant"
+    )
+    bl.add_argument("--queries", required=True, help="Arquivo com 1 consulta por linha")
+    bl.add_argument("--collection", help="Coleção (default: alias de QDRANT_COLLECTION)")
+    bl.add_argument("--max-queries", type=int, default=200)
+    bl.add_argument("--top-k", type=int, default=10)
+    bl.add_argument(
+        "--hybrid", action="store_true", help="Inclui denso+BM25 vs. 1 round trip"
+    )
+    bl.set_defaults(func=_bench_lexical)
+
+    iw = sub.add_parser(
+        "ingest-worker", help="Worker de ingestão distribuída (fila Redis ou sqlite)"
+    )
+    iw.add_argument(
+        "--queue", help="redis://... ou caminho sqlite (default: INGEST_QUEUE_URL)"
+    )
+    iw.add_argument("--lease-s", type=float, help="Arrendamento (default: INGEST_LEASE_S)")
+    iw.add_argument("--prefetch", type=int, default=1, help="Itens arrendados por vez")
+    iw.add_argument("--max-items", type=int)
+    iw.add_argument(
+        "--exit-when-idle", action="store_true", help="Sai quando a fila esvaziar"
+    )
+    iw.set_defaults(func=_ingest_worker)
+
+    args = p.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
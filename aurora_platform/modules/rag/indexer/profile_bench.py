@@ -0,0 +1,162 @@
+"""Benchmark de perfis de coleção sobre uma amostra da coleção real.
+
+Para cada perfil candidato: copia `sample` pontos (vetores + payload) para uma
+coleção temporária criada com o perfil, espera a indexação e roda as
+consultas reais medindo latência (p50/p95), recall@k contra a busca exata
+na mesma amostra e a memória estimada (`profiles.estimate_memory`).
+"""
+
+from __future__ import annotations
+
+import logging
+import statistics
+import time
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence
+
+from qdrant_client import QdrantClient
+from qdrant_client import models
+
+from aurora_platform.modules.rag.indexer.profiles import (
+    CollectionProfile,
+    ensure_collection,
+    estimate_memory,
+    search_params,
+)
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class ProfileBenchResult:
+    profile: str
+    points: int
+    p50_ms: float
+    p95_ms: float
+    recall_at_k: float
+    ram_mb: float
+    disk_mb: float
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _wait_indexed(client: QdrantClient, name: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = client.get_collection(name)
+        if str(getattr(info.status, "value", info.status)) == "green":
+            return
+        time.sleep(0.2)
+    log.warning("coleção %s não ficou green em %.0fs", name, timeout)
+
+
+def _copy_sample(
+    client: QdrantClient,
+    source: str,
+    target: str,
+    sample: int,
+    using: Optional[str] = None,
+    batch: int = 256,
+) -> int:
+    copied, offset = 0, None
+    while copied < sample:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=min(batch, sample - copied),
+            offset=offset,
+            with_payload=True,
+            with_vectors=[using] if using else True,
+        )
+        if not points:
+            break
+        client.upsert(
+            collection_name=target,
+            points=[
+                models.PointStruct(
+                    id=p.id,
+                    vector=p.vector[using] if using else p.vector,
+                    payload=p.payload or {},
+                )
+                for p in points
+            ],
+        )
+        copied += len(points)
+        if offset is None:
+            break
+    return copied
+
+
+def benchmark_profiles(
+    client: QdrantClient,
+    source: str,
+    query_vectors: Sequence[Sequence[float]],
+    profiles: Sequence[CollectionProfile],
+    *,
+    sample: int = 5000,
+    top_k: int = 10,
+    index_timeout: float = 120.0,
+    using: Optional[str] = None,
+) -> List[ProfileBenchResult]:
+    """`using` escolhe o vetor nomeado (ex.: `fast`) em coleções de dois níveis;
+    a amostra é copiada para uma coleção de vetor único."""
+    dim = len(query_vectors[0])
+    results: List[ProfileBenchResult] = []
+    for profile in profiles:
+        name = f"{source}__bench_{profile.name}"
+        if client.collection_exists(name):
+            client.delete_collection(name)
+        # força o HNSW a ser construído mesmo em amostras pequenas
+        bench_profile = replace(profile, indexing_threshold=1, payload_indexes={})
+        ensure_collection(client, name, dim, bench_profile)
+        try:
+            n = _copy_sample(client, source, name, sample, using)
+            _wait_indexed(client, name, index_timeout)
+            params = search_params(profile)
+            exact = search_params(profile, exact=True)
+            lat: List[float] = []
+            recalls: List[float] = []
+            for qv in query_vectors:
+                qv = list(map(float, qv))
+                truth = client.query_points(
+                    name, query=qv, limit=top_k, search_params=exact
+                ).points
+                t0 = time.perf_counter()
+                got = client.query_points(
+                    name, query=qv, limit=top_k, search_params=params
+                ).points
+                lat.append((time.perf_counter() - t0) * 1000)
+                want = {p.id for p in truth}
+                if want:
+                    recalls.append(len(want & {p.id for p in got}) / len(want))
+            mem = estimate_memory(n, dim, profile)
+            results.append(
+                ProfileBenchResult(
+                    profile=profile.name,
+                    points=n,
+                    p50_ms=round(statistics.median(lat), 3) if lat else 0.0,
+                    p95_ms=round(percentile(lat, 0.95), 3),
+                    recall_at_k=round(statistics.mean(recalls), 4) if recalls else 0.0,
+                    ram_mb=mem["ram_mb"],
+                    disk_mb=mem["disk_mb"],
+                )
+            )
+        finally:
+            client.delete_collection(name)
+    return results
+
+
+def format_table(results: List[ProfileBenchResult], top_k: int) -> str:
+    head = f"{'perfil':<14}{'pontos':>8}{'p50 ms':>9}{'p95 ms':>9}{f'recall@{top_k}':>11}{'RAM MB':>9}{'disco MB':>10}"
+    rows = [head, "-" * len(head)]
+    for r in results:
+        rows.append(
+            f"{r.profile:<14}{r.points:>8}{r.p50_ms:>9.2f}{r.p95_ms:>9.2f}"
+            f"{r.recall_at_k:>11.3f}{r.ram_mb:>9.1f}{r.disk_mb:>10.1f}"
+        )
+    return "\n".join(rows)
@@ -0,0 +1,285 @@
+"""Perfis declarativos de coleção Qdrant (HNSW, quantização, payload indexes).
+
+Todo ponto do código que cria coleções (QdrantIndexer, QdrantAdapter,
+VectorStore, rebuild) passa por `ensure_collection`, e as buscas usam
+`search_params` do mesmo perfil. O perfil ativo vem de `QDRANT_PROFILE`;
+perfis extras podem ser declarados num JSON apontado por
+`QDRANT_PROFILES_FILE` (`{"nome": {campo: valor, ...}}`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional, Sequence, Set, Union
+
+from qdrant_client import QdrantClient
+from qdrant_client import models
+
+log = logging.getLogger(__name__)
+
+# campos usados em filtros pelas APIs de busca / payload do indexador
+DEFAULT_PAYLOAD_INDEXES = {
+    "canonical_id": "keyword",
+    "source_type": "keyword",
+    "url": "keyword",
+    "lang": "keyword",
+}
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    name: str
+    distance: str = "Cosine"
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_ef: Optional[int] = None  # hnsw_ef na consulta (None = padrão do servidor)
+    on_disk: bool = False  # vetores originais em mmap
+    quantization: Optional[str] = None  # None | "scalar" | "binary"
+    quantization_always_ram: bool = True
+    rescore: bool = True  # reavalia candidatos com os vetores originais
+    oversampling: float = 2.0
+    indexing_threshold: Optional[int] = None  # KB; None = padrão do servidor
+    payload_indexes: Dict[str, str] = field(
+        default_factory=lambda: dict(DEFAULT_PAYLOAD_INDEXES)
+    )
+
+
+DEFAULT = CollectionProfile(name="default")
+BALANCED = CollectionProfile(name="balanced", quantization="scalar", oversampling=1.5)
+LOW_MEMORY = CollectionProfile(
+    name="low_memory",
+    on_disk=True,
+    quantization="scalar",
+    hnsw_m=12,
+    oversampling=2.0,
+)
+BINARY = CollectionProfile(
+    name="binary",
+    on_disk=True,
+    quantization="binary",
+    oversampling=3.0,
+    search_ef=128,
+)
+HIGH_RECALL = CollectionProfile(
+    name="high_recall", hnsw_m=32, hnsw_ef_construct=256, search_ef=256
+)
+
+PROFILES: Dict[str, CollectionProfile] = {
+    p.name: p for p in (DEFAULT, BALANCED, LOW_MEMORY, BINARY, HIGH_RECALL)
+}
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, CollectionProfile]:
+    out = dict(PROFILES)
+    path = path or os.getenv("QDRANT_PROFILES_FILE")
+    if not path:
+        return out
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    for name, spec in raw.items():
+        base = out.get(spec.pop("extends", "default"), DEFAULT)
+        out[name] = replace(base, name=name, **spec)
+    return out
+
+
+def get_profile(name: Optional[str] = None) -> CollectionProfile:
+    name = name or os.getenv("QDRANT_PROFILE", "default")
+    profiles = load_profiles()
+    if name not in profiles:
+        raise KeyError(f"perfil Qdrant desconhecido: {name} ({', '.join(profiles)})")
+    return profiles[name]
+
+
+# -------- tradução para o modelo do qdrant-client --------
+def _quantization_config(profile: CollectionProfile):
+    if profile.quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=profile.quantization_always_ram,
+            )
+        )
+    if profile.quantization == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(
+                always_ram=profile.quantization_always_ram
+            )
+        )
+    if profile.quantization:
+        raise ValueError(f"quantização desconhecida: {profile.quantization}")
+    return None
+
+
+def vector_params(
+    size: int, profile: CollectionProfile, *, rescore_only: bool = False
+) -> models.VectorParams:
+    if rescore_only:
+        # vetor usado só para reavaliar candidatos: sem grafo HNSW e em disco
+        return models.VectorParams(
+            size=size,
+            distance=models.Distance(profile.distance),
+            on_disk=True,
+            hnsw_config=models.HnswConfigDiff(m=0),
+        )
+    return models.VectorParams(
+        size=size,
+        distance=models.Distance(profile.distance),
+        on_disk=profile.on_disk or None,
+    )
+
+
+def collection_vectors(client: QdrantClient, name: str) -> Dict[str, int]:
+    """Vetores densos da coleção (ou alias): nome -> dimensão ("" = sem nome)."""
+    vectors = client.get_collection(name).config.params.vectors
+    if isinstance(vectors, dict):
+        return {k: v.size for k, v in vectors.items()}
+    return {"": vectors.size}
+
+
+def collection_sparse_vectors(client: QdrantClient, name: str) -> Set[str]:
+    sparse = client.get_collection(name).config.params.sparse_vectors
+    return set(sparse or {})
+
+
+def sparse_params(profile: CollectionProfile) -> models.SparseVectorParams:
+    # IDF calculado pelo Qdrant: o documento guarda só a parte tf do BM25
+    return models.SparseVectorParams(
+        index=models.SparseIndexParams(on_disk=profile.on_disk or None),
+        modifier=models.Modifier.IDF,
+    )
+
+
+def ensure_collection(
+    client: QdrantClient,
+    name: str,
+    size: Union[int, Dict[str, int]],
+    profile: Optional[CollectionProfile] = None,
+    *,
+    rescore_only: Sequence[str] = (),
+    sparse: Sequence[str] = (),
+) -> bool:
+    """Cria `name` segundo o perfil, se ainda não existir. Retorna True se criou.
+
+    `size` pode ser um dict de vetores nomeados (nome -> dimensão); os nomes em
+    `rescore_only` não recebem índice HNSW e os de `sparse` viram vetores
+    esparsos com IDF. Numa coleção existente, o perfil é reaplicado com
+    `apply_profile`.
+    """
+    profile = profile or get_profile()
+    if client.collection_exists(name):
+        apply_profile(client, name, profile)
+        return False
+    if isinstance(size, dict):
+        vectors_config = {
+            vname: vector_params(dim, profile, rescore_only=vname in rescore_only)
+            for vname, dim in size.items()
+        }
+    else:
+        vectors_config = vector_params(size, profile)
+    optimizers = None
+    if profile.indexing_threshold is not None:
+        optimizers = models.OptimizersConfigDiff(
+            indexing_threshold=profile.indexing_threshold
+        )
+    client.create_collection(
+        collection_name=name,
+        vectors_config=vectors_config,
+        hnsw_config=models.HnswConfigDiff(
+            m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct
+        ),
+        quantization_config=_quantization_config(profile),
+        optimizers_config=optimizers,
+        sparse_vectors_config={n: sparse_params(profile) for n in sparse} or None,
+    )
+    ensure_payload_indexes(client, name, profile)
+    log.info("Criada coleção %s (dim=%s, perfil=%s)", name, size, profile.name)
+    return True
+
+
+def apply_profile(client: QdrantClient, name: str, profile: CollectionProfile) -> bool:
+    """Leva uma coleção existente ao perfil: payload indexes que faltam e, se
+    diferirem, HNSW, `indexing_threshold` e quantização (`update_collection`;
+    o Qdrant reconstrói os índices em segundo plano). `distance` e `on_disk`
+    dos vetores só mudam recriando a coleção: a diferença fica no log (use o
+    rebuild). Retorna True se atualizou a coleção.
+    """
+    info = client.get_collection(name)
+    missing = {
+        k: v for k, v in profile.payload_indexes.items() if k not in (info.payload_schema or {})
+    }
+    ensure_payload_indexes(client, name, replace(profile, payload_indexes=missing))
+
+    params = info.config.params
+    vectors = params.vectors if isinstance(params.vectors, dict) else {"": params.vectors}
+    for vname, v in vectors.items():
+        if v.hnsw_config is not None and v.hnsw_config.m == 0:
+            continue  # vetor só de rescoring (sempre em disco, sem HNSW)
+        if v.distance != models.Distance(profile.distance) or bool(v.on_disk) != profile.on_disk:
+            log.warning(
+                "%s: vetor '%s' (distance=%s, on_disk=%s) difere do perfil %s; "
+                "use o rebuild para mudar",
+                name, vname, v.distance, bool(v.on_disk), profile.name,
+            )
+
+    diff: Dict[str, object] = {}
+    hnsw = info.config.hnsw_config
+    if (hnsw.m, hnsw.ef_construct) != (profile.hnsw_m, profile.hnsw_ef_construct):
+        diff["hnsw_config"] = models.HnswConfigDiff(
+            m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct
+        )
+    threshold = profile.indexing_threshold
+    if threshold is not None and info.config.optimizer_config.indexing_threshold != threshold:
+        diff["optimizers_config"] = models.OptimizersConfigDiff(indexing_threshold=threshold)
+    quant = _quantization_config(profile)
+    if info.config.quantization_config != quant:
+        diff["quantization_config"] = quant if quant is not None else models.Disabled.DISABLED
+    if not diff:
+        return False
+    client.update_collection(collection_name=name, **diff)
+    log.info("Coleção %s atualizada para o perfil %s (%s)", name, profile.name, ", ".join(diff))
+    return True
+
+
+def ensure_payload_indexes(
+    client: QdrantClient, name: str, profile: CollectionProfile
+) -> None:
+    for field_name, schema in profile.payload_indexes.items():
+        client.create_payload_index(
+            collection_name=name,
+            field_name=field_name,
+            field_schema=models.PayloadSchemaType(schema),
+        )
+
+
+def search_params(
+    profile: Optional[CollectionProfile] = None, *, exact: bool = False
+) -> models.SearchParams:
+    profile = profile or get_profile()
+    quant = None
+    if profile.quantization:
+        quant = models.QuantizationSearchParams(
+            rescore=profile.rescore, oversampling=profile.oversampling
+        )
+    return models.SearchParams(hnsw_ef=profile.search_ef, exact=exact, quantization=quant)
+
+
+def estimate_memory(n_points: int, dim: int, profile: CollectionProfile) -> Dict[str, float]:
+    """Estimativa (MB) de RAM e disco dos vetores + grafo HNSW do perfil."""
+    mb = 1024 * 1024
+    raw = n_points * dim * 4
+    quant = {"scalar": n_points * dim, "binary": n_points * dim / 8}.get(
+        profile.quantization or "", 0
+    )
+    # camada 0 tem até 2*m vizinhos (uint32) por ponto
+    graph = n_points * profile.hnsw_m * 2 * 4
+    ram = graph + (0 if profile.on_disk else raw)
+    if quant and profile.quantization_always_ram:
+        ram += quant
+    return {
+        "ram_mb": round(ram / mb, 2),
+        "disk_mb": round((raw + quant + graph) / mb, 2),
+    }
@@ -1,57 +1,242 @@
 import os
-import logging
 import json
-import pathlib
-from typing import Dict, Any
+import logging
+import time
+import uuid
+from typing import Dict, Any, Iterable, List, Optional
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import FieldCondition, Filter, MatchValue, PointStruct
 from fastembed import TextEmbedding
 
-LEXICAL_DIR = pathlib.Path("artifacts/lexical")
-LEXICAL_DIR.mkdir(parents=True, exist_ok=True)
+from aurora_platform.modules.rag.indexer.profiles import (
+    CollectionProfile,
+    apply_profile,
+    collection_sparse_vectors,
+    collection_vectors,
+    ensure_collection,
+    get_profile,
+)
+from aurora_platform.modules.rag.search.lexical_bm25 import (  # noqa: F401
+    LEXICAL_DIR,
+    lexical_path,
+)
+from aurora_platform.modules.rag.search.sparse_bm25 import (
+    SPARSE_VECTOR,
+    doc_sparse,
+    lexical_backend,
+    resolve_avgdl,
+)
+
+# Layout em dois níveis: ANN no vetor pequeno, rescoring com o grande
+FAST_VECTOR = "fast"
+FULL_VECTOR = "full"
+
+
+def point_id(canonical_id: str, chunk_index: int) -> str:
+    """Id determinístico do ponto (Qdrant só aceita inteiros ou UUIDs)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{canonical_id}:{chunk_index}"))
+
+
+def embedding_dim(embedder) -> int:
+    for attr in ("get_sentence_embedding_dimension", "get_embedding_size"):
+        fn = getattr(embedder, attr, None)
+        if callable(fn):
+            try:
+                return int(fn())
+            except TypeError:
+                pass
+    size = getattr(embedder, "embedding_size", None)
+    if isinstance(size, int):
+        return size
+    return len(list(embedder.embed(["dim"]))[0])
+
+
+def serving_collection() -> str:
+    """Coleção de busca e ingestão: sempre o alias (`aurora_docs`).
+
+    Um `QDRANT_COLLECTION=aurora_docs@v1` legado vira o alias; a versão
+    concreta só é resolvida em rebuild.py, então escritas feitas depois de
+    um switch vão para a coleção nova.
+    """
+    from aurora_platform.modules.rag.indexer.rebuild import base_alias
+
+    return base_alias(os.getenv("QDRANT_COLLECTION", "aurora_docs"))
 
 
 class QdrantIndexer:
-    def __init__(self, client: QdrantClient, collection: str, embedder: TextEmbedding):
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection: str,
+        embedder: TextEmbedding,
+        profile: Optional[CollectionProfile] = None,
+        rescore_embedder: Optional[TextEmbedding] = None,
+        lexical: Optional[str] = None,
+    ):
         self.client = client
         self.collection = collection
         self.embedder = embedder
+        self.rescore_embedder = rescore_embedder
+        self.profile = profile or get_profile()
+        # bm25 = JSONL p/ rank_bm25 em processo; sparse = vetor esparso no Qdrant
+        self.lexical = lexical or lexical_backend()
         self._ensure_collection()
 
     @classmethod
     def from_env(cls):
         url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        col = os.getenv("QDRANT_COLLECTION", "aurora_docs@v1")
+        col = serving_collection()
         client = QdrantClient(url=url)
         embedder = TextEmbedding(
             model_name=os.getenv("EMBEDDINGS_MODEL", "BAAI/bge-small-en-v1.5")
         )
-        return cls(client, col, embedder)
+        rescore_model = os.getenv("EMBEDDINGS_MODEL_RESCORE")
+        rescore = TextEmbedding(model_name=rescore_model) if rescore_model else None
+        return cls(client, col, embedder, rescore_embedder=rescore)
 
     def _ensure_collection(self):
-        dim = self.embedder.get_sentence_embedding_dimension()
-        try:
-            self.client.get_collection(self.collection)
-        except Exception:
-            self.client.recreate_collection(
+        from aurora_platform.modules.rag.indexer.rebuild import base_alias, ensure_alias
+
+        # um alias sem coleção por trás nasce como `<alias>@v1` + alias
+        concrete = self.collection
+        if base_alias(self.collection) == self.collection:
+            concrete = ensure_alias(self.client, self.collection) or f"{self.collection}@v1"
+        # collection_exists também resolve aliases; nunca recriamos uma coleção
+        # existente (isso apagaria dados em produção — ver rebuild.py), só
+        # reaplicamos o que o perfil permite mudar no lugar
+        if not self.client.collection_exists(concrete):
+            if self.rescore_embedder is not None:
+                size: Any = {
+                    FAST_VECTOR: embedding_dim(self.embedder),
+                    FULL_VECTOR: embedding_dim(self.rescore_embedder),
+                }
+            else:
+                size = embedding_dim(self.embedder)
+            ensure_collection(
+                self.client,
+                concrete,
+                size,
+                self.profile,
+                rescore_only=(FULL_VECTOR,),
+                sparse=(SPARSE_VECTOR,) if self.lexical in ("sparse", "both") else (),
+            )
+            if concrete != self.collection:
+                ensure_alias(self.client, self.collection)
+        else:
+            apply_profile(self.client, concrete, self.profile)
+        names = collection_vectors(self.client, self.collection)
+        self.sparse = SPARSE_VECTOR in collection_sparse_vectors(
+            self.client, self.collection
+        )
+        if self.lexical in ("sparse", "both") and not self.sparse:
+            logging.warning(
+                "%s não tem o vetor esparso '%s'; use o rebuild para adicioná-lo",
+                self.collection,
+                SPARSE_VECTOR,
+            )
+        # normalização de tamanho do BM25 esparso (medida no rebuild)
+        self.avgdl = resolve_avgdl(self.collection) if self.sparse else None
+        self.two_tier = FAST_VECTOR in names and FULL_VECTOR in names
+        if self.two_tier and self.rescore_embedder is None:
+            raise ValueError(
+                f"{self.collection} usa vetores em dois níveis: "
+                "defina EMBEDDINGS_MODEL_RESCORE"
+            )
+        if not self.two_tier and self.rescore_embedder is not None:
+            logging.warning(
+                "%s não tem o vetor '%s'; rescoring ignorado (use o rebuild "
+                "para migrar a coleção)",
+                self.collection,
+                FULL_VECTOR,
+            )
+            self.rescore_embedder = None
+
+    def delete_ids(self, ids: List[str]) -> int:
+        """Remove pontos (e grava lápides no JSONL lexical)."""
+        if not ids:
+            return 0
+        self.client.delete(collection_name=self.collection, points_selector=list(ids))
+        if self.lexical != "sparse":
+            lf = lexical_path(self.collection)
+            lf.parent.mkdir(parents=True, exist_ok=True)
+            with lf.open("a", encoding="utf-8") as f:
+                for i in ids:
+                    f.write(json.dumps({"id": str(i), "deleted": True}) + "\n")
+        return len(ids)
+
+    def prune_url(self, url: str, keep: Iterable[Dict[str, Any]] = ()) -> int:
+        """Apaga os pontos de `url` que não estão em `keep` (os registros
+        recém-gravados para ela): chunks de uma versão anterior do documento
+        têm outro `canonical_id` e ficariam na coleção."""
+        keep_ids = {point_id(r["canonical_id"], r["chunk_index"]) for r in keep}
+        stale: List[str] = []
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
                 collection_name=self.collection,
-                vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+                scroll_filter=Filter(must=[FieldCondition(key="url", match=MatchValue(value=url))]),
+                limit=256,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
             )
-            logging.info(f"Criada coleção {self.collection} (dim={dim})")
+            stale.extend(str(p.id) for p in points if str(p.id) not in keep_ids)
+            if offset is None:
+                break
+        return self.delete_ids(stale)
 
     def upsert_record(self, rec: Dict[str, Any]):
-        text = rec["chunk_text"]
-        vec = list(self.embedder.embed([text]))[0]
-        point = PointStruct(
-            id=rec["canonical_id"] + f":{rec['chunk_index']}", vector=vec, payload=rec
-        )
-        self.client.upsert(collection_name=self.collection, points=[point])
+        self.upsert_records([rec])
+
+    def upsert_records(
+        self,
+        recs: Iterable[Dict[str, Any]],
+        timings: Optional[Dict[str, float]] = None,
+    ) -> int:
+        """`timings`, se dado, acumula os segundos das etapas embed/upsert."""
+        recs = list(recs)
+        if not recs:
+            return 0
+        t0 = time.perf_counter()
+        texts = [r["chunk_text"] for r in recs]
+        vecs: List[Any] = [list(map(float, v)) for v in self.embedder.embed(texts)]
+        if self.two_tier:
+            full = self.rescore_embedder.embed(texts)
+            vecs = [
+                {FAST_VECTOR: v, FULL_VECTOR: list(map(float, f))}
+                for v, f in zip(vecs, full)
+            ]
+        if self.sparse:
+            vecs = [
+                {**(v if isinstance(v, dict) else {"": v}), SPARSE_VECTOR: doc_sparse(t, avgdl=self.avgdl)}
+                for v, t in zip(vecs, texts)
+            ]
+        points: List[PointStruct] = [
+            PointStruct(
+                id=point_id(r["canonical_id"], r["chunk_index"]),
+                vector=v,
+                payload=r,
+            )
+            for r, v in zip(recs, vecs)
+        ]
+        t1 = time.perf_counter()
+        if timings is not None:
+            timings["embed"] = timings.get("embed", 0.0) + t1 - t0
+        self.client.upsert(collection_name=self.collection, points=points)
+        if timings is not None:
+            timings["upsert"] = timings.get("upsert", 0.0) + time.perf_counter() - t1
+        if self.lexical == "sparse":
+            return len(points)
         # 🔹 Persistência lexical simples para BM25:
-        lf = LEXICAL_DIR / f"{self.collection}.jsonl"
+        lf = lexical_path(self.collection)
+        lf.parent.mkdir(parents=True, exist_ok=True)
         with lf.open("a", encoding="utf-8") as f:
-            f.write(
-                json.dumps(
-                    {"id": point.id, "text": text, "meta": rec}, ensure_ascii=False
+            for p, text in zip(points, texts):
+                f.write(
+                    json.dumps(
+                        {"id": p.id, "text": text, "meta": p.payload},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
                 )
-                + "\n"
-            )
+        return len(points)
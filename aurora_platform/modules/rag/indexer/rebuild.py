@@ -0,0 +1,404 @@
+"""Rebuild blue/green de coleções versionadas (`<alias>@vN`).
+
+Fluxo: cria `<alias>@v(N+1)` + índice lexical próprio, re-embeda o
+`chunk_text` armazenado no payload da coleção viva (em lotes, com checkpoint
+retomável), sincroniza o que mudou na coleção viva enquanto isso e, ao
+final, troca atomicamente o alias do Qdrant e o ponteiro lexical local; uma
+última passada depois da troca copia o que entrou na versão antiga no meio. Consultas feitas pelo alias passam a ver a nova versão sem
+reinício.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import re
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client import models
+
+from aurora_platform.modules.rag.indexer.profiles import CollectionProfile
+from aurora_platform.modules.rag.indexer.qdrant_indexer import (
+    QdrantIndexer,
+    serving_collection,
+)
+from aurora_platform.modules.rag.search.lexical_bm25 import set_lexical_pointer
+from aurora_platform.modules.rag.search.sparse_bm25 import (
+    corpus_avgdl,
+    load_avgdl,
+    save_corpus_stats,
+)
+
+log = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = pathlib.Path("artifacts/rebuild")
+VERSION_RE = re.compile(r"^(?P<alias>.+)@v(?P<n>\d+)$")
+# passadas de catch-up antes do switch (cada uma pega o que entrou na anterior)
+MAX_CATCH_UP = int(os.getenv("REBUILD_MAX_CATCH_UP", "3"))
+
+
+def base_alias(collection: str) -> str:
+    """`aurora_docs@v1` -> `aurora_docs` (nomes sem versão ficam iguais)."""
+    m = VERSION_RE.match(collection)
+    return m.group("alias") if m else collection
+
+
+def ensure_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """Coleção concreta por trás de `alias`, criando o alias se preciso.
+
+    Sem alias ainda, ele passa a apontar para a última `<alias>@vN`; uma
+    coleção legada chamada exatamente `alias` é devolvida como está. None
+    quando não há nenhuma versão.
+    """
+    for a in client.get_aliases().aliases:
+        if a.alias_name == alias:
+            return a.collection_name
+    if client.collection_exists(alias):
+        return alias
+    versions = sorted(
+        int(m.group("n"))
+        for c in client.get_collections().collections
+        if (m := VERSION_RE.match(c.name)) and m.group("alias") == alias
+    )
+    if not versions:
+        return None
+    target = f"{alias}@v{versions[-1]}"
+    client.update_collection_aliases(
+        change_aliases_operations=[
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=target, alias_name=alias)
+            )
+        ]
+    )
+    set_lexical_pointer(alias, target)
+    log.info("alias %s criado -> %s", alias, target)
+    return target
+
+
+def _payload_hash(payload: Optional[Dict[str, Any]]) -> str:
+    return hashlib.sha256(
+        json.dumps(payload or {}, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+@dataclass
+class RebuildCheckpoint:
+    source: str
+    target: str
+    offset: Any = None
+    processed: int = 0
+    done: bool = False
+
+
+@dataclass
+class RebuildReport:
+    source: str
+    target: str
+    processed: int
+    seconds: float
+    chunks_per_s: float
+    switched: bool
+
+
+class CollectionRebuilder:
+    def __init__(
+        self,
+        client: QdrantClient,
+        alias: str,
+        embedder,
+        batch_size: int = 64,
+        checkpoint_dir: pathlib.Path | str = CHECKPOINT_DIR,
+        profile: Optional[CollectionProfile] = None,
+        rescore_embedder=None,
+        lexical: Optional[str] = None,
+    ):
+        self.client = client
+        self.collection = alias
+        self.alias = base_alias(alias)
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.checkpoint_dir = pathlib.Path(checkpoint_dir)
+        # perfil da nova versão (parâmetros imutáveis, como on_disk, só mudam
+        # recriando a coleção — o rebuild é o caminho para trocá-los)
+        self.profile = profile
+        # com um modelo de rescoring a nova versão usa vetores `fast` + `full`
+        self.rescore_embedder = rescore_embedder
+        self.lexical = lexical  # backend lexical da nova versão (bm25|sparse|both)
+        self.progress: Dict[str, Any] = {}
+
+    @classmethod
+    def from_env(
+        cls,
+        alias: Optional[str] = None,
+        model: Optional[str] = None,
+        rescore_model: Optional[str] = None,
+    ):
+        from fastembed import TextEmbedding
+
+        client = QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"))
+        embedder = TextEmbedding(
+            model_name=model
+            or os.getenv("EMBEDDINGS_MODEL", "BAAI/bge-small-en-v1.5")
+        )
+        rescore_model = rescore_model or os.getenv("EMBEDDINGS_MODEL_RESCORE")
+        return cls(
+            client,
+            alias or serving_collection(),
+            embedder,
+            rescore_embedder=(
+                TextEmbedding(model_name=rescore_model) if rescore_model else None
+            ),
+        )
+
+    # -------- versões / alias --------
+    def _versions(self) -> List[int]:
+        out = []
+        for c in self.client.get_collections().collections:
+            m = VERSION_RE.match(c.name)
+            if m and m.group("alias") == self.alias:
+                out.append(int(m.group("n")))
+        return sorted(out)
+
+    def current(self) -> Optional[str]:
+        """Coleção servida hoje: a do alias ou, antes do 1º switch, a coleção
+        passada explicitamente (ex.: `docs@v1`) ou a última vN."""
+        for a in self.client.get_aliases().aliases:
+            if a.alias_name == self.alias:
+                return a.collection_name
+        if self.collection != self.alias and self.client.collection_exists(
+            self.collection
+        ):
+            return self.collection
+        versions = self._versions()
+        return f"{self.alias}@v{versions[-1]}" if versions else None
+
+    def next_version(self) -> str:
+        versions = self._versions()
+        return f"{self.alias}@v{(versions[-1] if versions else 0) + 1}"
+
+    def switch(self, target: str) -> None:
+        ops: List[Any] = []
+        if any(a.alias_name == self.alias for a in self.client.get_aliases().aliases):
+            ops.append(
+                models.DeleteAliasOperation(
+                    delete_alias=models.DeleteAlias(alias_name=self.alias)
+                )
+            )
+        ops.append(
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(
+                    collection_name=target, alias_name=self.alias
+                )
+            )
+        )
+        # o Qdrant aplica a lista inteira de uma vez (troca atômica)
+        self.client.update_collection_aliases(change_aliases_operations=ops)
+        set_lexical_pointer(self.alias, target)
+        log.info("alias %s -> %s", self.alias, target)
+
+    # -------- checkpoint --------
+    def _checkpoint_path(self, target: str) -> pathlib.Path:
+        return self.checkpoint_dir / f"{target}.json"
+
+    def _load_checkpoint(self, target: str) -> Optional[RebuildCheckpoint]:
+        p = self._checkpoint_path(target)
+        if not p.exists():
+            return None
+        return RebuildCheckpoint(**json.loads(p.read_text(encoding="utf-8")))
+
+    def _save_checkpoint(self, cp: RebuildCheckpoint) -> None:
+        p = self._checkpoint_path(cp.target)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(asdict(cp)), encoding="utf-8")
+        os.replace(tmp, p)
+
+    # -------- rebuild --------
+    def run(
+        self,
+        target: Optional[str] = None,
+        source: Optional[str] = None,
+        switch: bool = True,
+    ) -> RebuildReport:
+        target = target or self.next_version()
+        cp = self._load_checkpoint(target)
+        if cp is not None and source not in (None, cp.source):
+            cp = None  # checkpoint de outro rebuild: recomeça
+        source = source or (cp.source if cp else self.current())
+        if source is None:
+            raise RuntimeError(f"nenhuma coleção encontrada para o alias {self.alias}")
+        if target == source:
+            raise ValueError("target deve ser diferente da coleção em produção")
+
+        indexer = QdrantIndexer(
+            self.client,
+            target,
+            self.embedder,
+            self.profile,
+            rescore_embedder=self.rescore_embedder,
+            lexical=self.lexical,
+        )
+        if indexer.sparse:
+            indexer.avgdl = load_avgdl(target) or self._measure_avgdl(source, target)
+        cp = cp or RebuildCheckpoint(source=source, target=target)
+        started = time.perf_counter()
+        resumed_from = cp.processed
+        while not cp.done:
+            points, next_offset = self.client.scroll(
+                collection_name=source,
+                limit=self.batch_size,
+                offset=cp.offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            recs = [p.payload for p in points if p.payload and p.payload.get("chunk_text")]
+            cp.processed += indexer.upsert_records(recs)
+            cp.offset = next_offset
+            cp.done = next_offset is None
+            self._save_checkpoint(cp)
+            self._report(cp, started, resumed_from)
+
+        # pega pontos gravados na coleção viva durante a varredura; repete até
+        # uma passada não achar nada (ou MAX_CATCH_UP passadas)
+        for _ in range(MAX_CATCH_UP):
+            synced = self._catch_up(source, indexer)
+            cp.processed += synced
+            if not synced:
+                break
+        if switch:
+            self.switch(target)
+            # depois da troca as escritas vão para o alias (target) e a origem
+            # fica parada: o que entrou nela entre a última passada e o switch
+            # é copiado agora, sem sobrescrever nem apagar o que já está no
+            # destino (podem ser escritas novas)
+            cp.processed += self._catch_up(source, indexer, missing_only=True)
+        elapsed = time.perf_counter() - started
+        done = cp.processed - resumed_from
+        report = RebuildReport(
+            source=source,
+            target=target,
+            processed=cp.processed,
+            seconds=round(elapsed, 3),
+            chunks_per_s=round(done / elapsed, 2) if elapsed > 0 else 0.0,
+            switched=switch,
+        )
+        self.progress = asdict(report)
+        return report
+
+    def _measure_avgdl(self, source: str, target: str) -> float:
+        """Passada só de payloads para medir o tamanho médio dos chunks."""
+
+        def texts():
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=source,
+                    limit=max(self.batch_size, 256),
+                    offset=offset,
+                    with_payload=["chunk_text"],
+                    with_vectors=False,
+                )
+                for p in points:
+                    if p.payload and p.payload.get("chunk_text"):
+                        yield p.payload["chunk_text"]
+                if offset is None:
+                    return
+
+        avgdl, docs = corpus_avgdl(texts())
+        save_corpus_stats(target, avgdl, docs)
+        log.info("avgdl de %s: %.1f tokens (%d chunks)", target, avgdl, docs)
+        return avgdl
+
+    def _catch_up(
+        self, source: str, indexer: QdrantIndexer, missing_only: bool = False
+    ) -> int:
+        """Sincroniza o que mudou na coleção viva durante a varredura:
+        pontos novos ou com payload alterado são re-embedados e os que
+        sumiram da origem são apagados do destino. Com `missing_only`, só
+        copia os pontos que o destino ainda não tem."""
+        synced = 0
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=source,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            if points:
+                have = {
+                    str(p.id): _payload_hash(p.payload)
+                    for p in self.client.retrieve(
+                        indexer.collection, ids=[p.id for p in points], with_payload=True
+                    )
+                }
+                recs = [
+                    p.payload
+                    for p in points
+                    if p.payload
+                    and p.payload.get("chunk_text")
+                    and (
+                        str(p.id) not in have
+                        if missing_only
+                        else have.get(str(p.id)) != _payload_hash(p.payload)
+                    )
+                ]
+                synced += indexer.upsert_records(recs)
+            if offset is None:
+                break
+        if missing_only:
+            return synced
+        return synced + self._drop_deleted(source, indexer)
+
+    def _drop_deleted(self, source: str, indexer: QdrantIndexer) -> int:
+        dropped = 0
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=indexer.collection,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            ids = [p.id for p in points]
+            if ids:
+                alive = {
+                    str(p.id)
+                    for p in self.client.retrieve(source, ids=ids, with_payload=False)
+                }
+                dropped += indexer.delete_ids([i for i in ids if str(i) not in alive])
+            if offset is None:
+                return dropped
+
+    def _report(self, cp: RebuildCheckpoint, started: float, resumed_from: int) -> None:
+        elapsed = time.perf_counter() - started
+        rate = (cp.processed - resumed_from) / elapsed if elapsed > 0 else 0.0
+        self.progress = {
+            "source": cp.source,
+            "target": cp.target,
+            "processed": cp.processed,
+            "chunks_per_s": round(rate, 2),
+            "done": cp.done,
+        }
+        log.info(
+            "rebuild %s -> %s: %d chunks (%.1f/s)",
+            cp.source,
+            cp.target,
+            cp.processed,
+            rate,
+        )
+
+    def start(self, **kwargs) -> threading.Thread:
+        """Executa `run` em background; acompanhe via `self.progress`."""
+        t = threading.Thread(target=self.run, kwargs=kwargs, daemon=True)
+        t.start()
+        return t
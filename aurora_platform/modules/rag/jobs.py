@@ -0,0 +1,537 @@
+"""Jobs de ingestão: crawler -> indexador.
+
+Cada job recebe fontes (caminhos, URLs — `{"url": ...}` quando vêm da API —
+ou texto bruto) e as passa por load -> normalize -> chunk (até `concurrency`
+documentos em paralelo, fora do event loop) e, por uma fila limitada, para
+um único consumidor que faz embed -> upsert em lotes de `batch_size` chunks. Progresso, tempos por etapa
+e falhas ficam num sqlite (`JobStore`), consultável de qualquer processo.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+STAGES = ("load", "normalize", "chunk", "embed", "upsert")
+
+SourceSpec = Union[str, Dict[str, Any]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    timings TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    chunks INTEGER,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class StageError(Exception):
+    def __init__(self, stage: str, error: BaseException) -> None:
+        self.stage = stage
+        self.message = f"{type(error).__name__}: {error}"
+        super().__init__(f"{stage}: {self.message}")
+
+
+def _merge(total: Dict[str, float], part: Dict[str, float]) -> None:
+    for k, v in part.items():
+        total[k] = total.get(k, 0.0) + v
+
+
+def describe(spec: SourceSpec) -> str:
+    """Rótulo da fonte no job (texto bruto não é guardado inteiro)."""
+    if isinstance(spec, str):
+        return spec
+    return spec.get("source") or spec.get("url") or f"text:{len(spec.get('content', ''))}"
+
+
+def load_source(spec: SourceSpec) -> Tuple[str, str, str]:
+    """(texto, media_type, source) de um caminho, URL ou texto bruto."""
+    if isinstance(spec, dict):
+        return (
+            spec["content"],
+            spec.get("media_type") or spec.get("document_type") or "text",
+            spec.get("source") or f"inline:{uuid.uuid4().hex[:12]}",
+        )
+    from aurora_platform.modules.crawler.batch import load_item
+
+    text, media = load_item(spec)
+    return text, media, spec
+
+
+def prepare_source(spec: SourceSpec) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """load -> normalize -> chunk de uma fonte: (payloads do indexador, tempos)."""
+    from aurora_platform.modules.crawler.pipeline import run_ingestion, to_index_record
+
+    timings: Dict[str, float] = {}
+    if isinstance(spec, str) or "url" in spec:
+        from aurora_platform.modules.crawler.batch import guarded_client, ingest_item
+
+        # caminhos e URLs: PDF/DOCX em streaming, com a página nos chunks;
+        # {"url": ...} vem da API e só segue redirects para hosts permitidos
+        source = spec if isinstance(spec, str) else spec["url"]
+        client = None if isinstance(spec, str) else guarded_client(spec.get("allowed_hosts") or ())
+        try:
+            rec = ingest_item(source, timings=timings, client=client)
+        except Exception as e:
+            raise StageError("chunk" if "load" in timings else "load", e) from e
+        return [to_index_record(ch, url=source) for ch in rec["chunks"]], timings
+    t0 = time.perf_counter()
+    try:
+        text, media, source = load_source(spec)
+    except Exception as e:
+        raise StageError("load", e) from e
+    timings["load"] = time.perf_counter() - t0
+    try:
+        rec = run_ingestion(content=text, media_type=media, source=source, timings=timings)
+    except Exception as e:
+        raise StageError("chunk", e) from e
+    title = (spec.get("metadata") or {}).get("title")
+    return [to_index_record(ch, url=source, title=title) for ch in rec["chunks"]], timings
+
+
+def iter_source(
+    spec: SourceSpec, batch_size: int, timings: Dict[str, float]
+) -> Iterator[List[Dict[str, Any]]]:
+    """`prepare_source` em lotes de até `batch_size` payloads.
+
+    PDF/DOCX locais saem direto de `iter_pdf_chunks`/`iter_docx_chunks`,
+    conforme as páginas/seções são extraídas (o documento inteiro nunca fica
+    em memória); o resto vem de `prepare_source` em um lote só. `timings`
+    acumula só o tempo gasto aqui, não o de quem consome os lotes.
+    """
+    from aurora_platform.modules.crawler.batch import is_url, local_kind
+
+    kind = local_kind(spec) if isinstance(spec, str) and not is_url(spec) else ""
+    if kind not in ("pdf", "docx"):
+        recs, local = prepare_source(spec)
+        _merge(timings, local)
+        yield recs
+        return
+    from aurora_platform.modules.crawler.pipeline import (
+        iter_docx_chunks,
+        iter_pdf_chunks,
+        to_index_record,
+    )
+
+    batch: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    try:
+        for ch in iter_pdf_chunks(spec) if kind == "pdf" else iter_docx_chunks(spec):
+            batch.append(to_index_record(ch, url=spec))
+            if len(batch) >= batch_size:
+                _merge(timings, {"load": time.perf_counter() - t0})
+                yield batch
+                batch = []
+                t0 = time.perf_counter()
+    except Exception as e:
+        # extração e chunking são intercalados (como em `run_file_ingestion`)
+        raise StageError("load", e) from e
+    _merge(timings, {"load": time.perf_counter() - t0})
+    if batch:
+        yield batch
+
+
+def index_records(indexer: Any, recs: List[Dict[str, Any]]) -> Dict[str, float]:
+    """embed -> upsert; ids de ponto determinísticos tornam a repetição idempotente."""
+    timings: Dict[str, float] = {}
+    if not recs:
+        return timings
+    try:
+        indexer.upsert_records(recs, timings)
+    except Exception as e:
+        # o indexador só registra o tempo de embed quando ele termina
+        raise StageError("upsert" if "embed" in timings else "embed", e) from e
+    return timings
+
+
+class JobStore:
+    def __init__(self, path: str = "artifacts/jobs/jobs.sqlite") -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def create(self, sources: Sequence[SourceSpec]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "INSERT INTO jobs (id, status, total, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, len(sources), time.time()),
+            )
+            self.conn.executemany(
+                "INSERT INTO job_items (job_id, idx, source, status) VALUES (?, ?, ?, ?)",
+                [(job_id, i, describe(s), QUEUED) for i, s in enumerate(sources)],
+            )
+            self.conn.execute("COMMIT")
+        return job_id
+
+    def start(self, job_id: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (RUNNING, time.time(), job_id),
+            )
+
+    def item_done(self, job_id: str, idx: int, chunks: int) -> None:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "UPDATE job_items SET status = ?, chunks = ? WHERE job_id = ? AND idx = ?",
+                (DONE, chunks, job_id, idx),
+            )
+            self.conn.execute(
+                "UPDATE jobs SET done = done + 1, chunks = chunks + ? WHERE id = ?",
+                (chunks, job_id),
+            )
+            self.conn.execute("COMMIT")
+
+    def item_failed(self, job_id: str, idx: int, stage: str, error: str) -> None:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "UPDATE job_items SET status = ?, stage = ?, error = ? "
+                "WHERE job_id = ? AND idx = ?",
+                (FAILED, stage, error, job_id, idx),
+            )
+            self.conn.execute("UPDATE jobs SET failed = failed + 1 WHERE id = ?", (job_id,))
+            self.conn.execute("COMMIT")
+
+    def set_timings(self, job_id: str, timings: Dict[str, float]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET timings = ? WHERE id = ?",
+                (json.dumps({k: round(v, 4) for k, v in timings.items()}), job_id),
+            )
+
+    def finish(self, job_id: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (FAILED if error else DONE, error, time.time(), job_id),
+            )
+
+    def get(self, job_id: str, failures: int = 50) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id, status, total, done, failed, chunks, timings, error, "
+                "created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            errs = self.conn.execute(
+                "SELECT source, stage, error FROM job_items "
+                "WHERE job_id = ? AND status = ? ORDER BY idx LIMIT ?",
+                (job_id, FAILED, failures),
+            ).fetchall()
+        keys = ("id", "status", "total", "done", "failed", "chunks", "timings", "error",
+                "created_at", "started_at", "finished_at")
+        job = dict(zip(keys, row))
+        job["timings"] = json.loads(job["timings"])
+        job["failures"] = [{"source": s, "stage": st, "error": e} for s, st, e in errs]
+        end = job["finished_at"] or time.time()
+        elapsed = end - job["started_at"] if job["started_at"] else 0.0
+        job["docs_per_s"] = round((job["done"] + job["failed"]) / elapsed, 2) if elapsed else 0.0
+        return job
+
+
+class IngestionJobRunner:
+    """Executa jobs no event loop corrente. O indexador é criado sob demanda
+    (`indexer_factory`, padrão `QdrantIndexer.from_env`) na primeira execução."""
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        indexer: Any = None,
+        indexer_factory: Optional[Callable[[], Any]] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        queue_size: int = 32,
+        work_queue: Any = None,
+    ) -> None:
+        """Com `work_queue` (ver `workqueue.open_queue`) os jobs só são
+        enfileirados; quem executa são os `IngestionWorker` de cada host."""
+        self.store = store or JobStore()
+        self.work_queue = work_queue
+        self._indexer = indexer
+        self._indexer_factory = indexer_factory
+        self.concurrency = concurrency or int(os.getenv("INGEST_CONCURRENCY", "4"))
+        self.batch_size = batch_size or int(os.getenv("INGEST_BATCH_SIZE", "64"))
+        self.queue_size = queue_size
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _get_indexer(self) -> Any:
+        if self._indexer is None:
+            if self._indexer_factory is not None:
+                self._indexer = self._indexer_factory()
+            else:
+                from aurora_platform.modules.rag.indexer.qdrant_indexer import QdrantIndexer
+
+                self._indexer = QdrantIndexer.from_env()
+        return self._indexer
+
+    def submit(self, sources: Sequence[SourceSpec]) -> str:
+        """Cria o job e agenda a execução; retorna o id imediatamente."""
+        sources = list(sources)
+        job_id = self.store.create(sources)
+        if self.work_queue is not None:
+            self.work_queue.enqueue(
+                job_id, [(i, spec, describe(spec)) for i, spec in enumerate(sources)]
+            )
+            return job_id
+        task = asyncio.get_running_loop().create_task(self.run(job_id, sources))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(job_id)
+        if job is None or self.work_queue is None:
+            return job
+        # jobs distribuídos: o progresso está na fila compartilhada
+        prog = self.work_queue.progress(job_id)
+        finished = prog.pop("finished")
+        job.update(prog)
+        started = job["done"] or job["failed"] or prog.get("leased")
+        job["status"] = DONE if finished else RUNNING if started else QUEUED
+        return job
+
+    async def wait(self, job_id: str) -> Optional[Dict[str, Any]]:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.status(job_id)
+
+    async def run(self, job_id: str, sources: Sequence[SourceSpec]) -> None:
+        self.store.start(job_id)
+        timings: Dict[str, float] = {s: 0.0 for s in STAGES}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        sem = asyncio.Semaphore(self.concurrency)
+        chunks: Dict[int, int] = {}
+        failed: Set[int] = set()
+
+        def fail(idx: int, err: StageError) -> None:
+            # uma fonte falha uma vez só (produtor ou consumidor, o que vier antes)
+            if idx not in failed:
+                failed.add(idx)
+                self.store.item_failed(job_id, idx, err.stage, err.message)
+
+        async def produce(idx: int, spec: SourceSpec) -> None:
+            local: Dict[str, float] = {}
+            async with sem:
+                # lotes saem conforme a extração anda; a fila cheia segura o
+                # produtor, então um PDF grande não é carregado inteiro
+                it = iter_source(spec, self.batch_size, local)
+                try:
+                    while (recs := await asyncio.to_thread(next, it, None)) is not None:
+                        await queue.put((idx, recs, False))
+                except Exception as e:
+                    fail(idx, e if isinstance(e, StageError) else StageError("load", e))
+                    return
+                finally:
+                    _merge(timings, local)
+            await queue.put((idx, [], True))
+
+        async def consume() -> None:
+            done = False
+            while not done:
+                batch: List[Tuple[int, List[Dict[str, Any]], bool]] = []
+                size = 0
+                while size < self.batch_size:
+                    if batch and queue.empty():
+                        break
+                    item = await queue.get()
+                    if item is None:
+                        done = True
+                        break
+                    batch.append(item)
+                    size += len(item[1])
+                if batch:
+                    try:
+                        await self._index([r for _, rs, _ in batch for r in rs], timings)
+                    except StageError as e:
+                        for idx, _, _ in batch:
+                            fail(idx, e)
+                    for idx, rs, last in batch:
+                        chunks[idx] = chunks.get(idx, 0) + len(rs)
+                        if last and idx not in failed:
+                            self.store.item_done(job_id, idx, chunks.pop(idx))
+                self.store.set_timings(job_id, timings)
+
+        async def feed() -> None:
+            await asyncio.gather(*(produce(i, s) for i, s in enumerate(sources)))
+            await queue.put(None)
+
+        consumer = asyncio.create_task(consume())
+        feeder = asyncio.create_task(feed())
+        try:
+            # se o consumidor morre, os produtores ficariam presos na fila cheia
+            done, _ = await asyncio.wait(
+                (feeder, consumer), return_when=asyncio.FIRST_EXCEPTION
+            )
+            for t in done:
+                t.result()
+            await consumer
+        except BaseException as e:
+            self.store.set_timings(job_id, timings)
+            self.store.finish(job_id, error=f"{type(e).__name__}: {e}")
+            if not isinstance(e, Exception):
+                raise
+            logging.exception("job de ingestão %s falhou", job_id)
+            return
+        finally:
+            for t in (feeder, consumer):
+                t.cancel()
+        self.store.set_timings(job_id, timings)
+        self.store.finish(job_id)
+
+    async def _index(self, recs: List[Dict[str, Any]], timings: Dict[str, float]) -> None:
+        if not recs:
+            return
+        try:
+            indexer = await asyncio.to_thread(self._get_indexer)
+            local = await asyncio.to_thread(index_records, indexer, recs)
+        except StageError:
+            raise
+        except Exception as e:
+            # ex.: a fábrica do indexador falhou; conta como falha do lote
+            raise StageError("embed", e) from e
+        _merge(timings, local)
+
+
+class IngestionWorker:
+    """Consome a fila compartilhada: arrenda itens, mantém o arrendamento com
+    heartbeats enquanto carrega/chunka/indexa e confirma com `ack`. Rode um
+    por processo (`aurora-rag ingest-worker`); a vazão soma entre processos e
+    hosts porque não há estado compartilhado além da fila e do Qdrant."""
+
+    def __init__(
+        self,
+        work_queue: Any,
+        indexer: Any = None,
+        indexer_factory: Optional[Callable[[], Any]] = None,
+        worker_id: Optional[str] = None,
+        lease_s: Optional[float] = None,
+        prefetch: int = 1,
+        poll_s: float = 1.0,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        self.queue = work_queue
+        self._indexer = indexer
+        self._indexer_factory = indexer_factory
+        self.worker_id = worker_id or f"{os.uname().nodename}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_s = lease_s or float(os.getenv("INGEST_LEASE_S", "60"))
+        self.prefetch = prefetch
+        self.poll_s = poll_s
+        self.batch_size = batch_size or int(os.getenv("INGEST_BATCH_SIZE", "64"))
+        self.processed = 0
+        self.failed = 0
+        self._held: Dict[str, Any] = {}
+        self._held_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _get_indexer(self) -> Any:
+        if self._indexer is None:
+            if self._indexer_factory is not None:
+                self._indexer = self._indexer_factory()
+            else:
+                from aurora_platform.modules.rag.indexer.qdrant_indexer import QdrantIndexer
+
+                self._indexer = QdrantIndexer.from_env()
+        return self._indexer
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _heartbeats(self) -> None:
+        while not self._stop.wait(self.lease_s / 3):
+            with self._held_lock:
+                items = list(self._held.values())
+            for item in items:
+                if not self.queue.heartbeat(item, self.lease_s):
+                    logging.warning("arrendamento perdido: %s", item.id)
+
+    def process(self, item: Any) -> bool:
+        """Processa um item arrendado; True se confirmado (ack aceito)."""
+        timings: Dict[str, float] = {}
+        chunks = 0
+        try:
+            # PDF/DOCX locais são indexados em lotes conforme a extração anda
+            for recs in iter_source(item.spec, self.batch_size, timings):
+                _merge(timings, index_records(self._get_indexer(), recs))
+                chunks += len(recs)
+        except StageError as e:
+            # erro de chunk é do documento: repetir não adianta; carga (rede) e
+            # indexação podem ser transitórias
+            self.queue.nack(item, e.stage, e.message, retry=e.stage != "chunk")
+            self.failed += 1
+            return False
+        except Exception as e:
+            self.queue.nack(item, "worker", f"{type(e).__name__}: {e}")
+            self.failed += 1
+            return False
+        ok = self.queue.ack(item, chunks, timings)
+        if ok:
+            self.processed += 1
+        return ok
+
+    def run(self, max_items: Optional[int] = None, stop_when_idle: bool = False) -> int:
+        """Processa até `max_items` (ou para sempre). Retorna itens confirmados."""
+        hb = threading.Thread(target=self._heartbeats, daemon=True)
+        hb.start()
+        try:
+            while not self._stop.is_set():
+                if max_items is not None and self.processed + self.failed >= max_items:
+                    break
+                items = self.queue.lease(self.worker_id, self.prefetch, self.lease_s)
+                if not items:
+                    if stop_when_idle and not self.queue.pending():
+                        break
+                    self._stop.wait(self.poll_s)
+                    continue
+                with self._held_lock:
+                    self._held.update((i.id, i) for i in items)
+                for item in items:
+                    try:
+                        self.process(item)
+                    finally:
+                        with self._held_lock:
+                            self._held.pop(item.id, None)
+        finally:
+            self._stop.set()
+            hb.join()
+        return self.processed
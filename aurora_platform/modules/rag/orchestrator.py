@@ -1,12 +1,44 @@
 # src/aurora_platform/modules/rag/orchestrator.py
 
+import os
+from typing import Any, Dict, List, Optional, Union
+
+from aurora_platform.modules.rag.jobs import IngestionJobRunner
+
+
+def default_runner() -> IngestionJobRunner:
+    """Runner usado pela API.
+
+    Com `INGEST_QUEUE_URL` (`redis://...` ou caminho sqlite) os jobs só são
+    enfileirados e quem os executa são os workers
+    (`python -m aurora_platform.modules.rag.cli ingest-worker`); sem ela,
+    rodam no próprio processo da API.
+    """
+    url = os.getenv("INGEST_QUEUE_URL")
+    if url:
+        from aurora_platform.modules.rag.workqueue import open_queue
+
+        return IngestionJobRunner(work_queue=open_queue(url))
+    return IngestionJobRunner()
+
 
 class AuroraIngestionOrchestrator:
-    """Orchestrator for managing document ingestion and RAG processing."""
+    """Orchestrator for managing document ingestion and RAG processing.
+
+    A ingestão roda como job em segundo plano (`IngestionJobRunner`, ver
+    `default_runner`); os métodos retornam o id do job na hora e o status é
+    consultado depois.
+    """
+
+    _shared_runner: Optional[IngestionJobRunner] = None
 
-    def __init__(self):
-        """Initialize the ingestion orchestrator."""
-        pass
+    def __init__(self, runner: Optional[IngestionJobRunner] = None):
+        """Initialize the ingestion orchestrator (runner compartilhado por padrão)."""
+        if runner is None:
+            if AuroraIngestionOrchestrator._shared_runner is None:
+                AuroraIngestionOrchestrator._shared_runner = default_runner()
+            runner = AuroraIngestionOrchestrator._shared_runner
+        self.runner = runner
 
     async def ingest_document(self, document_data: dict) -> dict:
         """
@@ -16,7 +48,22 @@ class AuroraIngestionOrchestrator:
             document_data: Dictionary containing document information
 
         Returns:
-            Dictionary with ingestion result
+            Dictionary with the accepted job id
         """
-        # TODO: Implement document ingestion logic
-        return {"status": "success", "message": "Document ingested successfully"}
+        spec = {
+            "content": document_data["content"],
+            "media_type": document_data.get("document_type") or "text",
+            "metadata": document_data.get("metadata") or {},
+        }
+        source = spec["metadata"].get("source")
+        if source:
+            spec["source"] = source
+        return await self.ingest_sources([spec])
+
+    async def ingest_sources(self, sources: List[Union[str, Dict[str, Any]]]) -> dict:
+        """Caminhos, URLs ou documentos em texto; retorna o id do job."""
+        job_id = self.runner.submit(sources)
+        return {"status": "accepted", "job_id": job_id, "total": len(sources)}
+
+    def job_status(self, job_id: str) -> Optional[dict]:
+        return self.runner.status(job_id)
@@ -1,12 +1,28 @@
 from __future__ import annotations
 from typing import List, Dict, Any, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 import os
+import time
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import ScoredPoint
+from qdrant_client.models import (
+    Fusion,
+    FusionQuery,
+    Prefetch,
+    QueryRequest,
+    ScoredPoint,
+)
 from fastembed import TextEmbedding
+from aurora_platform.modules.rag.indexer.profiles import (
+    CollectionProfile,
+    collection_vectors,
+    get_profile,
+    search_params,
+)
+from aurora_platform.modules.rag.indexer.qdrant_indexer import FAST_VECTOR, FULL_VECTOR
 from .lexical_bm25 import LexicalBM25
+from .sparse_bm25 import SPARSE_VECTOR, lexical_backend, query_sparse
 
 
 @dataclass
@@ -17,6 +33,17 @@ class Hit:
     source: str  # "vec" | "bm25" | "rerank"
 
 
+def _as_floats(vec) -> List[float]:
+    return [float(x) for x in vec]
+
+
+def _to_hits(pts: List[ScoredPoint], source: str) -> List[Hit]:
+    return [
+        Hit(id=str(p.id), score=float(p.score), payload=p.payload or {}, source=source)
+        for p in pts
+    ]
+
+
 def rrf_fuse(
     vec_hits: List[Hit], lex_hits: List[Hit], k0: int = 60, top_k: int = 10
 ) -> List[Hit]:
@@ -44,22 +71,113 @@ def rrf_fuse(
 
 
 class VectorSearch:
-    def __init__(self, collection: str, qdrant_url: str, embed_model: str):
+    """Busca densa. Em coleções de dois níveis (vetores `fast` + `full`), faz o
+    ANN no vetor pequeno e reavalia os `rescore_candidates` melhores com o
+    vetor grande já armazenado, num único `query_points` (prefetch). O modelo
+    grande só é carregado/executado quando a coleção tem o vetor `full`."""
+
+    LAYOUT_TTL_S = 30.0  # relê o layout (o alias pode trocar de coleção)
+
+    def __init__(
+        self,
+        collection: str,
+        qdrant_url: str,
+        embed_model: str,
+        profile: CollectionProfile | None = None,
+        rescore_model: str | None = None,
+        rescore_candidates: int | None = None,
+        client: QdrantClient | None = None,
+        embedder: Any = None,
+        rescore_embedder: Any = None,
+    ):
         self.collection = collection
-        self.client = QdrantClient(url=qdrant_url)
-        self.embedder = TextEmbedding(model_name=embed_model)
+        self.client = client or QdrantClient(url=qdrant_url)
+        self.embedder = embedder or TextEmbedding(model_name=embed_model)
+        self.params = search_params(profile or get_profile())
+        self.rescore_model = rescore_model
+        self.rescore_candidates = rescore_candidates or int(
+            os.getenv("RESCORE_CANDIDATES", "100")
+        )
+        self._rescore_embedder = rescore_embedder
+        self._layout: Dict[str, int] = {}
+        self._layout_at = 0.0
+        self._embed_fast = lru_cache(maxsize=256)(
+            lambda q: _as_floats(next(iter(self.embedder.embed([q]))))
+        )
+        self._embed_full = lru_cache(maxsize=256)(
+            lambda q: _as_floats(next(iter(self._full_embedder().embed([q]))))
+        )
+
+    def _full_embedder(self):
+        if self._rescore_embedder is None:
+            self._rescore_embedder = TextEmbedding(model_name=self.rescore_model)
+        return self._rescore_embedder
+
+    def _two_tier(self) -> bool:
+        now = time.monotonic()
+        if not self._layout or now - self._layout_at > self.LAYOUT_TTL_S:
+            self._layout = collection_vectors(self.client, self.collection)
+            self._layout_at = now
+        can_rescore = self._rescore_embedder is not None or bool(self.rescore_model)
+        return FAST_VECTOR in self._layout and FULL_VECTOR in self._layout and can_rescore
 
-    def search(self, query: str, top_k: int = 10) -> List[Hit]:
-        vec = list(self.embedder.embed([query]))[0]
-        pts: List[ScoredPoint] = self.client.search(
-            collection_name=self.collection, query_vector=vec, limit=top_k
+    def _dense(self, query: str, limit: int, rescore: bool = True) -> Dict[str, Any]:
+        """Parâmetros da consulta densa (já com prefetch quando há rescoring)."""
+        fast = self._embed_fast(query)
+        if self._two_tier() and rescore:
+            return {
+                "prefetch": Prefetch(
+                    query=fast,
+                    using=FAST_VECTOR,
+                    limit=max(limit, self.rescore_candidates),
+                    params=self.params,
+                ),
+                "query": self._embed_full(query),
+                "using": FULL_VECTOR,
+            }
+        return {
+            "query": fast,
+            "using": FAST_VECTOR if FAST_VECTOR in self._layout else None,
+            "params": self.params,
+        }
+
+    def search(self, query: str, top_k: int = 10, rescore: bool = True) -> List[Hit]:
+        dense = self._dense(query, top_k, rescore)
+        dense["search_params"] = dense.pop("params", None)
+        pts: List[ScoredPoint] = self.client.query_points(
+            collection_name=self.collection, limit=top_k, with_payload=True, **dense
+        ).points
+        return _to_hits(pts, "vec")
+
+    def hybrid(
+        self, query: str, k_vec: int = 20, k_lex: int = 20, k_out: int = 10
+    ) -> Tuple[List[Hit], List[Hit], List[Hit]]:
+        """Denso, esparso (BM25) e fusão RRF num único round trip ao Qdrant."""
+        dense = self._dense(query, k_vec)
+        sparse = query_sparse(query)
+        requests = [
+            QueryRequest(limit=k_vec, with_payload=True, **dense),
+            QueryRequest(
+                query=sparse, using=SPARSE_VECTOR, limit=k_lex, with_payload=True
+            ),
+            QueryRequest(
+                prefetch=[
+                    Prefetch(limit=k_vec, **dense),
+                    Prefetch(query=sparse, using=SPARSE_VECTOR, limit=k_lex),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=k_out,
+                with_payload=True,
+            ),
+        ]
+        vec, lex, fused = self.client.query_batch_points(
+            collection_name=self.collection, requests=requests
+        )
+        return (
+            _to_hits(vec.points, "vec"),
+            _to_hits(lex.points, "bm25"),
+            _to_hits(fused.points, "hybrid"),
         )
-        hits: List[Hit] = []
-        for p in pts:
-            hits.append(
-                Hit(id=str(p.id), score=float(p.score), payload=p.payload, source="vec")
-            )
-        return hits
 
 
 class HybridSearchService:
@@ -69,8 +187,11 @@ class HybridSearchService:
             collection,
             os.getenv("QDRANT_URL", "http://localhost:6333"),
             os.getenv("EMBEDDINGS_MODEL", "BAAI/bge-small-en-v1.5"),
+            rescore_model=os.getenv("EMBEDDINGS_MODEL_RESCORE"),
         )
-        self.lex = LexicalBM25(collection)
+        # com o backend esparso o corpus lexical fica só no Qdrant
+        self.backend = lexical_backend()
+        self.lex = LexicalBM25(collection) if self.backend != "sparse" else None
 
     def query(
         self,
@@ -80,6 +201,8 @@ class HybridSearchService:
         k_out: int = 10,
         enable_lex: bool = True,
     ) -> List[Hit]:
+        if enable_lex and self.lex is None:
+            return self.vec.hybrid(q, k_vec=k_vec, k_lex=k_lex, k_out=k_out)[2]
         vec_hits = self.vec.search(q, top_k=k_vec)
         if enable_lex:
             lex_raw = self.lex.search(q, top_k=k_lex)
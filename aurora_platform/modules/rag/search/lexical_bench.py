@@ -0,0 +1,122 @@
+"""Compara o BM25 em processo (rank_bm25 + JSONL) com o vetor esparso no Qdrant.
+
+Mede carga/RAM do corpus em processo (tracemalloc), latência p50/p95 por
+consulta e a sobreposição do top-k esparso com o top-k do rank_bm25. Com um
+`VectorSearch`, compara também o híbrido em dois sistemas (denso + BM25 +
+`rrf_fuse`) com o híbrido num único round trip (`VectorSearch.hybrid`).
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from qdrant_client import QdrantClient
+
+from aurora_platform.modules.rag.indexer.profile_bench import percentile
+from .hybrid import VectorSearch, rrf_fuse, Hit
+from .lexical_bm25 import LexicalBM25
+from .sparse_bm25 import SPARSE_VECTOR, query_sparse
+
+
+@dataclass
+class LexicalBenchResult:
+    backend: str
+    load_ms: float
+    ram_mb: float  # corpus mantido no processo (por worker)
+    p50_ms: float
+    p95_ms: float
+    overlap_at_k: float  # vs. top-k do rank_bm25 em processo
+
+
+def _timed(fn: Callable[[str], List[str]], queries: Sequence[str]):
+    lat: List[float] = []
+    out: List[List[str]] = []
+    for q in queries:
+        t0 = time.perf_counter()
+        out.append(fn(q))
+        lat.append((time.perf_counter() - t0) * 1000)
+    return out, lat
+
+
+def _overlap(a: List[List[str]], b: List[List[str]]) -> float:
+    vals = [len(set(x) & set(y)) / len(x) for x, y in zip(a, b) if x]
+    return round(statistics.mean(vals), 4) if vals else 0.0
+
+
+def _result(name, load_ms, ram_mb, lat, overlap) -> LexicalBenchResult:
+    return LexicalBenchResult(
+        backend=name,
+        load_ms=round(load_ms, 2),
+        ram_mb=round(ram_mb, 2),
+        p50_ms=round(statistics.median(lat), 3) if lat else 0.0,
+        p95_ms=round(percentile(lat, 0.95), 3),
+        overlap_at_k=overlap,
+    )
+
+
+def benchmark_lexical(
+    client: QdrantClient,
+    collection: str,
+    queries: Sequence[str],
+    top_k: int = 10,
+    vector_search: Optional[VectorSearch] = None,
+) -> List[LexicalBenchResult]:
+    bm = LexicalBM25(collection)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    bm._load()
+    load_ms = (time.perf_counter() - t0) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # rank_bm25 devolve top-k mesmo com score 0 (nenhum termo em comum)
+    ref, lat_bm = _timed(
+        lambda q: [h.id for h in bm.search(q, top_k) if h.score > 0], queries
+    )
+
+    def sparse(q: str) -> List[str]:
+        pts = client.query_points(
+            collection, query=query_sparse(q), using=SPARSE_VECTOR, limit=top_k
+        ).points
+        return [str(p.id) for p in pts]
+
+    got, lat_sp = _timed(sparse, queries)
+    results = [
+        _result("bm25_inproc", load_ms, peak / 2**20, lat_bm, 1.0),
+        _result("qdrant_sparse", 0.0, 0.0, lat_sp, _overlap(ref, got)),
+    ]
+    if vector_search is None:
+        return results
+
+    def two_systems(q: str) -> List[str]:
+        vec = vector_search.search(q, top_k=2 * top_k)
+        lex = [
+            Hit(id=h.id, score=h.score, payload=h.payload, source="bm25")
+            for h in bm.search(q, 2 * top_k)
+        ]
+        return [h.id for h in rrf_fuse(vec, lex, top_k=top_k)]
+
+    def one_call(q: str) -> List[str]:
+        fused = vector_search.hybrid(q, k_vec=2 * top_k, k_lex=2 * top_k, k_out=top_k)[2]
+        return [h.id for h in fused]
+
+    ref_h, lat_2 = _timed(two_systems, queries)
+    got_h, lat_1 = _timed(one_call, queries)
+    results.append(_result("hybrid_2_systems", load_ms, peak / 2**20, lat_2, 1.0))
+    results.append(_result("hybrid_1_call", 0.0, 0.0, lat_1, _overlap(ref_h, got_h)))
+    return results
+
+
+def format_table(results: List[LexicalBenchResult], top_k: int) -> str:
+    head = f"{'backend':<18}{'carga ms':>10}{'RAM MB':>9}{'p50 ms':>9}{'p95 ms':>9}{f'overlap@{top_k}':>12}"
+    rows = [head, "-" * len(head)]
+    for r in results:
+        rows.append(
+            f"{r.backend:<18}{r.load_ms:>10.1f}{r.ram_mb:>9.1f}{r.p50_ms:>9.2f}"
+            f"{r.p95_ms:>9.2f}{r.overlap_at_k:>12.3f}"
+        )
+    return "\n".join(rows)
@@ -4,15 +4,44 @@ from dataclasses import dataclass
 from rank_bm25 import BM25Okapi
 import pathlib
 import json
+import os
 import re
 
 TOKEN_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ0-9_]+")
+LEXICAL_DIR = pathlib.Path("artifacts/lexical")
 
 
 def tokenize(text: str) -> List[str]:
     return [t.lower() for t in TOKEN_RE.findall(text or "")]
 
 
+def _pointer_path(alias: str) -> pathlib.Path:
+    return LEXICAL_DIR / f"{alias}.current"
+
+
+def resolve_lexical(collection: str) -> str:
+    """Nome da coleção lexical efetiva: segue o ponteiro do alias, se houver."""
+    ptr = _pointer_path(collection)
+    try:
+        target = ptr.read_text(encoding="utf-8").strip()
+    except OSError:
+        return collection
+    return target or collection
+
+
+def lexical_path(collection: str) -> pathlib.Path:
+    return LEXICAL_DIR / f"{resolve_lexical(collection)}.jsonl"
+
+
+def set_lexical_pointer(alias: str, target: str) -> None:
+    """Aponta o alias lexical para `target` de forma atômica (write + rename)."""
+    LEXICAL_DIR.mkdir(parents=True, exist_ok=True)
+    ptr = _pointer_path(alias)
+    tmp = ptr.with_suffix(".current.tmp")
+    tmp.write_text(target, encoding="utf-8")
+    os.replace(tmp, ptr)
+
+
 @dataclass
 class BM25Hit:
     id: str
@@ -21,31 +50,46 @@ class BM25Hit:
 
 
 class LexicalBM25:
-    """BM25 carregado a partir do JSONL lexical salvo pelo indexador."""
+    """BM25 carregado a partir do JSONL lexical salvo pelo indexador.
+
+    `collection` pode ser um alias: o ponteiro lexical é relido a cada busca,
+    então uma troca blue/green recarrega o corpus sem reiniciar o processo.
+    """
 
     def __init__(self, collection: str):
         self.collection = collection
-        self.path = pathlib.Path("artifacts/lexical") / f"{collection}.jsonl"
+        self.path = lexical_path(collection)
         self._docs: List[str] = []
         self._ids: List[str] = []
         self._payloads: List[Dict[str, Any]] = []
         self._bm25: BM25Okapi | None = None
+        self._loaded: pathlib.Path | None = None
 
     def _load(self):
-        if self._bm25 is not None:
+        path = lexical_path(self.collection)
+        if self._loaded == path:
             return
+        self.path = self._loaded = path
         self._docs, self._ids, self._payloads = [], [], []
+        self._bm25 = None
         if not self.path.exists():
-            self._bm25 = BM25Okapi([[]])  # vazio (evita falha)
-            return
+            return  # vazio (evita falha)
+        # rebuilds retomados podem regravar linhas: vale a última por id;
+        # `deleted` é a lápide gravada por `QdrantIndexer.delete_ids`
+        rows: Dict[str, Dict[str, Any]] = {}
         with self.path.open("r", encoding="utf-8") as f:
             for line in f:
                 obj = json.loads(line)
-                self._ids.append(obj["id"])
-                self._docs.append(obj["text"])
-                self._payloads.append(obj["meta"])
-        tokenized_corpus = [tokenize(d) for d in self._docs]
-        self._bm25 = BM25Okapi(tokenized_corpus)
+                if obj.get("deleted"):
+                    rows.pop(obj["id"], None)
+                else:
+                    rows[obj["id"]] = obj
+        for obj in rows.values():
+            self._ids.append(obj["id"])
+            self._docs.append(obj["text"])
+            self._payloads.append(obj["meta"])
+        if self._docs:
+            self._bm25 = BM25Okapi([tokenize(d) for d in self._docs])
 
     def search(self, query: str, top_k: int = 10) -> List[BM25Hit]:
         self._load()
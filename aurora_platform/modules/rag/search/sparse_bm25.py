@@ -0,0 +1,111 @@
+"""BM25 como vetor esparso nativo do Qdrant.
+
+O lado do documento guarda a saturação de tf do BM25 (k1, b, avgdl); o IDF é
+aplicado pelo próprio Qdrant (`Modifier.IDF`) no lado da consulta. A análise
+de texto é a mesma do BM25 em processo (`tokenize`), então os dois backends
+são comparáveis termo a termo.
+
+`avgdl` é medido no corpus: o rebuild conta os tokens de todos os chunks e
+grava `<coleção>.stats.json` ao lado do JSONL lexical (seguindo o ponteiro
+do alias). Sem esse arquivo — coleção ainda não reconstruída — vale
+`BM25_AVGDL`, com aviso se nem ele foi definido.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import zlib
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+from qdrant_client import models
+
+from . import lexical_bm25
+from .lexical_bm25 import resolve_lexical, tokenize
+
+log = logging.getLogger(__name__)
+
+SPARSE_VECTOR = "bm25"
+K1 = 1.2
+B = 0.75
+
+
+def lexical_backend() -> str:
+    """`bm25` (JSONL + rank_bm25 em processo), `sparse` (Qdrant) ou `both`."""
+    return os.getenv("LEXICAL_BACKEND", "bm25").lower()
+
+
+def term_id(token: str) -> int:
+    # hash estável entre processos (hash() do Python é randomizado)
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _avgdl() -> float:
+    return float(os.getenv("BM25_AVGDL", "128"))
+
+
+def _stats_path(collection: str) -> pathlib.Path:
+    return lexical_bm25.LEXICAL_DIR / f"{resolve_lexical(collection)}.stats.json"
+
+
+def corpus_avgdl(texts: Iterable[str]) -> Tuple[float, int]:
+    """(média de tokens por chunk, nº de chunks) com a mesma `tokenize`."""
+    total = n = 0
+    for t in texts:
+        total += len(tokenize(t))
+        n += 1
+    return (total / n if n and total else _avgdl()), n
+
+
+def save_corpus_stats(collection: str, avgdl: float, docs: int) -> None:
+    path = lexical_bm25.LEXICAL_DIR / f"{collection}.stats.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({"avgdl": avgdl, "docs": docs}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_avgdl(collection: str) -> Optional[float]:
+    """avgdl gravado para a coleção (ou a versão atrás do alias)."""
+    try:
+        return float(json.loads(_stats_path(collection).read_text(encoding="utf-8"))["avgdl"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def resolve_avgdl(collection: str) -> float:
+    avgdl = load_avgdl(collection)
+    if avgdl is not None:
+        return avgdl
+    if "BM25_AVGDL" not in os.environ:
+        log.warning(
+            "%s sem avgdl medido; usando %s tokens (rode o rebuild ou defina BM25_AVGDL)",
+            collection,
+            _avgdl(),
+        )
+    return _avgdl()
+
+
+def doc_sparse(
+    text: str, k1: float = K1, b: float = B, avgdl: Optional[float] = None
+) -> models.SparseVector:
+    toks = tokenize(text)
+    if not toks:
+        return models.SparseVector(indices=[], values=[])
+    avgdl = avgdl or _avgdl()
+    norm = k1 * (1 - b + b * len(toks) / avgdl)
+    weights: dict[int, float] = {}
+    for tok, tf in Counter(toks).items():
+        tid = term_id(tok)
+        # colisões de hash somam os pesos dos termos
+        weights[tid] = weights.get(tid, 0.0) + tf * (k1 + 1) / (tf + norm)
+    return models.SparseVector(indices=list(weights), values=list(weights.values()))
+
+
+def query_sparse(text: str) -> models.SparseVector:
+    ids = sorted({term_id(t) for t in tokenize(text)})
+    return models.SparseVector(indices=ids, values=[1.0] * len(ids))
+
@@ -0,0 +1,450 @@
+"""Fila de trabalho compartilhada para workers de ingestão distribuídos.
+
+Cada fonte de um job vira um item. Um worker *arrenda* itens por
+`lease_s` segundos e renova o arrendamento com heartbeats enquanto processa;
+se o worker morre, o arrendamento expira e o item volta a ficar visível para
+outro worker (até `max_attempts`). Cada arrendamento tem um token: `ack` e
+`nack` de um worker que perdeu o item são recusados, então o progresso do job
+conta cada item uma vez só. Como os ids dos pontos no Qdrant são
+determinísticos, reprocessar um item sobrescreve os mesmos pontos.
+
+Backends: `RedisWorkQueue` (produção, vários hosts) e `SQLiteWorkQueue`
+(um host / testes), com a mesma interface.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import redis
+
+    _HAS_REDIS = True
+except Exception:
+    redis = None
+    _HAS_REDIS = False
+
+LEASE_S = float(os.getenv("INGEST_LEASE_S", "60"))
+MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+
+@dataclass
+class WorkItem:
+    id: str
+    job_id: str
+    idx: int
+    spec: Any
+    attempts: int
+    token: str
+
+
+def open_queue(url: Optional[str] = None, **kw: Any):
+    """`redis://...` -> RedisWorkQueue; caminho de arquivo -> SQLiteWorkQueue."""
+    url = url or os.getenv("INGEST_QUEUE_URL", "artifacts/jobs/queue.sqlite")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(url, **kw)
+    return SQLiteWorkQueue(url, **kw)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    spec TEXT NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    token TEXT,
+    worker TEXT,
+    chunks INTEGER,
+    stage TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS work_status ON work (status, lease_until);
+CREATE INDEX IF NOT EXISTS work_job ON work (job_id, status);
+CREATE TABLE IF NOT EXISTS job_timings (
+    job_id TEXT NOT NULL, stage TEXT NOT NULL, seconds REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+);
+"""
+
+
+class SQLiteWorkQueue:
+    def __init__(
+        self,
+        path: str = "artifacts/jobs/queue.sqlite",
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        self.max_attempts = max_attempts or MAX_ATTEMPTS
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SQLiteWorkQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _tx(self, fn, *args):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(*args)
+                self.conn.execute("COMMIT")
+                return out
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, job_id: str, items: Sequence[Tuple[int, Any, str]]) -> int:
+        """`items`: (idx, spec, rótulo da fonte)."""
+        rows = [
+            (f"{job_id}:{idx}", job_id, idx, json.dumps(spec, ensure_ascii=False), source, PENDING)
+            for idx, spec, source in items
+        ]
+        self._tx(
+            self.conn.executemany,
+            "INSERT OR IGNORE INTO work (id, job_id, idx, spec, source, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        return len(rows)
+
+    def lease(self, worker: str, n: int = 1, lease_s: Optional[float] = None) -> List[WorkItem]:
+        lease_s = lease_s or LEASE_S
+
+        def claim() -> List[WorkItem]:
+            now = time.time()
+            # arrendamentos vencidos que já esgotaram as tentativas viram falha
+            self.conn.execute(
+                "UPDATE work SET status = ?, stage = COALESCE(stage, 'lease'), "
+                "error = COALESCE(error, 'lease expirado') "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, LEASED, now, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                "SELECT id, job_id, idx, spec, attempts FROM work "
+                "WHERE status = ? OR (status = ? AND lease_until < ?) "
+                "ORDER BY rowid LIMIT ?",
+                (PENDING, LEASED, now, n),
+            ).fetchall()
+            out = []
+            for id_, job_id, idx, spec, attempts in rows:
+                token = uuid.uuid4().hex
+                self.conn.execute(
+                    "UPDATE work SET status = ?, attempts = attempts + 1, lease_until = ?, "
+                    "token = ?, worker = ? WHERE id = ?",
+                    (LEASED, now + lease_s, token, worker, id_),
+                )
+                out.append(WorkItem(id_, job_id, idx, json.loads(spec), attempts + 1, token))
+            return out
+
+        return self._tx(claim)
+
+    def heartbeat(self, item: WorkItem, lease_s: Optional[float] = None) -> bool:
+        """Renova o arrendamento; False se o item já foi arrendado por outro."""
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE work SET lease_until = ? WHERE id = ? AND token = ? AND status = ?",
+                (time.time() + (lease_s or LEASE_S), item.id, item.token, LEASED),
+            )
+        return cur.rowcount == 1
+
+    def ack(self, item: WorkItem, chunks: int, timings: Dict[str, float]) -> bool:
+        def done() -> bool:
+            cur = self.conn.execute(
+                "UPDATE work SET status = ?, chunks = ?, lease_until = NULL, stage = NULL, "
+                "error = NULL WHERE id = ? AND token = ? AND status = ?",
+                (DONE, chunks, item.id, item.token, LEASED),
+            )
+            if cur.rowcount != 1:
+                return False
+            self.conn.executemany(
+                "INSERT INTO job_timings (job_id, stage, seconds) VALUES (?, ?, ?) "
+                "ON CONFLICT (job_id, stage) DO UPDATE SET seconds = seconds + excluded.seconds",
+                [(item.job_id, k, v) for k, v in timings.items()],
+            )
+            return True
+
+        return self._tx(done)
+
+    def nack(self, item: WorkItem, stage: str, error: str, retry: bool = True) -> bool:
+        """Devolve o item (ou marca falha ao esgotar `max_attempts`)."""
+        final = not retry or item.attempts >= self.max_attempts
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE work SET status = ?, lease_until = NULL, stage = ?, error = ? "
+                "WHERE id = ? AND token = ? AND status = ?",
+                (FAILED if final else PENDING, stage, error, item.id, item.token, LEASED),
+            )
+        return cur.rowcount == 1
+
+    def progress(self, job_id: str, failures: int = 50) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(
+                self.conn.execute(
+                    "SELECT status, COUNT(*) FROM work WHERE job_id = ? GROUP BY status",
+                    (job_id,),
+                )
+            )
+            chunks = self.conn.execute(
+                "SELECT COALESCE(SUM(chunks), 0) FROM work WHERE job_id = ? AND status = ?",
+                (job_id, DONE),
+            ).fetchone()[0]
+            timings = dict(
+                self.conn.execute(
+                    "SELECT stage, seconds FROM job_timings WHERE job_id = ?", (job_id,)
+                )
+            )
+            errs = self.conn.execute(
+                "SELECT source, stage, error FROM work WHERE job_id = ? AND status = ? "
+                "ORDER BY idx LIMIT ?",
+                (job_id, FAILED, failures),
+            ).fetchall()
+        return _progress(counts, chunks, timings, errs)
+
+    def pending(self) -> int:
+        """Itens ainda não concluídos (pendentes ou arrendados)."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM work WHERE status IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()[0]
+
+
+def _progress(
+    counts: Dict[str, int],
+    chunks: int,
+    timings: Dict[str, float],
+    errs: List[Tuple[str, str, str]],
+) -> Dict[str, Any]:
+    total = sum(counts.values())
+    done, failed = counts.get(DONE, 0), counts.get(FAILED, 0)
+    return {
+        "total": total,
+        "done": done,
+        "failed": failed,
+        "leased": counts.get(LEASED, 0),
+        "chunks": chunks,
+        "timings": {k: round(v, 4) for k, v in timings.items()},
+        "failures": [{"source": s, "stage": st, "error": e} for s, st, e in errs],
+        "finished": total > 0 and done + failed == total,
+    }
+
+
+# -------- Redis --------
+# Chaves (prefixo `name`):
+#   {name}:ready            lista de ids visíveis
+#   {name}:leased           zset id -> prazo do arrendamento
+#   {name}:item:{id}        hash: job_id, idx, spec, source, attempts, token, status, ...
+#   {name}:job:{job_id}     hash: total, done, failed, chunks, t:<etapa>
+#   {name}:job:{job_id}:failures  lista JSON (source, stage, error)
+
+_LEASE_LUA = """
+local ready, leased, prefix = KEYS[1], KEYS[2], ARGV[1]
+local now, deadline, n, max_attempts = tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local expired = redis.call('ZRANGEBYSCORE', leased, '-inf', now)
+for _, id in ipairs(expired) do
+  redis.call('ZREM', leased, id)
+  local key = prefix .. ':item:' .. id
+  if tonumber(redis.call('HGET', key, 'attempts')) >= max_attempts then
+    local job = redis.call('HGET', key, 'job_id')
+    redis.call('HSET', key, 'status', 'failed', 'stage', 'lease', 'error', 'lease expirado')
+    redis.call('HINCRBY', prefix .. ':job:' .. job, 'failed', 1)
+    redis.call('RPUSH', prefix .. ':job:' .. job .. ':failures',
+      cjson.encode({redis.call('HGET', key, 'source'), 'lease', 'lease expirado'}))
+  else
+    redis.call('HSET', key, 'status', 'pending')
+    redis.call('LPUSH', ready, id)
+  end
+end
+local out = {}
+for i = 1, n do
+  local id = redis.call('RPOP', ready)
+  if not id then break end
+  local key = prefix .. ':item:' .. id
+  local token = ARGV[6 + i - 1]
+  redis.call('HINCRBY', key, 'attempts', 1)
+  redis.call('HSET', key, 'status', 'leased', 'token', token)
+  redis.call('ZADD', leased, deadline, id)
+  table.insert(out, id)
+  table.insert(out, token)
+end
+return out
+"""
+
+_HEARTBEAT_LUA = """
+local key = KEYS[1] .. ':item:' .. ARGV[1]
+if redis.call('HGET', key, 'token') ~= ARGV[2] or redis.call('HGET', key, 'status') ~= 'leased' then
+  return 0
+end
+redis.call('ZADD', KEYS[1] .. ':leased', 'XX', tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+_FINISH_LUA = """
+local prefix, id, token, status = KEYS[1], ARGV[1], ARGV[2], ARGV[3]
+local key = prefix .. ':item:' .. id
+if redis.call('HGET', key, 'token') ~= token or redis.call('HGET', key, 'status') ~= 'leased' then
+  return 0
+end
+redis.call('ZREM', prefix .. ':leased', id)
+local job = prefix .. ':job:' .. redis.call('HGET', key, 'job_id')
+if status == 'done' then
+  redis.call('HSET', key, 'status', 'done', 'chunks', ARGV[4])
+  redis.call('HINCRBY', job, 'done', 1)
+  redis.call('HINCRBY', job, 'chunks', tonumber(ARGV[4]))
+  local timings = cjson.decode(ARGV[5])
+  for stage, secs in pairs(timings) do
+    redis.call('HINCRBYFLOAT', job, 't:' .. stage, secs)
+  end
+elseif status == 'failed' then
+  redis.call('HSET', key, 'status', 'failed', 'stage', ARGV[4], 'error', ARGV[5])
+  redis.call('HINCRBY', job, 'failed', 1)
+  redis.call('RPUSH', job .. ':failures',
+    cjson.encode({redis.call('HGET', key, 'source'), ARGV[4], ARGV[5]}))
+else
+  redis.call('HSET', key, 'status', 'pending', 'stage', ARGV[4], 'error', ARGV[5])
+  redis.call('LPUSH', prefix .. ':ready', id)
+end
+return 1
+"""
+
+
+class RedisWorkQueue:
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        name: str = "aurora:ingest",
+        max_attempts: Optional[int] = None,
+        client: Any = None,
+    ) -> None:
+        if client is None:
+            if not _HAS_REDIS:
+                raise RuntimeError("redis não instalado: pip install redis")
+            client = redis.Redis.from_url(
+                url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            )
+        self.r = client
+        self.name = name
+        self.max_attempts = max_attempts or MAX_ATTEMPTS
+        self._lease = self.r.register_script(_LEASE_LUA)
+        self._heartbeat = self.r.register_script(_HEARTBEAT_LUA)
+        self._finish = self.r.register_script(_FINISH_LUA)
+
+    def close(self) -> None:
+        self.r.close()
+
+    def __enter__(self) -> "RedisWorkQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.name,) + parts)
+
+    def enqueue(self, job_id: str, items: Sequence[Tuple[int, Any, str]]) -> int:
+        pipe = self.r.pipeline(transaction=True)
+        ids = []
+        for idx, spec, source in items:
+            id_ = f"{job_id}:{idx}"
+            ids.append(id_)
+            pipe.hset(
+                self._key("item", id_),
+                mapping={
+                    "job_id": job_id,
+                    "idx": idx,
+                    "spec": json.dumps(spec, ensure_ascii=False),
+                    "source": source,
+                    "attempts": 0,
+                    "status": PENDING,
+                },
+            )
+        pipe.hset(self._key("job", job_id), mapping={"total": len(ids)})
+        if ids:
+            pipe.lpush(self._key("ready"), *ids)
+        pipe.execute()
+        return len(ids)
+
+    def lease(self, worker: str, n: int = 1, lease_s: Optional[float] = None) -> List[WorkItem]:
+        now = time.time()
+        tokens = [uuid.uuid4().hex for _ in range(n)]
+        flat = self._lease(
+            keys=[self._key("ready"), self._key("leased")],
+            args=[self.name, now, now + (lease_s or LEASE_S), n, self.max_attempts, *tokens],
+        )
+        out = []
+        for i in range(0, len(flat), 2):
+            id_, token = _s(flat[i]), _s(flat[i + 1])
+            h = {_s(k): _s(v) for k, v in self.r.hgetall(self._key("item", id_)).items()}
+            out.append(
+                WorkItem(id_, h["job_id"], int(h["idx"]), json.loads(h["spec"]),
+                         int(h["attempts"]), token)
+            )
+        return out
+
+    def heartbeat(self, item: WorkItem, lease_s: Optional[float] = None) -> bool:
+        return bool(
+            self._heartbeat(
+                keys=[self.name],
+                args=[item.id, item.token, time.time() + (lease_s or LEASE_S)],
+            )
+        )
+
+    def ack(self, item: WorkItem, chunks: int, timings: Dict[str, float]) -> bool:
+        return bool(
+            self._finish(
+                keys=[self.name],
+                args=[item.id, item.token, DONE, chunks, json.dumps(timings)],
+            )
+        )
+
+    def nack(self, item: WorkItem, stage: str, error: str, retry: bool = True) -> bool:
+        final = not retry or item.attempts >= self.max_attempts
+        return bool(
+            self._finish(
+                keys=[self.name],
+                args=[item.id, item.token, FAILED if final else PENDING, stage, error],
+            )
+        )
+
+    def progress(self, job_id: str, failures: int = 50) -> Dict[str, Any]:
+        h = {_s(k): _s(v) for k, v in self.r.hgetall(self._key("job", job_id)).items()}
+        total = int(h.get("total", 0))
+        done, failed = int(h.get("done", 0)), int(h.get("failed", 0))
+        counts = {DONE: done, FAILED: failed, PENDING: max(total - done - failed, 0)}
+        timings = {k[2:]: float(v) for k, v in h.items() if k.startswith("t:")}
+        errs = [
+            tuple(json.loads(_s(e)))
+            for e in self.r.lrange(self._key("job", job_id, "failures"), 0, failures - 1)
+        ]
+        out = _progress(counts, int(h.get("chunks", 0)), timings, errs)
+        out.pop("leased")
+        return out
+
+    def pending(self) -> int:
+        return int(self.r.llen(self._key("ready")) + self.r.zcard(self._key("leased")))
+
+
+def _s(v: Any) -> str:
+    return v.decode("utf-8") if isinstance(v, bytes) else str(v)
@@ -0,0 +1,160 @@
+"""Cache de resultados do DocParser endereçado por conteúdo.
+
+Chave: (sha256 do upload, versão do parser). O mesmo edital enviado de novo
+— com qualquer nome — devolve o `IngestResponse` guardado sem passar pelo
+pool de parsing.
+
+Os resultados ficam comprimidos (zlib) num sqlite em WAL, então vários
+workers do uvicorn podem ler e escrever o mesmo cache: escritas e despejo
+rodam em `BEGIN IMMEDIATE`. O despejo é LRU pelo tamanho total
+(`DOCPARSER_CACHE_MAX_BYTES`); o horário de acesso só é regravado quando
+está mais velho que `TOUCH_INTERVAL_S`, para um hit não custar uma escrita.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from .schemas import IngestResponse
+
+CACHE_PATH = os.getenv("DOCPARSER_CACHE_PATH", "artifacts/docparser/cache.sqlite")
+CACHE_MAX_BYTES = int(os.getenv("DOCPARSER_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+TOUCH_INTERVAL_S = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    sha256 TEXT NOT NULL,
+    parser_version TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sha256, parser_version)
+);
+CREATE INDEX IF NOT EXISTS results_lru ON results (accessed_at);
+"""
+
+
+class ResultCache:
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+        self.path = path or CACHE_PATH
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(
+            self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, sha256: str, parser_version: str) -> Optional[IngestResponse]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body, accessed_at FROM results WHERE sha256 = ? AND parser_version = ?",
+                (sha256, parser_version),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL_S:
+                self.conn.execute(
+                    "UPDATE results SET accessed_at = ?, hits = hits + 1 "
+                    "WHERE sha256 = ? AND parser_version = ?",
+                    (now, sha256, parser_version),
+                )
+        return IngestResponse.model_validate_json(zlib.decompress(row[0]))
+
+    def put(self, sha256: str, parser_version: str, response: IngestResponse) -> bool:
+        """Grava o resultado; False se ele sozinho não cabe no cache."""
+        body = zlib.compress(response.model_dump_json().encode("utf-8"), 6)
+        if len(body) > self.max_bytes:
+            return False
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # outro worker pode ter gravado a mesma chave: o último vence
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO results "
+                    "(sha256, parser_version, size, body, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (sha256, parser_version, len(body), body, now, now),
+                )
+                self._evict()
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def _evict(self) -> None:
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for sha, version, size in self.conn.execute(
+            "SELECT sha256, parser_version, size FROM results ORDER BY accessed_at"
+        ):
+            if total <= self.max_bytes:
+                break
+            doomed.append((sha, version))
+            total -= size
+        self.conn.executemany(
+            "DELETE FROM results WHERE sha256 = ? AND parser_version = ?", doomed
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            n, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        return {"entries": n, "bytes": size, "max_bytes": self.max_bytes}
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ResultCache]:
+    """Cache compartilhado do processo; None com `DOCPARSER_CACHE_MAX_BYTES=0`."""
+    global _cache
+    if CACHE_MAX_BYTES <= 0 and _cache is None:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
+
+
+def configure(path: Optional[str] = None, max_bytes: Optional[int] = None) -> ResultCache:
+    """Troca o cache compartilhado (ex.: outro arquivo nos testes)."""
+    global _cache
+    with _cache_lock:
+        old, _cache = _cache, ResultCache(path, max_bytes)
+    if old is not None:
+        old.close()
+    return _cache
+
+
+def close_cache() -> None:
+    global _cache
+    with _cache_lock:
+        old, _cache = _cache, None
+    if old is not None:
+        old.close()
@@ -0,0 +1,234 @@
+"""Pool de processos para os parsers (CPU-bound) do DocParser.
+
+`process_document_pipeline` é async, mas Docling/PyMuPDF/OCR seguram a CPU
+(e o GIL) por segundos: rodando no event loop, um PDF pesado trava todas as
+outras requisições do worker. Aqui cada parse vai para um
+`ProcessPoolExecutor` limitado:
+
+- admissão: no máximo `workers + max_queue` documentos em voo; acima disso
+  `PoolSaturated` (429 + Retry-After) em vez de fila sem fim;
+- timeout por documento: alarme dentro do worker (o processo fica livre) e,
+  como rede de segurança, `wait_for` no chamador, que recicla o pool se o
+  worker não voltar;
+- worker que morre (segfault em lib nativa) recicla o pool; `PoolUnavailable`
+  (503) só enquanto ele está fechado.
+
+`run` devolve os instantes (epoch ms) de submissão, início e fim no worker,
+para o pipeline registrar espera em fila e execução como etapas separadas.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing as mp
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional
+
+logger = logging.getLogger("docparser")
+
+WORKERS = int(os.getenv("DOCPARSER_WORKERS", str(os.cpu_count() or 1)))
+MAX_QUEUE = int(os.getenv("DOCPARSER_MAX_QUEUE", str(2 * WORKERS)))
+PARSE_TIMEOUT_S = float(os.getenv("DOCPARSER_PARSE_TIMEOUT_S", "120"))
+START_METHOD = os.getenv(
+    "DOCPARSER_MP_START",
+    "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn",
+)
+# folga do timeout do chamador sobre o alarme do worker
+TIMEOUT_GRACE_S = 5.0
+
+
+class PoolSaturated(Exception):
+    """Fila cheia: o cliente deve tentar de novo depois (429)."""
+
+    def __init__(self, retry_after: int = 1) -> None:
+        super().__init__("fila de parsing cheia")
+        self.retry_after = retry_after
+
+
+class PoolUnavailable(Exception):
+    """Pool fechado ou reiniciando (503)."""
+
+
+class ParseTimeout(Exception):
+    """Documento passou do tempo limite de parsing (504)."""
+
+
+class WorkerCrashed(RuntimeError):
+    """O processo do parser morreu; o pool já foi recriado."""
+
+
+@dataclass
+class PoolTiming:
+    submitted_ms: int
+    started_ms: int
+    ended_ms: int
+
+    @property
+    def wait_ms(self) -> int:
+        return max(0, self.started_ms - self.submitted_ms)
+
+    @property
+    def exec_ms(self) -> int:
+        return max(0, self.ended_ms - self.started_ms)
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def _alarm(signum, frame):  # pragma: no cover - roda no worker
+    raise ParseTimeout("tempo limite de parsing excedido")
+
+
+def _timed_call(fn: Callable[..., Any], timeout: Optional[float], *args: Any):
+    """Roda no worker: chama `fn` sob alarme e devolve (resultado, início, fim)."""
+    started = _now_ms()
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args), started, _now_ms()
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ParserPool:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        start_method: Optional[str] = None,
+    ) -> None:
+        self.workers = max(1, workers or WORKERS)
+        self.max_queue = MAX_QUEUE if max_queue is None else max_queue
+        self.timeout = PARSE_TIMEOUT_S if timeout is None else timeout
+        self.start_method = start_method or START_METHOD
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    @property
+    def admitted(self) -> int:
+        return self._admitted
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._closed:
+                raise PoolUnavailable("pool de parsing encerrado")
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=mp.get_context(self.start_method)
+                )
+            return self._executor
+
+    def _recycle(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not broken:
+                return  # outra corrotina já recriou
+            self._executor = None
+        # processos presos (timeout que o alarme não pegou) são mortos
+        for proc in list(getattr(broken, "_processes", {}).values()):
+            with contextlib.suppress(Exception):
+                proc.kill()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def saturated(self) -> bool:
+        return self._admitted >= self.capacity
+
+    @contextlib.asynccontextmanager
+    async def admit(self) -> AsyncIterator["ParserPool"]:
+        """Reserva uma vaga para um documento (todas as etapas dele)."""
+        with self._lock:
+            if self._closed:
+                raise PoolUnavailable("pool de parsing encerrado")
+            if self.saturated:
+                # estimativa grosseira: uma "rodada" do pool por vaga excedente
+                raise PoolSaturated(retry_after=max(1, self.max_queue // self.workers))
+            self._admitted += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._admitted -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None):
+        """Executa `fn(*args)` num worker; devolve (resultado, PoolTiming)."""
+        timeout = self.timeout if timeout is None else timeout
+        executor = self._pool()
+        submitted = _now_ms()
+        try:
+            fut = executor.submit(_timed_call, fn, timeout, *args)
+        except BrokenProcessPool as e:
+            self._recycle(executor)
+            raise WorkerCrashed(str(e)) from e
+        except RuntimeError as e:  # shutdown concorrente
+            raise PoolUnavailable(str(e)) from e
+        try:
+            wait = None
+            if timeout:
+                # inclui o tempo em fila: a vaga foi admitida, o worker ainda não
+                wait = timeout * (1 + self.max_queue / self.workers) + TIMEOUT_GRACE_S
+            result, started, ended = await asyncio.wait_for(asyncio.wrap_future(fut), wait)
+        except asyncio.TimeoutError as e:
+            logger.warning("parse sem resposta após %ss; reciclando pool", wait)
+            self._recycle(executor)
+            raise ParseTimeout("tempo limite de parsing excedido") from e
+        except BrokenProcessPool as e:
+            self._recycle(executor)
+            raise WorkerCrashed(str(e)) from e
+        return result, PoolTiming(submitted, started, ended)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pool: Optional[ParserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ParserPool:
+    """Pool compartilhado do processo (criado sob demanda)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = ParserPool()
+        return _pool
+
+
+def configure(**kwargs: Any) -> ParserPool:
+    """Troca o pool compartilhado (ex.: `configure(workers=2, max_queue=0)`)."""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, ParserPool(**kwargs)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, None
+    if old is not None:
+        old.shutdown()
@@ -0,0 +1,586 @@
+"""Jobs assíncronos e ingestão em lote do DocParser.
+
+`POST /v1/docparser/jobs` recebe um ou vários arquivos (ou um .zip) e
+devolve 202 com um id por documento; o parsing roda depois, no mesmo
+`ParserPool` do endpoint síncrono. O estado fica num sqlite em WAL
+(`DOCPARSER_JOBS_DIR/jobs.sqlite`) e o arquivo de cada job em
+`DOCPARSER_JOBS_DIR/files/<id>` até ele terminar.
+
+Escalonamento (`FairQueue`): prioridade maior primeiro; dentro da mesma
+prioridade, round-robin entre submitters, para um lote de 500 arquivos não
+segurar o documento avulso de outro cliente. `JOB_CONCURRENCY` corrotinas
+consomem a fila e pedem vaga em `pool.admit()` como qualquer requisição —
+com o pool cheio elas esperam, então o endpoint síncrono continua recebendo
+429 em vez de fila sem fim.
+
+A posse de um job é um `UPDATE ... WHERE estado = 'queued'` atômico: vários
+workers do uvicorn podem carregar a mesma fila sem rodar um job duas vezes.
+A cada `DOCPARSER_JOB_POLL_S` o escalonador renova a lease dos jobs que está
+rodando, devolve à fila os `running` cujo dono morreu (lease `JOB_LEASE_S`
+vencida) e puxa os `queued` que outros processos deixaram na store.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import get_cache
+from .executor import PARSE_TIMEOUT_S, PoolSaturated, get_pool
+from .pipeline import cached_response, process_document_pipeline
+from .schemas import IngestResponse, JobStatus, RejectedFile
+from .upload import SpooledUpload
+
+logger = logging.getLogger("docparser")
+
+JOBS_DIR = os.getenv("DOCPARSER_JOBS_DIR", "artifacts/docparser/jobs")
+MAX_BATCH_FILES = int(os.getenv("DOCPARSER_MAX_BATCH_FILES", "100"))
+# 0: uma corrotina por worker do pool
+JOB_CONCURRENCY = int(os.getenv("DOCPARSER_JOB_CONCURRENCY", "0"))
+JOB_TTL_S = float(os.getenv("DOCPARSER_JOB_TTL_S", str(7 * 24 * 3600)))
+JOB_LEASE_S = 2 * PARSE_TIMEOUT_S + 60
+JOB_POLL_S = float(os.getenv("DOCPARSER_JOB_POLL_S", "30"))
+ZIP_CHUNK = 1 << 20
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TERMINAL = {DONE, FAILED}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    batch_id TEXT NOT NULL,
+    submitter TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mime TEXT NOT NULL,
+    state TEXT NOT NULL,
+    error TEXT,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    result BLOB,
+    created_ms INTEGER NOT NULL,
+    started_ms INTEGER,
+    ended_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_id);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority, created_ms);
+"""
+
+_COLUMNS = (
+    "id, batch_id, submitter, priority, filename, sha256, size, mime, state, "
+    "error, cache_hit, created_ms, started_ms, ended_ms"
+)
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+@dataclass
+class Job:
+    id: str
+    batch_id: str
+    submitter: str
+    priority: int
+    filename: str
+    sha256: str
+    size: int
+    mime: str
+    state: str = QUEUED
+    error: Optional[str] = None
+    cache_hit: bool = False
+    created_ms: int = 0
+    started_ms: Optional[int] = None
+    ended_ms: Optional[int] = None
+
+    def status(self) -> JobStatus:
+        return JobStatus(
+            id=self.id,
+            batch_id=self.batch_id,
+            fonte=self.filename,
+            sha256=self.sha256,
+            bytes=self.size,
+            mime_type=self.mime,
+            prioridade=self.priority,
+            submitter=self.submitter,
+            estado=self.state,
+            erro=self.error,
+            cache_hit=self.cache_hit,
+            criado_ms=self.created_ms,
+            iniciado_ms=self.started_ms,
+            concluido_ms=self.ended_ms,
+        )
+
+
+def _job(row) -> Job:
+    job = Job(*row)
+    job.cache_hit = bool(job.cache_hit)
+    return job
+
+
+class JobStore:
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root or JOBS_DIR
+        self.files = os.path.join(self.root, "files")
+        os.makedirs(self.files, exist_ok=True)
+        self.conn = sqlite3.connect(
+            os.path.join(self.root, "jobs.sqlite"),
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "JobStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def file_path(self, job_id: str) -> str:
+        return os.path.join(self.files, job_id)
+
+    def create(self, job: Job, result: Optional[IngestResponse] = None) -> Job:
+        """Grava um job novo; com `result` ele já nasce concluído (cache)."""
+        job.created_ms = job.created_ms or _now_ms()
+        body = None
+        if result is not None:
+            body = zlib.compress(result.model_dump_json().encode("utf-8"), 6)
+            job.state, job.cache_hit = DONE, True
+            job.started_ms = job.ended_ms = job.created_ms
+        with self._lock:
+            self.conn.execute(
+                f"INSERT INTO jobs ({_COLUMNS}, result) VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.batch_id, job.submitter, job.priority, job.filename,
+                    job.sha256, job.size, job.mime, job.state, job.error,
+                    int(job.cache_hit), job.created_ms, job.started_ms, job.ended_ms, body,
+                ),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job(row) if row else None
+
+    def batch(self, batch_id: str) -> List[Job]:
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE batch_id = ? ORDER BY created_ms, rowid",
+                (batch_id,),
+            ).fetchall()
+        return [_job(r) for r in rows]
+
+    def queued(self) -> List[Job]:
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE state = ? ORDER BY created_ms, rowid",
+                (QUEUED,),
+            ).fetchall()
+        return [_job(r) for r in rows]
+
+    def claim(self, job_id: str) -> Optional[Job]:
+        """Passa o job para `running` se ainda estiver na fila (atômico)."""
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE jobs SET state = ?, started_ms = ? WHERE id = ? AND state = ?",
+                (RUNNING, _now_ms(), job_id, QUEUED),
+            )
+        return self.get(job_id) if cur.rowcount else None
+
+    def finish(self, job_id: str, result: IngestResponse) -> None:
+        body = zlib.compress(result.model_dump_json().encode("utf-8"), 6)
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, ended_ms = ?, cache_hit = ? WHERE id = ?",
+                (DONE, body, _now_ms(), int(result.proveniencia.cache_hit), job_id),
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, ended_ms = ? WHERE id = ?",
+                (FAILED, error, _now_ms(), job_id),
+            )
+
+    def requeue(self, job_id: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, started_ms = NULL WHERE id = ? AND state = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+
+    def touch(self, job_ids: Iterable[str]) -> None:
+        """Renova a lease de jobs `running` deste processo."""
+        rows = [(_now_ms(), job_id, RUNNING) for job_id in job_ids]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE jobs SET started_ms = ? WHERE id = ? AND state = ?", rows
+            )
+
+    def requeue_stale(self, lease_s: float) -> int:
+        """Devolve à fila jobs `running` cujo dono sumiu (lease vencida)."""
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE jobs SET state = ?, started_ms = NULL WHERE state = ? AND started_ms < ?",
+                (QUEUED, RUNNING, _now_ms() - int(lease_s * 1000)),
+            )
+        return cur.rowcount
+
+    def result(self, job_id: str) -> Optional[IngestResponse]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result FROM jobs WHERE id = ? AND state = ?", (job_id, DONE)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return IngestResponse.model_validate_json(zlib.decompress(row[0]))
+
+    def purge(self, ttl_s: float) -> int:
+        """Apaga jobs terminados há mais de `ttl_s`."""
+        with self._lock:
+            cur = self.conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND ended_ms < ?",
+                (DONE, FAILED, _now_ms() - int(ttl_s * 1000)),
+            )
+        return cur.rowcount
+
+
+class FairQueue:
+    """Fila por prioridade (maior primeiro) com round-robin entre submitters."""
+
+    def __init__(self) -> None:
+        self._lanes: Dict[int, "OrderedDict[str, deque[str]]"] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, job_id: str, submitter: str, priority: int = 0) -> None:
+        lane = self._lanes.setdefault(priority, OrderedDict())
+        lane.setdefault(submitter, deque()).append(job_id)
+        self._size += 1
+
+    def pop(self) -> Optional[str]:
+        if not self._size:
+            return None
+        priority = max(self._lanes)
+        lane = self._lanes[priority]
+        submitter, pending = next(iter(lane.items()))
+        job_id = pending.popleft()
+        if pending:
+            lane.move_to_end(submitter)  # vez do próximo submitter
+        else:
+            del lane[submitter]
+            if not lane:
+                del self._lanes[priority]
+        self._size -= 1
+        return job_id
+
+
+def expand_zip(
+    upload: SpooledUpload, *, max_bytes: int, max_members: int
+) -> Tuple[List[SpooledUpload], List[RejectedFile]]:
+    """Extrai os membros de um .zip em `SpooledUpload`s.
+
+    O limite de bytes é aplicado ao que sai do descompressor (o tamanho
+    declarado no zip não é confiável); membros além de `max_members`,
+    grandes demais ou corrompidos vão para a lista de rejeitados.
+    """
+    members: List[SpooledUpload] = []
+    rejected: List[RejectedFile] = []
+    prefix = upload.filename or "upload.zip"
+    try:
+        archive = zipfile.ZipFile(upload.path())
+    except zipfile.BadZipFile as e:
+        return [], [RejectedFile(fonte=prefix, motivo=f"Zip inválido: {e}")]
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = f"{prefix}/{info.filename}"
+            if len(members) >= max_members:
+                rejected.append(RejectedFile(fonte=name, motivo="Limite de arquivos do lote."))
+                continue
+            if info.file_size > max_bytes:
+                rejected.append(RejectedFile(fonte=name, motivo="Arquivo excede o limite."))
+                continue
+            up = SpooledUpload(filename=name)
+            try:
+                with archive.open(info) as src:
+                    for block in iter(lambda: src.read(ZIP_CHUNK), b""):
+                        up.write(block)
+                        if up.size > max_bytes:
+                            raise ValueError("Arquivo excede o limite.")
+            except (ValueError, zipfile.BadZipFile, RuntimeError, OSError) as e:
+                up.close()
+                rejected.append(RejectedFile(fonte=name, motivo=str(e)))
+                continue
+            members.append(up)
+    return members, rejected
+
+
+class JobScheduler:
+    """Consome a `JobStore` com `concurrency` corrotinas no event loop atual."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        concurrency: Optional[int] = None,
+        poll_s: Optional[float] = None,
+    ) -> None:
+        self.store = store
+        self.concurrency = JOB_CONCURRENCY if concurrency is None else concurrency
+        self.poll_s = poll_s or JOB_POLL_S
+        self._queue = FairQueue()
+        self._queued: Set[str] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def start(self) -> None:
+        """Sobe os workers no loop corrente (idempotente; refaz se o loop mudou)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop, self._wake = loop, asyncio.Event()
+        self._queue, self._queued = FairQueue(), set()
+        self.store.requeue_stale(JOB_LEASE_S)
+        self.store.purge(JOB_TTL_S)
+        self._enqueue(self.store.queued())
+        n = self.concurrency or get_pool().workers
+        self._tasks = [loop.create_task(self._worker()) for _ in range(n)]
+        self._tasks.append(loop.create_task(self._poll()))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+
+    def _enqueue(self, jobs: Iterable[Job]) -> None:
+        for job in jobs:
+            if job.state == QUEUED and job.id not in self._queued:
+                self._queued.add(job.id)
+                self._queue.push(job.id, job.submitter, job.priority)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def submit(
+        self,
+        uploads: List[SpooledUpload],
+        *,
+        submitter: str,
+        priority: int = 0,
+        allowed_mime: Iterable[str],
+        max_bytes: int,
+        max_files: int = MAX_BATCH_FILES,
+    ) -> Tuple[str, List[Job], List[RejectedFile]]:
+        """Cria um lote a partir dos uploads (zips são expandidos).
+
+        Os arquivos aceitos são movidos para `files/`; todos os `uploads`
+        (e membros de zip) são fechados aqui. Conteúdo já no cache de
+        resultados vira um job concluído na hora.
+        """
+        self.start()
+        batch_id = uuid.uuid4().hex
+        allowed = set(allowed_mime)
+        cache = get_cache()
+        jobs: List[Job] = []
+        rejected: List[RejectedFile] = []
+        pending = list(uploads)
+        try:
+            while pending:
+                up = pending.pop(0)
+                with up:
+                    name = up.filename or "upload.bin"
+                    if up.mime == "application/zip":
+                        members, bad = await asyncio.to_thread(
+                            expand_zip,
+                            up,
+                            max_bytes=max_bytes,
+                            max_members=max(0, max_files - len(jobs) - len(pending)),
+                        )
+                        pending.extend(members)
+                        rejected.extend(bad)
+                        continue
+                    if not up.size:
+                        rejected.append(RejectedFile(fonte=name, motivo="Arquivo vazio."))
+                        continue
+                    if up.mime not in allowed:
+                        rejected.append(
+                            RejectedFile(fonte=name, motivo=f"Tipo não suportado: {up.mime}")
+                        )
+                        continue
+                    if len(jobs) >= max_files:
+                        rejected.append(RejectedFile(fonte=name, motivo="Limite de arquivos do lote."))
+                        continue
+                    job = Job(
+                        id=uuid.uuid4().hex,
+                        batch_id=batch_id,
+                        submitter=submitter,
+                        priority=priority,
+                        filename=name,
+                        sha256=up.sha256,
+                        size=up.size,
+                        mime=up.mime,
+                    )
+                    hit = (
+                        await asyncio.to_thread(cached_response, cache, job.sha256, name)
+                        if cache is not None
+                        else None
+                    )
+                    if hit is None:
+                        up.persist(self.store.file_path(job.id))
+                    jobs.append(self.store.create(job, result=hit))
+        finally:
+            for up in pending:
+                up.close()
+        self._enqueue(jobs)
+        logger.info(
+            "jobs_submitted",
+            extra={
+                "event": "jobs_submitted",
+                "batch_id": batch_id,
+                "submitter": submitter,
+                "jobs": len(jobs),
+                "rejected": len(rejected),
+            },
+        )
+        return batch_id, jobs, rejected
+
+    def _refresh(self) -> List[Job]:
+        self.store.touch(list(self._running))
+        stale = self.store.requeue_stale(JOB_LEASE_S)
+        if stale:
+            logger.warning("jobs_requeued", extra={"event": "jobs_requeued", "jobs": stale})
+        self.store.purge(JOB_TTL_S)
+        return self.store.queued()
+
+    async def _poll(self) -> None:
+        """Revisa a store periodicamente: sem isso, job de um worker que morreu
+        ou enfileirado por outro processo só andaria no próximo restart."""
+        while True:
+            await asyncio.sleep(self.poll_s)
+            try:
+                self._enqueue(await asyncio.to_thread(self._refresh))
+            except Exception:
+                logger.exception("jobs_poll_failed")
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = self._queue.pop()
+            if job_id is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            self._queued.discard(job_id)
+            job = self.store.claim(job_id)
+            if job is None:
+                continue  # outro processo pegou ou o job sumiu
+            self._running[job.id] = asyncio.current_task()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                # desligando: o job volta para a fila e o arquivo fica
+                self.store.requeue(job.id)
+                raise
+            finally:
+                self._running.pop(job.id, None)
+
+    async def _run(self, job: Job) -> None:
+        path = self.store.file_path(job.id)
+        pool = get_pool()
+        try:
+            while True:
+                try:
+                    async with pool.admit():
+                        result = await process_document_pipeline(
+                            filename=job.filename,
+                            content=path,
+                            sha256=job.sha256,
+                            sniffed_mime=job.mime,
+                            size=job.size,
+                            pool=pool,
+                            cache=get_cache(),
+                        )
+                    break
+                except PoolSaturated as e:
+                    await asyncio.sleep(e.retry_after)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("job_failed", extra={"job_id": job.id, "sha256": job.sha256})
+            self.store.fail(job.id, f"{type(e).__name__}: {e}")
+        else:
+            await asyncio.to_thread(self.store.finish, job.id, result)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """Escalonador compartilhado do processo (store em `DOCPARSER_JOBS_DIR`)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler(JobStore())
+        return _scheduler
+
+
+def configure(
+    root: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    poll_s: Optional[float] = None,
+) -> JobScheduler:
+    """Troca o escalonador compartilhado (ex.: outro diretório nos testes).
+
+    O anterior precisa ter sido parado com `stop()` no loop dele.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        old, _scheduler = _scheduler, JobScheduler(JobStore(root), concurrency, poll_s)
+    if old is not None:
+        old.store.close()
+    return _scheduler
+
+
+async def shutdown_scheduler() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        old, _scheduler = _scheduler, None
+    if old is not None:
+        await old.stop()
+        old.store.close()
@@ -1,68 +1,291 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Request
-from .schemas import IngestResponse
-from .pipeline import process_document_pipeline
-import hashlib
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from .cache import close_cache, get_cache
+from .executor import ParseTimeout, PoolSaturated, PoolUnavailable, get_pool, shutdown_pool
+from .jobs import MAX_BATCH_FILES, TERMINAL, Job, get_scheduler, shutdown_scheduler
+from .schemas import BatchStatus, BatchSubmitResponse, IngestResponse, JobStatus
+from .pipeline import cached_response, process_document_pipeline
+from .upload import UploadError, read_upload, read_uploads
+import asyncio
+import contextlib
+import hmac
+import json
 import logging
+import os
+import time
 
 router = APIRouter(prefix="/v1/docparser", tags=["docparser"])
-MAX_BYTES = 25 * 1024 * 1024  # 25 MB
+MAX_BYTES = int(os.getenv("DOCPARSER_MAX_BYTES", str(25 * 1024 * 1024)))  # 25 MB
 ALLOWED_MIME = {"application/pdf", "text/html"}
+# clientes autenticados de /jobs: "token=nome,token2=nome2". O nome vira o
+# submitter do fair share e só eles podem pedir prioridade acima de 0; sem
+# token o submitter é o IP de quem conectou.
+JOB_TOKENS = dict(
+    item.strip().split("=", 1)
+    for item in os.getenv("DOCPARSER_JOB_TOKENS", "").split(",")
+    if "=" in item
+)
+# intervalo de consulta da store no stream de eventos e do keepalive
+EVENTS_POLL_S = 0.5
+EVENTS_KEEPALIVE_S = 15.0
 
+# o corpo é lido em streaming (ver upload.py), então o schema do formulário
+# é declarado à mão para o OpenAPI
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
-def _sniff_mime(content: bytes, declared: str | None) -> str:
-    # PDF signature
-    if content[:5] == b"%PDF-":
-        return "application/pdf"
-    # crude HTML detection
-    head = content[:256].lower()
-    if b"<html" in head or b"<!doctype html" in head:
-        return "text/html"
-    # fallback to declared or octet-stream
-    return declared or "application/octet-stream"
-
-
-@router.post("/ingest", response_model=IngestResponse, status_code=200)
-async def ingest_document(request: Request, file: UploadFile = File(...)):
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Arquivo vazio.")
-    if len(content) > MAX_BYTES:
-        raise HTTPException(status_code=413, detail="Arquivo excede o limite de 25MB.")
-
-    sha256 = hashlib.sha256(content).hexdigest()
-    sniffed = _sniff_mime(content, getattr(file, "content_type", None))
-    if sniffed not in ALLOWED_MIME:
-        raise HTTPException(status_code=415, detail=f"Tipo não suportado: {sniffed}")
-
-    logger = logging.getLogger("docparser")
-    logger.info(
-        "ingest_request",
-        extra={
-            "event": "ingest_request",
-            "filename": file.filename,
-            "bytes": len(content),
-            "sha256": sha256,
-            "mime": sniffed,
+JOBS_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {
+                        "files": {
+                            "type": "array",
+                            "items": {"type": "string", "format": "binary"},
+                            "description": "PDF/HTML ou .zip com vários documentos.",
+                        }
+                    },
+                }
+            }
         },
-    )
+    }
+}
+
 
+@router.post(
+    "/ingest", response_model=IngestResponse, status_code=200, openapi_extra=UPLOAD_OPENAPI
+)
+async def ingest_document(request: Request):
+    pool = get_pool()
+    if pool.saturated:
+        # recusa antes de receber o corpo
+        raise _saturated(PoolSaturated(retry_after=1))
     try:
-        result = await process_document_pipeline(
-            filename=file.filename or "upload.bin",
-            content=content,
-            sha256=sha256,
-            sniffed_mime=sniffed,
+        upload = await read_upload(request.headers, request.stream(), max_bytes=MAX_BYTES)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+
+    with upload:
+        sha256 = upload.sha256
+        sniffed = upload.mime
+        if sniffed not in ALLOWED_MIME:
+            raise HTTPException(status_code=415, detail=f"Tipo não suportado: {sniffed}")
+
+        logger = logging.getLogger("docparser")
+        logger.info(
+            "ingest_request",
+            extra={
+                "event": "ingest_request",
+                "filename": upload.filename,
+                "bytes": upload.size,
+                "sha256": sha256,
+                "mime": sniffed,
+                "spooled_to_disk": not upload.in_memory,
+            },
+        )
+
+        cache = get_cache()
+        if cache is not None:
+            # hit não ocupa vaga no pool
+            hit = await asyncio.to_thread(
+                cached_response, cache, sha256, upload.filename or "upload.bin"
+            )
+            if hit is not None:
+                return hit
+
+        try:
+            async with pool.admit():
+                result = await process_document_pipeline(
+                    filename=upload.filename or "upload.bin",
+                    # pequeno fica em memória; o que já foi para o disco vai por caminho
+                    content=upload.source(),
+                    sha256=sha256,
+                    sniffed_mime=sniffed,
+                    size=upload.size,
+                    pool=pool,
+                    cache=cache,
+                )
+            return result
+        except HTTPException:
+            raise
+        except PoolSaturated as e:
+            raise _saturated(e) from e
+        except PoolUnavailable as e:
+            raise HTTPException(status_code=503, detail="Serviço de parsing indisponível.") from e
+        except ParseTimeout as e:
+            logger.warning("ingest_timeout", extra={"sha256": sha256})
+            raise HTTPException(status_code=504, detail="Tempo limite de parsing excedido.") from e
+        except Exception as e:
+            logger.exception("ingest_failed", extra={"sha256": sha256})
+            raise HTTPException(status_code=500, detail="Falha no processamento.") from e
+
+
+def _job_client(request: Request) -> tuple[str, bool]:
+    """(submitter, autenticado) de quem chama `/jobs`."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        for known, name in JOB_TOKENS.items():
+            if hmac.compare_digest(known.encode(), token.encode()):
+                return name, True
+        raise HTTPException(
+            status_code=401, detail="Token inválido.", headers={"WWW-Authenticate": "Bearer"}
         )
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.exception("ingest_failed", extra={"sha256": sha256})
-        raise HTTPException(status_code=500, detail="Falha no processamento.") from e
+    return (request.client.host if request.client else "anon"), False
+
+
+@router.post(
+    "/jobs", response_model=BatchSubmitResponse, status_code=202, openapi_extra=JOBS_OPENAPI
+)
+async def submit_jobs(request: Request, priority: int = Query(0, ge=0, le=9)):
+    """Lote assíncrono: um job por documento, processados pelo mesmo pool."""
+    # identidade vem do token ou do IP, nunca de cabeçalho livre; checada
+    # antes de ler o corpo
+    submitter, authenticated = _job_client(request)
+    if priority > 0 and not authenticated:
+        raise HTTPException(status_code=403, detail="Prioridade acima de 0 exige token.")
+    try:
+        uploads = await read_uploads(
+            request.headers,
+            request.stream(),
+            max_bytes=MAX_BYTES,
+            field="files",
+            max_files=MAX_BATCH_FILES,
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+    batch_id, jobs, rejected = await get_scheduler().submit(
+        uploads,
+        submitter=submitter,
+        priority=priority,
+        allowed_mime=ALLOWED_MIME,
+        max_bytes=MAX_BYTES,
+    )
+    if not jobs:
+        raise HTTPException(
+            status_code=415 if rejected else 400,
+            detail={"mensagem": "Nenhum arquivo aceito.", "rejeitados": [r.model_dump() for r in rejected]},
+        )
+    return BatchSubmitResponse(
+        batch_id=batch_id, jobs=[j.status() for j in jobs], rejeitados=rejected
+    )
+
+
+def _job_or_404(job_id: str) -> Job:
+    job = get_scheduler().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str):
+    return _job_or_404(job_id).status()
+
+
+@router.get("/jobs/{job_id}/result", response_model=IngestResponse)
+async def job_result(job_id: str):
+    job = _job_or_404(job_id)
+    if job.state not in TERMINAL:
+        raise HTTPException(status_code=409, detail=f"Job ainda em '{job.state}'.")
+    result = get_scheduler().store.result(job_id)
+    if result is None:
+        raise HTTPException(status_code=422, detail=job.error or "Job falhou.")
+    return result
+
+
+def _batch_status(batch_id: str, jobs: list) -> BatchStatus:
+    counts: dict = {}
+    for j in jobs:
+        counts[j.state] = counts.get(j.state, 0) + 1
+    return BatchStatus(
+        batch_id=batch_id,
+        total=len(jobs),
+        por_estado=counts,
+        concluido=all(j.state in TERMINAL for j in jobs),
+        jobs=[j.status() for j in jobs],
+    )
+
+
+@router.get("/batches/{batch_id}", response_model=BatchStatus)
+async def batch_status(batch_id: str):
+    jobs = get_scheduler().store.batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Lote não encontrado.")
+    return _batch_status(batch_id, jobs)
+
+
+@router.get("/batches/{batch_id}/events")
+async def batch_events(batch_id: str, request: Request):
+    """Server-Sent Events: `job` a cada mudança de estado, `batch` no fim."""
+    store = get_scheduler().store
+    if not store.batch(batch_id):
+        raise HTTPException(status_code=404, detail="Lote não encontrado.")
+
+    async def stream():
+        seen: dict = {}
+        last = time.monotonic()
+        while True:
+            jobs = store.batch(batch_id)
+            for j in jobs:
+                if seen.get(j.id) != j.state:
+                    seen[j.id] = j.state
+                    last = time.monotonic()
+                    yield f"event: job\ndata: {j.status().model_dump_json()}\n\n"
+            if all(j.state in TERMINAL for j in jobs):
+                summary = _batch_status(batch_id, jobs).model_dump(exclude={"jobs"})
+                yield f"event: batch\ndata: {json.dumps(summary)}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+            if time.monotonic() - last > EVENTS_KEEPALIVE_S:
+                last = time.monotonic()
+                yield ": keepalive\n\n"
+            await asyncio.sleep(EVENTS_POLL_S)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _saturated(e: PoolSaturated) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Fila de parsing cheia; tente novamente.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # retoma jobs que ficaram na fila de uma execução anterior
+    get_scheduler().start()
+    yield
+    await shutdown_scheduler()
+    shutdown_pool()
+    close_cache()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
+        lifespan=_lifespan,
         title="Aurora DocParser++ Service",
         version="1.0.0",
         description="Serviço de ingestão e parsing de documentos (Fase 1).",
@@ -1,6 +1,10 @@
-def parse_with_docling(content: bytes) -> dict:
+from ..upload import DocumentSource
+
+
+def parse_with_docling(source: DocumentSource) -> dict:
     """
     Parser primário usando Docling.
+    `source` é o caminho do arquivo ou um buffer (bytes/memoryview), sem cópia.
     TODO: Implementar integração real com a biblioteca Docling.
     """
     # Simulação de saída
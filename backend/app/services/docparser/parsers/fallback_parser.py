@@ -1,6 +1,10 @@
-def parse_with_fallback(content: bytes) -> dict:
+from ..upload import DocumentSource
+
+
+def parse_with_fallback(source: DocumentSource) -> dict:
     """
     Parser fallback usando PyMuPDF e OCR simulado.
+    `source` é o caminho do arquivo ou um buffer (bytes/memoryview), sem cópia.
     TODO: Implementar OCR real com PaddleOCR.
     """
     return {
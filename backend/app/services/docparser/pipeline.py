@@ -9,58 +9,156 @@ from .schemas import (
 )
 from .parsers.docling_parser import parse_with_docling
 from .parsers.fallback_parser import parse_with_fallback
+from .cache import ResultCache
+from .executor import ParserPool, ParseTimeout, PoolSaturated, PoolUnavailable, get_pool
+from .upload import DocumentSource, sniff_mime
+import asyncio
+import hashlib
+import logging
+import os
 import time
 
+# entra na chave do cache: mudou parser/heurística, sobe a versão
+PARSER_VERSION = "0.0.1"
+
+logger = logging.getLogger("docparser")
+
+
+def _source_info(source: DocumentSource) -> tuple[int, bytes]:
+    """Tamanho e primeiros bytes, sem copiar o documento."""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return os.path.getsize(source), f.read(512)
+    return len(source), bytes(source[:512])
+
+
+def _sha256(source: DocumentSource) -> str:
+    h = hashlib.sha256()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    else:
+        h.update(source)
+    return h.hexdigest()
+
+
+async def _run_parser(
+    pool: ParserPool, name: str, fn, content: DocumentSource, steps: list[StepRecord]
+) -> tuple[dict, int]:
+    """Roda `fn` no pool; registra espera em fila e execução como etapas
+    separadas. Devolve (saída do parser, ms de execução)."""
+    submitted = time.time_ns() // 1_000_000
+    try:
+        parsed, timing = await pool.run(fn, content)
+    except Exception as e:
+        steps.append(
+            StepRecord(
+                name=name,
+                started_ms=submitted,
+                ended_ms=time.time_ns() // 1_000_000,
+                ok=False,
+                notes=f"{type(e).__name__}: {e}",
+            )
+        )
+        raise
+    steps.append(
+        StepRecord(
+            name=f"queue:{name}",
+            started_ms=timing.submitted_ms,
+            ended_ms=timing.started_ms,
+            ok=True,
+            notes=f"espera {timing.wait_ms} ms",
+        )
+    )
+    steps.append(
+        StepRecord(
+            name=name,
+            started_ms=timing.started_ms,
+            ended_ms=timing.ended_ms,
+            ok=True,
+            notes=f"execução {timing.exec_ms} ms",
+        )
+    )
+    return parsed, timing.exec_ms
+
+
+def cached_response(
+    cache: ResultCache, sha256: str, filename: str
+) -> IngestResponse | None:
+    """Resultado já calculado para o mesmo conteúdo, marcado como hit.
+
+    Lê o cache em disco: no event loop, chame via `asyncio.to_thread`."""
+    t0 = time.time_ns() // 1_000_000
+    hit = cache.get(sha256, PARSER_VERSION)
+    if hit is None:
+        return None
+    hit.metadados.fonte = filename
+    hit.proveniencia.cache_hit = True
+    hit.proveniencia.steps.append(
+        StepRecord(
+            name="cache",
+            started_ms=t0,
+            ended_ms=time.time_ns() // 1_000_000,
+            ok=True,
+            notes=f"hit {sha256[:12]}",
+        )
+    )
+    hit.custo = CostBreakdown(cpu_ms_parser=0, usd_estimado=0.0)
+    return hit
+
 
 async def process_document_pipeline(
     filename: str,
-    content: bytes,
+    content: DocumentSource,
     *,
-    sha256: str,
-    sniffed_mime: str,
+    sha256: str | None = None,
+    sniffed_mime: str | None = None,
+    size: int | None = None,
+    pool: ParserPool | None = None,
+    cache: ResultCache | None = None,
 ) -> IngestResponse:
-    started = time.perf_counter_ns()
+    """`content` é o caminho do arquivo ou um buffer (bytes/memoryview); o
+    endpoint passa `SpooledUpload.source()`, já com sha256/MIME/tamanho.
+
+    Os parsers rodam no `ParserPool` (padrão: o compartilhado); o chamador
+    deve ter uma vaga de `pool.admit()`. `PoolSaturated`, `PoolUnavailable`
+    e `ParseTimeout` sobem sem tentar o fallback. Com `cache`, um conteúdo
+    já visto volta do cache e um novo resultado do parser primário é gravado
+    nele (o do fallback não, para a próxima carga tentar de novo).
+    """
+    pool = pool or get_pool()
+    if size is None or sniffed_mime is None:
+        n, head = _source_info(content)
+        size = n if size is None else size
+        sniffed_mime = sniffed_mime or sniff_mime(head, None)
+    sha256 = sha256 or _sha256(content)
+    if cache is not None:
+        hit = await asyncio.to_thread(cached_response, cache, sha256, filename)
+        if hit is not None:
+            return hit
+    if isinstance(content, memoryview):
+        content = content.tobytes()  # memoryview não atravessa processos
     steps: list[StepRecord] = []
 
     # Try primary parser
     try:
-        t0 = time.perf_counter_ns()
-        parsed = parse_with_docling(content)
-        t1 = time.perf_counter_ns()
-        steps.append(
-            StepRecord(
-                name="docling",
-                started_ms=t0 // 1_000_000,
-                ended_ms=t1 // 1_000_000,
-                ok=True,
-                notes=None,
-            )
-        )
+        parsed, cpu_ms = await _run_parser(pool, "docling", parse_with_docling, content, steps)
         parser_usado = "docling"
         fallback_flag = False
-        versao_parser = "0.0.1"
-    except Exception as _:
-        t0 = time.perf_counter_ns()
-        parsed = parse_with_fallback(content)
-        t1 = time.perf_counter_ns()
-        steps.append(
-            StepRecord(
-                name="fallback",
-                started_ms=t0 // 1_000_000,
-                ended_ms=t1 // 1_000_000,
-                ok=True,
-                notes=None,
-            )
-        )
+        versao_parser = PARSER_VERSION
+    except (PoolSaturated, PoolUnavailable, ParseTimeout):
+        raise
+    except Exception:
+        parsed, cpu_ms = await _run_parser(pool, "fallback", parse_with_fallback, content, steps)
         parser_usado = "fallback"
         fallback_flag = True
-        versao_parser = "0.0.1"
+        versao_parser = PARSER_VERSION
 
     texto_markdown: str = parsed.get("texto_markdown", "")
     tabelas = [TableSchema(**t) if not isinstance(t, TableSchema) else t for t in parsed.get("tabelas", [])]
     imagens = [ImageSchema(**i) if not isinstance(i, ImageSchema) else i for i in parsed.get("imagens", [])]
 
-    ended = time.perf_counter_ns()
     diag = Diagnostics(
         parser_usado=parser_usado,
         versao_parser=versao_parser,
@@ -73,17 +171,17 @@ async def process_document_pipeline(
     meta = Metadata(
         fonte=filename,
         mime_type=sniffed_mime,
-        bytes=len(content),
+        bytes=size,
         sha256=sha256,
         num_paginas=None,
     )
 
     cost = CostBreakdown(
-        cpu_ms_parser=int((ended - started) / 1_000_000),
+        cpu_ms_parser=cpu_ms,
         usd_estimado=0.0001,
     )
 
-    return IngestResponse(
+    response = IngestResponse(
         texto_markdown=texto_markdown,
         tabelas=tabelas,
         imagens=imagens,
@@ -91,3 +189,10 @@ async def process_document_pipeline(
         proveniencia=diag,
         custo=cost,
     )
+    # resultado do fallback é degradado: não prende o documento nele
+    if cache is not None and not fallback_flag:
+        try:
+            await asyncio.to_thread(cache.put, sha256, PARSER_VERSION, response)
+        except Exception:
+            logger.exception("cache_put_failed", extra={"sha256": sha256})
+    return response
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, HttpUrl, Field
+from typing import Dict, Optional, List
 
 
 class IngestRequest(BaseModel):
@@ -13,14 +13,137 @@ class IngestRequest(BaseModel):
     )
 
 
+class TableSchema(BaseModel):
+    """
+    Tabela extraída; parsers podem anexar campos próprios.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    pagina: Optional[int] = None
+    markdown: Optional[str] = None
+    linhas: List[List[str]] = Field(default_factory=list)
+
+
+class ImageSchema(BaseModel):
+    """
+    Imagem/figura detectada no documento.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    pagina: Optional[int] = None
+    descricao: Optional[str] = None
+    bbox: Optional[List[float]] = None
+
+
+class Metadata(BaseModel):
+    """
+    Metadados do arquivo recebido.
+    """
+
+    fonte: str
+    mime_type: str
+    bytes: int
+    sha256: str
+    num_paginas: Optional[int] = None
+
+
+class StepRecord(BaseModel):
+    """
+    Uma etapa do pipeline, com tempos em ms.
+    """
+
+    name: str
+    started_ms: int
+    ended_ms: int
+    ok: bool = True
+    notes: Optional[str] = None
+
+
+class Diagnostics(BaseModel):
+    """
+    Proveniência: qual parser rodou, versão e etapas executadas.
+    """
+
+    parser_usado: str
+    versao_parser: str
+    fallback: bool = False
+    cache_hit: bool = False
+    steps: List[StepRecord] = Field(default_factory=list)
+    planned_chunks: Optional[int] = None
+    embedding_model: Optional[str] = None
+
+
+class CostBreakdown(BaseModel):
+    """
+    Custo estimado do processamento.
+    """
+
+    cpu_ms_parser: int
+    usd_estimado: float
+
+
 class IngestResponse(BaseModel):
     """
     Modelo de resposta do pipeline de processamento.
     """
 
     texto_markdown: str
-    tabelas: List[Dict[str, Any]]
-    imagens: List[Dict[str, Any]]
-    metadados: Dict[str, Any]
-    proveniencia: Dict[str, Any]
-    custo: Dict[str, float]
+    tabelas: List[TableSchema]
+    imagens: List[ImageSchema]
+    metadados: Metadata
+    proveniencia: Diagnostics
+    custo: CostBreakdown
+
+
+class JobStatus(BaseModel):
+    """
+    Estado de um job assíncrono de parsing (tempos em epoch ms).
+    """
+
+    id: str
+    batch_id: str
+    fonte: str
+    sha256: str
+    bytes: int
+    mime_type: str
+    prioridade: int = 0
+    submitter: str
+    estado: str
+    erro: Optional[str] = None
+    cache_hit: bool = False
+    criado_ms: int
+    iniciado_ms: Optional[int] = None
+    concluido_ms: Optional[int] = None
+
+
+class RejectedFile(BaseModel):
+    """
+    Arquivo do lote que não virou job.
+    """
+
+    fonte: str
+    motivo: str
+
+
+class BatchSubmitResponse(BaseModel):
+    """
+    Resposta da submissão de um lote (202).
+    """
+
+    batch_id: str
+    jobs: List[JobStatus]
+    rejeitados: List[RejectedFile] = Field(default_factory=list)
+
+
+class BatchStatus(BaseModel):
+    """
+    Situação agregada de um lote.
+    """
+
+    batch_id: str
+    total: int
+    por_estado: Dict[str, int]
+    concluido: bool
+    jobs: List[JobStatus]
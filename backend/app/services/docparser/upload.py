@@ -0,0 +1,305 @@
+"""Recepção de upload em streaming para o DocParser.
+
+O corpo multipart é lido direto de `request.stream()` (python-multipart em
+modo incremental): cada bloco do arquivo atualiza o sha256 e vai para um
+`SpooledUpload` — em memória até `SPOOL_MEMORY_BYTES`, depois em arquivo
+temporário. O limite é checado a cada bloco (e antes de tudo pelo
+`Content-Length`), então um upload grande demais é recusado com 413 sem ser
+lido até o fim. Os parsers recebem `SpooledUpload.source()`: um
+`memoryview` do buffer ou o caminho do arquivo, nunca uma segunda cópia.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator, List, Optional, Union
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+
+    _HAS_MULTIPART = True
+except Exception:
+    try:
+        from multipart.multipart import MultipartParser, parse_options_header  # type: ignore
+
+        _HAS_MULTIPART = True
+    except Exception:
+        _HAS_MULTIPART = False
+
+SPOOL_MEMORY_BYTES = int(os.getenv("DOCPARSER_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+SPOOL_DIR = os.getenv("DOCPARSER_SPOOL_DIR") or None
+SNIFF_BYTES = 512
+# cabeçalhos e boundaries do multipart além do arquivo em si
+MULTIPART_OVERHEAD = 64 * 1024
+
+DocumentSource = Union[memoryview, bytes, str]
+
+
+class UploadError(Exception):
+    status_code = 400
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(detail)
+        self.detail = detail
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+def sniff_mime(head: bytes, declared: Optional[str]) -> str:
+    # PDF signature
+    if head[:5] == b"%PDF-":
+        return "application/pdf"
+    if head[:4] == b"PK\x03\x04":
+        return "application/zip"
+    # crude HTML detection
+    lowered = head[:256].lower()
+    if b"<html" in lowered or b"<!doctype html" in lowered:
+        return "text/html"
+    # fallback to declared or octet-stream
+    return declared or "application/octet-stream"
+
+
+class SpooledUpload:
+    """Arquivo recebido: em memória até `max_memory`, depois em disco."""
+
+    def __init__(
+        self,
+        filename: Optional[str] = None,
+        declared_mime: Optional[str] = None,
+        max_memory: Optional[int] = None,
+        dir: Optional[str] = None,
+    ) -> None:
+        self.filename = filename
+        self.declared_mime = declared_mime
+        self.max_memory = SPOOL_MEMORY_BYTES if max_memory is None else max_memory
+        self.dir = dir or SPOOL_DIR
+        self.size = 0
+        self.head = b""
+        self._hash = hashlib.sha256()
+        self._buf: Optional[io.BytesIO] = io.BytesIO()
+        self._fh: Optional[io.BufferedRandom] = None
+        self._path: Optional[str] = None
+        self._views: List[memoryview] = []
+        self._mmap: Optional[mmap.mmap] = None
+
+    def write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self.size += len(data)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += data[: SNIFF_BYTES - len(self.head)]
+        if self._fh is None and self.size > self.max_memory:
+            self._rollover()
+        if self._fh is not None:
+            self._fh.write(data)
+        else:
+            self._buf.write(data)
+
+    def _rollover(self) -> None:
+        fd, self._path = tempfile.mkstemp(prefix="docparser-", dir=self.dir)
+        self._fh = os.fdopen(fd, "w+b")
+        if self._buf is not None:
+            self._fh.write(self._buf.getbuffer())
+            self._buf = None
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def mime(self) -> str:
+        return sniff_mime(self.head, self.declared_mime)
+
+    @property
+    def in_memory(self) -> bool:
+        return self._fh is None
+
+    def view(self) -> memoryview:
+        """Conteúdo sem cópia (buffer do BytesIO ou mmap do arquivo)."""
+        if self._fh is None:
+            v = self._buf.getbuffer()
+        else:
+            self._fh.flush()
+            if self._mmap is None:
+                self._mmap = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+            v = memoryview(self._mmap)
+        self._views.append(v)
+        return v
+
+    def path(self) -> str:
+        """Caminho em disco (materializa o buffer se ainda estiver em memória)."""
+        if self._fh is None:
+            self._rollover()
+        self._fh.flush()
+        return self._path
+
+    def persist(self, dest: str) -> str:
+        """Move o conteúdo para `dest` (ex.: fila de jobs) e fecha o upload."""
+        path = self.path()
+        self._fh.close()
+        self._fh = None
+        try:
+            os.replace(path, dest)
+        except OSError:  # outro filesystem
+            shutil.move(path, dest)
+        self._path = None
+        self.close()
+        return dest
+
+    def source(self) -> DocumentSource:
+        """O que os parsers recebem: caminho se já está em disco, senão view."""
+        return self.path() if self._fh is not None else self.view()
+
+    def close(self) -> None:
+        # fatias ainda vivas de uma view impedem o release; o GC solta depois
+        for v in self._views:
+            try:
+                v.release()
+            except BufferError:
+                pass
+        self._views.clear()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+            self._path = None
+        self._buf = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+async def read_upload(
+    headers,
+    stream: AsyncIterator[bytes],
+    *,
+    max_bytes: int,
+    field: str = "file",
+    max_memory: Optional[int] = None,
+) -> SpooledUpload:
+    """Lê o campo `field` de um corpo multipart/form-data em streaming.
+
+    `headers`/`stream` são os de `starlette.requests.Request`. Levanta
+    `UploadTooLarge` assim que o arquivo passa de `max_bytes` e
+    `UploadError` para corpo inválido, sem arquivo ou vazio.
+    """
+    (up,) = await read_uploads(
+        headers, stream, max_bytes=max_bytes, field=field, max_files=1, max_memory=max_memory
+    )
+    if not up.size:
+        up.close()
+        raise UploadError("Arquivo vazio.")
+    return up
+
+
+async def read_uploads(
+    headers,
+    stream: AsyncIterator[bytes],
+    *,
+    max_bytes: int,
+    field: str = "files",
+    max_files: int = 1,
+    max_memory: Optional[int] = None,
+) -> List[SpooledUpload]:
+    """Como `read_upload`, para até `max_files` arquivos no campo `field`
+    (`max_bytes` vale por arquivo). Arquivos vazios vêm com `size == 0`."""
+    if not _HAS_MULTIPART:
+        raise RuntimeError("python-multipart não instalado")
+    ctype, opts = parse_options_header(headers.get("content-type", ""))
+    boundary = opts.get(b"boundary")
+    if ctype != b"multipart/form-data" or not boundary:
+        raise UploadError(f"Envie o arquivo como multipart/form-data no campo '{field}'.")
+    too_large = f"Arquivo excede o limite de {max_bytes // (1024 * 1024)}MB."
+    length = headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_files * (max_bytes + MULTIPART_OVERHEAD):
+        raise UploadTooLarge(too_large)
+
+    state = {"name": b"", "value": b"", "headers": {}, "target": None}
+    found: List[SpooledUpload] = []
+
+    def on_part_begin() -> None:
+        state["headers"], state["target"] = {}, None
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["name"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["value"] += data[start:end]
+
+    def on_header_end() -> None:
+        state["headers"][state["name"].lower()] = state["value"]
+        state["name"], state["value"] = b"", b""
+
+    def on_headers_finished() -> None:
+        _, disp = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        if disp.get(b"name", b"").decode("utf-8", "replace") != field:
+            return  # outros campos do formulário: ignorados
+        if len(found) >= max_files:
+            raise UploadError(f"Máximo de {max_files} arquivo(s) por requisição.")
+        declared = state["headers"].get(b"content-type")
+        up = SpooledUpload(
+            filename=disp.get(b"filename", b"").decode("utf-8", "replace") or None,
+            declared_mime=declared.decode("latin-1") if declared else None,
+            max_memory=max_memory,
+        )
+        found.append(up)
+        state["target"] = up
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        up = state["target"]
+        if up is None:
+            return
+        up.write(data[start:end])
+        if up.size > max_bytes:
+            raise UploadTooLarge(too_large)
+
+    def on_part_end() -> None:
+        state["target"] = None
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+        },
+    )
+    try:
+        async for chunk in stream:
+            if chunk:
+                parser.write(chunk)
+        parser.finalize()
+        if not found:
+            raise UploadError(f"Campo '{field}' ausente.")
+        return found
+    except UploadError:
+        for up in found:
+            up.close()
+        raise
+    except Exception as e:
+        for up in found:
+            up.close()
+        raise UploadError(f"Corpo multipart inválido: {e}") from e
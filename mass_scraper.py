@@ -1,107 +1,57 @@
 #!/usr/bin/env python3
 """Scraper massivo para teste de estresse - Rede Log RJ."""
 
+import asyncio
 import json
 import os
 import sys
 import time
-from collections import deque
-from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
+from aurora_platform.modules.crawler.engine import AsyncCrawler, CrawlConfig  # noqa: E402
+from aurora_platform.modules.crawler.frontier import SQLiteFrontier  # noqa: E402
+
 
 class MassScraper:
-    def __init__(self, base_url, max_pages=50):
-        self.base_url = base_url
-        self.domain = urlparse(base_url).netloc
-        self.visited = set()
-        self.to_visit = deque([base_url])
-        self.max_pages = max_pages
-        self.scraped_content = []
+    """Compatibilidade: delega ao crawler assíncrono (modules/crawler/engine.py)."""
 
-    def get_headers(self):
-        return {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
-            "Connection": "keep-alive",
-        }
-
-    def is_valid_url(self, url):
-        parsed = urlparse(url)
-        return (
-            parsed.netloc == self.domain
-            and url not in self.visited
-            and not url.endswith((".pdf", ".jpg", ".png", ".gif", ".css", ".js"))
+    def __init__(
+        self, base_url, max_pages=50, concurrency=8, per_host_delay=0.5, frontier_path=None
+    ):
+        self.base_url = base_url
+        self.frontier_path = frontier_path  # sqlite: permite retomar após queda
+        self.config = CrawlConfig(
+            max_pages=max_pages,
+            concurrency=concurrency,
+            per_host_delay=per_host_delay,
+            max_links_per_page=20,
+            keep_records=True,  # lidos de report.records ao final
         )
-
-    def extract_links(self, soup, current_url):
-        links = []
-        for link in soup.find_all("a", href=True):
-            full_url = urljoin(current_url, link["href"])
-            if self.is_valid_url(full_url):
-                links.append(full_url)
-        return links
-
-    def scrape_page(self, url):
-        try:
-            print(f"Scraping: {url}")
-            response = requests.get(url, headers=self.get_headers(), timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            # Remove elementos desnecessários
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
-
-            # Extrair texto
-            text = soup.get_text(separator="\n", strip=True)
-
-            # Extrair links
-            links = self.extract_links(soup, url)
-
-            return text, links
-
-        except Exception as e:
-            print(f"Erro ao scraping {url}: {e}")
-            return None, []
+        self.scraped_content = []
 
     def run(self):
-        scraped_count = 0
-
-        while self.to_visit and scraped_count < self.max_pages:
-            url = self.to_visit.popleft()
-
-            if url in self.visited:
-                continue
-
-            self.visited.add(url)
-            text, links = self.scrape_page(url)
-
-            if text:
-                self.scraped_content.append(
-                    {
-                        "url": url,
-                        "content": text[:5000],  # Limitar tamanho
-                        "length": len(text),
-                    }
-                )
-                scraped_count += 1
-
-                # Adicionar novos links
-                for link in links[:5]:  # Limitar links por página
-                    if link not in self.visited:
-                        self.to_visit.append(link)
-
-            # Delay para não sobrecarregar
-            time.sleep(2)
-
-        print(f"\nScraping concluído: {scraped_count} páginas")
+        if self.frontier_path:
+            with SQLiteFrontier(self.frontier_path) as frontier:
+                crawler = AsyncCrawler(self.config, frontier=frontier)
+                report = asyncio.run(crawler.crawl([self.base_url]))
+        else:
+            report = asyncio.run(AsyncCrawler(self.config).crawl([self.base_url]))
+        for rec in report.records:
+            text = rec["content_markdown"]
+            self.scraped_content.append(
+                {
+                    "url": rec["source"],
+                    "content": text[:5000],  # Limitar tamanho
+                    "length": len(text),
+                }
+            )
+        print(
+            f"\nScraping concluído: {report.fetched} páginas "
+            f"({report.pages_per_s} pág/s, {report.failed} falhas)"
+        )
         return self.scraped_content
 
 
@@ -139,7 +89,11 @@ if __name__ == "__main__":
     print("[INICIO] TESTE DE ESTRESSE - REDE LOG RJ")
 
     # Scraping massivo
-    scraper = MassScraper("https://redelog.rj.gov.br/redelog/", max_pages=20)
+    scraper = MassScraper(
+        "https://redelog.rj.gov.br/redelog/",
+        max_pages=20,
+        frontier_path="artifacts/crawl/redelog.sqlite",
+    )
     content = scraper.run()
 
     # Salvar resultado
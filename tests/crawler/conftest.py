@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+PAGE = """<html><head><title>{title}</title></head><body>
+<article><h1>{title}</h1><p>{body}</p></article>
+{links}
+</body></html>"""
+
+
+def _page(title: str, links: list[str]) -> str:
+    body = f"Conteúdo da página {title}. " * 20
+    anchors = "".join(f'<a href="{h}">{h}</a>' for h in links)
+    return PAGE.format(title=title, body=body, links=anchors)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):  # noqa: D401
+        pass
+
+
+@pytest.fixture()
+def site_dir(tmp_path):
+    root = tmp_path / "site"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture()
+def site(site_dir):
+    tmp_path = site_dir
+    (tmp_path / "robots.txt").write_text("User-agent: *\nDisallow: /private/\n")
+    (tmp_path / "index.html").write_text(
+        _page("home", ["/a.html", "/b.html", "/private/x.html", "/logo.png#top", "mailto:x@y"])
+    )
+    (tmp_path / "a.html").write_text(_page("a", ["/c.html", "/index.html"]))
+    (tmp_path / "b.html").write_text(_page("b", ["/c.html", "/missing.html"]))
+    (tmp_path / "c.html").write_text(_page("c", []))
+    (tmp_path / "private").mkdir()
+    (tmp_path / "private" / "x.html").write_text(_page("x", []))
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(_QuietHandler, directory=str(tmp_path))
+    )
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
@@ -0,0 +1,75 @@
+import os
+
+from aurora_platform.modules.crawler.ingestion.artifact_store import ArtifactStore
+from aurora_platform.modules.crawler.pipeline import run_ingestion, save_record
+
+
+def _rec(i):
+    return {
+        "id": f"doc{i:04d}",
+        "source": f"https://example.org/{i}",
+        "content_markdown": f"# Edital {i}\n\n" + "conteúdo repetido do edital " * 20,
+        "chunks": [{"id": f"doc{i:04d}::0", "text": f"trecho {i}"}],
+    }
+
+
+def test_shards_index_and_random_access(tmp_path):
+    root = str(tmp_path / "store")
+    with ArtifactStore(root, shard_bytes=2048, block_bytes=1024) as st:
+        for i in range(60):
+            assert st.put(_rec(i))
+        assert not st.put(_rec(3))  # id já gravado
+        assert st.get("doc0059")["source"] == "https://example.org/59"  # ainda no buffer
+
+    files = sorted(f for f in os.listdir(root) if f.endswith(".zst"))
+    assert len(files) > 1
+    raw = sum(len(str(_rec(i))) for i in range(60))
+    assert sum(os.path.getsize(os.path.join(root, f)) for f in files) < raw / 3
+
+    with ArtifactStore(root) as st:
+        assert len(st) == 60 and "doc0042" in st
+        assert st.get("doc0042")["chunks"][0]["text"] == "trecho 42"
+        assert st.get("nope") is None
+        assert [r["id"] for r in st] == [f"doc{i:04d}" for i in range(60)]
+
+
+def test_uncommitted_tail_is_truncated(tmp_path):
+    root = str(tmp_path / "store")
+    with ArtifactStore(root) as st:
+        st.put(_rec(1))
+    shard = os.path.join(root, "shard-00000.jsonl.zst")
+    size = os.path.getsize(shard)
+    with open(shard, "ab") as f:
+        f.write(b"lixo de uma escrita interrompida")
+    with ArtifactStore(root) as st:
+        assert os.path.getsize(shard) == size
+        st.put(_rec(2))
+    with ArtifactStore(root) as st:
+        assert [r["id"] for r in st] == ["doc0001", "doc0002"]
+
+
+def test_save_record_writes_to_store(tmp_path):
+    rec = run_ingestion("# Título\n\nTexto do documento.", "text", "local.txt")
+    path = save_record(rec, out_dir=str(tmp_path))
+    assert path.endswith(".jsonl.zst")
+    with ArtifactStore(str(tmp_path)) as st:
+        assert st.get(rec["id"])["content_markdown"] == rec["content_markdown"]
+
+
+def test_unregistered_shard_is_removed_on_open(tmp_path):
+    root = str(tmp_path / "store")
+    with ArtifactStore(root, shard_bytes=2048, block_bytes=1024) as st:
+        for i in range(30):
+            st.put(_rec(i))
+    names = sorted(f for f in os.listdir(root) if f.endswith(".zst"))
+    # shard seguinte aberto por uma escrita que morreu antes do índice
+    orphan = os.path.join(root, "shard-%05d.jsonl.zst" % (len(names)))
+    with open(orphan, "wb") as f:
+        f.write(b"frame nunca confirmado")
+    with ArtifactStore(root, shard_bytes=2048, block_bytes=1024) as st:
+        assert not os.path.exists(orphan)
+        for i in range(30, 60):
+            st.put(_rec(i))
+    with ArtifactStore(root) as st:
+        assert [r["id"] for r in st] == [f"doc{i:04d}" for i in range(60)]
+        assert st.get("doc0059")["source"] == "https://example.org/59"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+
+from aurora_platform.modules.crawler.engine import (
+    AsyncCrawler,
+    CrawlConfig,
+    extract_links,
+)
+
+
+def test_extract_links_resolves_and_filters():
+    html = '<a href="/x#frag">x</a><a href="mailto:a@b">m</a><a href="https://o.org/y">y</a>'
+    assert extract_links(html, "http://h/p/") == ["http://h/x", "https://o.org/y"]
+
+
+def test_crawl_respects_robots_and_ingests(site):
+    seen: list[dict] = []
+    cfg = CrawlConfig(
+        max_pages=20, concurrency=4, per_host_delay=0.0, http2=False, tags={"run": "t"}
+    )
+    crawler = AsyncCrawler(cfg, on_record=seen.append)
+    report = asyncio.run(crawler.crawl([f"{site}/index.html"]))
+
+    assert report.fetched == 4  # index, a, b, c
+    assert report.skipped_robots == 1
+    assert report.failed == 1  # /missing.html
+    assert sorted(r["source"].rsplit("/", 1)[1] for r in seen) == [
+        "a.html",
+        "b.html",
+        "c.html",
+        "index.html",
+    ]
+    assert report.records == []  # entregues pelo on_record, não acumulados
+    rec = seen[0]
+    assert rec["id"] and rec["chunks"]
+    assert rec["meta"]["tags"]["run"] == "t"
+
+
+def test_ingest_error_fails_only_that_page(site):
+    def on_record(rec):
+        if rec["source"].endswith("/a.html"):
+            raise ValueError("indexador fora do ar")
+
+    cfg = CrawlConfig(max_pages=20, per_host_delay=0.0, http2=False, keep_records=True)
+    report = asyncio.run(AsyncCrawler(cfg, on_record=on_record).crawl([f"{site}/index.html"]))
+    assert report.fetched == 4  # o crawl seguiu depois da falha
+    assert report.failed == 2  # /missing.html + a.html
+    assert len(report.records) == 4
+
+
+def test_crawl_honours_max_pages_and_depth(site):
+    cfg = CrawlConfig(max_pages=10, max_depth=0, per_host_delay=0.0, http2=False)
+    report = asyncio.run(AsyncCrawler(cfg).crawl([f"{site}/index.html"]))
+    assert report.fetched == 1
+
+    cfg = CrawlConfig(max_pages=2, per_host_delay=0.0, http2=False, ingest=False)
+    report = asyncio.run(AsyncCrawler(cfg).crawl([f"{site}/index.html"]))
+    assert report.fetched == 2
+    assert report.records == []
+
+
+def test_crawl_resumes_from_sqlite_frontier(site, tmp_path):
+    from aurora_platform.modules.crawler.frontier import SQLiteFrontier
+
+    db = str(tmp_path / "frontier.sqlite")
+    cfg = CrawlConfig(max_pages=2, per_host_delay=0.0, http2=False, ingest=False)
+    with SQLiteFrontier(db) as f:
+        first = asyncio.run(AsyncCrawler(cfg, frontier=f).crawl([f"{site}/index.html"]))
+    cfg.max_pages = 50
+    with SQLiteFrontier(db) as f:
+        second = asyncio.run(AsyncCrawler(cfg, frontier=f).crawl([f"{site}/index.html"]))
+        stats = f.stats()
+    assert first.fetched == 2
+    assert second.fetched == 2  # só o que faltou
+    assert stats["done"] == 5 and stats["failed"] == 1 and stats["pending"] == 0
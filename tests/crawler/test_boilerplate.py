@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from aurora_platform.modules.crawler.ingestion.boilerplate import BoilerplateModel
+from aurora_platform.modules.crawler.pipeline import run_ingestion
+
+MENU = "Início | Notícias | Licitações | Transparência | Contato"
+COOKIES = "Este site usa cookies para melhorar sua experiência. Ao continuar, você concorda."
+FOOTER = "© 2024 Governo do Estado do Rio de Janeiro - Todos os direitos reservados."
+
+
+def _page(n: int) -> str:
+    return (
+        f"{MENU}\n{COOKIES}\n## Objeto\n"
+        f"Aquisição de {n * 10} unidades de material hospitalar para a rede {n}. "
+        f"O prazo de entrega do lote {n} é de {n + 5} dias.\n"
+        f"{FOOTER}"
+    )
+
+
+def test_learns_and_strips_repeated_blocks(tmp_path):
+    path = str(tmp_path / "bp.sqlite")
+    with BoilerplateModel(path, min_pages=3) as bp:
+        records = [
+            run_ingestion(_page(n), "html", f"https://saude.rj.gov.br/p{n}", boilerplate=bp)
+            for n in range(1, 7)
+        ]
+        # antes de min_pages nada sai; depois menu, cookies e rodapé somem
+        assert MENU in records[0]["content_markdown"]
+        last = records[-1]["content_markdown"]
+        assert MENU not in last and "cookies" not in last and "©" not in last
+        assert "## Objeto" in last and "Aquisição de 60 unidades" in last
+        assert records[-1]["meta"]["raw"]["boilerplate_removed"] == 4
+        assert bp.stats("saude.rj.gov.br")["pages"] == 6
+        assert sum(len(c["text"]) for c in records[-1]["chunks"]) < len(_page(6))
+
+    # persistido; página já vista não conta de novo; outro domínio não é afetado
+    with BoilerplateModel(path, min_pages=3) as bp:
+        assert not bp.observe("saude.rj.gov.br", "https://saude.rj.gov.br/p1", _page(1))
+        assert bp.stats("saude.rj.gov.br")["pages"] == 6
+        text, removed = bp.strip("outro.gov.br", _page(1))
+        assert removed == 0 and MENU in text
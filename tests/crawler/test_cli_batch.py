@@ -0,0 +1,157 @@
+import ipaddress
+import socket
+
+import httpx
+import pytest
+
+from aurora_platform.modules.crawler import batch, cli
+from aurora_platform.modules.crawler.batch import (
+    Manifest,
+    SourceRejected,
+    check_source,
+    expand_inputs,
+    guarded_client,
+    run_batch,
+)
+from aurora_platform.modules.crawler.ingestion.artifact_store import ArtifactStore
+
+
+def _docs(tmp_path, n=4):
+    d = tmp_path / "docs"
+    (d / "sub").mkdir(parents=True)
+    for i in range(n):
+        (d / "sub" / f"doc{i}.html").write_text(
+            f"<html><body><article><h1>Edital {i}</h1><p>Pregão eletrônico número {i} "
+            "para aquisição de materiais de escritório.</p></article></body></html>",
+            encoding="utf-8",
+        )
+    (d / "notes.txt").write_text("texto simples do lote", encoding="utf-8")
+    (d / "ignore.bin").write_bytes(b"\x00")
+    return d
+
+
+def test_expand_inputs_dirs_globs_and_url_lists(tmp_path):
+    d = _docs(tmp_path)
+    urls = tmp_path / "urls.txt"
+    urls.write_text("# comentário\nhttps://a.example/x\n\nhttps://a.example/x\n", encoding="utf-8")
+    out = list(expand_inputs([str(d), str(d / "sub" / "*.html")], [str(urls)]))
+    assert len([s for s in out if s.endswith(".html")]) == 4  # glob não repete o diretório
+    assert any(s.endswith("notes.txt") for s in out)
+    assert not any(s.endswith(".bin") for s in out)
+    assert out.count("https://a.example/x") == 1
+
+
+def test_batch_is_resumable(tmp_path):
+    d = _docs(tmp_path)
+    missing = str(tmp_path / "missing.html")
+    manifest = str(tmp_path / "manifest.sqlite")
+    out = tmp_path / "out"
+    sources = list(expand_inputs([str(d)])) + [missing]
+
+    r1 = run_batch(sources, manifest_path=manifest, out_dir=str(out), workers=1, progress=None)
+    assert (r1.total, r1.done, r1.failed, r1.skipped) == (6, 5, 1, 0)
+    with ArtifactStore(str(out)) as store:
+        records = list(store)
+    assert len(records) == 5 and all(r["chunks"] for r in records)
+
+    r2 = run_batch(sources, manifest_path=manifest, out_dir=str(out), workers=1,
+                   retry_failed=False, progress=None)
+    assert (r2.done, r2.failed, r2.skipped) == (0, 0, 5)
+
+    m = Manifest(manifest)
+    try:
+        row = m.conn.execute(
+            "SELECT status, attempts, error FROM items WHERE source = ?", (missing,)
+        ).fetchone()
+    finally:
+        m.close()
+    assert row[0] == "failed" and row[1] == 1 and "FileNotFoundError" in row[2]
+
+
+def test_batch_process_pool(tmp_path):
+    d = _docs(tmp_path, n=6)
+    r = run_batch(expand_inputs([str(d)]), manifest_path=str(tmp_path / "m.sqlite"),
+                  out_dir=None, workers=2, progress=None)
+    assert r.done == 7 and r.failed == 0 and r.chunks >= 7
+
+
+def test_cli_batch_and_single_path(tmp_path, capsys):
+    d = _docs(tmp_path, n=2)
+    rc = cli.main(["--batch", str(d), "--workers", "1",
+                   "--manifest", str(tmp_path / "m.sqlite"), "--out", str(tmp_path / "out")])
+    assert rc == 0
+    assert "concluídos=3" in capsys.readouterr().out
+
+    cli.main(["--path", str(d / "notes.txt")])
+    assert "texto simples do lote" in capsys.readouterr().out
+
+
+# resolvedor fixo: o teste não depende de DNS
+HOSTS = {
+    "compras.gov.br": "200.152.32.10",
+    "site.gov.br": "200.152.32.11",
+    "tce.rn.gov.br": "200.152.32.12",
+    "portal.gov.br": "200.152.32.13",
+    "example.org": "93.184.216.34",
+    "qdrant": "172.18.0.3",
+    "redis": "10.0.0.5",
+    "2130706433": "127.0.0.1",
+    "127.1": "127.0.0.1",
+}
+
+
+def _fake_getaddrinfo(host, *args, **kwargs):
+    addr = HOSTS.get(host, host)
+    try:
+        ipaddress.ip_address(addr)
+    except ValueError:
+        raise socket.gaierror("nome não resolvido")
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (addr, 0))]
+
+
+def test_check_source_policy(tmp_path, monkeypatch):
+    monkeypatch.setattr(socket, "getaddrinfo", _fake_getaddrinfo)
+    assert check_source("https://compras.gov.br/edital.pdf") is None
+    assert check_source("ftp://compras.gov.br/x") == "URL deve ser http(s)"
+    assert check_source("file:///etc/passwd") == "URL deve ser http(s)"
+    assert check_source("https://site.gov.br/logo.png") == "tipo de URL não ingerível"
+    for url in (
+        "http://127.0.0.1:6333/collections", "http://169.254.169.254/", "http://localhost/x",
+        "http://[::1]/", "http://qdrant:6333/collections", "http://redis:6379/",
+        "http://2130706433/", "http://127.1/", "http://nao-resolve.interno/",
+    ):
+        assert check_source(url) == "host não permitido", url
+    allowed = ["gov.br"]
+    assert check_source("https://tce.rn.gov.br/a", allowed_hosts=allowed) is None
+    assert check_source("https://example.org/a", allowed_hosts=allowed) == "host não permitido"
+
+    assert check_source("/etc/passwd") == "caminhos locais não são aceitos"
+    root = str(tmp_path)
+    assert check_source("docs/a.pdf", local_root=root) is None
+    assert check_source("../fora.pdf", local_root=root) == "caminho fora da raiz permitida"
+    assert check_source("/etc/passwd", local_root=root) == "caminho fora da raiz permitida"
+
+
+def test_guarded_client_rechecks_redirects(monkeypatch):
+    monkeypatch.setattr(socket, "getaddrinfo", _fake_getaddrinfo)
+    monkeypatch.setattr(batch, "_guarded", {})
+
+    def handler(request):
+        if request.url.path == "/interno":
+            return httpx.Response(302, headers={"location": "http://redis:6379/"})
+        if request.url.path == "/outro":
+            return httpx.Response(302, headers={"location": "https://site.gov.br/ok"})
+        return httpx.Response(200, text="ok")
+
+    client = guarded_client()
+    client._transport = httpx.MockTransport(handler)
+    assert client.get("https://portal.gov.br/outro").text == "ok"
+    with pytest.raises(SourceRejected):
+        client.get("https://portal.gov.br/interno")
+    with pytest.raises(SourceRejected):
+        client.get("http://127.1/")
+
+    scoped = guarded_client(["portal.gov.br"])
+    scoped._transport = httpx.MockTransport(handler)
+    with pytest.raises(SourceRejected):
+        scoped.get("https://portal.gov.br/outro")
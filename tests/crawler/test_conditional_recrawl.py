@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from aurora_platform.modules.crawler.engine import AsyncCrawler, CrawlConfig
+from aurora_platform.modules.crawler.ingestion.validators import (
+    ValidatorStore,
+    text_fingerprint,
+)
+from aurora_platform.modules.crawler.loaders.url_loader import URLLoader
+from aurora_platform.modules.crawler.pipeline import run_ingestion
+
+
+def _crawl(site: str, store: ValidatorStore):
+    cfg = CrawlConfig(max_pages=20, per_host_delay=0.0, http2=False)
+    return asyncio.run(
+        AsyncCrawler(cfg, validators=store).crawl([f"{site}/index.html"])
+    )
+
+
+def _bump_mtime(path) -> None:
+    t = time.time() + 5
+    os.utime(path, (t, t))
+
+
+def test_fingerprint_matches_record_id():
+    text = "Portal de dados abertos.\n\nConteúdo."
+    assert text_fingerprint(text, "u") == run_ingestion(text, "html", "u")["id"]
+
+
+def test_recrawl_skips_unchanged_pages(site, site_dir, tmp_path):
+    with ValidatorStore(str(tmp_path / "v.sqlite")) as store:
+        first = _crawl(site, store)
+        assert len(first.records) == 4 and first.skipped_unchanged == 0
+
+        # If-Modified-Since -> 304 em todas; links vêm do store, crawl completo
+        second = _crawl(site, store)
+        assert second.not_modified == 4
+        assert second.records == []
+
+        # mtime novo, mesmo texto -> 200 mas sha256 igual
+        _bump_mtime(site_dir / "a.html")
+        # texto novo -> reprocessado
+        (site_dir / "c.html").write_text("<html><body><p>novo conteúdo</p></body></html>")
+        _bump_mtime(site_dir / "c.html")
+        third = _crawl(site, store)
+        assert third.unchanged == 1
+        assert third.not_modified == 2
+        assert [r["source"].rsplit("/", 1)[1] for r in third.records] == ["c.html"]
+
+
+def test_url_loader_flags_unchanged(site, site_dir, tmp_path):
+    with ValidatorStore(str(tmp_path / "v.sqlite")) as store:
+        loader = URLLoader(validators=store)
+        url = f"{site}/a.html"
+        doc = loader.load(source=url)
+        assert doc["text"] and doc["metadata"]["unchanged"] is False
+        assert store.get(url) is None  # nada gravado antes de ingerir
+        loader.commit(doc)
+        assert store.get(url).last_modified
+
+        again = loader.load(source=url)
+        assert again["metadata"]["not_modified"] and again["metadata"]["unchanged"]
+
+        _bump_mtime(site_dir / "a.html")
+        same = loader.load(source=url)
+        assert same["metadata"]["unchanged"] is True
+        assert same["metadata"]["content_sha256"] == doc["metadata"]["content_sha256"]
+
+
+def test_url_loader_ignores_markup_only_changes(site, site_dir, tmp_path):
+    page = site_dir / "a.html"
+    body = "<p>Edital de pregão eletrônico para compra de equipamentos.</p>" * 5
+    page.write_text(
+        f'<html><body><form><input name="csrf" value="t1"></form><article>{body}</article>'
+        '<!-- gerado em 10:00 --></body></html>'
+    )
+    with ValidatorStore(str(tmp_path / "v.sqlite")) as store:
+        loader = URLLoader(validators=store)
+        url = f"{site}/a.html"
+        first = loader.load(source=url)
+        loader.commit(first)
+        page.write_text(
+            f'<html><body><form><input name="csrf" value="t2"></form><article>{body}</article>'
+            '<!-- gerado em 10:05 --></body></html>'
+        )
+        _bump_mtime(page)
+        again = loader.load(source=url)
+        assert again["metadata"]["unchanged"] is True
+        assert again["metadata"]["content_sha256"] == first["metadata"]["content_sha256"]
+
+
+def test_failed_ingest_is_retried_on_next_crawl(site, tmp_path):
+    cfg = CrawlConfig(max_pages=20, per_host_delay=0.0, http2=False)
+
+    def boom(record):
+        raise RuntimeError("indexador fora do ar")
+
+    with ValidatorStore(str(tmp_path / "v.sqlite")) as store:
+        failed = asyncio.run(
+            AsyncCrawler(cfg, validators=store, on_record=boom).crawl([f"{site}/index.html"])
+        )
+        assert failed.failed >= 4 and failed.not_modified == 0
+        retry = _crawl(site, store)
+        assert retry.fetched == 4 and retry.not_modified == 0
+        assert len(retry.records) == 4
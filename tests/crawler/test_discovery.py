@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+
+from aurora_platform.modules.crawler.discovery import FeedParser, parse_feed, parse_lastmod
+from aurora_platform.modules.crawler.engine import AsyncCrawler, CrawlConfig, crawl
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _urlset(entries):
+    urls = "".join(
+        f"<url><loc>{u}</loc>" + (f"<lastmod>{m}</lastmod>" if m else "") + "</url>"
+        for u, m in entries
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{urls}</urlset>'.encode()
+
+
+def _index(locs):
+    items = "".join(f"<sitemap><loc>{u}</loc></sitemap>" for u in locs)
+    return f"<sitemapindex {NS}>{items}</sitemapindex>".encode()
+
+
+def test_parse_lastmod_formats():
+    assert parse_lastmod("2024-05-01") == 1714521600.0
+    assert parse_lastmod("2024-05-01T00:00:00Z") == 1714521600.0
+    assert parse_lastmod("2024-05-01T03:00:00+03:00") == 1714521600.0
+    assert parse_lastmod("Wed, 01 May 2024 00:00:00 GMT") == 1714521600.0
+    assert parse_lastmod("ontem") is None
+
+
+def test_parse_sitemap_index_rss_and_atom():
+    urls = parse_feed(_urlset([("https://a.gov.br/x", "2024-05-01"), ("https://a.gov.br/y", None)]))
+    assert [(d.url, d.lastmod, d.sitemap) for d in urls] == [
+        ("https://a.gov.br/x", 1714521600.0, False),
+        ("https://a.gov.br/y", None, False),
+    ]
+    idx = parse_feed(_index(["https://a.gov.br/s1.xml.gz"]))
+    assert idx[0].sitemap and idx[0].url.endswith("s1.xml.gz")
+
+    rss = parse_feed(
+        b"<rss><channel><title>t</title><link>https://a.gov.br/</link>"
+        b"<item><title>Edital</title><link>https://a.gov.br/e1</link>"
+        b"<pubDate>Wed, 01 May 2024 00:00:00 GMT</pubDate></item></channel></rss>"
+    )
+    assert [(d.url, d.lastmod) for d in rss] == [("https://a.gov.br/e1", 1714521600.0)]
+
+    atom = parse_feed(
+        b'<feed xmlns="http://www.w3.org/2005/Atom"><entry><title>x</title>'
+        b'<link rel="enclosure" href="https://a.gov.br/e.pdf"/>'
+        b'<link href="https://a.gov.br/e2"/><updated>2024-05-01T00:00:00Z</updated>'
+        b"</entry></feed>"
+    )
+    assert [(d.url, d.lastmod) for d in atom] == [("https://a.gov.br/e2", 1714521600.0)]
+
+
+def test_streaming_gzip_in_small_chunks():
+    entries = [(f"https://a.gov.br/p/{i}", "2024-01-01") for i in range(5000)]
+    data = gzip.compress(_urlset(entries))
+    p = FeedParser()
+    out = p.feed(data[:1])  # cabeçalho gzip partido entre blocos
+    for i in range(1, len(data), 4096):
+        out += p.feed(data[i:i + 4096])
+    out += p.close()
+    assert len(out) == 5000 and out[-1].url == "https://a.gov.br/p/4999"
+    assert len(p._root) == 0  # entradas não acumulam na árvore
+
+
+def _discovery_site(site_dir, site, old="2020-01-01"):
+    for name in ("d", "e", "f"):
+        (site_dir / f"{name}.html").write_text(  # órfãs: ninguém aponta para elas
+            f"<html><head><title>{name}</title></head><body><article><h1>{name}</h1>"
+            f"<p>{'Conteúdo da página órfã. ' * 20}</p></article></body></html>"
+        )
+    (site_dir / "robots.txt").write_text(
+        f"User-agent: *\nDisallow: /private/\nSitemap: {site}/sitemap_index.xml\n"
+    )
+    (site_dir / "sitemap_index.xml").write_bytes(
+        _index([f"{site}/pages.xml.gz", f"{site}/missing.xml"])
+    )
+    (site_dir / "pages.xml.gz").write_bytes(gzip.compress(_urlset([
+        (f"{site}/d.html", old),
+        (f"{site}/e.html", "2099-01-01"),
+        (f"{site}/private/x.html", None),
+        ("https://outro.gov.br/z.html", None),
+    ])))
+    (site_dir / "feed.xml").write_bytes(
+        f"<rss><channel><item><link>{site}/f.html</link></item></channel></rss>".encode()
+    )
+
+
+def test_crawl_discovers_orphan_pages(site_dir, site):
+    _discovery_site(site_dir, site)
+    seen: list[str] = []
+    cfg = CrawlConfig(max_depth=0, per_host_delay=0.0, http2=False, concurrency=1,
+                      discover=True, feeds=[f"{site}/feed.xml"])
+    crawler = AsyncCrawler(cfg, on_record=lambda r: seen.append(r["source"].rsplit("/", 1)[1]))
+    report = asyncio.run(crawler.crawl([f"{site}/index.html"]))
+    assert report.sitemaps == 3  # índice, pages.xml.gz, feed (missing.xml é 404)
+    assert report.discovered == 4  # d, e, f, private/x (outro host fica de fora)
+    assert report.skipped_robots == 1
+    assert set(seen) == {"index.html", "d.html", "e.html", "f.html"}
+    assert seen.index("e.html") < seen.index("d.html")  # lastmod mais novo primeiro
+
+
+def test_recrawl_skips_by_lastmod(site_dir, site, tmp_path):
+    _discovery_site(site_dir, site)
+    opts = dict(validators_path=str(tmp_path / "v.sqlite"), discover=True, max_depth=0,
+                per_host_delay=0.0, http2=False)
+    first = crawl([f"{site}/index.html"], **opts)
+    assert first.fetched == 3 and first.skipped_lastmod == 0
+    second = crawl([f"{site}/index.html"], **opts)
+    # d.html (2020) não é buscada; e.html (2099) e as sem data sim
+    assert second.skipped_lastmod == 1
+    assert second.discovered == 2
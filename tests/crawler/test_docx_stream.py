@@ -0,0 +1,95 @@
+import tracemalloc
+
+from aurora_platform.modules.crawler.loaders.docx_bench import (
+    _p,
+    _table,
+    make_large_docx,
+    write_docx,
+)
+from aurora_platform.modules.crawler.loaders.docx_loader import DocxLoader, iter_blocks
+from aurora_platform.modules.crawler.pipeline import file_sha256, iter_docx_chunks
+
+
+def _sample(tmp_path):
+    nested = "<w:tbl><w:tr><w:tc>" + _p("sub a") + "</w:tc><w:tc>" + _p("sub b") + "</w:tc></w:tr></w:tbl>"
+    return write_docx(str(tmp_path / "s.docx"), [
+        _p("Edital de Pregão", "Title"),
+        _p("Objeto", "Ttulo2"),
+        _p("Aquisição de mobiliário & equipamentos."),
+        _table([["Item", "Qtd"], ["Cadeira", "10"]]),
+        "<w:tbl><w:tr><w:tc>" + _p("Lote") + "</w:tc><w:tc>" + nested + "</w:tc></w:tr></w:tbl>",
+        _p(""),
+        _p("Disposições finais."),
+    ])
+
+
+def test_iter_blocks_headings_paragraphs_and_rows(tmp_path):
+    blocks = list(iter_blocks(_sample(tmp_path)))
+    kinds = [(b["kind"], b["text"]) for b in blocks]
+    assert kinds[:3] == [
+        ("heading", "Edital de Pregão"),
+        ("heading", "Objeto"),
+        ("paragraph", "Aquisição de mobiliário & equipamentos."),
+    ]
+    assert blocks[0]["level"] == 1 and blocks[1]["level"] == 2
+    rows = [b["cells"] for b in blocks if b["kind"] == "row"]
+    assert rows == [["Item", "Qtd"], ["Cadeira", "10"], ["Lote", "sub a ; sub b"]]
+    assert kinds[-1] == ("paragraph", "Disposições finais.")
+
+
+def test_load_stream_returns_markdown(tmp_path):
+    doc = DocxLoader("stream").load(source=_sample(tmp_path))
+    assert doc["metadata"]["engine"] == "stream"
+    md = doc["text"]
+    assert md.startswith("# Edital de Pregão\n\n## Objeto")
+    assert "| Item | Qtd |\n| --- | --- |\n| Cadeira | 10 |" in md
+    assert "| Lote | sub a ; sub b |" in md  # segunda tabela, novo cabeçalho
+
+
+def test_bad_zip_falls_back(tmp_path):
+    bad = tmp_path / "bad.docx"
+    bad.write_bytes(b"not a zip")
+    doc = DocxLoader("stream").load(source=str(bad))
+    assert "BadZipFile" in doc["metadata"]["warning"]
+
+
+def _peak(fn):
+    tracemalloc.start()
+    try:
+        out = fn()
+        return out, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_iter_docx_chunks_streams_with_bounded_memory(tmp_path):
+    small = make_large_docx(str(tmp_path / "small.docx"), paragraphs=2000)
+    big = make_large_docx(str(tmp_path / "big.docx"), paragraphs=8000)
+    first = next(iter_docx_chunks(small))  # aquece imports/caches
+    assert first["id"] == f"{file_sha256(small)}::0"
+    assert first["heading"] == "Seção 1"
+
+    def drain(path):
+        return sum(1 for _ in iter_docx_chunks(path))
+
+    n_small, stream_small = _peak(lambda: drain(small))
+    n_big, stream_big = _peak(lambda: drain(big))
+    _, full_big = _peak(lambda: DocxLoader("stream").load(source=big))
+    assert n_big > 3 * n_small
+    # streaming: pico não cresce com o documento; carga inteira sim
+    assert stream_big < 1.5 * stream_small
+    assert stream_big < full_big / 2
+
+
+def test_batch_and_jobs_use_streaming_path(tmp_path, monkeypatch):
+    from aurora_platform.modules.crawler.batch import process_item
+    from aurora_platform.modules.rag.jobs import prepare_source
+
+    path = _sample(tmp_path)
+    # a leitura com DOM inteiro não deve mais ser chamada
+    monkeypatch.setattr(DocxLoader, "load", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+    rec = process_item(path)["record"]
+    assert rec["id"] == file_sha256(path)
+    assert [c["text"] for c in rec["chunks"]] == [c["text"] for c in iter_docx_chunks(path)]
+    payloads, _ = prepare_source(path)
+    assert payloads[0]["canonical_id"] == rec["id"] and payloads[0]["source_type"] == "docx"
@@ -0,0 +1,119 @@
+import gzip
+
+import pytest
+
+from aurora_platform.modules.crawler import cli
+from aurora_platform.modules.crawler.archive import FetchArchive, read_at, reprocess
+from aurora_platform.modules.crawler.engine import crawl
+from aurora_platform.modules.crawler.ingestion.artifact_store import ArtifactStore
+from aurora_platform.modules.crawler.loaders.url_loader import URLLoader
+
+HTML = (
+    "<html><head><title>Edital {n}</title></head><body><article><h1>Edital {n}</h1>"
+    "<p>Pregão eletrônico para aquisição de mobiliário, versão {n}.</p></article></body></html>"
+)
+
+
+class FakeIndexer:
+    def __init__(self):
+        self.calls = []
+        self.pruned = {}
+
+    def upsert_records(self, recs):
+        self.calls.append(recs)
+
+    def prune_url(self, url, keep):
+        self.pruned[url] = [r["canonical_id"] for r in keep]
+
+
+def _fill(archive, urls=3):
+    for i in range(urls):
+        url = f"https://ex.gov.br/edital/{i}"
+        archive.put(url, 200, {"Content-Type": "text/html; charset=utf-8"},
+                    HTML.format(n=f"{i}-v1").encode(), fetched_at=1000.0 + i)
+        archive.put(url, 200, {"Content-Type": "text/html; charset=utf-8"},
+                    HTML.format(n=f"{i}-v2").encode(), fetched_at=2000.0 + i)
+
+
+def test_put_get_versions_and_warc_layout(tmp_path):
+    with FetchArchive(str(tmp_path / "a")) as archive:
+        _fill(archive, urls=2)
+        url = "https://ex.gov.br/edital/1"
+        assert archive.versions(url) == [1001.0, 2001.0]
+        assert "1-v2" in archive.get(url).text()
+        old = archive.get(url, 1001.0)
+        assert old.status == 200 and "1-v1" in old.text()
+        assert old.content_type.startswith("text/html")
+        assert len(archive) == 4
+        latest = archive.latest()
+        assert [u for u, *_ in latest] == ["https://ex.gov.br/edital/0", url]
+        path = latest[0][1]
+    # segmento é um .warc.gz válido: membros gzip concatenados
+    raw = gzip.decompress(open(path, "rb").read())
+    assert raw.count(b"WARC/1.0\r\nWARC-Type: response") == 4
+    assert b"WARC-Target-URI: https://ex.gov.br/edital/0" in raw
+
+
+def test_segments_rotate_and_tail_is_truncated(tmp_path):
+    root = str(tmp_path / "a")
+    with FetchArchive(root, segment_bytes=200) as archive:
+        _fill(archive, urls=2)
+        locs = archive.latest()
+        assert len({p for _, p, _, _ in locs}) > 1
+        last = archive.path(archive._segment)
+    with open(last, "ab") as f:
+        f.write(b"\x1f\x8b lixo de escrita interrompida")
+    with FetchArchive(root, segment_bytes=200) as archive:
+        archive.put("https://ex.gov.br/novo", 200, {"content-type": "text/plain"}, b"ok")
+        assert archive.get("https://ex.gov.br/novo").body == b"ok"
+        for url, path, off, n in archive.latest():
+            assert read_at(path, off, n).url == url
+
+
+def test_url_loader_archives_raw_response(tmp_path, site):
+    with FetchArchive(str(tmp_path / "a")) as archive:
+        doc = URLLoader(archive=archive).load(source=f"{site}/a.html")
+        assert "Conteúdo da página a" in doc["text"]
+        resp = archive.get(f"{site}/a.html")
+        assert resp.status == 200
+        assert resp.body.startswith(b"<html><head><title>a</title>")
+        assert resp.headers["content-length"] == str(len(resp.body))
+
+
+def test_crawl_archives_pages(tmp_path, site):
+    root = str(tmp_path / "a")
+    crawl([f"{site}/index.html"], archive_path=root, max_pages=10, per_host_delay=0.0)
+    with FetchArchive(root) as archive:
+        urls = {u for u, *_ in archive.latest()}
+    assert {f"{site}/{p}.html" for p in ("index", "a", "b", "c")} <= urls
+    assert not any("/private/" in u or "missing" in u for u in urls)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reprocess_rebuilds_records_and_index(tmp_path, workers):
+    with FetchArchive(str(tmp_path / "a")) as archive:
+        _fill(archive)
+        archive.put("https://ex.gov.br/quebrado", 200, {"content-type": "application/pdf"}, b"%PDF-")
+        indexer = FakeIndexer()
+        report = reprocess(archive, out_dir=str(tmp_path / "out"), workers=workers,
+                           indexer=indexer, batch_size=2, progress=None)
+    assert report.total == 4 and report.done + report.failed == 4
+    assert report.done >= 3
+    recs = [r for batch in indexer.calls for r in batch]
+    assert len(recs) == report.chunks
+    assert {r["url"] for r in recs} >= {f"https://ex.gov.br/edital/{i}" for i in range(3)}
+    # cada URL reprocessada limpa os pontos da versão antiga, mantendo os novos
+    assert set(indexer.pruned) >= {r["url"] for r in recs}
+    assert all(set(ids) <= {r["canonical_id"] for r in recs} for ids in indexer.pruned.values())
+    with ArtifactStore(str(tmp_path / "out")) as store:
+        joined = " ".join(ch["text"] for r in store for ch in r["chunks"])
+    assert "v2" in joined and "v1" not in joined
+
+
+def test_cli_reprocess(tmp_path, capsys):
+    root = str(tmp_path / "a")
+    with FetchArchive(root) as archive:
+        _fill(archive, urls=2)
+    rc = cli.main(["--reprocess", root, "--out", str(tmp_path / "out"), "--workers", "1"])
+    assert rc == 0
+    assert "total=2 concluídos=2" in capsys.readouterr().out
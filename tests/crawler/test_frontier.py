@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import sys
+
+import pytest
+
+from aurora_platform.modules.crawler.frontier import (
+    ScalableBloomFilter,
+    SQLiteFrontier,
+)
+
+
+def test_scalable_bloom_grows_without_false_negatives():
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+    keys = [f"https://site/{i}" for i in range(5000)]
+    for k in keys:
+        bloom.add(k)
+    assert len(bloom.filters) > 1
+    assert all(k in bloom for k in keys)
+    fp = sum(f"https://other/{i}" in bloom for i in range(5000)) / 5000
+    assert fp < 0.03
+
+
+def test_sqlite_frontier_persists_and_resumes(tmp_path):
+    db = str(tmp_path / "f.sqlite")
+    with SQLiteFrontier(db) as f:
+        assert f.push_many([("http://h/b", 1, 1.0), ("http://h/a", 0, 0.0), ("http://h/a#x", 0, 0.0)]) == 2
+        assert not f.push("http://h/a")
+        first = f.pop()
+        assert first.url == "http://h/a"
+        f.done(first)
+        f.pop()  # reservado e "perdido" num crash
+
+    with SQLiteFrontier(db, lease_s=0.0) as f:
+        assert f.seen("http://h/a") and f.seen("http://h/b")
+        assert not f.push("http://h/a")  # já visitado continua fora da fila
+        again = f.pop()  # lease vencido: volta a ser elegível
+        assert again.url == "http://h/b"
+        f.done(again, ok=False)
+        assert f.pop() is None
+        assert f.stats() == {"pending": 0, "claimed": 0, "done": 1, "failed": 1}
+
+
+def test_release_returns_own_claims(tmp_path):
+    with SQLiteFrontier(str(tmp_path / "f.sqlite"), worker_id="w1") as f:
+        f.push("http://h/a")
+        f.pop()
+        assert len(f) == 0
+        assert f.release() == 1
+        assert f.pop().url == "http://h/a"
+
+
+def _drain(db: str, out) -> None:
+    got = []
+    with SQLiteFrontier(db) as f:
+        while (item := f.pop()) is not None:
+            got.append(item.url)
+            f.done(item)
+    out.put(got)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="usa fork")
+def test_processes_never_claim_same_item(tmp_path):
+    db = str(tmp_path / "f.sqlite")
+    with SQLiteFrontier(db) as f:
+        f.push_many((f"http://h/{i}", 0, float(i)) for i in range(300))
+    ctx = mp.get_context("fork")
+    q = ctx.Queue()
+    procs = [ctx.Process(target=_drain, args=(db, q)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    results = [q.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(timeout=60)
+    claimed = [u for r in results for u in r]
+    assert len(claimed) == 300 and len(set(claimed)) == 300
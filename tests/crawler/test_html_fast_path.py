@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+
+from aurora_platform.modules.crawler.ingestion import html_loader
+from aurora_platform.modules.crawler.ingestion.html_bench import benchmark_engines
+from aurora_platform.modules.crawler.ingestion.html_loader import (
+    EngineSelector,
+    HTMLLoader,
+    extraction_quality,
+)
+
+pytestmark = pytest.mark.skipif(not html_loader.HAS_SELECTOLAX, reason="selectolax ausente")
+
+HTML = """<html><head><title>Edital 12/2024</title></head><body>
+<nav class="content">{nav}</nav>
+<div class="post"><p>curto</p></div>
+<main><article><h1>Edital</h1><p>{body}</p><script>var x = "{script}";</script></article></main>
+<footer>{nav}</footer></body></html>"""
+
+
+def _doc(i: int = 0) -> str:
+    return HTML.format(nav="menu " * 500, body=f"Objeto do edital {i}. " * 30, script="s" * 5000)
+
+
+def test_single_pass_ignores_boilerplate_and_scripts():
+    res = HTMLLoader(prefer_readable=False).load_from_string(_doc(), "https://h/x")
+    assert res.text.startswith("Edital")
+    assert "Objeto do edital 0." in res.text
+    assert "menu" not in res.text and "sss" not in res.text
+    assert res.meta["title"] == "Edital 12/2024"
+
+
+def test_selector_prefers_cheapest_engine_within_tolerance():
+    sel = EngineSelector(explore_docs=2, tolerance=0.9)
+    assert sel.choose("gov.br") is None
+    for _ in range(2):
+        sel.record_trial(
+            "gov.br",
+            {"trafilatura": (1.0, 30.0), "selectolax": (0.95, 1.0), "bs4": (0.5, 10.0)},
+        )
+    assert sel.choose("gov.br") == "selectolax"
+    sel.record_trial("other.org", {"trafilatura": (1.0, 30.0), "selectolax": (0.2, 1.0)})
+    sel.explore_docs = 1
+    assert sel.choose("other.org") == "trafilatura"
+
+
+def test_quality_penalizes_boilerplate_instead_of_rewarding_length():
+    body = "Objeto do edital: aquisição de computadores para as escolas. " * 10
+    menu = "Início Notícias Contato Transparência Ouvidoria " * 40
+    q = extraction_quality(
+        {"trafilatura": body, "selectolax": body + menu, "bs4": body[: len(body) // 2]}
+    )
+    assert q["trafilatura"] == 1.0
+    assert q["selectolax"] < 0.5  # o mais longo, mas quase tudo é menu
+    assert q["bs4"] > q["selectolax"]
+    # sem trafilatura: consenso entre os demais; o ponto fora perde
+    q = extraction_quality({"selectolax": body, "bs4": body, "outro": body + menu})
+    assert q["selectolax"] > q["outro"] and q["bs4"] > q["outro"]
+    assert extraction_quality({"selectolax": ""}) == {"selectolax": 0.0}
+
+
+def test_selector_roundtrip(tmp_path):
+    sel = EngineSelector(explore_docs=1)
+    sel.record_trial("a", {"selectolax": (1.0, 1.0)})
+    path = str(tmp_path / "sel.json")
+    sel.save(path)
+    assert EngineSelector.load(path, explore_docs=1).choose("a") == "selectolax"
+
+
+def test_adaptive_loader_explores_then_commits():
+    sel = EngineSelector(explore_docs=2)
+    loader = HTMLLoader(selector=sel)
+    for i in range(3):
+        res = loader.load_from_string(_doc(i), f"https://portal.gov.br/{i}")
+        assert f"Objeto do edital {i}." in res.text
+    stats = sel.stats["portal.gov.br"]["selectolax"]
+    assert stats.trials == 2 and stats.calls == 3
+
+
+def test_load_many_preserves_order_in_pool():
+    sel = EngineSelector(explore_docs=1)
+    docs = [(_doc(i), f"https://portal.gov.br/{i}") for i in range(6)]
+    results = HTMLLoader(selector=sel).load_many(docs, workers=2, chunksize=1)
+    assert [f"Objeto do edital {i}." in r.text for i, r in enumerate(results)] == [True] * 6
+    assert sel.choose("portal.gov.br") == "selectolax"
+
+
+def test_benchmark_engines_reports_each_engine():
+    results = benchmark_engines([(_doc(), None)], repeat=1)
+    assert {r.engine for r in results} == set(html_loader.available_engines())
+    assert all(r.ms_per_doc >= 0 and r.docs == 1 for r in results)
+    assert all(0.0 <= r.quality <= 1.0 for r in results)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import pytest
+
+from aurora_platform.modules.crawler.ingestion.near_dedupe import (
+    MinHasher,
+    NearDuplicateIndex,
+    lsh_params,
+)
+from aurora_platform.modules.crawler.pipeline import register_dedupe, run_ingestion
+
+BODY = " ".join(
+    f"Cláusula {i}: a contratada deverá entregar o lote {i} no armazém central "
+    f"em até {i + 3} dias úteis após a emissão da ordem de fornecimento."
+    for i in range(40)
+)
+
+
+def _notice(footer: str) -> str:
+    return f"# Pregão eletrônico 45/2024\n\n## Condições\n\n{BODY}\n\n{footer}"
+
+
+def test_minhash_estimates_jaccard():
+    h = MinHasher(num_perm=256)
+    a = h.signature(_notice("Publicado em 01/02/2024."))
+    b = h.signature(_notice("Atualizado em 09/03/2024 - Secretaria de Logística."))
+    c = h.signature("Texto completamente diferente sobre outro assunto qualquer " * 10)
+    assert MinHasher.similarity(a, b) > 0.85
+    assert MinHasher.similarity(a, c) < 0.1
+
+
+def test_lsh_params_cover_threshold():
+    b, r = lsh_params(0.85, 128)
+    assert b * r <= 128 and abs((1 / b) ** (1 / r) - 0.85) < 0.05
+
+
+def test_pipeline_links_near_duplicates_and_reports(tmp_path):
+    path = str(tmp_path / "lsh.sqlite")
+    with NearDuplicateIndex(path, threshold=0.8) as idx:
+        first = run_ingestion(_notice("Publicado em 01/02/2024."), "html", "https://a.gov.br/1", dedupe=idx)
+        assert first["chunks"] and "duplicate_of" not in first
+        register_dedupe(idx, first)
+        other = run_ingestion("Ata da reunião do conselho, sem relação com editais. " * 20, "html", "https://a.gov.br/3", dedupe=idx)
+        assert "duplicate_of" not in other
+        register_dedupe(idx, other)
+
+    # persistido: reabrir o índice continua reconhecendo o original
+    with NearDuplicateIndex(path, threshold=0.8) as idx:
+        again = run_ingestion(_notice("Atualizado em 09/03/2024."), "html", "https://b.gov.br/2", dedupe=idx)
+        assert again["duplicate_of"] == first["id"]
+        assert again["chunks"] == [] and again["similarity"] >= 0.8
+
+        # documento novo que reaproveita trechos: só os chunks repetidos saem
+        novo = " ".join(
+            f"Item {i} do aditivo {i * 7}: reajuste de {i}% sobre o valor do lote {i + 100}."
+            for i in range(60)
+        )
+        mixed = f"# Aditivo\n\n{novo}\n\n## Condições\n\n{BODY}"
+        rec = run_ingestion(mixed, "html", "https://b.gov.br/4", dedupe=idx)
+        assert "duplicate_of" not in rec
+        assert rec["chunk_duplicates"] and rec["chunks"]
+        assert set(rec["chunk_duplicates"].values()) <= {c["id"] for c in first["chunks"]}
+
+        stats = idx.stats()
+        assert stats["a.gov.br"]["doc_dup_rate"] == 0.0
+        assert stats["b.gov.br"]["docs"] == 2 and stats["b.gov.br"]["doc_dups"] == 1
+        assert 0 < stats["b.gov.br"]["chunk_dup_rate"] < 1
+
+
+def test_params_mismatch_is_rejected(tmp_path):
+    path = str(tmp_path / "lsh.sqlite")
+    NearDuplicateIndex(path, num_perm=64).close()
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(path, num_perm=128)
+
+
+def test_reingest_and_update_of_same_source_are_not_duplicates(tmp_path):
+    url = "https://a.gov.br/edital"
+    with NearDuplicateIndex(str(tmp_path / "lsh.sqlite"), threshold=0.8) as idx:
+        first = run_ingestion(_notice("Publicado em 01/02/2024."), "html", url, dedupe=idx)
+        # nada registrado antes de confirmar: a nova tentativa não é duplicata
+        retry = run_ingestion(_notice("Publicado em 01/02/2024."), "html", url, dedupe=idx)
+        assert "duplicate_of" not in retry and retry["chunks"]
+        register_dedupe(idx, first)
+
+        again = run_ingestion(_notice("Publicado em 01/02/2024."), "html", url, dedupe=idx)
+        assert "duplicate_of" not in again and again["chunks"]
+
+        update = run_ingestion(_notice("Atualizado em 09/03/2024."), "html", url, dedupe=idx)
+        assert "duplicate_of" not in update and update["chunks"]
+        assert "chunk_duplicates" not in update
+        register_dedupe(idx, update)
+
+        # a versão nova substituiu a antiga: outra URL aponta para ela
+        copy = run_ingestion(_notice("Republicado em 10/03/2024."), "html", "https://b.gov.br/x", dedupe=idx)
+        assert copy["duplicate_of"] == update["id"]
+        n = idx.conn.execute("SELECT COUNT(*) FROM signatures WHERE kind = 'doc'").fetchone()[0]
+        assert n == 1
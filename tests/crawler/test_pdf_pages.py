@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from aurora_platform.modules.crawler import pipeline
+from aurora_platform.modules.crawler.loaders import pdf_loader
+from aurora_platform.modules.crawler.loaders.pdf_loader import PDFLoader
+
+N_PAGES = 45
+
+
+def _fake_range(source, start, stop):
+    # roda no worker: o pid prova que a extração saiu do processo principal
+    return [
+        {"page": i + 1, "text": f"Página {i + 1} do edital. pid={os.getpid()}"}
+        for i in range(start, stop)
+    ]
+
+
+@pytest.fixture()
+def fake_backend(monkeypatch):
+    monkeypatch.setattr(pdf_loader, "_HAS_UNSTRUCTURED", False)
+    monkeypatch.setattr(pdf_loader, "_HAS_PYPDF", True)
+    monkeypatch.setattr(pdf_loader, "page_count", lambda source: N_PAGES)
+    monkeypatch.setattr(pdf_loader, "extract_page_range", _fake_range)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="pool com fork")
+def test_iter_pages_fans_out_and_keeps_order(fake_backend):
+    pages = list(PDFLoader().iter_pages("x.pdf", workers=3, pages_per_task=4))
+    assert [p["page"] for p in pages] == list(range(1, N_PAGES + 1))
+    pids = {p["text"].rsplit("pid=", 1)[1] for p in pages}
+    assert str(os.getpid()) not in pids
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="pool com fork")
+def test_pool_is_shared_between_pdfs(fake_backend):
+    first = list(PDFLoader().iter_pages("a.pdf", workers=3, pages_per_task=4))
+    pool = pdf_loader.shared_pool()
+    second = list(PDFLoader().iter_pages("b.pdf", workers=3, pages_per_task=4))
+    assert len(first) == len(second) == N_PAGES
+    assert pdf_loader.shared_pool() is pool  # nenhum pool novo por arquivo
+    pids = {p["text"].rsplit("pid=", 1)[1] for p in first + second}
+    assert len(pids) <= pdf_loader.PDF_WORKERS
+
+
+def test_iter_pages_range_and_early_stop(fake_backend):
+    gen = PDFLoader().iter_pages("x.pdf", workers=1, first_page=10, last_page=20)
+    assert [p["page"] for p in gen] == list(range(10, 21))
+    gen = PDFLoader().iter_pages("x.pdf", workers=2, pages_per_task=2)
+    assert next(gen)["page"] == 1
+    gen.close()  # cancela as demais faixas; o pool segue para o próximo PDF
+    assert [p["page"] for p in PDFLoader().iter_pages("y.pdf", workers=2)] == list(
+        range(1, N_PAGES + 1)
+    )
+
+
+def test_load_records_page_spans(fake_backend):
+    doc = PDFLoader().load(source="x.pdf", workers=1)
+    assert doc["metadata"]["pages"] == N_PAGES
+    page, start, end = doc["metadata"]["page_spans"][4]
+    assert page == 5 and doc["text"][start:end].startswith("Página 5 ")
+
+
+def test_iter_pdf_chunks_carry_page(fake_backend, tmp_path):
+    f = tmp_path / "x.pdf"
+    f.write_bytes(b"%PDF-1.4 fake")
+    chunks = list(pipeline.iter_pdf_chunks(str(f), source="https://h/edital.pdf", workers=1))
+    assert [c["page"] for c in chunks] == list(range(1, N_PAGES + 1))
+    assert chunks[0]["id"] == f"{pipeline.file_sha256(str(f))}::0"
+    rec = pipeline.to_index_record(chunks[7], url="https://h/edital.pdf")
+    assert rec["chunk_index"] == 7 and rec["page"] == 8 and rec["chunk_text"]
+
+
+@pytest.mark.skipif(
+    not any(importlib.util.find_spec(m) for m in ("pdfplumber", "pypdf")),
+    reason="pdf backends not installed",
+)
+def test_real_pdf_pages():
+    p = Path("tests/crawler/fixtures/sample.pdf")
+    if not p.exists():
+        pytest.skip("sample.pdf ausente")
+    pages = list(PDFLoader().iter_pages(str(p), workers=2, pages_per_task=1))
+    assert pages and pages[0]["page"] == 1
+
+
+def test_batch_and_jobs_stream_pdf_with_pages(fake_backend, tmp_path):
+    from aurora_platform.modules.crawler.batch import process_item
+    from aurora_platform.modules.rag.jobs import prepare_source
+
+    f = tmp_path / "edital.pdf"
+    f.write_bytes(b"%PDF-1.4 fake")
+    res = process_item(str(f))
+    rec = res["record"]
+    assert rec["id"] == pipeline.file_sha256(str(f))
+    assert rec["meta"]["raw"]["pages"] == N_PAGES
+    assert [c["page"] for c in rec["chunks"]] == list(range(1, N_PAGES + 1))
+
+    payloads, timings = prepare_source(str(f))
+    assert payloads[4]["page"] == 5 and payloads[4]["canonical_id"] == rec["id"]
+    assert timings["load"] > 0
+
+
+def test_job_indexes_pdf_in_batches_while_extracting(fake_backend, tmp_path):
+    import asyncio
+
+    from aurora_platform.modules.rag.jobs import IngestionJobRunner, JobStore, iter_source
+
+    f = tmp_path / "edital.pdf"
+    f.write_bytes(b"%PDF-1.4 fake")
+    timings = {}
+    batches = list(iter_source(str(f), 10, timings))
+    assert [len(b) for b in batches] == [10, 10, 10, 10, 5]
+    assert [r["page"] for b in batches for r in b] == list(range(1, N_PAGES + 1))
+    assert timings["load"] > 0
+
+    calls = []
+
+    class Indexer:
+        def upsert_records(self, recs, timings=None):
+            calls.append(len(recs))
+            return len(recs)
+
+    runner = IngestionJobRunner(
+        store=JobStore(str(tmp_path / "jobs.sqlite")), indexer=Indexer(), batch_size=10
+    )
+    job_id = runner.store.create([str(f)])
+    asyncio.run(runner.run(job_id, [str(f)]))
+    job = runner.status(job_id)
+    assert (job["done"], job["failed"], job["chunks"]) == (1, 0, N_PAGES)
+    assert len(calls) > 1 and max(calls) <= 10  # indexado aos poucos, não de uma vez
+
+
+def test_downloaded_pdf_chunks_use_page_spans(fake_backend):
+    doc = PDFLoader().load(source="x.pdf", workers=1)
+    rec = pipeline.run_pages_ingestion(
+        doc["text"], doc["metadata"]["page_spans"], "https://h/e.pdf"
+    )
+    assert [c["page"] for c in rec["chunks"]] == list(range(1, N_PAGES + 1))
+    assert rec["id"] == pipeline.run_ingestion(doc["text"], "pdf", "https://h/e.pdf")["id"]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from aurora_platform.modules.crawler.engine import AsyncCrawler, CrawlConfig, crawl
+from aurora_platform.modules.crawler.ratecontrol import (
+    AdaptiveHostLimiter,
+    RateStore,
+    parse_retry_after,
+)
+
+HOST = "h.test"
+
+
+def _site(pages: int):
+    links = "".join(f'<a href="/p{i}.html">p{i}</a>' for i in range(pages))
+    return {"/index.html": f"<html><body><p>índice</p>{links}</body></html>"} | {
+        f"/p{i}.html": f"<html><body><p>página {i}</p></body></html>" for i in range(pages)
+    }
+
+
+class Server:
+    """Transporte fake: mede concorrência e pode responder 429."""
+
+    def __init__(self, pages: int = 40, latency: float = 0.01, throttle_first: int = 0,
+                 retry_after: str = "0") -> None:
+        self.pages = _site(pages)
+        self.latency = latency
+        self.throttle_first = throttle_first
+        self.retry_after = retry_after
+        self.active = 0
+        self.peak = 0
+        self.hits: dict[str, int] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/robots.txt":
+            return httpx.Response(404)
+        self.hits[path] = self.hits.get(path, 0) + 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        if self.hits[path] <= self.throttle_first:
+            return httpx.Response(429, headers={"Retry-After": self.retry_after})
+        body = self.pages.get(path)
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, html=body)
+
+
+def _crawl(server: Server, **cfg) -> AsyncCrawler:
+    opts = dict(max_pages=100, per_host_delay=0.0, http2=False, ingest=False, concurrency=32)
+    opts.update(cfg)
+    crawler = AsyncCrawler(CrawlConfig(**opts), transport=httpx.MockTransport(server))
+    asyncio.run(crawler.crawl([f"http://{HOST}/index.html"]))
+    return crawler
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470.0) == 10.0
+    assert parse_retry_after("amanhã") is None
+
+
+def test_aimd_increase_and_multiplicative_decrease():
+    lim = AdaptiveHostLimiter(2, 0.5, max_limit=8)
+    for _ in range(30):
+        lim.record(HOST, 0.05, 200)
+    rate = lim.rate(HOST)
+    assert rate.limit == 8.0 and rate.delay < 0.05
+    lim.record(HOST, 0.05, 429, retry_after=5)
+    assert rate.limit == 4.0 and rate.delay >= 0.1
+    assert rate.throttled == 1 and rate.blocked_until > 0
+    lim.record(HOST, 0.05, 503)  # mesma janela: não corta de novo
+    assert rate.limit == 4.0
+
+
+def test_latency_spike_cuts_limit():
+    lim = AdaptiveHostLimiter(4, 0.0, max_limit=8)
+    for _ in range(5):
+        lim.record(HOST, 0.1, 200)
+    before = lim.rate(HOST).limit
+    for _ in range(5):
+        lim.record(HOST, 2.0, 200)
+    assert lim.rate(HOST).limit < before
+
+
+def test_adaptive_ramps_up_on_healthy_origin():
+    fixed = Server()
+    _crawl(fixed, adaptive=False, per_host_concurrency=2)
+    assert fixed.peak <= 2
+
+    server = Server()
+    crawler = _crawl(server, per_host_concurrency=2, max_per_host_concurrency=12)
+    assert crawler.report.fetched == 41
+    assert server.peak > 2
+
+
+def test_throttled_requests_back_off_and_retry():
+    server = Server(pages=6, throttle_first=1)
+    crawler = _crawl(server, per_host_concurrency=4)
+    report = crawler.report
+    assert report.fetched == 7 and report.failed == 0
+    assert report.throttled == 7 and report.retried == 7
+    assert server.hits["/p0.html"] == 2
+
+
+def test_gives_up_after_max_retries():
+    server = Server(pages=0, throttle_first=10)
+    report = _crawl(server, max_retries=1).report
+    assert report.failed == 1 and report.throttled == 2
+    assert server.hits["/index.html"] == 2
+
+
+def test_limits_persist_between_runs(tmp_path, site):
+    db = str(tmp_path / "rates.sqlite")
+    crawl([f"{site}/index.html"], rates_path=db, max_pages=10, per_host_delay=0.0,
+          http2=False, ingest=False)
+    with RateStore(db) as store:
+        (rate,) = store.all()
+        assert rate.ok >= 4 and rate.limit > 2
+        rate.limit, rate.delay = 1.0, 0.0
+        store.save([rate])
+    with RateStore(db) as store:
+        lim = AdaptiveHostLimiter(2, 0.5, store=store)
+        assert lim.rate(rate.host).limit == 1.0
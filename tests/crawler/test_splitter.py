@@ -6,3 +6,70 @@ def test_splitter_naive():
     chunks = split_markdown(text, chunk_size=500, overlap=50)
     assert len(chunks) >= 2
     assert all("text" in c for c in chunks)
+
+
+import types
+
+from aurora_platform.modules.crawler.chunking import policies
+from aurora_platform.modules.crawler.chunking.splitter import (
+    get_tokenizer,
+    iter_markdown_chunks,
+)
+
+DOC = """# Edital 12/2024
+
+Objeto: contratação de serviços de logística. O prazo é de doze meses. As propostas devem ser enviadas até sexta.
+
+## Habilitação
+
+""" + "A empresa deve apresentar certidões negativas de débito federal e estadual. " * 12 + """
+
+## Prazos
+
+Curto.
+"""
+
+
+def test_chunks_have_offsets_and_respect_headings():
+    chunks = list(iter_markdown_chunks(DOC, chunk_size=200, overlap=40))
+    for c in chunks:
+        assert DOC[c["start"]:c["end"]] == c["text"]
+        assert len(c["text"]) <= 200
+        # nunca corta palavra
+        assert c["start"] == 0 or DOC[c["start"] - 1].isspace()
+        assert c["end"] == len(DOC) or DOC[c["end"]].isspace()
+    starts = [c["text"].split("\n", 1)[0] for c in chunks]
+    assert "## Habilitação" in starts and "## Prazos" in starts
+    assert chunks[0]["heading"] == "Edital 12/2024"
+    assert chunks[-1]["heading"] == "Prazos"
+    habil = [c for c in chunks if c["heading"] == "Habilitação"]
+    assert len(habil) > 1
+    # sobreposição dentro da seção
+    assert habil[1]["start"] < habil[0]["end"]
+
+
+def test_token_unit_with_cached_tokenizer():
+    assert get_tokenizer() is get_tokenizer()
+    gen = iter_markdown_chunks(DOC, chunk_size=40, overlap=5, unit="tokens")
+    assert isinstance(gen, types.GeneratorType)
+    chunks = list(gen)
+    count = get_tokenizer().count
+    assert all(c["tokens"] <= 40 for c in chunks)
+    assert all(count(c["text"]) <= 40 for c in chunks)
+    assert all(c["tokens"] == count(c["text"]) for c in chunks)
+
+
+def test_chunks_never_exceed_size_with_separators():
+    # muitas unidades curtas: os separadores entre elas somam bastante
+    md = "# T\n\n" + "\n\n".join(f"item {i}." for i in range(200))
+    for size, overlap in ((30, 0), (50, 10), (97, 20)):
+        chunks = list(iter_markdown_chunks(md, chunk_size=size, overlap=overlap))
+        assert all(len(c["text"]) <= size for c in chunks)
+        assert chunks[-1]["text"].endswith("item 199.")
+
+
+def test_policies_can_mean_tokens(monkeypatch):
+    assert policies.for_source("pdf") == policies.PDF_CHUNK
+    monkeypatch.setenv("CHUNK_UNIT", "tokens")
+    assert policies.for_source("pdf")["unit"] == "tokens"
+    assert policies.for_source("html", unit="chars") == policies.HTML_CHUNK
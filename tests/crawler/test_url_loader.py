@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from aurora_platform.modules.crawler.loaders import url_loader
+from aurora_platform.modules.crawler.loaders.url_loader import (
+    DocumentTooLarge,
+    URLLoader,
+    shared_client,
+    sniff,
+)
+
+
+@pytest.fixture()
+def tmpdir_spy(tmp_path, monkeypatch):
+    d = tmp_path / "spool"
+    d.mkdir()
+    monkeypatch.setattr(url_loader, "TMP_DIR", str(d))
+    return d
+
+
+def test_sniff_prefers_magic_bytes():
+    assert sniff(b"%PDF-1.7 ...", "text/html", "http://h/x") == "pdf"
+    assert sniff(b"PK\x03\x04....word/document.xml", "", "http://h/x") == "docx"
+    assert sniff(b"\xef\xbb\xbf  <!doctype html>", "application/pdf", "http://h/x.pdf") == "html"
+    assert sniff(b"plain", "", "http://h/file.pdf?x=1") == "pdf"
+    with pytest.raises(ValueError):
+        sniff(b"PK\x03\x04 data.csv", "application/zip", "http://h/a.zip")
+
+
+def test_load_html_with_shared_pool(site, tmpdir_spy):
+    loader = URLLoader()
+    doc = loader.load(source=f"{site}/a.html")
+    assert "Conteúdo da página a" in doc["text"]
+    assert doc["metadata"]["bytes"] > 0
+    assert shared_client() is shared_client()
+    assert list(tmpdir_spy.iterdir()) == []
+
+
+def test_pdf_is_sniffed_and_temp_file_removed(site, site_dir, tmpdir_spy):
+    (site_dir / "report.bin").write_bytes(b"%PDF-1.4\n" + b"0" * 4096)
+    doc = URLLoader().load(source=f"{site}/report.bin")
+    assert doc["metadata"]["content_type"] == "application/pdf"
+    assert doc["metadata"]["source"] == f"{site}/report.bin"
+    assert list(tmpdir_spy.iterdir()) == []
+
+
+def test_size_cap_with_and_without_content_length(site, tmpdir_spy):
+    with pytest.raises(DocumentTooLarge):
+        URLLoader(max_bytes=100).load(source=f"{site}/a.html")
+
+    def handler(request):
+        # corpo em streaming, sem Content-Length
+        return httpx.Response(200, content=iter([b"%PDF-" + b"x" * 600] * 10))
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with pytest.raises(DocumentTooLarge):
+        URLLoader(client=client, max_bytes=2048).load(source="http://h/big.pdf")
+    assert list(tmpdir_spy.iterdir()) == []
+
+
+def test_aload_many(site, tmpdir_spy):
+    async def run():
+        async with URLLoader() as loader:
+            return await loader.aload_many(
+                [f"{site}/a.html", f"{site}/b.html", f"{site}/missing.html"], concurrency=2
+            )
+
+    a, b, missing = asyncio.run(run())
+    assert "página a" in a["text"] and "página b" in b["text"]
+    assert isinstance(missing, httpx.HTTPStatusError)
+    assert list(tmpdir_spy.iterdir()) == []
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+
+
+class FakeEmbedder:
+    """Embedder determinístico (sha256 do texto) no lugar do fastembed."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def embed(self, texts):
+        for t in texts:
+            self.calls += 1
+            h = hashlib.sha256(t.encode("utf-8")).digest()
+            yield [b / 255.0 + 0.01 for b in h[: self.dim]]
+
+
+@pytest.fixture()
+def fake_embedder():
+    """Fábrica: `fake_embedder(dim)` -> `FakeEmbedder`."""
+    return FakeEmbedder
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import time
+
+from aurora_platform.modules.rag.jobs import IngestionJobRunner, IngestionWorker, JobStore
+from aurora_platform.modules.rag.orchestrator import default_runner
+from aurora_platform.modules.rag.workqueue import SQLiteWorkQueue
+
+
+class RecordingIndexer:
+    def __init__(self):
+        self.points = {}
+        self.calls = 0
+
+    def upsert_records(self, recs, timings=None):
+        self.calls += 1
+        for r in recs:
+            self.points[(r["canonical_id"], r["chunk_index"])] = r
+        if timings is not None:
+            timings["embed"] = timings.get("embed", 0.0) + 0.001
+            timings["upsert"] = timings.get("upsert", 0.0) + 0.001
+        return len(recs)
+
+
+class FlakyIndexer(RecordingIndexer):
+    def __init__(self, fail_times):
+        super().__init__()
+        self.fail_times = fail_times
+
+    def upsert_records(self, recs, timings=None):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("qdrant timeout")
+        return super().upsert_records(recs, timings)
+
+
+def _specs(n):
+    return [
+        {"content": f"Edital {i}: aquisição de material de consumo, lote {i}.", "source": f"doc-{i}"}
+        for i in range(n)
+    ]
+
+
+def _enqueue(q, job_id, specs):
+    q.enqueue(job_id, [(i, s, s["source"]) for i, s in enumerate(specs)])
+
+
+def test_lease_expiry_and_token_fencing(tmp_path):
+    q = SQLiteWorkQueue(str(tmp_path / "q.sqlite"))
+    _enqueue(q, "j1", _specs(1))
+    [dead] = q.lease("w-dead", lease_s=0.05)
+    assert q.lease("w2") == []  # ainda arrendado
+    time.sleep(0.1)
+    [again] = q.lease("w2", lease_s=30)
+    assert again.id == dead.id and again.attempts == 2
+    assert not q.heartbeat(dead)  # worker "morto" voltou tarde demais
+    assert not q.ack(dead, 1, {})
+    assert q.heartbeat(again)
+    assert q.ack(again, 1, {"load": 0.5})
+    prog = q.progress("j1")
+    assert (prog["done"], prog["failed"], prog["chunks"], prog["finished"]) == (1, 0, 1, True)
+    assert prog["timings"] == {"load": 0.5}
+
+
+def test_items_fail_after_max_attempts(tmp_path):
+    q = SQLiteWorkQueue(str(tmp_path / "q.sqlite"), max_attempts=2)
+    _enqueue(q, "j1", _specs(1))
+    for _ in range(2):
+        [item] = q.lease("w", lease_s=0.01)
+        time.sleep(0.02)
+    assert q.lease("w") == []
+    prog = q.progress("j1")
+    assert prog["failed"] == 1 and prog["failures"][0]["stage"] == "lease"
+
+
+def test_worker_retries_transient_index_errors(tmp_path):
+    q = SQLiteWorkQueue(str(tmp_path / "q.sqlite"), max_attempts=3)
+    _enqueue(q, "j1", _specs(3))
+    indexer = FlakyIndexer(fail_times=2)
+    w = IngestionWorker(q, indexer=indexer, poll_s=0.01)
+    assert w.run(stop_when_idle=True) == 3
+    prog = q.progress("j1")
+    assert (prog["done"], prog["failed"]) == (3, 0)
+    assert len({k[0] for k in indexer.points}) == 3
+
+
+def test_runner_enqueues_and_reports_queue_progress(tmp_path):
+    q = SQLiteWorkQueue(str(tmp_path / "q.sqlite"))
+    runner = IngestionJobRunner(store=JobStore(str(tmp_path / "jobs.sqlite")), work_queue=q)
+
+    async def submit():
+        return runner.submit(_specs(4) + [str(tmp_path / "nao_existe.txt")])
+
+    job_id = asyncio.run(submit())
+    assert runner.status(job_id)["status"] == "queued"
+    IngestionWorker(q, indexer=RecordingIndexer(), poll_s=0.01).run(stop_when_idle=True)
+    job = runner.status(job_id)
+    assert job["status"] == "done"
+    assert (job["total"], job["done"], job["failed"]) == (5, 4, 1)
+    assert job["failures"][0]["stage"] == "load"
+
+
+def _worker_proc(path, out):
+    idx = RecordingIndexer()
+    w = IngestionWorker(SQLiteWorkQueue(path), indexer=idx, poll_s=0.01)
+    w.run(stop_when_idle=True)
+    out.put(sorted(k[0] for k in idx.points))
+
+
+def test_workers_in_several_processes_share_the_queue(tmp_path):
+    path = str(tmp_path / "q.sqlite")
+    q = SQLiteWorkQueue(path)
+    _enqueue(q, "j1", _specs(40))
+    ctx = mp.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker_proc, args=(path, out)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    results = [out.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(timeout=60)
+    ids = [i for r in results for i in r]
+    assert len(ids) == len(set(ids)) == 40  # cada documento indexado uma vez
+    assert q.progress("j1")["done"] == 40
+
+
+def test_default_runner_uses_queue_from_env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("INGEST_QUEUE_URL", raising=False)
+    assert default_runner().work_queue is None
+
+    monkeypatch.setenv("INGEST_QUEUE_URL", str(tmp_path / "q.sqlite"))
+    runner = default_runner()
+    assert isinstance(runner.work_queue, SQLiteWorkQueue)
+    job_id = runner.submit(_specs(2))
+    # a API só enfileira: nada roda no processo até um worker arrendar
+    assert runner.work_queue.pending() == 2
+    assert runner.status(job_id)["total"] == 2
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+
+from qdrant_client import QdrantClient
+
+from aurora_platform.modules.rag.indexer.qdrant_indexer import QdrantIndexer
+from aurora_platform.modules.rag.jobs import IngestionJobRunner, JobStore
+from aurora_platform.modules.rag.orchestrator import AuroraIngestionOrchestrator
+
+
+class BrokenIndexer:
+    def upsert_records(self, recs, timings=None):
+        raise RuntimeError("qdrant fora do ar")
+
+
+def _runner(tmp_path, indexer, **kw):
+    return IngestionJobRunner(
+        store=JobStore(str(tmp_path / "jobs.sqlite")), indexer=indexer, **kw
+    )
+
+
+def test_job_streams_sources_into_qdrant(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    doc = tmp_path / "edital.txt"
+    doc.write_text("# Edital\n\n" + "Objeto: aquisição de computadores. " * 40, encoding="utf-8")
+    client = QdrantClient(":memory:")
+    indexer = QdrantIndexer(client, "docs@v1", fake_embedder(4))
+    runner = _runner(tmp_path, indexer, concurrency=2, batch_size=4)
+    sources = [
+        str(doc),
+        {"content": "Pregão eletrônico para serviços de limpeza.", "source": "inline-1"},
+        str(tmp_path / "nao_existe.txt"),
+    ]
+
+    async def go():
+        orch = AuroraIngestionOrchestrator(runner)
+        accepted = await orch.ingest_sources(sources)
+        assert accepted["status"] == "accepted"
+        first = orch.job_status(accepted["job_id"])
+        assert first["status"] in ("queued", "running")  # não bloqueia
+        return await runner.wait(accepted["job_id"])
+
+    job = asyncio.run(go())
+    assert job["status"] == "done"
+    assert (job["total"], job["done"], job["failed"]) == (3, 2, 1)
+    assert job["failures"][0]["stage"] == "load"
+    assert job["failures"][0]["source"].endswith("nao_existe.txt")
+    assert set(job["timings"]) >= {"load", "normalize", "chunk", "embed", "upsert"}
+    count = client.count("docs@v1").count
+    assert count == job["chunks"] > 1
+
+
+def test_index_failures_are_recorded_per_item(tmp_path):
+    runner = _runner(tmp_path, BrokenIndexer())
+
+    async def go():
+        job_id = runner.submit([{"content": "texto qualquer do documento"}])
+        return await runner.wait(job_id)
+
+    job = asyncio.run(go())
+    assert job["status"] == "done" and job["failed"] == 1
+    assert job["failures"][0]["stage"] == "embed"
+    assert "qdrant fora do ar" in job["failures"][0]["error"]
+
+
+def test_unexpected_indexer_error_fails_the_batch(tmp_path):
+    def factory():
+        raise ConnectionError("sem qdrant")
+
+    runner = IngestionJobRunner(
+        store=JobStore(str(tmp_path / "jobs.sqlite")), indexer_factory=factory
+    )
+
+    async def go():
+        job_id = runner.submit([{"content": "texto um"}, {"content": "texto dois"}])
+        return await runner.wait(job_id)
+
+    job = asyncio.run(go())
+    assert job["status"] == "done" and job["failed"] == 2
+    assert "ConnectionError: sem qdrant" in job["failures"][0]["error"]
+
+
+def test_consumer_crash_cancels_producers_and_fails_job(tmp_path):
+    runner = _runner(tmp_path, BrokenIndexer(), batch_size=1, queue_size=1)
+
+    async def boom(*args):
+        raise RuntimeError("consumidor morreu")
+
+    runner._index = boom
+    sources = [{"content": f"documento {i}"} for i in range(20)]
+
+    async def go():
+        job_id = runner.submit(sources)
+        return await asyncio.wait_for(runner.wait(job_id), timeout=10)
+
+    job = asyncio.run(go())
+    assert job["status"] == "failed"
+    assert "consumidor morreu" in job["error"]
+
+
+def test_ingest_document_returns_job_id(tmp_path):
+    runner = _runner(tmp_path, BrokenIndexer())
+
+    async def go():
+        res = await AuroraIngestionOrchestrator(runner).ingest_document(
+            {"content": "abc", "document_type": "text", "metadata": {"source": "s1"}}
+        )
+        await runner.wait(res["job_id"])
+        return res
+
+    res = asyncio.run(go())
+    assert res["status"] == "accepted" and res["total"] == 1
+    assert runner.status(res["job_id"])["failures"][0]["source"] == "s1"
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import json
+import random
+from dataclasses import replace
+from qdrant_client import QdrantClient, models
+
+from aurora_platform.modules.rag.indexer import profiles
+from aurora_platform.modules.rag.indexer.profile_bench import benchmark_profiles
+
+
+def test_profile_from_file_and_env(tmp_path, monkeypatch):
+    f = tmp_path / "profiles.json"
+    f.write_text(
+        json.dumps({"editais": {"extends": "low_memory", "hnsw_m": 24}}),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("QDRANT_PROFILES_FILE", str(f))
+    monkeypatch.setenv("QDRANT_PROFILE", "editais")
+    p = profiles.get_profile()
+    assert p.hnsw_m == 24 and p.on_disk and p.quantization == "scalar"
+    sp = profiles.search_params(p)
+    assert sp.quantization.rescore is True
+
+
+def test_ensure_collection_applies_profile():
+    client = QdrantClient(":memory:")
+    calls = {}
+    create = client.create_collection
+    client.create_collection = lambda **kw: calls.setdefault("create", kw) and create(**kw)
+    client.create_payload_index = lambda **kw: calls.setdefault("idx", []).append(
+        kw["field_name"]
+    )
+    assert profiles.ensure_collection(client, "c", 8, profiles.BINARY)
+    assert not profiles.ensure_collection(client, "c", 8, profiles.BINARY)
+    kw = calls["create"]
+    assert kw["vectors_config"].on_disk is True
+    assert kw["hnsw_config"].m == profiles.BINARY.hnsw_m
+    assert isinstance(kw["quantization_config"], models.BinaryQuantization)
+    assert set(calls["idx"]) == set(profiles.DEFAULT_PAYLOAD_INDEXES)
+
+
+def test_existing_collection_is_brought_to_profile(caplog):
+    client = QdrantClient(":memory:")
+    assert profiles.ensure_collection(client, "c", 8, profiles.DEFAULT)
+    updates = []
+    indexes = []
+    client.update_collection = lambda **kw: updates.append(kw)
+    client.create_payload_index = lambda **kw: indexes.append(kw["field_name"])
+
+    # perfil igual ao da coleção: nada a atualizar
+    assert not profiles.ensure_collection(client, "c", 8, profiles.DEFAULT)
+    assert updates == []
+    assert set(indexes) == set(profiles.DEFAULT_PAYLOAD_INDEXES)  # o local não os guarda
+
+    tuned = replace(profiles.LOW_MEMORY, indexing_threshold=5000)
+    assert not profiles.ensure_collection(client, "c", 8, tuned)
+    (kw,) = updates
+    assert kw["collection_name"] == "c"
+    assert kw["hnsw_config"].m == profiles.LOW_MEMORY.hnsw_m
+    assert kw["optimizers_config"].indexing_threshold == 5000
+    assert isinstance(kw["quantization_config"], models.ScalarQuantization)
+    # on_disk não muda no lugar: só o aviso
+    assert "use o rebuild" in caplog.text
+
+
+def test_benchmark_reports_each_profile():
+    rnd = random.Random(7)
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "src", vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE)
+    )
+    client.upsert(
+        "src",
+        points=[
+            models.PointStruct(id=i, vector=[rnd.random() for _ in range(4)])
+            for i in range(50)
+        ],
+    )
+    queries = [[rnd.random() for _ in range(4)] for _ in range(5)]
+    res = benchmark_profiles(
+        client, "src", queries, [profiles.DEFAULT, profiles.LOW_MEMORY], top_k=5
+    )
+    assert [r.profile for r in res] == ["default", "low_memory"]
+    assert all(r.points == 50 and 0.0 <= r.recall_at_k <= 1.0 for r in res)
+    assert res[1].ram_mb < res[0].ram_mb
+    assert client.get_collections().collections[0].name == "src"
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from qdrant_client import QdrantClient
+
+from aurora_platform.modules.rag.indexer.qdrant_indexer import QdrantIndexer, point_id
+from aurora_platform.modules.rag.indexer.rebuild import CollectionRebuilder
+from aurora_platform.modules.rag.search.lexical_bm25 import LexicalBM25
+
+
+def _rec(i: int, text: str) -> dict:
+    return {"canonical_id": f"doc{i}", "chunk_index": 0, "chunk_text": text}
+
+
+def test_rebuild_switches_alias_and_lexical(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    live = QdrantIndexer(client, "docs@v1", fake_embedder(8))
+    live.upsert_records(
+        [_rec(0, "gatos são animais"), _rec(1, "aviões voam"), _rec(2, "cães e gatos")]
+    )
+    assert LexicalBM25("docs@v1").search("gatos")
+    lex = LexicalBM25("docs")  # alias ainda sem ponteiro lexical
+    assert lex.search("gatos") == []
+
+    rb = CollectionRebuilder(client, "docs@v1", fake_embedder(16), batch_size=2)
+    assert rb.current() == "docs@v1"
+    report = rb.run()
+
+    assert report.target == "docs@v2"
+    assert report.processed == 3
+    assert rb.current() == "docs@v2"
+    info = client.get_collection("docs@v2")
+    assert info.config.params.vectors.size == 16
+    assert client.count("docs").count == 3
+    assert (tmp_path / "artifacts/lexical/docs@v2.jsonl").exists()
+    assert lex.search("gatos")  # mesma instância segue o ponteiro novo
+    assert lex.path.name == "docs@v2.jsonl"
+
+
+def test_rebuild_resumes_from_checkpoint(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    live = QdrantIndexer(client, "docs@v1", fake_embedder())
+    live.upsert_records([_rec(i, f"texto {i}") for i in range(5)])
+
+    rb = CollectionRebuilder(client, "docs@v1", fake_embedder(), batch_size=2)
+    calls = {"n": 0}
+    orig = QdrantIndexer.upsert_records
+
+    def flaky(self, recs):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("queda no meio do rebuild")
+        return orig(self, recs)
+
+    monkeypatch.setattr(QdrantIndexer, "upsert_records", flaky)
+    try:
+        rb.run(target="docs@v2")
+    except RuntimeError:
+        pass
+    monkeypatch.setattr(QdrantIndexer, "upsert_records", orig)
+    report = rb.run(target="docs@v2")
+    assert report.processed == 5
+    assert client.count("docs@v2").count == 5
+
+
+def test_alias_is_default_target_and_survives_switch(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    live = QdrantIndexer(client, "docs", fake_embedder())  # alias: nasce docs@v1
+    live.upsert_records([_rec(0, "gatos"), _rec(1, "aviões")])
+    assert client.count("docs@v1").count == 2
+
+    rb = CollectionRebuilder(client, "docs", fake_embedder(), batch_size=1)
+    assert rb.current() == "docs@v1"
+    rb.run()
+    # o mesmo indexador (pelo alias) agora grava na versão nova
+    live.upsert_records([_rec(2, "barcos")])
+    assert client.count("docs@v2").count == 3
+    assert client.count("docs@v1").count == 2
+    assert {h.id for h in LexicalBM25("docs").search("barcos")}
+
+
+def test_catch_up_propagates_updates_and_deletes(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    live = QdrantIndexer(client, "docs@v1", fake_embedder())
+    live.upsert_records([_rec(i, f"texto {i}") for i in range(4)])
+    rb = CollectionRebuilder(client, "docs@v1", fake_embedder(), batch_size=3)
+    rb.run(target="docs@v2", switch=False)
+
+    # mudanças na coleção viva enquanto o rebuild terminava
+    live.upsert_records([_rec(1, "texto novo"), _rec(9, "chegou agora")])
+    live.delete_ids([point_id("doc2", 0)])
+    target = QdrantIndexer(client, "docs@v2", fake_embedder())
+    assert rb._catch_up("docs@v1", target) == 3
+
+    got = {
+        p.payload["canonical_id"]: p.payload["chunk_text"]
+        for p in client.scroll("docs@v2", limit=100, with_payload=True)[0]
+    }
+    assert got == {"doc0": "texto 0", "doc1": "texto novo", "doc3": "texto 3", "doc9": "chegou agora"}
+    assert rb._catch_up("docs@v1", target) == 0  # já em dia: nada re-embedado
+    ids = {h.id for h in LexicalBM25("docs@v2").search("texto")}
+    assert point_id("doc2", 0) not in ids
+
+
+def test_writes_racing_the_switch_are_not_lost(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    old = QdrantIndexer(client, "docs@v1", fake_embedder())
+    old.upsert_records([_rec(i, f"texto {i}") for i in range(3)])
+    rb = CollectionRebuilder(client, "docs@v1", fake_embedder(), batch_size=2)
+    switch = rb.switch
+
+    def racing_switch(target):
+        # gravado na versão antiga depois da última passada de catch-up
+        old.upsert_records([_rec(7, "entre a passada e o switch")])
+        switch(target)
+        # já pelo alias: vai para a versão nova e não pode ser desfeito
+        QdrantIndexer(client, "docs", fake_embedder()).upsert_records([_rec(8, "depois do switch")])
+
+    monkeypatch.setattr(rb, "switch", racing_switch)
+    report = rb.run()
+    assert report.target == "docs@v2"
+    points = client.scroll("docs@v2", limit=100, with_payload=True)[0]
+    assert {p.payload["canonical_id"] for p in points} == {"doc0", "doc1", "doc2", "doc7", "doc8"}
+
+
+def test_prune_url_drops_stale_versions(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    idx = QdrantIndexer(client, "docs", fake_embedder())
+    url = "https://ex.gov.br/edital"
+    old = [{**_rec(i, f"versão antiga {i}"), "url": url} for i in range(3)]
+    other = {**_rec(9, "outro documento"), "url": "https://ex.gov.br/outro"}
+    idx.upsert_records(old + [other])
+
+    new = [
+        {"canonical_id": "novo", "chunk_index": i, "chunk_text": f"versão nova {i}", "url": url}
+        for i in range(2)
+    ]
+    idx.upsert_records(new)
+    assert idx.prune_url(url, new) == 3
+    ids = {str(p.id) for p in client.scroll("docs", limit=100)[0]}
+    assert ids == {point_id("novo", 0), point_id("novo", 1), point_id("doc9", 0)}
+    hits = LexicalBM25("docs").search("versão")
+    assert hits and {h.id for h in hits} <= ids
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from qdrant_client import QdrantClient
+
+from aurora_platform.modules.rag.indexer.qdrant_indexer import QdrantIndexer, point_id
+from aurora_platform.modules.rag.indexer.rebuild import CollectionRebuilder
+from aurora_platform.modules.rag.search.hybrid import VectorSearch
+from aurora_platform.modules.rag.search.lexical_bench import benchmark_lexical
+from aurora_platform.modules.rag.search.sparse_bm25 import doc_sparse, load_avgdl, term_id
+
+
+TEXTS = [
+    "gatos são animais domésticos",
+    "cães e gatos podem conviver",
+    "aviões voam no céu",
+    "edital de pregão eletrônico",
+]
+
+
+def _index(client, lexical, fake_embedder):
+    idx = QdrantIndexer(client, "docs@v1", fake_embedder(6), lexical=lexical)
+    idx.upsert_records(
+        [
+            {"canonical_id": f"d{i}", "chunk_index": 0, "chunk_text": t}
+            for i, t in enumerate(TEXTS)
+        ]
+    )
+    return idx
+
+
+def test_doc_sparse_uses_tokenizer_and_tf_saturation():
+    sv = doc_sparse("Gatos gatos cães", avgdl=3)
+    w = dict(zip(sv.indices, sv.values))
+    assert w[term_id("gatos")] > w[term_id("cães")]
+    assert term_id("Gatos".lower()) in w
+
+
+def test_sparse_backend_single_round_trip(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    _index(client, "sparse", fake_embedder)
+    assert not (tmp_path / "artifacts/lexical/docs@v1.jsonl").exists()
+
+    vs = VectorSearch("docs@v1", "", "", client=client, embedder=fake_embedder(6))
+    calls = []
+    batch = client.query_batch_points
+    client.query_batch_points = lambda **kw: calls.append(kw) or batch(**kw)
+    vec, lex, fused = vs.hybrid("gatos", k_vec=4, k_lex=4, k_out=3)
+    assert len(calls) == 1
+    assert {h.payload["chunk_text"] for h in lex} == set(TEXTS[:2])
+    assert len(fused) == 3 and fused[0].source == "hybrid"
+    assert len(vec) == 4
+
+
+def test_benchmark_compares_backends(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    _index(client, "both", fake_embedder)
+    vs = VectorSearch("docs@v1", "", "", client=client, embedder=fake_embedder(6))
+    res = benchmark_lexical(
+        client, "docs@v1", ["gatos", "pregão"], top_k=2, vector_search=vs
+    )
+    by = {r.backend: r for r in res}
+    assert set(by) == {"bm25_inproc", "qdrant_sparse", "hybrid_2_systems", "hybrid_1_call"}
+    assert by["qdrant_sparse"].overlap_at_k == 1.0
+    assert by["bm25_inproc"].ram_mb > 0
+
+
+def test_rebuild_measures_avgdl_from_corpus(tmp_path, monkeypatch, caplog, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BM25_AVGDL", raising=False)
+    client = QdrantClient(":memory:")
+    with caplog.at_level("WARNING"):
+        idx = _index(client, "sparse", fake_embedder)
+    assert idx.avgdl == 128.0 and "sem avgdl medido" in caplog.text
+
+    rb = CollectionRebuilder(client, "docs@v1", fake_embedder(6), lexical="sparse")
+    rb.run()
+    expected = sum(len(t.split()) for t in TEXTS) / len(TEXTS)
+    assert load_avgdl("docs@v2") == expected
+    assert load_avgdl("docs") == expected  # pelo ponteiro do alias
+    live = QdrantIndexer(client, "docs", fake_embedder(6), lexical="sparse")
+    assert live.avgdl == expected
+    stored = client.retrieve("docs@v2", ids=[point_id("d0", 0)], with_vectors=True)[0]
+    assert stored.vector["bm25"].values == doc_sparse(TEXTS[0], avgdl=expected).values
+
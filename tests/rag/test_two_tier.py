@@ -0,0 +1,52 @@
+from __future__ import annotations
+from qdrant_client import QdrantClient
+
+from aurora_platform.modules.rag.indexer.profiles import collection_vectors
+from aurora_platform.modules.rag.indexer.qdrant_indexer import QdrantIndexer
+from aurora_platform.modules.rag.search.hybrid import VectorSearch
+
+
+def _recs():
+    texts = ["licitação de obras", "pregão eletrônico", "dispensa de licitação"]
+    return [
+        {"canonical_id": f"d{i}", "chunk_index": 0, "chunk_text": t}
+        for i, t in enumerate(texts)
+    ]
+
+
+def test_two_tier_index_and_rescore(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    small, large = fake_embedder(4), fake_embedder(12)
+    idx = QdrantIndexer(client, "docs@v1", small, rescore_embedder=large)
+    idx.upsert_records(_recs())
+    assert collection_vectors(client, "docs@v1") == {"fast": 4, "full": 12}
+
+    q_small, q_large = fake_embedder(4), fake_embedder(12)
+    vs = VectorSearch(
+        "docs@v1", "", "", client=client, embedder=q_small, rescore_embedder=q_large
+    )
+    hits = vs.search("pregão eletrônico", top_k=2)
+    assert hits[0].payload["chunk_text"] == "pregão eletrônico"
+    assert q_large.calls == 1
+    vs.search("pregão eletrônico", top_k=2)  # embedding de consulta em cache
+    assert q_large.calls == 1
+    vs.search("outra consulta", top_k=2, rescore=False)
+    assert q_large.calls == 1
+
+
+def test_single_vector_collection_skips_large_model(tmp_path, monkeypatch, fake_embedder):
+    monkeypatch.chdir(tmp_path)
+    client = QdrantClient(":memory:")
+    QdrantIndexer(client, "docs@v1", fake_embedder(4)).upsert_records(_recs())
+    q_large = fake_embedder(12)
+    vs = VectorSearch(
+        "docs@v1",
+        "",
+        "",
+        client=client,
+        embedder=fake_embedder(4),
+        rescore_embedder=q_large,
+    )
+    assert len(vs.search("licitação", top_k=3)) == 3
+    assert q_large.calls == 0
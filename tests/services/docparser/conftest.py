@@ -0,0 +1,17 @@
+import pytest
+
+from backend.app.services.docparser import cache, jobs
+
+
+@pytest.fixture(autouse=True)
+def _result_cache(tmp_path_factory):
+    # cache de resultados isolado por teste (o padrão grava em artifacts/)
+    c = cache.configure(str(tmp_path_factory.mktemp("cache") / "docparser.sqlite"))
+    yield c
+    cache.close_cache()
+
+
+@pytest.fixture(autouse=True)
+def _job_store(tmp_path_factory):
+    # idem para a fila de jobs (o lifespan do app sobe o escalonador)
+    yield jobs.configure(str(tmp_path_factory.mktemp("jobs")))
@@ -0,0 +1,185 @@
+import asyncio
+import io
+import os
+import time
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.services.docparser import executor, jobs, main
+from backend.app.services.docparser.jobs import FairQueue
+
+HTML = b"<!doctype html><html><body><p>Edital %d</p></body></html>"
+PDF = b"%PDF-1.7\n" + b"pregao eletronico " * 100
+
+
+def _html(i):
+    return HTML.replace(b"%d", str(i).encode())
+
+
+def test_fair_queue_orders_by_priority_then_round_robin():
+    q = FairQueue()
+    for i in range(4):
+        q.push(f"big{i}", "lote-grande")
+    q.push("small0", "avulso")
+    q.push("small1", "avulso")
+    q.push("urgente", "outro", priority=5)
+    order = [q.pop() for _ in range(len(q))]
+    assert order[0] == "urgente"
+    assert order[1:5] == ["big0", "small0", "big1", "small1"]
+    assert order[5:] == ["big2", "big3"]
+    assert q.pop() is None
+
+
+@pytest.fixture()
+def client():
+    executor.configure(workers=1, max_queue=0, start_method="fork")
+    with TestClient(main.app) as c:
+        yield c
+    executor.shutdown_pool()
+
+
+def _wait(client, batch_id, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f"/v1/docparser/batches/{batch_id}").json()
+        if body["concluido"]:
+            return body
+        time.sleep(0.05)
+    raise AssertionError(f"lote não terminou: {body}")
+
+
+def _zip(entries):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in entries.items():
+            z.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_batch_with_files_and_zip_runs_to_completion(client, monkeypatch):
+    monkeypatch.setattr(main, "JOB_TOKENS", {"segredo": "prefeitura"})
+    archive = _zip({"docs/b.html": _html(2), "docs/c.pdf": PDF, "leia.txt": b"nada"})
+    resp = client.post(
+        "/v1/docparser/jobs?priority=3",
+        files=[
+            ("files", ("a.html", _html(1), "text/html")),
+            ("files", ("lote.zip", archive, "application/zip")),
+        ],
+        headers={"Authorization": "Bearer segredo"},
+    )
+    assert resp.status_code == 202, resp.text
+    body = resp.json()
+    names = [j["fonte"] for j in body["jobs"]]
+    assert names == ["a.html", "lote.zip/docs/b.html", "lote.zip/docs/c.pdf"]
+    assert {j["prioridade"] for j in body["jobs"]} == {3}
+    assert {j["submitter"] for j in body["jobs"]} == {"prefeitura"}
+    assert [r["fonte"] for r in body["rejeitados"]] == ["lote.zip/leia.txt"]
+
+    status = _wait(client, body["batch_id"])
+    assert status["por_estado"] == {"done": 3}
+    job = body["jobs"][2]
+    assert client.get(f"/v1/docparser/jobs/{job['id']}").json()["estado"] == "done"
+    result = client.get(f"/v1/docparser/jobs/{job['id']}/result")
+    assert result.status_code == 200
+    assert result.json()["metadados"]["sha256"] == job["sha256"]
+    # arquivos do job apagados depois do processamento
+    store = jobs.get_scheduler().store
+    assert not any(os.path.exists(store.file_path(j["id"])) for j in body["jobs"])
+
+
+def test_events_stream_and_cache_hit_on_resubmit(client):
+    resp = client.post("/v1/docparser/jobs", files=[("files", ("a.pdf", PDF, None))])
+    batch_id = resp.json()["batch_id"]
+    with client.stream("GET", f"/v1/docparser/batches/{batch_id}/events") as events:
+        text = "".join(events.iter_text())
+    assert "event: job" in text and '"estado":"done"' in text
+    assert text.rstrip().splitlines()[-2] == "event: batch"
+
+    again = client.post("/v1/docparser/jobs", files=[("files", ("copia.pdf", PDF, None))])
+    job = again.json()["jobs"][0]
+    assert job["estado"] == "done" and job["cache_hit"]  # nem entrou na fila
+    result = client.get(f"/v1/docparser/jobs/{job['id']}/result").json()
+    assert result["metadados"]["fonte"] == "copia.pdf"
+
+
+def test_submitter_and_priority_need_a_token(client, monkeypatch):
+    monkeypatch.setattr(main, "JOB_TOKENS", {"segredo": "prefeitura"})
+    files = [("files", ("a.html", _html(7), "text/html"))]
+    resp = client.post("/v1/docparser/jobs", files=files, headers={"X-Submitter": "prefeitura"})
+    assert resp.status_code == 202
+    assert resp.json()["jobs"][0]["submitter"] == "testclient"  # cabeçalho ignorado
+    assert client.post("/v1/docparser/jobs?priority=5", files=files).status_code == 403
+    resp = client.post(
+        "/v1/docparser/jobs", files=files, headers={"Authorization": "Bearer outro"}
+    )
+    assert resp.status_code == 401
+
+
+def test_scheduler_picks_up_jobs_queued_by_another_process(tmp_path):
+    executor.configure(workers=1, max_queue=0, start_method="fork")
+    sched = jobs.JobScheduler(jobs.JobStore(str(tmp_path)), concurrency=1, poll_s=0.05)
+    other = jobs.JobStore(str(tmp_path))  # outro worker do uvicorn
+    job = jobs.Job(
+        id="j2", batch_id="b2", submitter="x", priority=0,
+        filename="a.pdf", sha256="2" * 64, size=len(PDF), mime="application/pdf",
+    )
+
+    async def go():
+        sched.start()
+        with open(other.file_path("j2"), "wb") as f:
+            f.write(PDF)
+        other.create(job)
+        deadline = time.monotonic() + 20
+        while sched.store.get("j2").state not in jobs.TERMINAL:
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.05)
+        await sched.stop()
+        return sched.store.get("j2").state
+
+    try:
+        assert asyncio.run(go()) == "done"
+    finally:
+        executor.shutdown_pool()
+        other.close()
+        sched.store.close()
+
+
+def test_errors(client):
+    assert client.get("/v1/docparser/jobs/nada").status_code == 404
+    assert client.get("/v1/docparser/batches/nada").status_code == 404
+    resp = client.post("/v1/docparser/jobs", files=[("files", ("a.bin", b"\x00\x01", None))])
+    assert resp.status_code == 415
+    assert resp.json()["detail"]["rejeitados"][0]["fonte"] == "a.bin"
+    resp = client.post("/v1/docparser/jobs", files=[("file", ("a.pdf", PDF, None))])
+    assert resp.status_code == 400
+
+    sched = jobs.get_scheduler()
+    job = jobs.Job(
+        id="pendente", batch_id="b", submitter="x", priority=0,
+        filename="a.pdf", sha256="0" * 64, size=1, mime="application/pdf",
+    )
+    sched.store.create(job)  # fora da fila em memória: continua queued
+    assert client.get("/v1/docparser/jobs/pendente/result").status_code == 409
+
+
+def test_queued_jobs_survive_restart(tmp_path):
+    store = jobs.JobStore(str(tmp_path))
+    job = jobs.Job(
+        id="j1", batch_id="b1", submitter="x", priority=0,
+        filename="a.pdf", sha256="1" * 64, size=len(PDF), mime="application/pdf",
+    )
+    with open(store.file_path("j1"), "wb") as f:
+        f.write(PDF)
+    store.create(job)
+    assert store.claim("j1") is not None and store.claim("j1") is None
+    assert store.requeue_stale(lease_s=-1) == 1  # dono "morreu"
+    store.close()
+
+    jobs.configure(str(tmp_path))
+    executor.configure(workers=1, max_queue=0, start_method="fork")
+    with TestClient(main.app) as c:
+        status = _wait(c, "b1")
+    executor.shutdown_pool()
+    assert status["por_estado"] == {"done": 1}
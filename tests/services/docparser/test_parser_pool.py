@@ -0,0 +1,129 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.services.docparser import executor, main, pipeline
+from backend.app.services.docparser.executor import (
+    ParserPool,
+    ParseTimeout,
+    PoolSaturated,
+    WorkerCrashed,
+)
+
+HTML = b"<!doctype html><html><body><p>Edital</p></body></html>"
+
+
+def slow(seconds, value="ok"):
+    time.sleep(seconds)
+    return value
+
+
+def crash():
+    os._exit(1)
+
+
+def slow_docling(source):
+    time.sleep(0.3)
+    return {"texto_markdown": "# lento", "tabelas": [], "imagens": []}
+
+
+@pytest.fixture()
+def pool():
+    p = ParserPool(workers=1, max_queue=2, timeout=5, start_method="fork")
+    yield p
+    p.shutdown()
+
+
+def test_wait_and_exec_are_measured_separately(pool):
+    async def go():
+        async with pool.admit(), pool.admit():
+            return await asyncio.gather(pool.run(slow, 0.3, "a"), pool.run(slow, 0.3, "b"))
+
+    (ra, ta), (rb, tb) = asyncio.run(go())
+    assert (ra, rb) == ("a", "b")
+    first, second = sorted([ta, tb], key=lambda t: t.started_ms)
+    assert 250 <= first.exec_ms < 1000 and 250 <= second.exec_ms < 1000
+    assert second.wait_ms >= 250  # ficou na fila enquanto o único worker rodava
+
+
+def test_admission_control_rejects_when_full():
+    p = ParserPool(workers=1, max_queue=1, start_method="fork")
+
+    async def go():
+        async with p.admit(), p.admit():
+            assert p.saturated
+            with pytest.raises(PoolSaturated):
+                async with p.admit():
+                    pass
+        assert p.admitted == 0
+
+    asyncio.run(go())
+    p.shutdown()
+
+
+def test_timeout_frees_worker_and_crash_recycles_pool():
+    p = ParserPool(workers=1, max_queue=0, timeout=0.2, start_method="fork")
+
+    async def go():
+        with pytest.raises(ParseTimeout):
+            await p.run(slow, 3)
+        assert (await p.run(slow, 0.01, "depois"))[0] == "depois"
+        with pytest.raises(WorkerCrashed):
+            await p.run(crash)
+        assert (await p.run(slow, 0.01, "novo pool"))[0] == "novo pool"
+
+    t0 = time.monotonic()
+    asyncio.run(go())
+    assert time.monotonic() - t0 < 3
+    p.shutdown()
+
+
+def test_pipeline_does_not_block_event_loop(pool, monkeypatch):
+    monkeypatch.setattr(pipeline, "parse_with_docling", slow_docling)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def go():
+        t = asyncio.create_task(ticker())
+        async with pool.admit():
+            res = await pipeline.process_document_pipeline("a.html", HTML, pool=pool)
+        t.cancel()
+        return res
+
+    res = asyncio.run(go())
+    assert res.texto_markdown == "# lento"
+    assert len(ticks) > 10  # o loop seguiu rodando durante o parse
+    names = [s.name for s in res.proveniencia.steps]
+    assert names == ["queue:docling", "docling"]
+    assert res.custo.cpu_ms_parser >= 250
+
+
+@pytest.fixture()
+def client():
+    executor.configure(workers=1, max_queue=0, start_method="fork")
+    yield TestClient(main.app)
+    executor.shutdown_pool()
+
+
+def test_endpoint_reports_steps_and_returns_429_when_saturated(client):
+    resp = client.post("/v1/docparser/ingest", files={"file": ("a.html", HTML, "text/html")})
+    assert resp.status_code == 200, resp.text
+    steps = resp.json()["proveniencia"]["steps"]
+    assert [s["name"] for s in steps] == ["queue:docling", "docling"]
+    assert steps[0]["ended_ms"] == steps[1]["started_ms"]
+
+    pool = executor.get_pool()
+    pool._admitted = pool.capacity
+    try:
+        resp = client.post("/v1/docparser/ingest", files={"file": ("a.html", HTML, "text/html")})
+    finally:
+        pool._admitted = 0
+    assert resp.status_code == 429
+    assert resp.headers["retry-after"] == "1"
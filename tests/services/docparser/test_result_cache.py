@@ -0,0 +1,115 @@
+import multiprocessing as mp
+import time
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.services.docparser import cache as cache_mod
+from backend.app.services.docparser import executor, main, pipeline
+from backend.app.services.docparser.cache import ResultCache
+from backend.app.services.docparser.schemas import (
+    CostBreakdown,
+    Diagnostics,
+    IngestResponse,
+    Metadata,
+)
+
+PDF = b"%PDF-1.7\n" + b"edital padrao " * 200
+
+
+def _response(sha, text="# Edital"):
+    return IngestResponse(
+        texto_markdown=text,
+        tabelas=[],
+        imagens=[],
+        metadados=Metadata(fonte="a.pdf", mime_type="application/pdf", bytes=1, sha256=sha),
+        proveniencia=Diagnostics(parser_usado="docling", versao_parser="0.0.1"),
+        custo=CostBreakdown(cpu_ms_parser=5, usd_estimado=0.0001),
+    )
+
+
+def test_roundtrip_is_keyed_by_sha_and_version(tmp_path):
+    with ResultCache(str(tmp_path / "c.sqlite")) as c:
+        assert c.put("a" * 64, "0.0.1", _response("a" * 64))
+        assert c.get("a" * 64, "0.0.1").texto_markdown == "# Edital"
+        assert c.get("a" * 64, "0.0.2") is None
+        assert c.get("b" * 64, "0.0.1") is None
+        assert c.stats()["entries"] == 1
+
+
+def test_lru_eviction_by_total_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "TOUCH_INTERVAL_S", 0.0)
+    noise = "".join(chr(0x4E00 + (i * 7919) % 20000) for i in range(3000))  # pouco compressível
+    one = len(zlib.compress(_response("a" * 64, noise + "a").model_dump_json().encode(), 6))
+    with ResultCache(str(tmp_path / "c.sqlite"), max_bytes=int(one * 3.5)) as c:
+        for k in "abc":
+            c.put(k * 64, "v", _response(k * 64, noise + k))
+            time.sleep(0.01)
+        assert c.get("a" * 64, "v") is not None  # "a" volta a ser o mais recente
+        c.put("d" * 64, "v", _response("d" * 64, noise + "d"))
+        assert c.get("b" * 64, "v") is None  # menos recente saiu
+        assert all(c.get(k * 64, "v") is not None for k in "acd")
+        assert c.stats()["bytes"] <= c.max_bytes
+
+
+def _writer(path, prefix, n):
+    with ResultCache(path) as c:
+        for i in range(n):
+            c.put(f"{prefix}{i:063d}", "v", _response("x"))
+
+
+def test_concurrent_writers_from_several_processes(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    ResultCache(path).close()
+    ctx = mp.get_context("fork")
+    procs = [ctx.Process(target=_writer, args=(path, p, 30)) for p in "abcd"]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert [p.exitcode for p in procs] == [0, 0, 0, 0]
+    with ResultCache(path) as c:
+        assert c.stats()["entries"] == 120
+
+
+@pytest.fixture()
+def client():
+    executor.configure(workers=1, max_queue=0, start_method="fork")
+    yield TestClient(main.app)
+    executor.shutdown_pool()
+
+
+def test_endpoint_serves_repeated_uploads_from_cache(client):
+    first = client.post("/v1/docparser/ingest", files={"file": ("edital.pdf", PDF, "application/pdf")})
+    assert first.status_code == 200
+    assert first.json()["proveniencia"]["cache_hit"] is False
+
+    t0 = time.perf_counter()
+    second = client.post("/v1/docparser/ingest", files={"file": ("copia.pdf", PDF, "application/pdf")})
+    elapsed = time.perf_counter() - t0
+    body = second.json()
+    assert body["proveniencia"]["cache_hit"] is True
+    assert body["proveniencia"]["steps"][-1]["name"] == "cache"
+    assert body["metadados"]["fonte"] == "copia.pdf"
+    assert body["metadados"]["sha256"] == first.json()["metadados"]["sha256"]
+    assert body["custo"]["cpu_ms_parser"] == 0
+    assert body["texto_markdown"] == first.json()["texto_markdown"]
+    assert elapsed < 0.5
+    assert executor.get_pool().admitted == 0
+
+
+def _broken_docling(source):
+    raise RuntimeError("docling indisponível")
+
+
+def test_fallback_result_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(pipeline, "parse_with_docling", _broken_docling)
+    doc = b"%PDF-1.7\n" + b"edital so no fallback " * 200
+    for _ in range(2):
+        resp = client.post("/v1/docparser/ingest", files={"file": ("f.pdf", doc, "application/pdf")})
+        assert resp.status_code == 200, resp.text
+        body = resp.json()
+        assert body["proveniencia"]["fallback"] is True
+        assert body["proveniencia"]["cache_hit"] is False
+    assert main.get_cache().get(body["metadados"]["sha256"], pipeline.PARSER_VERSION) is None
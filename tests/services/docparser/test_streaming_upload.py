@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.services.docparser import main
+from backend.app.services.docparser.upload import (
+    SpooledUpload,
+    UploadTooLarge,
+    read_upload,
+)
+
+HTML = b"<!doctype html><html><body><h1>Edital</h1><p>Preg\xc3\xa3o</p></body></html>"
+
+
+@pytest.fixture()
+def client():
+    return TestClient(main.app)
+
+
+def test_ingest_streams_and_hashes(client):
+    resp = client.post(
+        "/v1/docparser/ingest", files={"file": ("edital.html", HTML, "application/octet-stream")}
+    )
+    assert resp.status_code == 200, resp.text
+    meta = resp.json()["metadados"]
+    assert meta["sha256"] == hashlib.sha256(HTML).hexdigest()
+    assert meta["bytes"] == len(HTML)
+    assert meta["mime_type"] == "text/html"  # sniffado do primeiro bloco
+    assert meta["fonte"] == "edital.html"
+
+
+def test_small_upload_is_not_spilled_to_disk(client, monkeypatch):
+    seen = []
+    real = main.process_document_pipeline
+
+    async def spy(*, content, **kw):
+        seen.append(content)
+        return await real(content=content, **kw)
+
+    monkeypatch.setattr(main, "process_document_pipeline", spy)
+    resp = client.post("/v1/docparser/ingest", files={"file": ("edital.html", HTML, None)})
+    assert resp.status_code == 200, resp.text
+    assert isinstance(seen[0], memoryview)  # não virou arquivo temporário
+
+
+def test_ingest_rejects_large_unsupported_and_empty(client, monkeypatch, tmp_path):
+    monkeypatch.setattr("backend.app.services.docparser.upload.SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "MAX_BYTES", 4096)
+    big = b"%PDF-1.7\n" + b"x" * 200_000
+    resp = client.post("/v1/docparser/ingest", files={"file": ("a.pdf", big, "application/pdf")})
+    assert resp.status_code == 413
+    resp = client.post("/v1/docparser/ingest", files={"file": ("a.bin", b"\x00\x01", None)})
+    assert resp.status_code == 415
+    resp = client.post("/v1/docparser/ingest", files={"file": ("a.pdf", b"", "application/pdf")})
+    assert resp.status_code == 400
+    resp = client.post("/v1/docparser/ingest", data={"outro": "x"}, files={"x": ("a", b"1")})
+    assert resp.status_code == 400
+    assert os.listdir(tmp_path) == []  # nada de temporário esquecido
+
+
+def _multipart(payload: bytes, boundary=b"XyZ"):
+    head = (
+        b"--" + boundary + b"\r\nContent-Disposition: form-data; name=\"file\"; "
+        b"filename=\"big.pdf\"\r\nContent-Type: application/pdf\r\n\r\n"
+    )
+    return {"content-type": "multipart/form-data; boundary=" + boundary.decode()}, head + payload + (
+        b"\r\n--" + boundary + b"--\r\n"
+    )
+
+
+def test_read_upload_aborts_before_consuming_body():
+    headers, body = _multipart(b"%PDF-" + b"y" * 1_000_000)
+    consumed = []
+
+    async def stream():
+        for i in range(0, len(body), 16_384):
+            consumed.append(i)
+            yield body[i:i + 16_384]
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(read_upload(headers, stream(), max_bytes=50_000))
+    assert len(consumed) < 10  # parou logo depois do limite
+
+
+def test_read_upload_rejects_declared_length_without_reading():
+    headers, _ = _multipart(b"")
+    headers["content-length"] = str(10 * 1024 * 1024)
+
+    async def stream():
+        raise AssertionError("não deveria ler o corpo")
+        yield b""
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(read_upload(headers, stream(), max_bytes=1024 * 1024))
+
+
+def test_spooled_upload_rolls_over_to_disk(tmp_path):
+    data = os.urandom(300_000)
+    up = SpooledUpload("x.pdf", max_memory=100_000, dir=str(tmp_path))
+    for i in range(0, len(data), 65_536):
+        up.write(data[i:i + 65_536])
+    assert not up.in_memory
+    path = up.source()
+    assert isinstance(path, str) and open(path, "rb").read() == data
+    assert bytes(up.view()) == data and up.sha256 == hashlib.sha256(data).hexdigest()
+    up.close()
+    assert not os.path.exists(path)
+
+    small = SpooledUpload(max_memory=100_000)
+    small.write(b"%PDF-1.4 ok")
+    view = small.source()
+    assert isinstance(view, memoryview) and small.mime == "application/pdf"
+    assert bytes(view) == b"%PDF-1.4 ok"
+    small.close()